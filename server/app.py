@@ -3,7 +3,7 @@ import os
 import logging
 from datetime import datetime, timezone, timedelta
 
-from flask import Flask, request, jsonify, send_from_directory, redirect
+from flask import Flask, request, jsonify, send_from_directory, redirect, Response
 from werkzeug.security import check_password_hash
 import jwt as pyjwt
 
@@ -13,6 +13,10 @@ sys.path.insert(0, BASE_DIR)
 
 from core.database import JSONDatabase
 from server.cors_config import configure_cors
+from server.services.tracing import init_flask
+from server.services.runtime_config import (
+    RUNTIME_CONFIG_JS, RUNTIME_CONFIG_JSON, STATIC_CACHE_CONTROL, RuntimeConfig
+)
 from server.config import SECURITY_CONFIG
 
 # Logging
@@ -37,6 +41,9 @@ def create_app():
     # Banco de dados
     app.db = JSONDatabase()
 
+    # Span por requisição (X-Request-ID vindo dos proxies)
+    init_flask(app)
+
     # Configura CORS
     configure_cors(app)
 
@@ -144,7 +151,19 @@ def create_app():
     # 🔥 CORREÇÃO: Agora serve arquivos de client/static/
     @app.route('/static/<path:filename>')
     def serve_static(filename):
-        return send_from_directory(CLIENT_DIR, filename)
+        response = send_from_directory(CLIENT_DIR, filename)
+        response.headers['Cache-Control'] = STATIC_CACHE_CONTROL
+        return response
+
+    # Configuração dinâmica das páginas (URL do túnel, rotas) - o HTML não é mais reescrito
+    runtime_config = RuntimeConfig()
+
+    @app.route(RUNTIME_CONFIG_JSON)
+    @app.route(RUNTIME_CONFIG_JS, endpoint='runtime_config_js')
+    def serve_runtime_config():
+        fmt = 'js' if request.path.endswith('.js') else 'json'
+        status, headers, body = runtime_config.respond(fmt, request.headers.get('If-None-Match'))
+        return Response(body, status=status, headers=headers)
 
     # Rota para health check do load balancer externo
     @app.route('/health')
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+⏱️ LATÊNCIA POR RERUN: MOTORES COMPARTILHADOS (st.cache_resource) x RECONSTRUÍDOS
+Cada app roda em um subprocesso próprio (day trade e esportes têm ambos um pacote 'project')
+com ALMA_ENGINE_CACHE=1 e depois =0. Dentro do subprocesso, AppTest abre várias sessões novas
+no mesmo processo (como visitantes diferentes do mesmo servidor) e faz reruns em cada uma.
+
+Uso (a partir de server/):
+    python -m benchmarks.engine_rerun
+    python -m benchmarks.engine_rerun --apps sports --sessions 5 --reruns 10
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from services.stats import p95
+
+SELETOR_DIR = Path(__file__).parent.parent / "scripts" / "seletor"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+APPS = {
+    "daytrade": SELETOR_DIR / "day_trade" / "project" / "main.py",
+    "sports": SELETOR_DIR / "project" / "main.py",
+    "quantum": SELETOR_DIR / "ApostaPro" / "main.py",
+}
+
+
+def child(app: str, sessions: int, reruns: int) -> dict:
+    """Executado no subprocesso: mede a primeira execução e os reruns de cada sessão"""
+    from streamlit.testing.v1 import AppTest
+
+    script = APPS[app]
+    os.chdir(script.parent)
+    first, rerun = [], []
+    for _ in range(sessions):
+        at = AppTest.from_file(str(script), default_timeout=120)
+        started = time.perf_counter()
+        at.run()
+        first.append(time.perf_counter() - started)
+        if at.exception:
+            return {"error": at.exception[0].message}
+        for _ in range(reruns):
+            started = time.perf_counter()
+            at.run()
+            rerun.append(time.perf_counter() - started)
+    return {
+        "first_run_ms": [round(t * 1000, 2) for t in first],
+        "rerun_median_ms": round(statistics.median(rerun) * 1000, 2),
+        "rerun_p95_ms": round(p95(rerun) * 1000, 2),
+        # a primeira sessão paga os imports; as seguintes mostram o custo de uma sessão nova
+        "new_session_median_ms": round(statistics.median(first[1:] or first) * 1000, 2),
+    }
+
+
+def measure(app: str, cache: bool, sessions: int, reruns: int) -> dict:
+    env = dict(os.environ, ALMA_ENGINE_CACHE="1" if cache else "0")
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.engine_rerun", "--child", app,
+         "--sessions", str(sessions), "--reruns", str(reruns)],
+        cwd=Path(__file__).parent.parent, env=env, capture_output=True, text=True, timeout=900,
+    )
+    try:
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        return {"error": (completed.stderr.strip().splitlines() or ["sem saída"])[-1]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência por rerun com e sem motores compartilhados")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--sessions", type=int, default=5)
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/)")
+    parser.add_argument("--child", choices=list(APPS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.sessions, args.reruns)))
+        return
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "sessions": args.sessions,
+        "reruns": args.reruns,
+        "apps": {},
+    }
+    print(f"{'app':<10}{'cache':>7}{'rerun p50':>12}{'rerun p95':>12}{'sessão nova':>13}")
+    for app in args.apps:
+        report["apps"][app] = {}
+        for cache in (True, False):
+            result = measure(app, cache, args.sessions, args.reruns)
+            report["apps"][app]["cached" if cache else "uncached"] = result
+            if "error" in result:
+                print(f"{app:<10}{str(cache):>7}  falhou: {result['error']}")
+                continue
+            print(f"{app:<10}{str(cache):>7}{result['rerun_median_ms']:>10}ms{result['rerun_p95_ms']:>10}ms"
+                  f"{result['new_session_median_ms']:>11}ms")
+
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"engine_rerun_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
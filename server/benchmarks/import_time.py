@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+📦 TEMPO DE IMPORTAÇÃO DOS APPS STREAMLIT (python -X importtime)
+Executa cada ponto de entrada uma vez, em processo novo e em modo "bare" do Streamlit (sem
+servidor), e soma o tempo cumulativo dos imports de primeiro nível: é o que a primeira visita
+de um processo recém-iniciado paga antes de desenhar qualquer coisa.
+Para o ApostaPro também mede o import de cada tela do registro (frontend/registro.py).
+
+Compara com benchmarks/baselines/import_time.json e sai com código 1 quando algum ponto de
+entrada passa do limite (baseline + threshold). --update-baseline regrava o arquivo.
+
+Uso (a partir de server/):
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --apps quantum --runs 5 --threshold 0.25
+    python -m benchmarks.import_time --update-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+SELETOR_DIR = Path(__file__).parent.parent / "scripts" / "seletor"
+RESULTS_DIR = Path(__file__).parent / "results"
+BASELINE_FILE = Path(__file__).parent / "baselines" / "import_time.json"
+
+ENTRY_POINTS = {
+    "hub": SELETOR_DIR / "seletor.py",
+    "daytrade": SELETOR_DIR / "day_trade" / "project" / "main.py",
+    "sports": SELETOR_DIR / "project" / "main.py",
+    "quantum": SELETOR_DIR / "ApostaPro" / "main.py",
+}
+THRESHOLD = 0.25  # 25% acima da baseline
+MIN_SLACK_MS = 50.0  # variação absoluta tolerada em pontos de entrada pequenos
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+
+def parse_importtime(stderr: str) -> Tuple[float, List[Tuple[str, float]]]:
+    """Total dos imports de primeiro nível (ms) e os módulos de primeiro nível mais caros"""
+    top_level = []
+    for line in stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match and len(match.group(3)) == 1:  # um espaço: import feito pelo próprio script
+            top_level.append((match.group(4), int(match.group(2)) / 1000))
+    total = sum(ms for _, ms in top_level)
+    return total, sorted(top_level, key=lambda item: item[1], reverse=True)
+
+
+def run_importtime(code: str, cwd: Path) -> Tuple[float, List[Tuple[str, float]]]:
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=cwd, capture_output=True, text=True, timeout=300,
+        env=dict(os.environ, PYTHONWARNINGS="ignore"),
+    )
+    if completed.returncode != 0:
+        raise RuntimeError((completed.stderr.strip().splitlines() or ["falhou"])[-1])
+    return parse_importtime(completed.stderr)
+
+
+def entry_point_code(script: Path) -> str:
+    return (f"import runpy, sys; sys.argv = [{script.name!r}]; "
+            f"runpy.run_path({script.name!r}, run_name='__main__')")
+
+
+def view_codes() -> Dict[str, str]:
+    """Um import por tela do ApostaPro (módulos compartilhados entre telas aparecem em todas)"""
+    sys.path.insert(0, str(SELETOR_DIR / "ApostaPro"))
+    try:
+        from frontend.registro import TELAS
+    finally:
+        sys.path.pop(0)
+    modules = dict.fromkeys(tela.modulo for tela in TELAS)
+    return {f"quantum:{module.rsplit('.', 1)[-1]}": f"import {module}" for module in modules}
+
+
+def measure(code: str, cwd: Path, runs: int) -> dict:
+    totals, heaviest = [], []
+    for _ in range(runs):
+        try:
+            total, top = run_importtime(code, cwd)
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            return {"error": str(e)}
+        totals.append(total)
+        heaviest = top
+    return {
+        "import_ms": round(statistics.median(totals), 1),
+        "runs_ms": [round(t, 1) for t in totals],
+        "heaviest": [{"module": name, "ms": round(ms, 1)} for name, ms in heaviest[:8]],
+    }
+
+
+def check(results: Dict[str, dict], baseline: Dict[str, float], threshold: float) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline or "import_ms" not in result:
+            continue
+        limit = max(baseline[name] * (1 + threshold), baseline[name] + MIN_SLACK_MS)
+        if result["import_ms"] > limit:
+            regressions.append(f"{name}: {result['import_ms']}ms > limite {limit:.1f}ms "
+                               f"(baseline {baseline[name]}ms)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tempo de importação dos pontos de entrada Streamlit")
+    parser.add_argument("--apps", nargs="+", choices=list(ENTRY_POINTS), default=list(ENTRY_POINTS))
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--no-views", action="store_true", help="Não medir as telas do ApostaPro")
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/)")
+    args = parser.parse_args()
+
+    targets = {name: (entry_point_code(ENTRY_POINTS[name]), ENTRY_POINTS[name].parent) for name in args.apps}
+    if "quantum" in args.apps and not args.no_views:
+        targets.update({name: (code, ENTRY_POINTS["quantum"].parent) for name, code in view_codes().items()})
+
+    results = {}
+    print(f"{'ponto de entrada':<36}{'imports (ms)':>14}  mais caros")
+    for name, (code, cwd) in targets.items():
+        results[name] = result = measure(code, cwd, args.runs)
+        if "error" in result:
+            print(f"{name:<36}  falhou: {result['error']}")
+            continue
+        heaviest = ", ".join(f"{h['module']} {h['ms']:.0f}" for h in result["heaviest"][:3])
+        print(f"{name:<36}{result['import_ms']:>14.1f}  {heaviest}")
+
+    baseline = json.loads(BASELINE_FILE.read_text(encoding="utf-8")) if BASELINE_FILE.exists() else {}
+    regressions = check(results, baseline, args.threshold)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "runs": args.runs,
+        "threshold": args.threshold,
+        "results": results,
+        "regressions": regressions,
+    }
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"import_time_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"💾 Resultados salvos em {output}")
+
+    if args.update_baseline:
+        baseline.update({name: r["import_ms"] for name, r in results.items() if "import_ms" in r})
+        BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"📌 Baseline atualizada em {BASELINE_FILE}")
+    elif regressions:
+        print("❌ Regressão no tempo de importação:")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+    elif baseline:
+        print(f"✅ Dentro do limite da baseline (+{args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+🎛️ LATÊNCIA POR INTERAÇÃO NO PAINEL AO VIVO (fase 3 do app de esportes)
+Abre o app de esportes via AppTest já na fase "in_play" (portfólio e fases anteriores
+preenchidos no session_state), muda um controle por vez e mede o rerun que o servidor faria
+por causa dessa mudança: quanto tempo leva e quantos elementos são redesenhados.
+
+Quando o widget mexido pertence a um st.fragment, o rerun é pedido para aquele fragmento, como
+o navegador faz (RerunData.fragment_id). Widgets fora de fragmentos disparam o rerun completo do
+script. Funciona com o streamlit fixado em requirements.txt (1.48) e com versões mais novas.
+Para comparar antes/depois, rode o mesmo script em um checkout anterior.
+
+Uso (a partir de server/):
+    python -m benchmarks.in_play_rerun
+    python -m benchmarks.in_play_rerun --repeats 20
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+from services.stats import p95
+
+SELETOR_DIR = Path(__file__).parent.parent / "scripts" / "seletor"
+RESULTS_DIR = Path(__file__).parent / "results"
+SCRIPT = SELETOR_DIR / "project" / "main.py"
+
+# rótulo -> (tipo de widget, chave ou rótulo no AppTest, valores alternados)
+INTERACTIONS = {
+    "placar": ("selectbox", "live_score_select", ["1-0", "1-1"]),
+    "minuto": ("slider", "Minuto do Jogo", [62, 70]),
+    "volatilidade": ("select_slider", "Volatilidade do Mercado", ["Caótico", "Estável"]),
+    "pressao_casa": ("slider", "home_pressure_live", [0.8, 0.6]),
+}
+
+
+def seed_in_play(at):
+    """Portfólio com apostas iniciais e combinações confirmadas, pronto para a fase 3"""
+    sys.path.insert(0, str(SELETOR_DIR))
+    from project.config import BetType
+
+    portfolio = at.session_state["portfolio"]
+    portfolio.capital = 1000.0
+    for bet in portfolio.initial_bets.values():
+        bet.amount, bet.odd, bet.probability = 100.0, 1.9, 0.5
+    portfolio.multi_bets = [
+        {"name": "Under + Ambas", "bets": [BetType.UNDER_25, BetType.BOTH_TO_SCORE], "odds": [1.9, 2.0]},
+        {"name": "Over 1.5 + Vencedor", "bets": [BetType.OVER_15_MATCH, BetType.WINNER], "odds": [1.4, 2.1]},
+    ]
+    at.session_state["multi_bets_state"] = {"calculated_amounts": [155.0, 155.0]}
+    at.session_state["initial_odds_confirmed"] = True
+    at.session_state["multi_bets_confirmed"] = True
+    at.session_state["current_phase"] = "in_play"
+
+
+def find_widget(at, kind: str, ident: str):
+    for widget in getattr(at, kind):
+        if widget.key == ident or widget.label == ident:
+            return widget
+    raise LookupError(f"{kind} '{ident}' não encontrado")
+
+
+def widget_fragments(messages) -> dict:
+    """id do widget -> id do fragmento que o desenhou (vazio quando fora de fragmento)"""
+    owners = {}
+    for msg in messages:
+        if not msg.HasField("delta") or not msg.delta.HasField("new_element"):
+            continue
+        element = msg.delta.new_element
+        kind = element.WhichOneof("type")
+        proto = getattr(element, kind, None) if kind else None
+        if getattr(proto, "id", ""):
+            owners[proto.id] = msg.delta.fragment_id
+    return owners
+
+
+def count_elements(node) -> int:
+    children = getattr(node, "children", None)
+    if not children:
+        return 1
+    return sum(count_elements(child) for child in children.values())
+
+
+def run_interactions(repeats: int) -> dict:
+    """Uma sessão AppTest, uma série de mudanças por controle"""
+    from streamlit.testing.v1 import AppTest, local_script_runner
+
+    owners, target = {}, {"fragment_id": None}
+    parse_tree = local_script_runner.parse_tree_from_messages
+    rerun_data = local_script_runner.RerunData
+    fragments = local_script_runner.MemoryFragmentStorage()
+
+    def recording_parse(messages):
+        owners.update(widget_fragments(messages))
+        return parse_tree(messages)
+
+    def scoped_rerun_data(**kwargs):
+        return rerun_data(fragment_id=target["fragment_id"], **kwargs)
+
+    # o AppTest sempre pede rerun completo; aqui ele passa a pedir o do fragmento dono do widget.
+    # No 1.48 cada at.run() criaria um armazenamento de fragmentos vazio; o servidor mantém um só
+    # por sessão, então aqui também
+    local_script_runner.parse_tree_from_messages = recording_parse
+    local_script_runner.RerunData = scoped_rerun_data
+    local_script_runner.MemoryFragmentStorage = lambda: fragments
+
+    os.chdir(SCRIPT.parent)
+    at = AppTest.from_file(str(SCRIPT), default_timeout=120)
+    at.run()
+    seed_in_play(at)
+    at.run()
+    if at.exception:
+        return {"error": at.exception[0].message}
+
+    results = {"page_elements": count_elements(at._tree)}
+    for name, (kind, ident, values) in INTERACTIONS.items():
+        timings, redrawn, scope = [], [], "app"
+        for i in range(repeats):
+            widget = find_widget(at, kind, ident)
+            target["fragment_id"] = owners.get(widget.id) or None
+            scope = "fragment" if target["fragment_id"] else "app"
+            widget.set_value(values[i % len(values)])
+            started = time.perf_counter()
+            at.run()
+            timings.append(time.perf_counter() - started)
+            target["fragment_id"] = None
+            if at.exception:
+                return {"error": f"{name}: {at.exception[0].message}"}
+            redrawn.append(count_elements(at._tree))
+            # a árvore do AppTest só guarda o que o último rerun desenhou: um rerun completo
+            # (sem mudanças de widget) traz a página inteira de volta para a próxima interação
+            at.run()
+        results[name] = {
+            "scope": scope,
+            "median_ms": round(statistics.median(timings) * 1000, 2),
+            "p95_ms": round(p95(timings) * 1000, 2),
+            "elements_redrawn": max(redrawn),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latência por interação no painel ao vivo (fase 3)")
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/)")
+    args = parser.parse_args()
+
+    results = run_interactions(args.repeats)
+    if "error" in results:
+        print(f"⚠️  {results['error']}")
+    else:
+        print(f"{'controle':<16}{'escopo':>10}{'mediana (ms)':>14}{'p95 (ms)':>10}{'elementos':>12}")
+        for name in INTERACTIONS:
+            r = results[name]
+            print(f"{name:<16}{r['scope']:>10}{r['median_ms']:>14.1f}{r['p95_ms']:>10.1f}"
+                  f"{r['elements_redrawn']:>7}/{results['page_elements']}")
+
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "repeats": args.repeats,
+        "results": results,
+    }
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"in_play_rerun_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""
+📊 BENCHMARK DOS PROXIES DE BORDA
+Sobe upstreams falsos nas portas reais, inicia cada proxy como subprocesso e mede
+vazão, latência p50/p95/p99, memória e descritores de arquivo por conexão.
+
+Uso (a partir de server/):
+    python -m benchmarks.proxy_bench --concurrency 50 --requests 2000 --ws-clients 50
+    python -m benchmarks.proxy_bench --proxies gateway tunnel_server --output antes.json
+    python -m benchmarks.proxy_bench --compare antes.json depois.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import aiohttp
+import psutil
+
+from benchmarks.stub_upstreams import StubUpstreams, port_is_free
+from services.stats import percentile
+
+SERVICES_DIR = Path(__file__).parent.parent / "services"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# Como cada proxy é iniciado e quais caminhos exercitam o encaminhamento
+PROXIES = {
+    "proxy_server": {
+        "script": "proxy_server.py", "port": 5001,
+        "http_path": "/hub/bench", "ws_path": None,  # sem suporte a WebSocket
+    },
+    "fastapi_proxy": {
+        "script": "fastapi_proxy.py", "port": 5001,
+        "http_path": "/bench", "ws_path": "/hub/_stcore/stream",
+    },
+    "tunnel_server": {
+        "script": "tunnel_server.py", "port": 5501,
+        "http_path": "/seletor/bench", "ws_path": "/seletor/_stcore/stream",
+    },
+    "gateway": {
+        "script": "gateway.py", "port": 5001,
+        "http_path": "/hub/bench", "ws_path": "/hub/_stcore/stream",
+    },
+}
+
+
+def latency_summary(samples: List[float]) -> dict:
+    ms = [s * 1000 for s in samples]
+    return {
+        "p50_ms": round(percentile(ms, 50), 3),
+        "p95_ms": round(percentile(ms, 95), 3),
+        "p99_ms": round(percentile(ms, 99), 3),
+        "max_ms": round(max(ms), 3) if ms else 0.0,
+    }
+
+
+class ProcessSampler:
+    """Amostra RSS e descritores abertos do processo do proxy"""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        self.process = psutil.Process(pid)
+        self.interval = interval
+        self.peak_rss = 0
+        self.peak_fds = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def snapshot(self) -> Dict[str, int]:
+        rss = self.process.memory_info().rss
+        fds = self.process.num_fds() if hasattr(self.process, "num_fds") else self.process.num_handles()
+        self.peak_rss = max(self.peak_rss, rss)
+        self.peak_fds = max(self.peak_fds, fds)
+        return {"rss": rss, "fds": fds}
+
+    async def _run(self):
+        while True:
+            self.snapshot()
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        self.peak_rss = self.peak_fds = 0
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+
+async def wait_for_port(port: int, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Proxy encerrou durante a inicialização (código {process.returncode})")
+        if not port_is_free(port):
+            return
+        await asyncio.sleep(0.1)
+    raise TimeoutError(f"Proxy não abriu a porta {port} em {timeout:.0f}s")
+
+
+async def run_http_load(url: str, total: int, concurrency: int) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(total))
+
+    async def worker(session):
+        nonlocal errors
+        for _ in counter:
+            start = time.perf_counter()
+            try:
+                async with session.get(url) as resp:
+                    await resp.read()
+                    if resp.status >= 400:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        started = time.perf_counter()
+        await asyncio.gather(*[worker(session) for _ in range(concurrency)])
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "concurrency": concurrency,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(total / elapsed, 1) if elapsed else 0.0,
+        **latency_summary(latencies),
+    }
+
+
+async def run_ws_load(url: str, clients: int, messages: int, sampler: ProcessSampler) -> dict:
+    latencies: List[float] = []
+    errors = 0
+    all_open = asyncio.Event()
+    opened = 0
+    release = asyncio.Event()
+
+    async def client(session):
+        nonlocal errors, opened
+        try:
+            async with session.ws_connect(url, protocols=["streamlit"]) as ws:
+                opened += 1
+                if opened == clients:
+                    all_open.set()
+                for i in range(messages):
+                    start = time.perf_counter()
+                    await ws.send_str(f"ping-{i}")
+                    await ws.receive()
+                    latencies.append(time.perf_counter() - start)
+                await release.wait()
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            errors += 1
+            opened += 1
+            if opened == clients:
+                all_open.set()
+
+    async with aiohttp.ClientSession() as session:
+        await asyncio.sleep(1.0)  # deixa o proxy fechar as conexões da fase HTTP
+        idle = sampler.snapshot()
+        started = time.perf_counter()
+        tasks = [asyncio.create_task(client(session)) for _ in range(clients)]
+        await asyncio.wait_for(all_open.wait(), timeout=60)
+        await asyncio.sleep(0.5)  # todas as conexões abertas simultaneamente
+        loaded = sampler.snapshot()
+        release.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - started
+
+    connected = max(1, clients - errors)
+    return {
+        "clients": clients,
+        "messages_per_client": messages,
+        "errors": errors,
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_s": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "rss_per_connection_kb": round((loaded["rss"] - idle["rss"]) / connected / 1024, 2),
+        "fds_per_connection": round((loaded["fds"] - idle["fds"]) / connected, 2),
+        **latency_summary(latencies),
+    }
+
+
+async def bench_proxy(name: str, args) -> dict:
+    spec = PROXIES[name]
+    if not port_is_free(spec["port"]):
+        raise RuntimeError(f"Porta {spec['port']} ocupada; não é possível iniciar {name}")
+
+    process = subprocess.Popen(
+        [sys.executable, spec["script"]],
+        cwd=SERVICES_DIR,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        await wait_for_port(spec["port"], process)
+        sampler = ProcessSampler(process.pid)
+        base = f"http://127.0.0.1:{spec['port']}"
+        idle = sampler.snapshot()
+
+        # Aquecimento (não entra nas métricas)
+        await run_http_load(base + spec["http_path"], min(100, args.requests), min(10, args.concurrency))
+
+        sampler.start()
+        result = {
+            "idle_rss_mb": round(idle["rss"] / 1024 / 1024, 2),
+            "idle_fds": idle["fds"],
+            "http": await run_http_load(base + spec["http_path"], args.requests, args.concurrency),
+        }
+        if spec["ws_path"] and args.ws_clients:
+            result["websocket"] = await run_ws_load(
+                base.replace("http", "ws") + spec["ws_path"], args.ws_clients, args.ws_messages, sampler
+            )
+        await sampler.stop()
+        result["peak_rss_mb"] = round(sampler.peak_rss / 1024 / 1024, 2)
+        result["peak_fds"] = sampler.peak_fds
+        return result
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def run(args) -> dict:
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "parameters": {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "ws_clients": args.ws_clients,
+            "ws_messages": args.ws_messages,
+            "payload_bytes": args.payload_bytes,
+            "upstream_latency_ms": args.upstream_latency_ms,
+            "cacheable": args.cacheable,
+        },
+        "proxies": {},
+    }
+
+    async with StubUpstreams(payload_bytes=args.payload_bytes, latency_ms=args.upstream_latency_ms,
+                             cacheable=args.cacheable):
+        for name in args.proxies:
+            print(f"▶️  {name}...")
+            try:
+                report["proxies"][name] = await bench_proxy(name, args)
+            except Exception as e:
+                print(f"   ❌ {e}")
+                report["proxies"][name] = {"error": str(e)}
+                continue
+            http = report["proxies"][name]["http"]
+            print(f"   HTTP {http['throughput_rps']} req/s  p50={http['p50_ms']}ms  "
+                  f"p95={http['p95_ms']}ms  p99={http['p99_ms']}ms  erros={http['errors']}")
+            ws = report["proxies"][name].get("websocket")
+            if ws:
+                print(f"   WS   p50={ws['p50_ms']}ms  p99={ws['p99_ms']}ms  "
+                      f"{ws['rss_per_connection_kb']} KB/conn  {ws['fds_per_connection']} fds/conn")
+    return report
+
+
+def compare(old_path: str, new_path: str):
+    """Mostra a variação das métricas principais entre dois resultados"""
+    old = json.loads(Path(old_path).read_text(encoding="utf-8"))["proxies"]
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))["proxies"]
+    metrics = [("http", "throughput_rps"), ("http", "p50_ms"), ("http", "p99_ms"),
+               ("websocket", "p99_ms"), ("websocket", "rss_per_connection_kb"),
+               ("websocket", "fds_per_connection")]
+    for name in sorted(set(old) & set(new)):
+        print(f"== {name}")
+        for section, metric in metrics:
+            a = old[name].get(section, {}).get(metric)
+            b = new[name].get(section, {}).get(metric)
+            if a is None or b is None:
+                continue
+            delta = ((b - a) / a * 100) if a else 0.0
+            print(f"   {section}.{metric}: {a} -> {b} ({delta:+.1f}%)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos proxies ALMA com upstreams falsos")
+    parser.add_argument("--proxies", nargs="+", choices=sorted(PROXIES), default=sorted(PROXIES))
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--ws-clients", type=int, default=50)
+    parser.add_argument("--ws-messages", type=int, default=20)
+    parser.add_argument("--payload-bytes", type=int, default=2048)
+    parser.add_argument("--upstream-latency-ms", type=float, default=0.0)
+    parser.add_argument("--cacheable", action="store_true", help="Upstream responde com max-age=60")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/)")
+    parser.add_argument("--compare", nargs=2, metavar=("ANTES", "DEPOIS"))
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = asyncio.run(run(args))
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"proxy_bench_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
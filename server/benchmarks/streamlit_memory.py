@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+📊 MEMÓRIA: APPS STREAMLIT SEPARADOS x SERVIDOR ÚNICO (host.py)
+Sobe os apps como na implantação atual (um processo por app) e depois como páginas de um
+único Streamlit, aquece cada página com uma sessão headless e compara a memória residente
+(RSS e USS, que desconta bibliotecas compartilhadas) e o número de destinos de proxy.
+
+Uso (a partir de server/):
+    python -m benchmarks.streamlit_memory
+    python -m benchmarks.streamlit_memory --apps hub daytrade sports --output memoria.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+import aiohttp
+import psutil
+
+from benchmarks.stub_upstreams import port_is_free
+
+SERVICES_DIR = Path(__file__).parent.parent / "services"
+SELETOR_DIR = Path(__file__).parent.parent / "scripts" / "seletor"
+RESULTS_DIR = Path(__file__).parent / "results"
+
+sys.path.insert(0, str(SERVICES_DIR))
+from streamlit_warmup import run_session, wait_healthy  # noqa: E402
+
+# Script de cada app e nome da página correspondente no host.py
+APPS = {
+    "hub": (SELETOR_DIR / "seletor.py", ""),
+    "daytrade": (SELETOR_DIR / "day_trade" / "project" / "main.py", "daytrade"),
+    "sports": (SELETOR_DIR / "project" / "main.py", "sports"),
+    "quantum": (SELETOR_DIR / "ApostaPro" / "main.py", "quantum"),
+}
+BASE_PORT = 8611
+
+
+def start_streamlit(script: Path, port: int) -> subprocess.Popen:
+    if not port_is_free(port):
+        raise RuntimeError(f"Porta {port} ocupada")
+    return subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(script), "--server.port", str(port),
+         "--server.address", "127.0.0.1", "--server.headless", "true", "--browser.gatherUsageStats", "false"],
+        cwd=script.parent, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+
+
+def memory(processes: List[subprocess.Popen]) -> Dict[str, float]:
+    """RSS/USS somados dos processos e de seus filhos, em MB"""
+    rss = uss = 0
+    for process in processes:
+        try:
+            root = psutil.Process(process.pid)
+            for proc in [root] + root.children(recursive=True):
+                info = proc.memory_full_info()
+                rss += info.rss
+                uss += info.uss
+        except psutil.Error:
+            continue
+    return {"rss_mb": round(rss / 1024 / 1024, 1), "uss_mb": round(uss / 1024 / 1024, 1)}
+
+
+async def visit(session: aiohttp.ClientSession, port: int, page: str) -> dict:
+    try:
+        return {"first_visit_s": round(await run_session(session, port, page_name=page), 3)}
+    except Exception as e:
+        return {"error": str(e) or type(e).__name__}
+
+
+async def bench_separate(apps: List[str]) -> dict:
+    processes = {name: start_streamlit(APPS[name][0], BASE_PORT + i) for i, name in enumerate(apps)}
+    try:
+        async with aiohttp.ClientSession() as session:
+            for i, name in enumerate(apps):
+                await wait_healthy(session, BASE_PORT + i)
+            idle = memory(list(processes.values()))
+            pages = {name: await visit(session, BASE_PORT + i, "") for i, name in enumerate(apps)}
+        return {"processes": len(processes), "proxy_targets": len(processes), "idle": idle,
+                "loaded": memory(list(processes.values())), "pages": pages}
+    finally:
+        stop(processes.values())
+
+
+async def bench_host(apps: List[str]) -> dict:
+    port = BASE_PORT + len(APPS)
+    process = start_streamlit(SELETOR_DIR / "host.py", port)
+    try:
+        async with aiohttp.ClientSession() as session:
+            await wait_healthy(session, port)
+            idle = memory([process])
+            pages = {name: await visit(session, port, APPS[name][1]) for name in apps}
+        return {"processes": 1, "proxy_targets": 1, "idle": idle, "loaded": memory([process]), "pages": pages}
+    finally:
+        stop([process])
+
+
+def stop(processes):
+    for process in processes:
+        process.terminate()
+    for process in processes:
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+async def run(args) -> dict:
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+        },
+        "apps": args.apps,
+    }
+    print("▶️  apps separados...")
+    report["separate"] = await bench_separate(args.apps)
+    time.sleep(1)
+    print("▶️  servidor único (host.py)...")
+    report["host"] = await bench_host(args.apps)
+
+    sep, host = report["separate"]["loaded"], report["host"]["loaded"]
+    report["reduction"] = {
+        metric: round((1 - host[metric] / sep[metric]) * 100, 1) if sep[metric] else None
+        for metric in ("rss_mb", "uss_mb")
+    }
+    print(f"{'modo':<12}{'processos':>10}{'RSS (MB)':>11}{'USS (MB)':>11}")
+    for mode in ("separate", "host"):
+        r = report[mode]
+        print(f"{mode:<12}{r['processes']:>10}{r['loaded']['rss_mb']:>11}{r['loaded']['uss_mb']:>11}")
+        for name, page in r["pages"].items():
+            print(f"   {name:<10} {page.get('first_visit_s', page.get('error'))}")
+    print(f"Redução: RSS {report['reduction']['rss_mb']}%  USS {report['reduction']['uss_mb']}%")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memória dos apps Streamlit: separados x servidor único")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/)")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"streamlit_memory_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"💾 Resultados salvos em {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+🔁 CUSTO POR RERUN DOS APPS STREAMLIT (AppTest, sem navegador e sem rede)
+Cada ponto de entrada roda em um subprocesso próprio (day trade e esportes têm ambos um pacote
+'project') e percorre um roteiro fixo de interações, como um usuário faria. Para cada passo mede
+o rerun que a interação provoca: tempo de relógio, tempo de CPU e pico de memória alocada.
+
+- As primeiras sessões de cada subprocesso pagam imports e caches frios: --warmup as descarta.
+- O pico de memória (tracemalloc) vem de uma sessão extra, fora das medições de tempo, porque
+  o tracemalloc deixa o script bem mais lento.
+- A rede fica desligada: requests recebe uma resposta fixa e conexões de socket são recusadas.
+  As tentativas aparecem no relatório (network_calls); nenhum app deveria ter alguma.
+- Os botões "Acessar" do hub ficam de fora: eles esperam 1 s de propósito antes de redirecionar.
+
+Compara com benchmarks/baselines/streamlit_rerun.json e sai com código 1 quando algum passo
+passa do limite (baseline + threshold). --update-baseline regrava o arquivo.
+
+Uso (a partir de server/):
+    python -m benchmarks.streamlit_rerun
+    python -m benchmarks.streamlit_rerun --apps sports quantum --sessions 8 --threshold 0.5
+    python -m benchmarks.streamlit_rerun --update-baseline
+"""
+
+import argparse
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from services.stats import p95
+
+SERVER_DIR = Path(__file__).resolve().parent.parent
+SELETOR_DIR = SERVER_DIR / "scripts" / "seletor"
+RESULTS_DIR = Path(__file__).parent / "results"
+BASELINE_FILE = Path(__file__).parent / "baselines" / "streamlit_rerun.json"
+
+THRESHOLD = 0.5  # 50% acima da baseline: reruns curtos variam bastante entre execuções
+MIN_SLACK_MS = 25.0  # variação absoluta tolerada em passos rápidos
+MIN_SLACK_KB = 1024.0
+
+# Erros que o próprio app captura e mostra com st.error em vez de deixar a exceção subir
+FATAL_ERRORS = ("Erro crítico de execução",)
+
+# passo -> (tipo de widget, chave ou rótulo, valor). "button" clica; "rerun" roda sem mudança;
+# em "selectbox" o valor é o índice da opção (as opções são enums)
+APPS: Dict[str, Tuple[Path, List[Tuple[str, str, str, Any]]]] = {
+    "hub": (SELETOR_DIR / "seletor.py", [
+        ("nova_aba", "radio", "Modo de abertura:", "Em uma nova aba"),
+        ("mesma_janela", "radio", "Modo de abertura:", "Na mesma janela"),
+        ("ocioso", "rerun", "", None),
+    ]),
+    "daytrade": (SELETOR_DIR / "day_trade" / "project" / "main.py", [
+        ("capital", "number_input", "capital_input", 20000.0),
+        ("iniciar", "button", "init_flow", None),
+        ("preco_entrada", "number_input", "entry_LONG", 101.0),
+        ("timeframe", "selectbox", "tf_LONG", 1),
+        ("otimizar", "button", "optimize_standard", None),
+        ("confirmar", "button", "confirm_standard", None),
+        ("combinacao", "checkbox", "combo_Tendência com Proteção", True),
+        ("ocioso", "rerun", "", None),
+    ]),
+    "sports": (SELETOR_DIR / "project" / "main.py", [
+        ("capital", "number_input", "capital_input", 200.0),
+        ("iniciar", "button", "init_flow", None),
+        ("odd", "number_input", "odd_input_WINNER_3", 2.3),
+        ("otimizar", "button", "optimize_standard", None),
+        ("confirmar", "button", "confirm_standard", None),
+        ("combinacao", "checkbox", "combo_Combo Defensivo", True),
+        ("ocioso", "rerun", "", None),
+    ]),
+    "quantum": (SELETOR_DIR / "ApostaPro" / "main.py", [
+        # o primeiro PlataformaApostas limpa o session_state; o navegador reenviaria o modo
+        # escolhido, o AppTest não: fixar o modo primeiro recoloca o valor do radio no estado
+        ("modo_partida", "radio", "main_mode_selector", "Operações por Partida"),
+        ("capital", "number_input", "capital_input_unique", 50.0),
+        ("estrategia", "button", "confirm_strategy_button", None),
+        ("modo_multiplas", "radio", "main_mode_selector", "Apostas Múltiplas"),
+        ("calcular_multiplas", "button", "🔄 Calcular Distribuição Ótima", None),
+        ("modo_avancadas", "radio", "main_mode_selector", "🔢 Múltiplas Avançadas"),
+        ("confirmar_partidas", "button", "✅ Confirmar Partidas", None),
+        ("modo_por_partida", "radio", "main_mode_selector", "🔢 Múltiplas por Partida"),
+        ("modo_quantico", "radio", "main_mode_selector", "🧮 Cálculos Quânticos"),
+        ("modo_financeiro", "radio", "main_mode_selector", "📊 Operações Financeiras"),
+        ("modo_trade", "radio", "main_mode_selector", "⚡ Trade Automatizado"),
+        ("otimizar_trade", "button", "⚡ Otimizar Portfólio", None),
+        ("ocioso", "rerun", "", None),
+    ]),
+}
+
+
+# ------------------------------------------------------------------ rede desligada
+
+@contextmanager
+def offline(calls: List[str]):
+    """requests devolve 200 com corpo vazio; conexões TCP/UDP são recusadas. Anota cada tentativa"""
+    original_connect = socket.socket.connect
+    original_connect_ex = socket.socket.connect_ex
+
+    def refuse(sock, address):
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            calls.append(f"socket {address[0]}:{address[1]}")
+            raise ConnectionRefusedError(f"rede desligada no benchmark ({address[0]}:{address[1]})")
+        return original_connect(sock, address)
+
+    def refuse_ex(sock, address):
+        if sock.family in (socket.AF_INET, socket.AF_INET6):
+            calls.append(f"socket {address[0]}:{address[1]}")
+            return 111  # ECONNREFUSED
+        return original_connect_ex(sock, address)
+
+    socket.socket.connect, socket.socket.connect_ex = refuse, refuse_ex
+    adapter, original_send = None, None
+    try:
+        from requests import adapters, models
+        adapter, original_send = adapters.HTTPAdapter, adapters.HTTPAdapter.send
+
+        def canned(self, request, **kwargs):
+            calls.append(f"http {request.method} {request.url}")
+            response = models.Response()
+            response.status_code, response._content = 200, b"{}"
+            response.url, response.request = request.url, request
+            response.headers["Content-Type"] = "application/json"
+            return response
+
+        adapter.send = canned
+    except ImportError:
+        pass
+    try:
+        yield
+    finally:
+        socket.socket.connect, socket.socket.connect_ex = original_connect, original_connect_ex
+        if adapter is not None:
+            adapter.send = original_send
+
+
+# ------------------------------------------------------------------ subprocesso
+
+def find_widget(at, kind: str, ident: str):
+    for widget in getattr(at, kind):
+        if widget.key == ident or widget.label == ident:
+            return widget
+    raise LookupError(f"{kind} '{ident}' não encontrado")
+
+
+def failure(at) -> str:
+    if at.exception:
+        return at.exception[0].message.strip().splitlines()[-1]
+    for error in at.error:
+        if str(error.value).startswith(FATAL_ERRORS):
+            return str(error.value).splitlines()[-1]
+    return ""
+
+
+def run_session(script: Path, steps, memory: bool) -> Dict[str, Dict[str, float]]:
+    """Uma sessão nova percorrendo o roteiro; passo -> medidas (ou erro) do rerun que ele provoca"""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(str(script), default_timeout=120)
+    at.run()
+    if failure(at):
+        return {"inicio": {"error": failure(at)}}
+
+    measures = {}
+    for name, kind, ident, value in steps:
+        try:
+            if kind == "button":
+                find_widget(at, kind, ident).click()
+            elif kind == "selectbox":
+                find_widget(at, kind, ident).select_index(value)
+            elif kind != "rerun":
+                find_widget(at, kind, ident).set_value(value)
+        except LookupError as e:
+            measures[name] = {"error": str(e)}
+            continue
+
+        if memory:
+            tracemalloc.reset_peak()
+            baseline_kb = tracemalloc.get_traced_memory()[0] / 1024
+        wall, cpu = time.perf_counter(), time.process_time()
+        at.run()
+        wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+        if failure(at):
+            measures[name] = {"error": failure(at)}
+        elif memory:
+            measures[name] = {"peak_kb": round(tracemalloc.get_traced_memory()[1] / 1024 - baseline_kb, 1)}
+        else:
+            measures[name] = {"wall_ms": wall * 1000, "cpu_ms": cpu * 1000}
+    return measures
+
+
+def child(app: str, sessions: int, warmup: int) -> dict:
+    """Executado no subprocesso: sessões de aquecimento, sessões medidas e a sessão de memória"""
+    script, steps = APPS[app]
+    os.chdir(script.parent)
+    # com `-m` o server/ entra no sys.path, e o server/core esconderia o core do ApostaPro
+    sys.path[:] = [p for p in sys.path if p and Path(p).resolve() != SERVER_DIR]
+    calls: List[str] = []
+    with offline(calls):
+        for _ in range(warmup):
+            run_session(script, steps, memory=False)
+        timed = [run_session(script, steps, memory=False) for _ in range(sessions)]
+        tracemalloc.start()
+        try:
+            traced = run_session(script, steps, memory=True)
+        finally:
+            tracemalloc.stop()
+
+    if "inicio" in timed[0]:
+        return {"error": timed[0]["inicio"]["error"], "network_calls": sorted(set(calls))}
+    results = {}
+    for name, *_ in steps:
+        runs = [session[name] for session in timed if name in session]
+        errors = [run["error"] for run in runs if "error" in run]
+        if errors or not runs:
+            results[name] = {"error": errors[0] if errors else "passo não executado"}
+            continue
+        wall = sorted(run["wall_ms"] for run in runs)
+        results[name] = {
+            "wall_median_ms": round(statistics.median(wall), 2),
+            "wall_p95_ms": round(p95(wall), 2),
+            "cpu_median_ms": round(statistics.median(run["cpu_ms"] for run in runs), 2),
+            "peak_kb": traced.get(name, {}).get("peak_kb"),
+        }
+    return {"steps": results, "network_calls": sorted(set(calls))}
+
+
+def measure(app: str, sessions: int, warmup: int) -> dict:
+    completed = subprocess.run(
+        [sys.executable, "-m", "benchmarks.streamlit_rerun", "--child", app,
+         "--sessions", str(sessions), "--warmup", str(warmup)],
+        cwd=SERVER_DIR, capture_output=True, text=True, timeout=1800,
+    )
+    try:
+        return json.loads(completed.stdout.strip().splitlines()[-1])
+    except (IndexError, json.JSONDecodeError):
+        return {"error": (completed.stderr.strip().splitlines() or ["sem saída"])[-1]}
+
+
+# ------------------------------------------------------------------ baseline
+
+def baseline_entries(results: Dict[str, dict]) -> Dict[str, Dict[str, float]]:
+    """'app:passo' -> {wall_ms, peak_kb} dos passos que rodaram sem erro"""
+    entries = {}
+    for app, result in results.items():
+        for name, step in result.get("steps", {}).items():
+            if "wall_median_ms" in step:
+                entries[f"{app}:{name}"] = {"wall_ms": step["wall_median_ms"], "peak_kb": step["peak_kb"]}
+    return entries
+
+
+def check(results: Dict[str, dict], baseline: Dict[str, dict], threshold: float) -> List[str]:
+    regressions = []
+    for name, current in baseline_entries(results).items():
+        reference = baseline.get(name)
+        if not reference:
+            continue
+        for metric, unit, slack in (("wall_ms", "ms", MIN_SLACK_MS), ("peak_kb", "KB", MIN_SLACK_KB)):
+            if current.get(metric) is None or reference.get(metric) is None:
+                continue
+            limit = max(reference[metric] * (1 + threshold), reference[metric] + slack)
+            if current[metric] > limit:
+                regressions.append(f"{name} {metric}: {current[metric]}{unit} > limite {limit:.1f}{unit} "
+                                   f"(baseline {reference[metric]}{unit})")
+    for name in baseline:  # passo que rodava e agora falha também é regressão
+        app, step = name.split(":", 1)
+        failed = results.get(app, {}).get("steps", {}).get(step, {}).get("error")
+        if failed:
+            regressions.append(f"{name}: falhou ({failed})")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Custo por rerun dos apps Streamlit (AppTest)")
+    parser.add_argument("--apps", nargs="+", choices=list(APPS), default=list(APPS))
+    parser.add_argument("--sessions", type=int, default=5, help="Sessões medidas por app")
+    parser.add_argument("--warmup", type=int, default=1, help="Sessões descartadas antes das medidas")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--output", help="Arquivo JSON de saída (padrão: benchmarks/results/)")
+    parser.add_argument("--child", choices=list(APPS), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(child(args.child, args.sessions, args.warmup)))
+        return
+
+    results = {}
+    print(f"{'app:passo':<32}{'relógio p50':>13}{'p95':>10}{'CPU p50':>10}{'pico (KB)':>12}")
+    for app in args.apps:
+        results[app] = result = measure(app, args.sessions, args.warmup)
+        if "error" in result:
+            print(f"{app:<32}  falhou: {result['error']}")
+            continue
+        for name, step in result["steps"].items():
+            label = f"{app}:{name}"
+            if "error" in step:
+                print(f"{label:<32}  falhou: {step['error'][:70]}")
+                continue
+            print(f"{label:<32}{step['wall_median_ms']:>11.1f}ms{step['wall_p95_ms']:>8.1f}ms"
+                  f"{step['cpu_median_ms']:>8.1f}ms{step['peak_kb'] or 0:>12.0f}")
+        if result["network_calls"]:
+            print(f"⚠️  {app}: tentativas de rede bloqueadas: {', '.join(result['network_calls'][:5])}")
+
+    baseline = json.loads(BASELINE_FILE.read_text(encoding="utf-8")) if BASELINE_FILE.exists() else {}
+    regressions = check(results, baseline, args.threshold)
+    report = {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "environment": {"python": platform.python_version(), "platform": platform.platform()},
+        "sessions": args.sessions,
+        "warmup": args.warmup,
+        "threshold": args.threshold,
+        "results": results,
+        "regressions": regressions,
+    }
+    output = Path(args.output) if args.output else \
+        RESULTS_DIR / f"streamlit_rerun_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"💾 Resultados salvos em {output}")
+
+    if args.update_baseline:
+        baseline.update(baseline_entries(results))
+        BASELINE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        BASELINE_FILE.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"📌 Baseline atualizada em {BASELINE_FILE}")
+    elif regressions:
+        print("❌ Regressão no custo por rerun:")
+        for regression in regressions:
+            print(f"   {regression}")
+        sys.exit(1)
+    elif baseline:
+        print(f"✅ Dentro do limite da baseline (+{args.threshold:.0%})")
+
+
+if __name__ == "__main__":
+    main()
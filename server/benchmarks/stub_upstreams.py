@@ -0,0 +1,98 @@
+# stub_upstreams.py
+"""
+Upstreams falsos para benchmarks dos proxies
+Respondem HTTP com payload fixo e fazem eco de WebSocket em qualquer */_stcore/stream
+"""
+
+import asyncio
+import socket
+from typing import Iterable, List
+
+from aiohttp import web, WSMsgType
+
+# Portas reais usadas pelos proxies (Flask + apps Streamlit)
+DEFAULT_PORTS = (5000, 8501, 8502, 8503, 8504)
+
+
+def port_is_free(port: int, host: str = "127.0.0.1") -> bool:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.settimeout(0.5)
+        return s.connect_ex((host, port)) != 0
+
+
+class StubUpstreams:
+    """Sobe um stub aiohttp em cada porta informada"""
+
+    def __init__(self, ports: Iterable[int] = DEFAULT_PORTS, payload_bytes: int = 2048,
+                 latency_ms: float = 0.0, cacheable: bool = False):
+        self.ports = list(ports)
+        self.payload = b"x" * payload_bytes
+        self.latency = latency_ms / 1000.0
+        self.cacheable = cacheable
+        self.requests = 0
+        self.ws_messages = 0
+        self._runners: List[web.AppRunner] = []
+
+    def build_app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_route('*', '/{path:.*}', self.handle)
+        return app
+
+    async def handle(self, request):
+        if request.path.endswith("_stcore/stream") and request.headers.get("Upgrade", "").lower() == "websocket":
+            return await self.echo(request)
+
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        if request.can_read_body:
+            await request.read()
+        cache_control = "public, max-age=60" if self.cacheable else "no-store"
+        return web.Response(body=self.payload, content_type="application/octet-stream",
+                            headers={"Cache-Control": cache_control})
+
+    async def echo(self, request):
+        ws = web.WebSocketResponse(protocols=["streamlit", "v4.streamlit.connection"], max_msg_size=0)
+        await ws.prepare(request)
+        async for msg in ws:
+            self.ws_messages += 1
+            if msg.type == WSMsgType.TEXT:
+                await ws.send_str(msg.data)
+            elif msg.type == WSMsgType.BINARY:
+                await ws.send_bytes(msg.data)
+        return ws
+
+    async def start(self):
+        busy = [port for port in self.ports if not port_is_free(port)]
+        if busy:
+            raise RuntimeError(f"Portas em uso, encerre os serviços reais antes do benchmark: {busy}")
+        for port in self.ports:
+            runner = web.AppRunner(self.build_app(), access_log=None)
+            await runner.setup()
+            await web.TCPSite(runner, "127.0.0.1", port).start()
+            self._runners.append(runner)
+
+    async def stop(self):
+        for runner in self._runners:
+            await runner.cleanup()
+        self._runners.clear()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def _serve_forever(ports):
+    async with StubUpstreams(ports):
+        print(f"Stubs ativos nas portas {list(ports)} (Ctrl+C para parar)")
+        await asyncio.Future()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(_serve_forever(DEFAULT_PORTS))
+    except KeyboardInterrupt:
+        pass
@@ -9,6 +9,7 @@ import asyncio
 import websockets
 import subprocess
 import time
+from services.supervisor import CLOUDFLARE_URL_PATTERNS, supervisor
 
 logger = logging.getLogger(__name__)
 
@@ -24,7 +25,7 @@ class BridgeConfig:
         self._session.timeout = 3
         self.quantum_websocket = None
         self.quantum_connected = False
-        self.cloudflare_process = None
+        self._cloudflare_unsubscribe = None
         
     def _load_config(self):
         """Carrega configuração com validação rigorosa - SEM NGROK"""
@@ -66,7 +67,7 @@ class BridgeConfig:
         return {"url": "https://almafluxo.uk", "last_updated": None, "type": "cloudflare"}
     
     def start_cloudflare_tunnel(self):
-        """Inicia o tunnel do Cloudflare em background - VERSÃO MELHORADA"""
+        """Inicia o tunnel do Cloudflare; a saída é lida pelo supervisor como fluxo de eventos"""
         try:
             logger.info(f"Iniciando Cloudflare Tunnel: {self.config['cloudflare_tunnel_name']}")
             
@@ -78,69 +79,32 @@ class BridgeConfig:
                 self.config['cloudflare_tunnel_name']
             ]
             
-            # Inicia em background
-            self.cloudflare_process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                bufsize=1,
-                universal_newlines=True
-            )
+            # URL publicada assim que aparece na saída (sem sondagem nem prazo fixo)
+            if self._cloudflare_unsubscribe is None:
+                self._cloudflare_unsubscribe = supervisor.subscribe(
+                    self._on_cloudflare_event, topics=["cloudflared.url", "process.cloudflared"]
+                )
+            supervisor.watch_process("cloudflared", cmd, CLOUDFLARE_URL_PATTERNS, restart=True)
             
-            # Thread para monitorar a saída e extrair a URL
-            def monitor_output():
-                url_detected = False
-                start_time = time.time()
-                
-                while self.cloudflare_process and self.cloudflare_process.poll() is None:
-                    try:
-                        output = self.cloudflare_process.stdout.readline()
-                        if output:
-                            logger.info(f"Cloudflare: {output.strip()}")
-                            
-                            # Tenta extrair URL da saída
-                            if not url_detected:
-                                url = self._extract_url_from_output(output)
-                                if url:
-                                    self.update_cloudflare_url(url)
-                                    url_detected = True
-                                    logger.info(f"✅ URL do Cloudflare detectada: {url}")
-                            
-                        error = self.cloudflare_process.stderr.readline()
-                        if error:
-                            logger.error(f"Cloudflare Error: {error.strip()}")
-                            
-                        # Timeout após 30 segundos
-                        if time.time() - start_time > 30 and not url_detected:
-                            logger.warning("Timeout ao detectar URL do Cloudflare")
-                            break
-                            
-                        time.sleep(0.1)
-                    except Exception as e:
-                        logger.error(f"Erro no monitoramento Cloudflare: {e}")
-                        break
-                
-                monitor_thread = threading.Thread(target=monitor_output, daemon=True)
-                monitor_thread.start()
-                
-                logger.info("Cloudflare Tunnel iniciado em background")
-                return True
+            logger.info("Cloudflare Tunnel iniciado em background")
+            return True
                 
         except Exception as e:
             logger.error(f"Erro ao iniciar Cloudflare Tunnel: {e}")
             return False
 
+    def _on_cloudflare_event(self, event):
+        """Eventos do processo cloudflared publicados pelo supervisor"""
+        if event.topic == "cloudflared.url":
+            self.update_cloudflare_url(event.value)
+            logger.info(f"✅ URL do Cloudflare detectada: {event.value}")
+        elif event.value != "running":
+            logger.error(f"Cloudflare Tunnel encerrado ({event.value})")
+
     def _extract_url_from_output(self, output):
         """Extrai URL da saída do cloudflared - ATUALIZADO"""
-        patterns = [
-            r'https://[a-zA-Z0-9-]+\.try\.cloudflare\.com',
-            r'https://[a-zA-Z0-9-]+\.[a-zA-Z0-9-]+\.cloudflare\.com',
-            r'https://[a-zA-Z0-9-]+\.almafluxo\.uk'
-        ]
-        
-        for pattern in patterns:
-            match = re.search(pattern, output)
+        for pattern in CLOUDFLARE_URL_PATTERNS:
+            match = pattern.search(output)
             if match:
                 return match.group(0)
         
@@ -388,15 +352,15 @@ class BridgeConfig:
     
     def stop_cloudflare_tunnel(self):
         """Para o tunnel do Cloudflare"""
-        if self.cloudflare_process:
-            try:
-                self.cloudflare_process.terminate()
-                self.cloudflare_process.wait(timeout=5)
-                logger.info("Cloudflare Tunnel parado com sucesso")
-            except Exception as e:
-                logger.error(f"Erro ao parar Cloudflare Tunnel: {e}")
-            finally:
-                self.cloudflare_process = None
+        try:
+            supervisor.stop_process("cloudflared")
+            logger.info("Cloudflare Tunnel parado com sucesso")
+        except Exception as e:
+            logger.error(f"Erro ao parar Cloudflare Tunnel: {e}")
+        finally:
+            if self._cloudflare_unsubscribe:
+                self._cloudflare_unsubscribe()
+                self._cloudflare_unsubscribe = None
 
 # Instância singleton com inicialização segura
 try:
@@ -3,24 +3,22 @@ import time
 import requests
 import logging
 from bridge_config import bridge_config
+from services.supervisor import supervisor
+from services.tunnel_registry import tunnel_registry
 from threading import Event
-import json
-from pathlib import Path
 
 class NgrokManager:
     def __init__(self):
         self._is_running = True
         self._stop_event = Event()
         self._current_urls = {}
+        self._published = set()  # túneis que este processo publicou no registro
         self._failed_checks = {}
         self._max_failed_checks = 3
         self._max_recovery_attempts = 5  # ✅ ADICIONE ESTA LINHA
         self.logger = logging.getLogger(self.__class__.__name__)
-        self.config_file = Path(__file__).parent / ".ngrok_coordinator.json"
-        self.redirect_config_file = Path(__file__).parent / ".ngrok_redirects.json"
         
         # Configurações
-        self._monitor_interval = 20
         self._request_timeout = 12
 
     # ✅ ADICIONE ESTA FUNÇÃO PARA VERIFICAÇÃO DE TIMEZONE
@@ -57,100 +55,66 @@ class NgrokManager:
             
         return True
 
-    # ✅ ADICIONE ESTA FUNÇÃO PARA MONITORAMENTO COM TIMEZONE
     def monitor_ngrok_url(self):
-        """Monitora continuamente a URL do Ngrok - VERSÃO MELHORADA"""
+        """Acompanha os túneis como assinante do supervisor (sem laço próprio) - bloqueia até stop()"""
         self.logger.info("📡 Iniciando monitoramento contínuo multiporta...")
         
         # ✅ VERIFICAÇÃO DE TIMEZONE CRÍTICA
         if not self.check_timezone_compatibility():
             self.logger.warning("🚨 ALERTA: Possível problema de timezone detectado!")
         
-        last_tunnels = {}
-        performance_metrics = {
-            'checks_total': 0,
-            'checks_failed': 0,
+        self._metrics = {
             'recovery_attempts': 0,
             'url_changes': 0,
             'start_time': time.time()
         }
         
-        while self._is_running:
-            try:
-                performance_metrics['checks_total'] += 1
-                new_urls = self.fetch_ngrok_urls()
-                
-                # ✅ VERIFICAÇÃO PERIÓDICA DE TIMEZONE (a cada 10 ciclos)
-                if performance_metrics['checks_total'] % 10 == 0:
-                    if not self.check_timezone_compatibility():
-                        self.logger.warning("🔄 Timezone problem detectado - re-verificando túneis")
-                
-                # ✅ VERIFICAÇÃO INTELIGENTE COM TOLERÂNCIA A FALHAS
-                verified_urls = {}
-                
-                for name, url in new_urls.items():
-                    is_working = self.verify_connection(url)
-                    
-                    if is_working:
-                        verified_urls[name] = url
-                        self._failed_checks[name] = 0
-                    else:
-                        failed_count = self._failed_checks.get(name, 0) + 1
-                        self._failed_checks[name] = failed_count
-                        
-                        if failed_count <= self._max_failed_checks:
-                            self.logger.debug(f"⚠️  {name} falhou {failed_count}/{self._max_failed_checks}: {url}")
-                            verified_urls[name] = url
-                        else:
-                            self.logger.warning(f"❌ {name} removido após {failed_count} falhas: {url}")
-                
-                # Verifica se houve mudanças significativas
-                if verified_urls != self._current_urls:
-                    if verified_urls:
-                        self.logger.info(f"🔄 Mudança detectada: {len(verified_urls)} túneis ativos")
-                        self._current_urls = verified_urls
-                        performance_metrics['url_changes'] += 1
-                        
-                        self.update_bridge_config(verified_urls)
-                        self.update_redirect_config(verified_urls.get('proxy'))
-                    else:
-                        self.logger.warning("⚠️  Todos os túneis inativos - aguardando recuperação")
-                        self._current_urls = {}
-                        self.update_redirect_config(None)
-                
-                self.log_urls_status(verified_urls)
-                
-                # ✅ REGISTRA MÉTRICAS A CADA 10 CICLOS
-                if performance_metrics['checks_total'] % 10 == 0:
-                    uptime = time.time() - performance_metrics['start_time']
-                    success_rate = (
-                        (performance_metrics['checks_total'] - performance_metrics['checks_failed']) / 
-                        performance_metrics['checks_total']
-                    ) * 100
-                    
-                    self.logger.info(
-                        f"📈 Métricas: {uptime:.0f}s uptime, "
-                        f"{success_rate:.1f}% sucesso, "
-                        f"{performance_metrics['url_changes']} mudanças detectadas"
-                    )
-                        
-            except Exception as e:
-                performance_metrics['checks_failed'] += 1
-                self.logger.error(f"❌ Erro no monitoramento: {str(e)}")
-                
-                if performance_metrics['recovery_attempts'] < self._max_recovery_attempts:
-                    performance_metrics['recovery_attempts'] += 1
+        # ✅ O SUPERVISOR TESTA OS TÚNEIS NOVOS NA HORA E REVERIFICA OS DEMAIS
+        supervisor.watch_tunnels(threshold=self._max_failed_checks)
+        unsubscribe = supervisor.subscribe(self.on_supervisor_event, topics=["tunnels.healthy", "ngrok.api"])
+        try:
+            while not self._stop_event.wait(1):
+                pass
+        finally:
+            unsubscribe()
+
+    def on_supervisor_event(self, event):
+        """Aplica as mudanças publicadas pelo supervisor"""
+        if event.topic == "ngrok.api":
+            if event.value is False:
+                if self._metrics['recovery_attempts'] < self._max_recovery_attempts:
+                    self._metrics['recovery_attempts'] += 1
                     self.logger.warning(
                         f"🔄 Tentativa de recuperação "
-                        f"{performance_metrics['recovery_attempts']}/{self._max_recovery_attempts}"
+                        f"{self._metrics['recovery_attempts']}/{self._max_recovery_attempts}"
                     )
                     self.attempt_recovery()
                 else:
                     self.logger.critical("💥 Máximo de tentativas de recuperação excedido")
-                
-                time.sleep(30)
+            return
+        
+        verified_urls = event.value or {}
+        if verified_urls == self._current_urls:
+            return
+        
+        if verified_urls:
+            self.logger.info(f"🔄 Mudança detectada: {len(verified_urls)} túneis ativos")
+            self._current_urls = verified_urls
+            self._metrics['url_changes'] += 1
             
-            self._stop_event.wait(self._monitor_interval)
+            self.update_bridge_config(verified_urls)
+            self.update_redirect_config(verified_urls.get('proxy'))
+            
+            self.logger.info("📊 Túneis ativos:")
+            for name, url in verified_urls.items():
+                self.logger.info(f"   ✅ {name}: {url}")
+        else:
+            self.logger.warning("⚠️  Todos os túneis inativos - aguardando recuperação")
+            self._current_urls = {}
+            self.update_redirect_config(None)
+        
+        uptime = time.time() - self._metrics['start_time']
+        self.logger.info(f"📈 Métricas: {uptime:.0f}s uptime, {self._metrics['url_changes']} mudanças detectadas")
 
     # ✅ MODIFIQUE A FUNÇÃO start_monitoring PARA USAR A NOVA VERSÃO
     def start_monitoring(self):
@@ -158,22 +122,18 @@ class NgrokManager:
         self.monitor_ngrok_url()
 
     def get_coordinator_urls(self):
-        """Obtém URLs do arquivo de coordenação - AGORA retorna dicionário"""
-        try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    return config.get('urls', {})  # ✅ Retorna dicionário
-        except:
-            pass
-        return {}
+        """URLs publicadas no registro compartilhado de túneis"""
+        return tunnel_registry.urls()  # ✅ Retorna dicionário
 
     def update_redirect_config(self, url):
-        """Atualiza arquivo de configuração do redirect server"""
+        """Atualiza a URL principal no registro de túneis (None = nenhum túnel ativo)"""
         try:
-            config = {'current_ngrok': url}
-            with open(self.redirect_config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2)
+            if url:
+                tunnel_registry.publish(url=url, source='ngrok_manager', merge=True)
+            elif self._published:
+                # só retira os túneis do ngrok; os de outros publicadores continuam
+                tunnel_registry.unpublish(self._published, source='ngrok_manager')
+                self._published = set()
             self.logger.info(f"✅ Configuração de redirect atualizada: {url}")
         except Exception as e:
             self.logger.error(f"❌ Erro ao atualizar redirect config: {e}")
@@ -376,22 +336,14 @@ class NgrokManager:
                 self.logger.warning(f"   ❌ {name}: {url} (falhas: {failed_count})")
 
     def share_config_with_redirect_server(self, urls):
-        """Compartilha a configuração com o Redirect Server"""
+        """Compartilha os túneis com os demais processos pelo registro de túneis"""
         try:
-            redirect_config_file = Path(__file__).parent.parent / "client" / ".ngrok_redirects.json"
-            main_url = urls.get('proxy') or urls.get('streamlit') or next(iter(urls.values()), None)
-            
-            config = {
-                'current_ngrok': main_url,
-                'urls': urls,
-                'last_updated': time.time(),
-                'source': 'ngrok_manager'
-            }
-            
-            with open(redirect_config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=2)
-                
-            self.logger.info(f"✅ Configuração compartilhada com Redirect Server: {main_url}")
+            stale = self._published - set(urls)
+            if stale:
+                tunnel_registry.unpublish(stale, source='ngrok_manager')
+            version = tunnel_registry.publish(urls, source='ngrok_manager', merge=True)
+            self._published = set(urls)
+            self.logger.info(f"✅ Registro de túneis v{version}: {tunnel_registry.current_url()}")
             
         except Exception as e:
             self.logger.error(f"❌ Erro ao compartilhar config: {e}")
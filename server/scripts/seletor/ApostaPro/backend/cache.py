@@ -0,0 +1,17 @@
+# backend/cache.py
+"""
+Acesso aos módulos compartilhados pelos apps: cache de resultados (seletor/result_cache.py)
+e forma compacta do session_state (seletor/session_budget.py)
+"""
+
+import sys
+from pathlib import Path
+
+SELETOR_DIR = Path(__file__).resolve().parent.parent.parent
+if str(SELETOR_DIR) not in sys.path:
+    sys.path.append(str(SELETOR_DIR))
+
+from result_cache import get_cache  # noqa: E402
+from session_budget import compact, expand  # noqa: E402
+
+__all__ = ["get_cache", "compact", "expand"]
@@ -2,6 +2,7 @@ import numpy as np
 from typing import List, Dict, Tuple
 import itertools
 from frontend.config import config_multiplas
+from backend.cache import get_cache
 
 class OtimizadorMultiplas:
     def __init__(self):
@@ -140,6 +141,19 @@ class OtimizadorMultiplas:
         if not isinstance(tolerancia, (int, float)) or tolerancia < 0 or tolerancia > 0.1:
             raise ValueError("Tolerância deve ser um número entre 0 e 0.1")
 
+        # Mesmas partidas, capital e tolerância: resultado do cache (compartilhado entre sessões)
+        cache = get_cache("multiplas.distribuicao", source=__file__)
+        resultado, self.combinacoes = cache.get_or_compute(
+            cache.key(self.partidas, capital, tolerancia),
+            lambda: (self._calcular_distribuicao(capital, tolerancia), self.combinacoes),
+            cacheable=lambda calculado: calculado[0]['tipo_distribuicao'] != 'erro',
+        )
+        self.retornos = resultado['retornos']
+        self.probabilidades = resultado['probabilidades']
+        resultado['partidas'] = self.partidas
+        return resultado
+
+    def _calcular_distribuicao(self, capital: float, tolerancia: float) -> Dict:
         try:
             self._gerar_combinacoes_validas(tolerancia)
             self._calcular_retornos_combinacoes()  # Chamada corrigida sem parâmetros
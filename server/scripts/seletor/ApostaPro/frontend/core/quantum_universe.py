@@ -16,9 +16,10 @@ class QuantumState:
     energy_level: float = 1.0
 
 class QuantumUniverseOperator:
-    def __init__(self, dimensions: int = 1000):
+    def __init__(self, dimensions: int = 1000, quantum_field: Dict[str, np.ndarray] = None):
         self.dimensions = dimensions
-        self.quantum_field = self._initialize_quantum_vacuum()
+        # Campo somente leitura: pode vir pronto e ser compartilhado (frontend/engines.py)
+        self.quantum_field = quantum_field if quantum_field is not None else self._initialize_quantum_vacuum()
         self.temporal_flux = 1.61803398875
         self.parallel_universes = []
     
@@ -0,0 +1,56 @@
+# engines.py
+"""
+Motores compartilhados pelo processo do Streamlit (st.cache_resource)
+O que é caro e não depende do usuário é construído uma vez por processo e reaproveitado
+entre reruns e sessões; o que é de cada usuário (universos criados, estado quântico,
+múltiplas calculadas) continua em objetos próprios guardados no session_state.
+
+Invalidação explícita: invalidar_motores(). Alterar o código dos motores também invalida,
+porque a data de modificação do módulo faz parte da chave do cache.
+ALMA_ENGINE_CACHE=0 desliga o compartilhamento (usado para comparar no benchmark).
+"""
+
+import inspect
+import os
+
+import streamlit as st
+
+from frontend.modules.quantum import QuantumProcessor, QuantumUniverseOperator
+
+CACHE_ENABLED = os.getenv("ALMA_ENGINE_CACHE", "1") == "1"
+
+DIMENSOES_UNIVERSO = 100
+
+
+def _versao(*classes) -> tuple:
+    return tuple(os.path.getmtime(inspect.getfile(c)) for c in classes)
+
+
+def _novo_campo(dimensoes: int) -> dict:
+    campo = QuantumUniverseOperator(dimensions=dimensoes).quantum_field
+    for matriz in campo.values():
+        matriz.setflags(write=False)  # compartilhado entre sessões: somente leitura
+    return campo
+
+
+@st.cache_resource(show_spinner=False)
+def _campo_quantico(dimensoes: int, versao: tuple) -> dict:
+    return _novo_campo(dimensoes)
+
+
+def campo_quantico(dimensoes: int = DIMENSOES_UNIVERSO) -> dict:
+    """Vácuo quântico (matrizes aleatórias) do QuantumUniverseOperator, um por processo"""
+    if not CACHE_ENABLED:
+        return _novo_campo(dimensoes)
+    return _campo_quantico(dimensoes, _versao(QuantumUniverseOperator))
+
+
+def processador_quantico() -> QuantumProcessor:
+    """QuantumProcessor por usuário sobre o campo compartilhado (os universos criados são da sessão)"""
+    operador = QuantumUniverseOperator(dimensions=DIMENSOES_UNIVERSO, quantum_field=campo_quantico())
+    return QuantumProcessor(universe_operator=operador)
+
+
+def invalidar_motores():
+    """Descarta os motores compartilhados; o próximo uso reconstrói"""
+    _campo_quantico.clear()
@@ -0,0 +1,198 @@
+# entrada_lote.py
+"""
+Entrada de odds em lote para as telas do Operador Conquistador
+Com um number_input por odd, cada valor digitado reexecuta a tela inteira. Aqui as odds vão
+numa tabela dentro de um st.form ou coladas como linhas CSV: nada roda até o envio, e no envio
+todas as linhas são validadas de uma vez (todos os erros aparecem juntos) antes do único cálculo.
+"""
+
+import csv
+import datetime
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import streamlit as st
+
+MODOS_ENTRADA = ("Campo a campo", "Lote (tabela ou CSV)")
+MAX_ERROS_EXIBIDOS = 15
+
+
+@dataclass(frozen=True)
+class Campo:
+    chave: str
+    rotulo: str
+    padrao: Any  # float para odds/estatísticas, datetime.time para horários
+    minimo: float = 1.01
+    maximo: float = math.inf  # o mesmo limite do number_input da tela (sem max_value: sem teto)
+    opcional: bool = False  # pode faltar no CSV; a tela usa o próprio padrão
+
+
+def modo_lote(chave: str) -> bool:
+    """Seletor do modo de entrada da tela; True quando o modo em lote está ativo"""
+    modo = st.radio("Modo de entrada das odds", MODOS_ENTRADA, horizontal=True, key=f"modo_entrada_{chave}")
+    return modo == MODOS_ENTRADA[1]
+
+
+def _vazio(bruto: Any) -> bool:
+    return bruto is None or bruto is pd.NaT or (isinstance(bruto, float) and math.isnan(bruto)) \
+        or str(bruto).strip() == ""
+
+
+def converter(campo: Campo, bruto: Any) -> Tuple[Any, Optional[str]]:
+    """Valor convertido e validado, ou (None, motivo). Aceita vírgula decimal ("1,85")"""
+    if _vazio(bruto):
+        return None, "valor ausente"
+    if isinstance(campo.padrao, datetime.time):
+        if isinstance(bruto, datetime.time):
+            return bruto, None
+        try:
+            return datetime.datetime.strptime(str(bruto).strip(), "%H:%M").time(), None
+        except ValueError:
+            return None, f"'{bruto}' não é um horário HH:MM"
+    try:
+        valor = float(str(bruto).strip().replace(",", ".")) if isinstance(bruto, str) else float(bruto)
+    except (TypeError, ValueError):
+        return None, f"'{bruto}' não é um número"
+    if math.isnan(valor) or not campo.minimo <= valor <= campo.maximo:
+        if math.isinf(campo.maximo):
+            return None, f"{valor:g} abaixo do mínimo {campo.minimo:g}"
+        return None, f"{valor:g} fora do intervalo {campo.minimo:g}–{campo.maximo:g}"
+    return valor, None
+
+
+def _nomes(campos: Sequence[Campo]) -> Dict[str, str]:
+    """Chave ou rótulo (sem diferenciar maiúsculas) -> chave do campo"""
+    nomes = {c.rotulo.strip().lower(): c.chave for c in campos}
+    nomes.update({c.chave.lower(): c.chave for c in campos})
+    return nomes
+
+
+def _linhas_csv(texto: str, campos: Sequence[Campo]) -> Tuple[List[Tuple[int, Dict[str, str]]], List[str]]:
+    """Linhas coladas -> (número da linha, valores brutos). Separador ; , ou tab; cabeçalho opcional"""
+    linhas = [(n, l) for n, l in enumerate(texto.splitlines(), 1) if l.strip() and not l.lstrip().startswith("#")]
+    if not linhas:
+        return [], ["Nenhuma linha colada"]
+
+    delimitador = next((d for d in (";", "\t") if d in linhas[0][1]), ",")
+    registros = [(n, [c.strip() for c in r]) for (n, _), r in
+                 zip(linhas, csv.reader([l for _, l in linhas], delimiter=delimitador))]
+
+    nomes = _nomes(campos)
+    cabecalho = [nomes.get(celula.lower()) for celula in registros[0][1]]
+    obrigatorios = [c.chave for c in campos if not c.opcional]
+    if all(cabecalho):  # primeira linha é cabeçalho: colunas em qualquer ordem
+        faltando = [c.rotulo for c in campos if not c.opcional and c.chave not in cabecalho]
+        if faltando:
+            return [], [f"Cabeçalho sem as colunas: {', '.join(faltando)}"]
+        ordens, registros = {len(cabecalho): cabecalho}, registros[1:]
+    else:
+        ordens = {len(campos): [c.chave for c in campos], len(obrigatorios): obrigatorios}
+
+    brutas, erros = [], []
+    for n, registro in registros:
+        ordem = ordens.get(len(registro))
+        if ordem is None:
+            esperado = " ou ".join(str(k) for k in sorted(ordens))
+            erros.append(f"Linha {n}: {len(registro)} colunas, esperado {esperado}")
+        else:
+            brutas.append((n, dict(zip(ordem, registro))))
+    return brutas, erros
+
+
+def ler_lote(tabela: Optional[pd.DataFrame], texto: str, campos: Sequence[Campo],
+             min_linhas: int = 1, max_linhas: Optional[int] = None) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Converte e valida todas as linhas de uma vez. O texto colado, se houver, tem prioridade
+    sobre a tabela. Devolve (linhas, []) quando tudo é válido ou ([], erros) com todos os erros.
+    """
+    if texto and texto.strip():
+        brutas, erros = _linhas_csv(texto, campos)
+    else:
+        registros = tabela.to_dict("records") if tabela is not None else []
+        brutas, erros = list(enumerate(registros, 1)), []
+
+    linhas = []
+    for n, bruta in brutas:
+        linha = {}
+        for campo in campos:
+            if campo.opcional and _vazio(bruta.get(campo.chave)):
+                continue
+            valor, erro = converter(campo, bruta.get(campo.chave))
+            if erro:
+                erros.append(f"Linha {n}, {campo.rotulo}: {erro}")
+            linha[campo.chave] = valor
+        linhas.append(linha)
+
+    total = len(brutas)
+    if total < min_linhas or (max_linhas is not None and total > max_linhas):
+        limite = f"entre {min_linhas} e {max_linhas}" if max_linhas is not None else f"ao menos {min_linhas}"
+        erros.insert(0, f"{total} linha(s) informada(s); são necessárias {limite}")
+    return ([], erros) if erros else (linhas, [])
+
+
+def ler_pares(texto: str, campos: Sequence[Campo]) -> Tuple[Dict[str, Any], List[str]]:
+    """Linhas "mercado;valor" (chave ou rótulo do campo) -> valores validados e todos os erros"""
+    nomes, valores, erros = _nomes(campos), {}, []
+    por_chave = {c.chave: c for c in campos}
+    for n, linha in enumerate(texto.splitlines(), 1):
+        if not linha.strip() or linha.lstrip().startswith("#"):
+            continue
+        delimitador = next((d for d in (";", "\t", "=") if d in linha), ",")
+        nome, _, bruto = linha.partition(delimitador)
+        chave = nomes.get(nome.strip().lower())
+        if chave is None:
+            erros.append(f"Linha {n}: mercado '{nome.strip()}' desconhecido")
+            continue
+        valor, erro = converter(por_chave[chave], bruto)
+        if erro:
+            erros.append(f"Linha {n}, {por_chave[chave].rotulo}: {erro}")
+        else:
+            valores[chave] = valor
+    return valores, erros
+
+
+def validar_valores(valores: Dict[str, Any], campos: Sequence[Campo]) -> List[str]:
+    """Valida de uma vez os valores de um formulário (um campo por chave)"""
+    erros = []
+    for campo in campos:
+        _, erro = converter(campo, valores.get(campo.chave))
+        if erro:
+            erros.append(f"{campo.rotulo}: {erro}")
+    return erros
+
+
+def editor_lote(chave: str, campos: Sequence[Campo], linhas_iniciais: List[Dict[str, Any]]) -> Tuple[pd.DataFrame, str]:
+    """Tabela editável (uma linha por partida) e área para colar CSV. Use dentro de um st.form"""
+    config = {}
+    for campo in campos:
+        if isinstance(campo.padrao, datetime.time):
+            config[campo.chave] = st.column_config.TimeColumn(campo.rotulo, format="HH:mm")
+        else:
+            config[campo.chave] = st.column_config.NumberColumn(
+                campo.rotulo, min_value=campo.minimo, max_value=None if math.isinf(campo.maximo) else campo.maximo,
+                step=0.01, format="%.2f")
+
+    tabela = st.data_editor(
+        pd.DataFrame(linhas_iniciais, columns=[c.chave for c in campos]),
+        column_config=config, num_rows="dynamic", hide_index=True,
+        use_container_width=True, key=f"tabela_{chave}"
+    )
+    exemplo = ";".join(c.chave for c in campos) + "\n" + ";".join(
+        c.padrao.strftime("%H:%M") if isinstance(c.padrao, datetime.time) else f"{c.padrao:.2f}".replace(".", ",")
+        for c in campos)
+    texto = st.text_area(
+        "Ou cole as linhas em CSV (tem prioridade sobre a tabela)",
+        key=f"csv_{chave}", placeholder=exemplo, height=120,
+        help="Uma partida por linha; separador ; , ou tab; cabeçalho opcional; vírgula decimal aceita com ;"
+    )
+    return tabela, texto
+
+
+def mostrar_erros(erros: List[str]):
+    """Todos os erros da validação em um só aviso"""
+    itens = "\n".join(f"- {erro}" for erro in erros[:MAX_ERROS_EXIBIDOS])
+    if len(erros) > MAX_ERROS_EXIBIDOS:
+        itens += f"\n- … e mais {len(erros) - MAX_ERROS_EXIBIDOS} erro(s)"
+    st.error(f"❌ Nada foi calculado. Corrija {len(erros)} problema(s):\n{itens}")
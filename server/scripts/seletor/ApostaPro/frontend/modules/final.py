@@ -1,7 +1,6 @@
 # modules/final.py
 import streamlit as st
 import pandas as pd
-import matplotlib.pyplot as plt
 from typing import Dict
 from dataclasses import dataclass
 from frontend.config import TipoAposta, CenarioIntervalo
@@ -146,6 +145,7 @@ class GerenciadorFinal:
             st.dataframe(df_2t.style.format({"Retorno (R$)": "{:.2f}"}))
         
         # Gráfico de desempenho
+        import matplotlib.pyplot as plt
         fig, ax = plt.subplots()
         ax.bar(["1º Tempo", "2º Tempo"], 
               [sum(resultado.retornos_1t.values()), sum(resultado.retornos_2t.values())],
@@ -1,11 +1,10 @@
 # modules/intervalo.py
 import math 
-import matplotlib.pyplot as plt
 import pandas as pd
 import streamlit as st
 from typing import Dict
 from dataclasses import dataclass
-from frontend.modules.quantum import QuantumProcessor
+from frontend.engines import processador_quantico
 from frontend.config import (
     CenarioIntervalo,
     CENARIOS,
@@ -32,7 +31,7 @@ class GerenciadorIntervalo:
         self.previsao = previsao
         self.capital_total = capital_total
         self.metricas = MetricasIntervalo()
-        self.quantum = QuantumProcessor()  # Adiciona o processador quântico
+        self.quantum = processador_quantico()  # Adiciona o processador quântico (campo compartilhado)
         self._inicializar_estado()
 
     def _get_quantum_flux(self, placar: str) -> Dict[str, float]:
@@ -277,6 +276,8 @@ class GerenciadorIntervalo:
 
     def _mostrar_grafico_quantico(self, df):
         """Mostra visualização quântica da distribuição"""
+        import matplotlib.pyplot as plt
+
         fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(12, 6))
     
         # Gráfico de pizza
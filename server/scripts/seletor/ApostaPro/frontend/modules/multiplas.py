@@ -7,7 +7,20 @@ from dataclasses import dataclass
 from enum import Enum
 from io import BytesIO
 from backend.otimizador import OtimizadorMultiplas
+from backend.cache import compact, expand
 from modules.analise_distribuicao import AnalisadorDistribuicao
+from frontend.modules.entrada_lote import Campo, editor_lote, ler_lote, modo_lote, mostrar_erros
+
+ODD_MAXIMA = 50.0  # teto dos number_input de odds desta tela
+
+# Odds de cada partida na entrada em lote (mesmos padrões da entrada campo a campo)
+CAMPOS_PARTIDA = (
+    Campo('casa', "Time Casa ⚽", 1.8, maximo=ODD_MAXIMA),
+    Campo('empate', "Empate ➖", 3.2, maximo=ODD_MAXIMA),
+    Campo('fora', "Time Fora 🏃", 4.5, maximo=ODD_MAXIMA),
+    Campo('under_25', "Menos de 2.5 Gols 🔻 ou Mais de 1.5 Gols 🔺", 1.75, maximo=ODD_MAXIMA),
+    Campo('ambas_nao', "Ambas Não ❌ ou Ambas Sim ✅", 1.85, maximo=ODD_MAXIMA),
+)
 
 class TipoMultipla(Enum):
     SIMPLES = 1
@@ -53,6 +66,12 @@ class GerenciadorMultiplas:
 
     def _mostrar_interface_principal(self):
         """Interface principal para apostas múltiplas"""
+        if modo_lote("multiplas"):
+            self._mostrar_entrada_lote()
+            if st.session_state.get('calculos_realizados', False):
+                self._mostrar_resultados(expand(st.session_state.resultado_multiplas))
+            return
+
         partidas = self._coletar_dados_partidas()
     
         valor_total = st.number_input("💰 Valor Total para Distribuição (R$)", 
@@ -73,7 +92,8 @@ class GerenciadorMultiplas:
                     resultado = self.otimizar_distribuicao(partidas, valor_total, tolerancia)
                 
                     # Armazena na sessão
-                    st.session_state.resultado_multiplas = resultado
+                    # Forma compacta: sessões com o mesmo resultado compartilham um só bloco
+                    st.session_state.resultado_multiplas = compact(resultado)
                     st.session_state.calculos_realizados = True
                 
                     # Força atualização
@@ -85,7 +105,30 @@ class GerenciadorMultiplas:
 
         # Mostra resultados se existirem
         if st.session_state.get('calculos_realizados', False):
-            self._mostrar_resultados(st.session_state.resultado_multiplas)
+            self._mostrar_resultados(expand(st.session_state.resultado_multiplas))
+
+    def _mostrar_entrada_lote(self):
+        """Odds de todas as partidas num formulário: nenhum rerun enquanto digita, um cálculo por envio"""
+        with st.form("form_multiplas_lote"):
+            tabela, texto = editor_lote("multiplas", CAMPOS_PARTIDA,
+                                        [{c.chave: c.padrao for c in CAMPOS_PARTIDA}] * 2)
+            valor_total = st.number_input("💰 Valor Total para Distribuição (R$)",
+                                          min_value=10.0, max_value=10000.0,
+                                          value=20.0, step=5.0, format="%.2f")
+            tolerancia = st.slider("🎯 Tolerância", 0.0, 0.1, 0.01, 0.01,
+                                   help="Define o nível de tolerância para combinações válidas")
+            enviado = st.form_submit_button("🔄 Calcular Distribuição Ótima", type="primary")
+
+        if not enviado:
+            return
+        partidas, erros = ler_lote(tabela, texto, CAMPOS_PARTIDA, min_linhas=2, max_linhas=10)
+        if erros:
+            mostrar_erros(erros)
+            return
+        with st.spinner(f"Otimizando distribuição de {len(partidas)} partidas..."):
+            resultado = self.otimizar_distribuicao(partidas, valor_total, tolerancia)
+        st.session_state.resultado_multiplas = compact(resultado)
+        st.session_state.calculos_realizados = True
 
     def _mostrar_interface_testes(self):
         """Interface para testes de tolerância"""
@@ -192,8 +235,8 @@ class GerenciadorMultiplas:
 
         if st.button("🔍 Calcular Múltiplas"):
             # Realiza os cálculos e armazena no session_state
-            st.session_state.projecao_atual = self.projetar_retornos(partidas, valor_aposta, tipo)
-            st.session_state.projecao_atual = self.aplicar_analise_quantica(st.session_state.projecao_atual)
+            projecao = self.projetar_retornos(partidas, valor_aposta, tipo)
+            st.session_state.projecao_atual = compact(self.aplicar_analise_quantica(projecao))
             st.session_state.calculos_realizados = True
             
             # Força a atualização das outras abas
@@ -219,13 +262,13 @@ class GerenciadorMultiplas:
 
     def _mostrar_projecao(self):
         if st.session_state.calculos_realizados and st.session_state.projecao_atual:
-            self._mostrar_resultados(st.session_state.projecao_atual)
+            self._mostrar_resultados(expand(st.session_state.projecao_atual))
         else:
             st.warning("Configure as apostas e clique em 'Calcular Múltiplas' para ver os resultados")
 
     def _mostrar_otimizacao(self):
         if st.session_state.calculos_realizados and st.session_state.projecao_atual:
-            self.mostrar_otimizacao(st.session_state.projecao_atual)
+            self.mostrar_otimizacao(expand(st.session_state.projecao_atual))
         else:
             st.warning("Configure as apostas e clique em 'Calcular Múltiplas' para ver a otimização")
 
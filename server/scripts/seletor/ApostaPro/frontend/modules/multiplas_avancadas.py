@@ -6,6 +6,21 @@ import plotly.express as px
 import datetime
 import math
 from backend.otimizador_avancado import OtimizadorMultiplasAvancado
+from frontend.modules.entrada_lote import Campo, editor_lote, ler_lote, modo_lote, mostrar_erros
+
+ODD_MAXIMA = 50.0  # teto dos number_input de odds desta tela
+
+# Odds de cada partida na entrada em lote; sem horário, vale o padrão 12h, 15h, 18h...
+CAMPOS_PARTIDA = (
+    Campo('favorito', "Odd Favorito", 1.80, maximo=ODD_MAXIMA),
+    Campo('dupla_chance', "Odd Dupla Chance", 2.05, maximo=ODD_MAXIMA),
+    Campo('mais15', "Odd Mais 1.5", 1.45, maximo=ODD_MAXIMA),
+    Campo('under15', "Odd Menos 1.5", 2.60, maximo=ODD_MAXIMA),
+    Campo('horario', "Horário", datetime.time(12, 0), opcional=True),
+)
+
+def _horario_padrao(i: int) -> datetime.time:
+    return datetime.time((12 + i*3) % 24, 0)
 
 class GerenciadorMultiplasAvancadas:
     def __init__(self):
@@ -43,6 +58,8 @@ class GerenciadorMultiplasAvancadas:
         num_partidas = st.sidebar.selectbox("Número de Partidas", [2, 3, 4, 5, 6], index=2)
         partidas = []
         st.markdown("### 📋 Informe as Odds e Horários para Cada Partida")
+        if modo_lote("multiplas_avancadas"):
+            return self._coletar_partidas_lote(num_partidas)
         
         for i in range(num_partidas):
             with st.container(border=True):
@@ -54,7 +71,7 @@ class GerenciadorMultiplasAvancadas:
                     'dupla_chance': cols[1].number_input("Odd Dupla Chance", 1.01, 50.0, 2.05, 0.01, key=f'dupla_{i}'),
                     'mais15': cols[2].number_input("Odd Mais 1.5", 1.01, 50.0, 1.45, 0.01, key=f'over15_{i}'),
                     'under15': cols[3].number_input("Odd Menos 1.5", 1.01, 50.0, 2.60, 0.01, key=f'under15_{i}'),
-                    'horario': cols[4].time_input("Horário", value=datetime.time(12 + i*3, 0), key=f'hora_{i}', 
+                    'horario': cols[4].time_input("Horário", value=_horario_padrao(i), key=f'hora_{i}', 
                                                 help="A ordem dos horários define a sequência da proteção.")
                 }
                 partidas.append(odds)
@@ -64,6 +81,34 @@ class GerenciadorMultiplasAvancadas:
             st.success(f"{len(partidas)} partida(s) confirmada(s)! Prossiga para a aba 'Distribuição de Apostas'.")
         return partidas
 
+    def _coletar_partidas_lote(self, num_partidas: int) -> List[Dict]:
+        """Todas as partidas num formulário (tabela ou CSV), validadas juntas e confirmadas de uma vez"""
+        iniciais = [
+            {**{c.chave: c.padrao for c in CAMPOS_PARTIDA}, 'horario': _horario_padrao(i)}
+            for i in range(num_partidas)
+        ]
+        with st.form("form_multiplas_avancadas_lote"):
+            tabela, texto = editor_lote("multiplas_avancadas", CAMPOS_PARTIDA, iniciais)
+            enviado = st.form_submit_button("✅ Confirmar Partidas", type="primary")
+
+        if not enviado:
+            return st.session_state.get('partidas_configuradas') or []
+        linhas, erros = ler_lote(tabela, texto, CAMPOS_PARTIDA, min_linhas=2, max_linhas=6)
+        if erros:
+            mostrar_erros(erros)
+            return []
+
+        partidas = [
+            {'partida': f'Partida {i+1}', **linha,
+             'horario': linha.get('horario') or _horario_padrao(i)}
+            for i, linha in enumerate(linhas)
+        ]
+        st.session_state.partidas_configuradas = partidas
+        # a distribuição anterior era de outras odds: o próximo cálculo parte das novas
+        st.session_state.pop('resultado', None)
+        st.success(f"{len(partidas)} partida(s) confirmada(s)! Prossiga para a aba 'Distribuição de Apostas'.")
+        return partidas
+
     def _mostrar_distribuicao_avancada(self, partidas: List[Dict]):
         st.markdown("### 💰 Configuração de Capital")
         cols = st.columns(2)
@@ -49,7 +49,8 @@ class GerenciadorMultiplasPartida:
     def _coletar_dados_partida(self) -> Dict:
         st.markdown("### 📋 Informe as Odds da Partida")
     
-        with st.container():
+        # Formulário: as seis odds são enviadas juntas, sem rerun a cada valor digitado
+        with st.form("form_partida_unica"):
             # Os nomes dos inputs foram mantidos, mas a exibição será corrigida no output.
             cols = st.columns(6)
             odds = {
@@ -62,8 +63,10 @@ class GerenciadorMultiplasPartida:
                 'menos15_1t': cols[5].number_input("Menos 0.5 1º Tempo/Menos 2,5 Gols", 1.01, 50.0, 1.40, 0.01, key='under15_1t')
             }
 
-            if st.button("✅ Confirmar Partida", type="primary"):
+            if st.form_submit_button("✅ Confirmar Partida", type="primary"):
                 st.session_state.partida_configurada = odds
+                # o resultado anterior era de outras odds
+                st.session_state.pop('resultado_partida', None)
                 st.success("Partida confirmada! Prossiga para a aba 'Distribuição de Apostas'.")
                 # Não precisa retornar, o session_state cuida disso.
 
@@ -8,6 +8,8 @@ from dataclasses import dataclass, field
 from scipy.stats import entropy
 from datetime import datetime
 from streamlit_tags import st_tags
+from backend.cache import get_cache
+from frontend.modules.entrada_lote import Campo, ler_pares, mostrar_erros, validar_valores
 
 # =============================================================================
 # 1. MODELOS DE DADOS (ESTRUTURA PRINCIPAL)
@@ -166,6 +168,17 @@ class QuantumEngine:
         if not mercados:
             return []
 
+        # Mesmos mercados (nome, odd, categoria) e perfil: pesos do cache, compartilhado entre sessões
+        cache = get_cache("operacao.portfolio", source=__file__)
+        entradas = [(m.nome, m.odd, m.categoria) for m in mercados]
+        valores = cache.get_or_compute(cache.key(entradas, perfil_risco),
+                                       lambda: self._calcular_pesos(mercados, perfil_risco))
+        for m, (probabilidade, valor_esperado, peso) in zip(mercados, valores):
+            m.probabilidade, m.valor_esperado, m.peso_alocacao = probabilidade, valor_esperado, peso
+        return mercados
+
+    def _calcular_pesos(self, mercados: List[Mercado], perfil_risco: str) -> List[Tuple[float, float, float]]:
+        """Probabilidade, valor esperado e peso de alocação de cada mercado"""
         # 1. Cálculo das probabilidades implícitas e valores esperados
         for m in mercados:
             m.probabilidade = 1 / m.odd
@@ -226,12 +239,22 @@ class QuantumEngine:
             for m in mercados:
                 m.peso_alocacao = m.peso_alocacao / total
 
-        return mercados
+        return [(m.probabilidade, m.valor_esperado, m.peso_alocacao) for m in mercados]
 
 # =============================================================================
 # 3. INTERFACE DO USUÁRIO (STREAMLIT) - ADAPTADA PARA MERCADOS FINANCEIROS
 # =============================================================================
 
+# Retornos de referência do ativo (chave em odds_referencia, rótulo no formulário, padrão)
+CAMPOS_RETORNOS_REFERENCIA = (
+    Campo('alta_1d', "Alta 1 Dia", 1.85),
+    Campo('baixa_1d', "Baixa 1 Dia", 2.05),
+    Campo('alta_semana', "Alta Semana", 2.20),
+    Campo('baixa_semana', "Baixa Semana", 1.90),
+    Campo('alta_mes', "Alta Mês", 2.50),
+    Campo('baixa_mes', "Baixa Mês", 1.75),
+)
+
 class QuantumInterface:
     """Sistema completo de gestão quântica de investimentos"""
     
@@ -253,7 +276,6 @@ class QuantumInterface:
             st.session_state.relatorio = {
                 "risco": 0.0,
                 "dataframe": pd.DataFrame(),
-                "grafico_alocacao": go.Figure(),
                 "analise_correlacao": None,
                 "recomendacoes": []
             }
@@ -425,6 +447,11 @@ class QuantumInterface:
         )
 
         if st.session_state.modo_entrada == "Manual":
+            self._formulario_ativo()
+
+    def _formulario_ativo(self):
+        """Dados do ativo num formulário: nada é recalculado até o envio"""
+        with st.form("form_ativo_manual"):
             # Entrada manual dos dados do ativo
             col1, col2 = st.columns(2)
             with col1:
@@ -474,40 +501,55 @@ class QuantumInterface:
                 sharpe = st.number_input("Índice Sharpe", min_value=-5.0, max_value=5.0, value=1.0, step=0.1,
                                       help="Retorno ajustado ao risco")
 
-            # Botão para criar o ativo
-            if st.button("🔍 Criar Ativo e Calcular Retornos"):
-                if not nome:
-                    st.error("❌ Por favor, insira o nome do ativo")
-                elif any(odd <= 1.0 for odd in [odd_alta_1d, odd_baixa_1d, odd_alta_semana, odd_baixa_semana, odd_alta_mes, odd_baixa_mes]):
-                    st.error("❌ Todos os retornos devem ser maiores que 1.00")
-                else:
-                    ativo = Ativo(
-                        id=str(datetime.now().timestamp()),
-                        nome=nome,
-                        tipo=tipo.lower(),
-                        estatisticas={
-                            'volatilidade': volatilidade / 100,
-                            'correlacao_dolar': correlacao_dolar,
-                            'correlacao_juros': correlacao_juros,
-                            'beta': beta,
-                            'sharpe': sharpe,
-                            'odds_referencia': {
-                                'alta_1d': odd_alta_1d,
-                                'baixa_1d': odd_baixa_1d,
-                                'alta_semana': odd_alta_semana,
-                                'baixa_semana': odd_baixa_semana,
-                                'alta_mes': odd_alta_mes,
-                                'baixa_mes': odd_baixa_mes
-                            }
-                        }
-                    )
-
-                    # Atualiza estado da sessão
-                    st.session_state.ativo_selecionado = ativo
-                    st.session_state.odds_dinamicas = self.engine._calcular_odds_dinamicas(ativo)
-                    st.session_state.mercados_selecionados = []
-
-                    st.toast(f"✅ Ativo criado: {nome} ({tipo})")
+            retornos_colados = st.text_area(
+                "Ou cole os retornos (um por linha: mercado;retorno) — substituem os campos acima",
+                placeholder="alta_1d;1,85\nbaixa_semana;1,90\nAlta Mês;2,50",
+                help="Use a chave ou o nome do mercado; separador ; tab = ou ,"
+            )
+
+            enviado = st.form_submit_button("🔍 Criar Ativo e Calcular Retornos")
+
+        if not enviado:
+            return
+
+        # Validação em bloco: todos os problemas aparecem de uma vez
+        odds_referencia = {
+            'alta_1d': odd_alta_1d,
+            'baixa_1d': odd_baixa_1d,
+            'alta_semana': odd_alta_semana,
+            'baixa_semana': odd_baixa_semana,
+            'alta_mes': odd_alta_mes,
+            'baixa_mes': odd_baixa_mes
+        }
+        colados, erros = ler_pares(retornos_colados, CAMPOS_RETORNOS_REFERENCIA)
+        odds_referencia.update(colados)
+        if not nome:
+            erros.insert(0, "Por favor, insira o nome do ativo")
+        erros += validar_valores(odds_referencia, CAMPOS_RETORNOS_REFERENCIA)
+        if erros:
+            mostrar_erros(erros)
+            return
+
+        ativo = Ativo(
+            id=str(datetime.now().timestamp()),
+            nome=nome,
+            tipo=tipo.lower(),
+            estatisticas={
+                'volatilidade': volatilidade / 100,
+                'correlacao_dolar': correlacao_dolar,
+                'correlacao_juros': correlacao_juros,
+                'beta': beta,
+                'sharpe': sharpe,
+                'odds_referencia': odds_referencia
+            }
+        )
+
+        # Atualiza estado da sessão
+        st.session_state.ativo_selecionado = ativo
+        st.session_state.odds_dinamicas = self.engine._calcular_odds_dinamicas(ativo)
+        st.session_state.mercados_selecionados = []
+
+        st.toast(f"✅ Ativo criado: {nome} ({tipo})")
 
     def _construir_aba_configuracao(self):
         """Interface para configuração da estratégia de investimento."""
@@ -701,25 +743,13 @@ class QuantumInterface:
 
         df_alocacao = pd.DataFrame(dados)
     
-        if not df_alocacao.empty and 'Categoria' in df_alocacao.columns:
-            fig_alocacao = px.pie(
-                df_alocacao,
-                names='Estratégia',
-                values='Alocação (%)',
-                title='Distribuição de Capital Otimizada',
-                color='Categoria',
-                color_discrete_map={'Principal': '#3498db', 'Protecao': '#e74c3c'},
-                hole=0.3
-            )
-        else:
+        if df_alocacao.empty or 'Categoria' not in df_alocacao.columns:
             df_alocacao = pd.DataFrame(columns=["Estratégia", "Retorno", "Probabilidade", "Alocação (%)", 
                                              "Investimento (R$)", "Retorno Potencial (R$)", "Categoria"])
-            fig_alocacao = go.Figure()
 
         st.session_state.relatorio = {
             "risco": min(1.0, max(0.0, self.engine.calcular_risco_portfolio(mercados))),
             "dataframe": df_alocacao,
-            "grafico_alocacao": fig_alocacao,
             "retorno_principal": retorno_principal,
             "retorno_protecao": retorno_protecao,
             "investimento_principal": investimento_principal,
@@ -825,9 +855,24 @@ class QuantumInterface:
         st.metric("Lucro Líquido Total", f"R$ {lucro_total:,.2f}", 
                  f"{(lucro_total/capital*100):.1f}%" if capital > 0 else "0%")
     
-        if 'grafico_alocacao' in relatorio and relatorio['grafico_alocacao']:
-            st.plotly_chart(relatorio['grafico_alocacao'], use_container_width=True)
-        
+        fig_alocacao = self._grafico_alocacao(relatorio['dataframe'])
+        if fig_alocacao is not None:
+            st.plotly_chart(fig_alocacao, use_container_width=True)
+        
+    def _grafico_alocacao(self, df_alocacao: pd.DataFrame) -> Optional[go.Figure]:
+        """Gráfico de distribuição montado a partir do DataFrame do relatório (a figura não fica na sessão)"""
+        if df_alocacao.empty or 'Categoria' not in df_alocacao.columns:
+            return None
+        return px.pie(
+            df_alocacao,
+            names='Estratégia',
+            values='Alocação (%)',
+            title='Distribuição de Capital Otimizada',
+            color='Categoria',
+            color_discrete_map={'Principal': '#3498db', 'Protecao': '#e74c3c'},
+            hole=0.3
+        )
+
     def _construir_aba_historico(self):
         """Exibe o histórico de performance das estratégias."""
         st.header("📈 Histórico de Performance")
@@ -31,9 +31,9 @@ class QuantumLearner:
         return np.mean(X) * self.phi
 
 class QuantumProcessor:
-    def __init__(self):
+    def __init__(self, universe_operator: Optional[QuantumUniverseOperator] = None):
         self.learner = QuantumLearner()
-        self.universe_operator = QuantumUniverseOperator(dimensions=100)
+        self.universe_operator = universe_operator or QuantumUniverseOperator(dimensions=100)
         self.current_universe = None
         self.quantum_state = None
 
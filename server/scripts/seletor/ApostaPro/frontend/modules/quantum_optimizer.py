@@ -8,6 +8,8 @@ from dataclasses import dataclass, field
 from scipy.stats import entropy
 from datetime import datetime
 from streamlit_tags import st_tags
+from backend.cache import get_cache
+from frontend.modules.entrada_lote import Campo, ler_pares, mostrar_erros, validar_valores
 
 # =============================================================================
 # 1. MODELOS DE DADOS (ESTRUTURA PRINCIPAL)
@@ -223,6 +225,17 @@ class QuantumEngine:
         if not mercados:
             return []
 
+        # Mesmos mercados (nome, odd, categoria) e perfil: pesos do cache, compartilhado entre sessões
+        cache = get_cache("quantum_optimizer.portfolio", source=__file__)
+        entradas = [(m.nome, m.odd, m.categoria) for m in mercados]
+        valores = cache.get_or_compute(cache.key(entradas, perfil_risco),
+                                       lambda: self._calcular_pesos(mercados, perfil_risco))
+        for m, (probabilidade, valor_esperado, peso) in zip(mercados, valores):
+            m.probabilidade, m.valor_esperado, m.peso_alocacao = probabilidade, valor_esperado, peso
+        return mercados
+
+    def _calcular_pesos(self, mercados: List[Mercado], perfil_risco: str) -> List[Tuple[float, float, float]]:
+        """Probabilidade, valor esperado e peso de alocação de cada mercado"""
         # 1. Cálculo das probabilidades implícitas e valores esperados
         for m in mercados:
             m.probabilidade = 1 / m.odd
@@ -283,12 +296,27 @@ class QuantumEngine:
             for m in mercados:
                 m.peso_alocacao = m.peso_alocacao / total
 
-        return mercados
+        return [(m.probabilidade, m.valor_esperado, m.peso_alocacao) for m in mercados]
 
 # =============================================================================
 # 3. INTERFACE DO USUÁRIO (STREAMLIT)
 # =============================================================================
 
+# Odds de referência da partida (chave em odds_referencia, rótulo no formulário, padrão)
+CAMPOS_ODDS_REFERENCIA = (
+    Campo('mandante', "Time Mandante Vence", 2.10),
+    Campo('menos_25', "Menos 2.5 Gols", 3.00),
+    Campo('mais_25', "Mais 2.5 Gols", 1.36),
+    Campo('empate', "Empate", 5.90),
+    Campo('mais_15_1t', "Mais 1.5 (1T)", 1.95),
+    Campo('menos_15_1t', "Menos 1.5 (1T)", 1.85),
+    Campo('mais_15_2t', "Mais 1.5 (2T)", 1.80),
+    Campo('menos_15_2t', "Menos 1.5 (2T)", 1.90),
+    Campo('over_escanteios', "Over Escanteios", 1.75),
+    Campo('over_cartoes', "Over Cartões", 1.65),
+    Campo('ambas_marcam', "Ambas Marcam", 1.80),
+)
+
 class QuantumInterface:
     """Sistema completo de gestão quântica de apostas"""
     
@@ -309,7 +337,6 @@ class QuantumInterface:
             st.session_state.relatorio = {
                 "risco": 0.0,
                 "dataframe": pd.DataFrame(),
-                "grafico_alocacao": go.Figure(),  # Figura vazia para evitar erros
                 "analise_over_under": None,
                 "recomendacoes": []
             }
@@ -491,6 +518,11 @@ class QuantumInterface:
         )
 
         if st.session_state.modo_entrada == "Manual":
+            self._formulario_partida()
+
+    def _formulario_partida(self):
+        """Times, odds e estatísticas num formulário: nada é recalculado até o envio"""
+        with st.form("form_partida_manual"):
             # Entrada manual dos times e estatísticas
             col1, col2 = st.columns(2)
             with col1:
@@ -568,50 +600,65 @@ class QuantumInterface:
                 media_cartoes = st.number_input("Média de Cartões", min_value=0.0, value=3.0, step=0.1,
                                               help="Média de cartões por partida")
 
-            # Botão para criar a partida
-            if st.button("🔍 Criar Partida e Calcular Odds"):
-                if not time_mandante or not time_visitante:
-                    st.error("❌ Por favor, insira os nomes dos times")
-                elif any(odd <= 1.0 for odd in [odd_mandante, odd_menos_25, odd_mais_25, odd_empate,
-                                              odd_mais_15_1t, odd_menos_15_1t, odd_mais_15_2t, odd_menos_15_2t,
-                                              odd_over_escanteios, odd_over_cartoes]):
-                    st.error("❌ Todas as odds devem ser maiores que 1.00")
-                else:
-                    partida = Partida(
-                        id=str(datetime.now().timestamp()),
-                        time_mandante=time_mandante,
-                        time_visitante=time_visitante,
-                        liga=liga,
-                        estatisticas={
-                            'media_gols': media_gols,
-                            'media_gols_1t': media_gols_1t,
-                            'media_gols_2t': media_gols_2t,
-                            'vitorias_mandante': vitorias_mandante / 100,
-                            'empates_mandante': empates_mandante / 100,
-                            'ambas_marcam_freq': ambas_marcam / 100,
-                            'media_cartoes': media_cartoes,
-                            'odds_referencia': {
-                                'mandante': odd_mandante,
-                                'menos_25': odd_menos_25,
-                                'mais_25': odd_mais_25,
-                                'empate': odd_empate,
-                                'ambas_marcam': odd_ambas_marcam,
-                                'mais_15_1t': odd_mais_15_1t,
-                                'menos_15_1t': odd_menos_15_1t,
-                                'mais_15_2t': odd_mais_15_2t,
-                                'menos_15_2t': odd_menos_15_2t,
-                                'over_escanteios': odd_over_escanteios,
-                                'over_cartoes': odd_over_cartoes
-                            }
-                        }
-                    )
+            odds_coladas = st.text_area(
+                "Ou cole as odds (uma por linha: mercado;odd) — substituem os campos acima",
+                placeholder="mandante;2,10\nmais_25;1,36\nAmbas Marcam;1,80",
+                help="Use a chave ou o nome do mercado; separador ; tab = ou ,"
+            )
+
+            enviado = st.form_submit_button("🔍 Criar Partida e Calcular Odds")
+
+        if not enviado:
+            return
 
-                    # Atualiza estado da sessão
-                    st.session_state.partida_selecionada = partida
-                    st.session_state.odds_dinamicas = self.engine._calcular_odds_dinamicas(partida)
-                    st.session_state.mercados_selecionados = []
+        # Validação em bloco: todos os problemas aparecem de uma vez
+        odds_referencia = {
+            'mandante': odd_mandante,
+            'menos_25': odd_menos_25,
+            'mais_25': odd_mais_25,
+            'empate': odd_empate,
+            'ambas_marcam': odd_ambas_marcam,
+            'mais_15_1t': odd_mais_15_1t,
+            'menos_15_1t': odd_menos_15_1t,
+            'mais_15_2t': odd_mais_15_2t,
+            'menos_15_2t': odd_menos_15_2t,
+            'over_escanteios': odd_over_escanteios,
+            'over_cartoes': odd_over_cartoes
+        }
+        coladas, erros = ler_pares(odds_coladas, CAMPOS_ODDS_REFERENCIA)
+        odds_referencia.update(coladas)
+        if not time_mandante or not time_visitante:
+            erros.insert(0, "Por favor, insira os nomes dos times")
+        erros += validar_valores(odds_referencia, CAMPOS_ODDS_REFERENCIA)
+        if vitorias_mandante + empates_mandante > 100:
+            erros.append("Vitórias + Empates do mandante passam de 100%")
+        if erros:
+            mostrar_erros(erros)
+            return
+
+        partida = Partida(
+            id=str(datetime.now().timestamp()),
+            time_mandante=time_mandante,
+            time_visitante=time_visitante,
+            liga=liga,
+            estatisticas={
+                'media_gols': media_gols,
+                'media_gols_1t': media_gols_1t,
+                'media_gols_2t': media_gols_2t,
+                'vitorias_mandante': vitorias_mandante / 100,
+                'empates_mandante': empates_mandante / 100,
+                'ambas_marcam_freq': ambas_marcam / 100,
+                'media_cartoes': media_cartoes,
+                'odds_referencia': odds_referencia
+            }
+        )
 
-                    st.toast(f"✅ Partida criada: {time_mandante} x {time_visitante}")
+        # Atualiza estado da sessão
+        st.session_state.partida_selecionada = partida
+        st.session_state.odds_dinamicas = self.engine._calcular_odds_dinamicas(partida)
+        st.session_state.mercados_selecionados = []
+
+        st.toast(f"✅ Partida criada: {time_mandante} x {time_visitante}")
 
     def _construir_aba_configuracao(self):
         """Interface para configuração da estratégia de apostas."""
@@ -823,27 +870,15 @@ class QuantumInterface:
         df_alocacao = pd.DataFrame(dados)
     
         # Garante que o DataFrame não está vazio e tem a coluna 'Categoria'
-        if not df_alocacao.empty and 'Categoria' in df_alocacao.columns:
-            fig_alocacao = px.pie(
-                df_alocacao,
-                names='Mercado',
-                values='Alocação (%)',
-                title='Distribuição de Capital Otimizada',
-                color='Categoria',
-                color_discrete_map={'Principal': '#3498db', 'Protecao': '#e74c3c'},
-                hole=0.3
-            )
-        else:
+        if df_alocacao.empty or 'Categoria' not in df_alocacao.columns:
             # Cria um DataFrame vazio com a estrutura esperada
             df_alocacao = pd.DataFrame(columns=["Mercado", "Odd", "Probabilidade", "Alocação (%)", 
                                               "Investimento (R$)", "Retorno Potencial (R$)", "Categoria"])
-            fig_alocacao = go.Figure()
 
         # Atualiza o relatório na sessão
         st.session_state.relatorio = {
             "risco": min(1.0, max(0.0, self.engine.calcular_risco_portfolio(mercados))),
             "dataframe": df_alocacao,
-            "grafico_alocacao": fig_alocacao,
             "retorno_principal": retorno_principal,
             "retorno_protecao": retorno_protecao,
             "investimento_principal": investimento_principal,
@@ -962,9 +997,24 @@ class QuantumInterface:
                  f"{(lucro_total/capital*100):.1f}%" if capital > 0 else "0%")
     
         # Gráfico de distribuição com verificação
-        if 'grafico_alocacao' in relatorio and relatorio['grafico_alocacao']:
-            st.plotly_chart(relatorio['grafico_alocacao'], use_container_width=True)
+        fig_alocacao = self._grafico_alocacao(relatorio['dataframe'])
+        if fig_alocacao is not None:
+            st.plotly_chart(fig_alocacao, use_container_width=True)
         
+    def _grafico_alocacao(self, df_alocacao: pd.DataFrame) -> Optional[go.Figure]:
+        """Gráfico de distribuição montado a partir do DataFrame do relatório (a figura não fica na sessão)"""
+        if df_alocacao.empty or 'Categoria' not in df_alocacao.columns:
+            return None
+        return px.pie(
+            df_alocacao,
+            names='Mercado',
+            values='Alocação (%)',
+            title='Distribuição de Capital Otimizada',
+            color='Categoria',
+            color_discrete_map={'Principal': '#3498db', 'Protecao': '#e74c3c'},
+            hole=0.3
+        )
+
     def _construir_aba_historico(self):
         """Exibe o histórico de performance das estratégias."""
         st.header("📈 Histórico de Performance")
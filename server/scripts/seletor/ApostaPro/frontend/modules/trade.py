@@ -7,8 +7,6 @@ from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass, field
 from scipy.stats import entropy
 from datetime import datetime, timedelta
-import yfinance as yf
-import ccxt
 from collections import defaultdict
 
 # =============================================================================
@@ -0,0 +1,50 @@
+# registro.py
+"""
+Registro das telas do Operador Conquistador
+Cada modo do seletor aponta para o módulo que o implementa; o módulo só é importado quando
+o modo é aberto pela primeira vez na sessão. Assim a primeira visita não paga os imports das
+outras telas (plotly, scipy, streamlit_tags, etc.).
+"""
+
+import importlib
+from dataclasses import dataclass
+
+import streamlit as st
+
+
+@dataclass(frozen=True)
+class Tela:
+    rotulo: str
+    modulo: str
+    classe: str
+    chave_estado: str  # instância guardada no session_state
+    metodo: str = "mostrar_interface"
+
+
+TELAS = (
+    Tela("Operações por Partida", "frontend.modules.plataforma", "PlataformaApostas", "plataforma"),
+    Tela("Apostas Múltiplas", "frontend.modules.plataforma", "PlataformaApostas", "plataforma_multiplas",
+         metodo="_mostrar_modulo_multiplas"),
+    Tela("🔢 Múltiplas Avançadas", "frontend.modules.multiplas_avancadas", "GerenciadorMultiplasAvancadas",
+         "gerenciador_avancadas"),
+    Tela("🔢 Múltiplas por Partida", "frontend.modules.multiplas_avancadas_partida", "GerenciadorMultiplasPartida",
+         "gerenciador_partida"),
+    Tela("🧮 Cálculos Quânticos", "frontend.modules.quantum_optimizer", "QuantumInterface", "quantum_interface"),
+    Tela("📊 Operações Financeiras", "frontend.modules.operacao", "QuantumInterface", "operacao_interface"),
+    Tela("⚡ Trade Automatizado", "frontend.modules.trade", "TradingInterface", "trade_interface"),
+)
+
+TELAS_POR_ROTULO = {tela.rotulo: tela for tela in TELAS}
+
+
+def carregar(tela: Tela) -> type:
+    """Importa o módulo da tela (uma vez por processo) e devolve a classe"""
+    return getattr(importlib.import_module(tela.modulo), tela.classe)
+
+
+def mostrar(rotulo: str):
+    """Cria a instância da tela na sessão, se preciso, e desenha a interface"""
+    tela = TELAS_POR_ROTULO[rotulo]
+    if tela.chave_estado not in st.session_state:
+        st.session_state[tela.chave_estado] = carregar(tela)()
+    getattr(st.session_state[tela.chave_estado], tela.metodo)()
@@ -0,0 +1,81 @@
+# test/test_entrada_lote.py
+import datetime
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Raiz do ApostaPro (pacote 'frontend') e frontend/ (as telas importam 'modules.*' soltos, como
+# no app); não depende do cwd nem do pytest.ini
+projeto_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+frontend_dir = os.path.join(projeto_root, 'frontend')
+if projeto_root not in sys.path:
+    sys.path.insert(0, projeto_root)
+if frontend_dir not in sys.path:
+    sys.path.append(frontend_dir)
+
+from frontend.modules.entrada_lote import Campo, ler_lote, ler_pares, validar_valores
+
+CAMPOS = (  # como nas telas de múltiplas, cujos number_input vão até 50
+    Campo('casa', "Time Casa", 1.8, maximo=50.0),
+    Campo('empate', "Empate", 3.2, maximo=50.0),
+    Campo('fora', "Time Fora", 4.5, maximo=50.0),
+    Campo('horario', "Horário", datetime.time(12, 0), opcional=True),
+)
+
+
+class TestEntradaLote:
+    def test_csv_colado_tem_prioridade_e_aceita_virgula_decimal(self):
+        tabela = pd.DataFrame([{'casa': 9.0, 'empate': 9.0, 'fora': 9.0}])
+        texto = "fora;empate;casa;horario\n4,50;3,20;1,80;15:30\n5;3.1;1.7;18:00\n"
+
+        partidas, erros = ler_lote(tabela, texto, CAMPOS, min_linhas=2)
+
+        assert erros == []
+        assert partidas[0] == {'casa': 1.8, 'empate': 3.2, 'fora': 4.5, 'horario': datetime.time(15, 30)}
+        assert partidas[1]['fora'] == 5.0
+
+    def test_todos_os_erros_aparecem_juntos(self):
+        texto = "1,80;abc;4,50\n0,90;3,20\n1,70;3,10;99\n"
+
+        partidas, erros = ler_lote(None, texto, CAMPOS, max_linhas=1)
+
+        assert partidas == []
+        assert erros[0].startswith("2 linha(s) informada(s)")  # a linha com 2 colunas não conta
+        assert any("Linha 1, Empate" in e for e in erros)
+        assert any("Linha 2: 2 colunas" in e for e in erros)
+        assert any("Linha 3, Time Fora" in e and "fora do intervalo" in e for e in erros)
+
+    def test_tabela_sem_horario_usa_padrao_da_tela(self):
+        tabela = pd.DataFrame([{'casa': 1.8, 'empate': 3.2, 'fora': 4.5, 'horario': None}])
+
+        partidas, erros = ler_lote(tabela, "", CAMPOS)
+
+        assert erros == [] and 'horario' not in partidas[0]
+
+    def test_pares_por_chave_ou_rotulo(self):
+        valores, erros = ler_pares("casa;1,95\nTime Fora=5.5\nescanteios;2\nempate;1,00", CAMPOS)
+
+        assert valores == {'casa': 1.95, 'fora': 5.5}
+        assert len(erros) == 2
+
+    def test_sem_teto_por_padrao_como_os_number_input_sem_max_value(self):
+        from frontend.modules.multiplas import CAMPOS_PARTIDA
+
+        assert validar_valores({'odd': 80.0}, [Campo('odd', "Odd", 2.0)]) == []
+        assert validar_valores({'odd': 1.0}, [Campo('odd', "Odd", 2.0)]) == ["Odd: 1 abaixo do mínimo 1.01"]
+        assert validar_valores({c.chave: 80.0 for c in CAMPOS_PARTIDA}, CAMPOS_PARTIDA)  # teto 50 da tela
+
+    @pytest.mark.parametrize("modulo, campos", [
+        ("frontend.modules.quantum_optimizer", "CAMPOS_ODDS_REFERENCIA"),
+        ("frontend.modules.operacao", "CAMPOS_RETORNOS_REFERENCIA"),
+    ])
+    def test_formularios_de_referencia_aceitam_odds_acima_de_50(self, modulo, campos):
+        pytest.importorskip("streamlit_tags")
+        import importlib
+        campos = getattr(importlib.import_module(modulo), campos)
+
+        assert validar_valores({c.chave: 80.0 for c in campos}, campos) == []
+        valores, erros = ler_pares(f"{campos[0].chave};120,5", campos)
+        assert erros == [] and valores == {campos[0].chave: 120.5}
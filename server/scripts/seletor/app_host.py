@@ -0,0 +1,174 @@
+# app_host.py
+"""
+Hospedagem dos quatro apps Streamlit em um único servidor (ALMA_STREAMLIT_HOST=1)
+host.py monta hub, day trade, esportes e ApostaPro como páginas de st.navigation: um só
+processo carrega pandas/numpy/scipy/plotly uma vez, st.cache_resource é compartilhado e
+todo o tráfego usa um único endpoint WebSocket.
+
+Os apps foram escritos para processos separados, então cada execução de página recebe:
+- espaço de módulos próprio para os apps que colidem (day trade e esportes têm ambos um
+  pacote 'project'; day trade e ApostaPro importam 'modules' e 'config' soltos): os módulos
+  dos outros apps saem de sys.modules durante a execução e voltam quando forem usados de novo
+- session_state próprio por app dentro da mesma sessão do navegador
+
+Este módulo fica em sys.modules entre reruns; host.py é apenas o ponto de entrada.
+"""
+
+import runpy
+import sys
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+SELETOR_DIR = Path(__file__).resolve().parent
+
+STATE_PREFIX = "_alma_host"
+
+
+class HostedApp:
+    """
+    Um app montado como página.
+    'root' delimita os arquivos que pertencem ao app (usado para separar os módulos dos apps
+    isolados); 'paths' vão para a frente de sys.path enquanto o app executa.
+    """
+
+    def __init__(self, name: str, title: str, icon: str, script: Path, root: Optional[Path] = None,
+                 paths: Tuple[Path, ...] = (), isolated: bool = False, default: bool = False):
+        self.name = name
+        self.title = title
+        self.icon = icon
+        self.script = script
+        self.root = (root or script.parent).resolve()
+        self.paths = tuple(str(p) for p in paths)
+        self.isolated = isolated
+        self.default = default
+
+    def owns(self, module) -> bool:
+        filename = getattr(module, "__file__", None)
+        if not filename:
+            return False
+        try:
+            Path(filename).resolve().relative_to(self.root)
+        except ValueError:
+            return False
+        return True
+
+
+APPS: Dict[str, HostedApp] = {
+    "hub": HostedApp("hub", "ALMA EM FLUXO", "🚀", SELETOR_DIR / "seletor.py", default=True),
+    "daytrade": HostedApp(
+        "daytrade", "TRADE-ON", "📈", SELETOR_DIR / "day_trade" / "project" / "main.py",
+        root=SELETOR_DIR / "day_trade",
+        paths=(SELETOR_DIR / "day_trade" / "project", SELETOR_DIR / "day_trade"),
+        isolated=True,
+    ),
+    "sports": HostedApp(
+        "sports", "Apostas Esportivas", "⚽", SELETOR_DIR / "project" / "main.py",
+        paths=(SELETOR_DIR,),
+        isolated=True,
+    ),
+    "quantum": HostedApp(
+        "quantum", "Operador Conquistador", "🎯", SELETOR_DIR / "ApostaPro" / "main.py",
+        root=SELETOR_DIR / "ApostaPro",
+        paths=(SELETOR_DIR / "ApostaPro", SELETOR_DIR / "ApostaPro" / "frontend"),
+        isolated=True,
+    ),
+}
+
+
+class _ModuleNamespaces:
+    """
+    Troca os módulos dos apps isolados em sys.modules.
+    Execuções do mesmo app rodam em paralelo; a troca para outro app espera as execuções
+    em andamento terminarem (só há espera quando usuários alternam entre os apps em conflito).
+    """
+
+    def __init__(self, apps: Dict[str, HostedApp]):
+        self.apps = [app for app in apps.values() if app.isolated]
+        self.saved: Dict[str, dict] = {app.name: {} for app in self.apps}
+        self.active: Optional[str] = None
+        self.running = 0
+        self.switches = 0
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def enter(self, app: HostedApp):
+        with self._cond:
+            while self.running and self.active != app.name:
+                self._cond.wait()
+            if self.active != app.name:
+                self._switch(app)
+            self.running += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self.running -= 1
+                self._cond.notify_all()
+
+    def _switch(self, app: HostedApp):
+        for other in self.apps:
+            if other is app:
+                continue
+            owned = {name: module for name, module in list(sys.modules.items()) if other.owns(module)}
+            for name in owned:
+                sys.modules.pop(name, None)
+            self.saved[other.name].update(owned)
+            sys.path[:] = [p for p in sys.path if p not in other.paths]
+        sys.modules.update(self.saved[app.name])
+        self.saved[app.name] = {}
+        sys.path[:] = list(app.paths) + [p for p in sys.path if p not in app.paths]
+        self.active = app.name
+        self.switches += 1
+
+
+namespaces = _ModuleNamespaces(APPS)
+
+
+def _swap_session_state(app: HostedApp):
+    """Guarda o session_state do app anterior e restaura o do app atual"""
+    state = st.session_state
+    previous = state.get(f"{STATE_PREFIX}_app")
+    if previous == app.name:
+        return
+    stash = state.setdefault(f"{STATE_PREFIX}_state", {})
+    if previous is not None:
+        keys = [key for key in state.keys() if not str(key).startswith(STATE_PREFIX)]
+        stash[previous] = {key: state[key] for key in keys}
+        for key in keys:
+            del state[key]
+    for key, value in stash.pop(app.name, {}).items():
+        try:
+            state[key] = value
+        except StreamlitAPIException:
+            pass  # widgets como botões não aceitam valor atribuído
+    state[f"{STATE_PREFIX}_app"] = app.name
+
+
+def run_app(app: HostedApp):
+    """Executa o script do app como se fosse o principal (inclui o bloco __main__)"""
+    _swap_session_state(app)
+    if app.isolated:
+        with namespaces.enter(app):
+            runpy.run_path(str(app.script), run_name="__main__")
+        return
+    for path in reversed(app.paths):
+        if path not in sys.path:
+            sys.path.insert(0, path)
+    runpy.run_path(str(app.script), run_name="__main__")
+
+
+def page_for(app: HostedApp):
+    def render():
+        run_app(app)
+
+    render.__name__ = f"page_{app.name}"
+    return st.Page(render, title=app.title, icon=app.icon, url_path=app.name, default=app.default)
+
+
+def pages():
+    return [page_for(app) for app in APPS.values()]
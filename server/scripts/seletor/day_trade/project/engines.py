@@ -0,0 +1,31 @@
+# day_trade/project/engines.py
+"""
+Um QuantumTrader por processo do Streamlit, compartilhado pelos TradingSystem de todas as sessões
+Depois do construtor o motor só lê as próprias tabelas. Nova versão de optimizer.py gera um
+motor novo; ALMA_ENGINE_CACHE=0 volta a criar um por sessão.
+"""
+
+import inspect
+import os
+
+import streamlit as st
+
+from project.quantum.optimizer import QuantumTrader
+
+CACHE_ENABLED = os.getenv("ALMA_ENGINE_CACHE", "1") == "1"
+
+
+@st.cache_resource(show_spinner=False)
+def _quantum_trader(version: float) -> QuantumTrader:
+    return QuantumTrader()
+
+
+def quantum_trader() -> QuantumTrader:
+    if not CACHE_ENABLED:
+        return QuantumTrader()
+    return _quantum_trader(os.path.getmtime(inspect.getfile(QuantumTrader)))
+
+
+def invalidate_engines():
+    """Descarta os motores compartilhados; o próximo uso reconstrói"""
+    _quantum_trader.clear()
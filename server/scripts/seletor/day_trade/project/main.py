@@ -12,21 +12,25 @@ logger = logging.getLogger(__name__)
 
 # Adiciona o diretório raiz ao path (ajuste conforme sua estrutura)
 sys.path.append(str(Path(__file__).parent.parent))
+# Módulos compartilhados entre os apps (seletor/)
+sys.path.append(str(Path(__file__).parent.parent.parent))
 
 try:
-    from project.quantum.optimizer import QuantumTrader
+    from project.engines import quantum_trader
     from modules.initial_trades import InitialTradesModule
     from modules.multi_trades import MultiTradesModule
     from modules.dynamic_trading import DynamicTradingModule
     from config import TradePortfolio, TradeType, QuantumTrade
     from utils import safe_divide
+    from session_budget import track_activity, debug_panel
+    from rerun_tracing import rerun_span
 except ImportError as e:
     logger.error(f"Erro de importação: {e}")
     raise
 
 class TradingSystem:
     def __init__(self):
-        self.quantum_trader = QuantumTrader()
+        self.quantum_trader = quantum_trader()
         self.initial_trades = InitialTradesModule(self)
         self.multi_trades = MultiTradesModule(self)
         self.dynamic_trading = DynamicTradingModule(self)
@@ -201,6 +205,10 @@ def main():
     </style>
     """, unsafe_allow_html=True)
     
+    # Memória da sessão: traz de volta o que foi despejado em disco e marca a atividade
+    track_activity()
+    debug_panel()
+
     # Inicializa estados antes de qualquer renderização
     initialize_session_state()
 
@@ -263,4 +271,5 @@ def main():
         st.info("Defina o Capital Total na barra lateral e clique em 'Iniciar Operações' para começar.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with rerun_span("daytrade"):
+        main()
\ No newline at end of file
@@ -0,0 +1,13 @@
+# host.py
+"""
+Servidor Streamlit único com os quatro apps como páginas (ALMA_STREAMLIT_HOST=1)
+    streamlit run host.py --server.port 8501
+Páginas: /  (hub), /daytrade, /sports, /quantum — a navegação fica oculta para manter a
+interface de cada app; o hub continua levando às plataformas pelos mesmos caminhos.
+"""
+
+import streamlit as st
+
+from app_host import pages
+
+st.navigation(pages(), position="hidden").run()
@@ -4,6 +4,11 @@ import subprocess
 import signal
 from pathlib import Path
 import time
+import asyncio
+
+# 🔥 Aquecimento compartilhado com o start_local (server/services/streamlit_warmup.py)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / "services"))
+import streamlit_warmup
 
 def kill_streamlit_processes(port=None):
     """Mata processos Streamlit específicos ou todos"""
@@ -71,6 +76,11 @@ def launch_platform(platform):
         ], cwd=working_dir)
         
         print(f"{platform.capitalize()} iniciado na porta {port}")
+
+        # Executa o main.py uma vez numa sessão headless antes de liberar o acesso
+        if streamlit_warmup.WARMUP_ENABLED:
+            result = asyncio.run(streamlit_warmup.warm_up(port))
+            print(streamlit_warmup.format_report({platform: result}))
         
     except Exception as e:
         print(f"Erro ao iniciar plataforma {platform}: {e}")
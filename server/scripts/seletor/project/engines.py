@@ -0,0 +1,35 @@
+# flux_on/project/engines.py
+"""
+Motores compartilhados pelo processo do Streamlit (st.cache_resource)
+O QuantumOptimizer não guarda estado do usuário depois de construído, então uma instância
+atende todas as sessões e reruns; o BettingSystem de cada sessão só referencia o motor.
+
+Invalidação explícita: invalidate_engines(). Alterar optimizer.py também invalida, porque a
+data de modificação do módulo faz parte da chave do cache.
+ALMA_ENGINE_CACHE=0 desliga o compartilhamento (usado para comparar no benchmark).
+"""
+
+import inspect
+import os
+
+import streamlit as st
+
+from project.quantum.optimizer import QuantumOptimizer
+
+CACHE_ENABLED = os.getenv("ALMA_ENGINE_CACHE", "1") == "1"
+
+
+@st.cache_resource(show_spinner=False)
+def _quantum_optimizer(version: float) -> QuantumOptimizer:
+    return QuantumOptimizer()
+
+
+def quantum_optimizer() -> QuantumOptimizer:
+    if not CACHE_ENABLED:
+        return QuantumOptimizer()
+    return _quantum_optimizer(os.path.getmtime(inspect.getfile(QuantumOptimizer)))
+
+
+def invalidate_engines():
+    """Descarta os motores compartilhados; o próximo uso reconstrói"""
+    _quantum_optimizer.clear()
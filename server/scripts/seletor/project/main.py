@@ -7,16 +7,18 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-from project.quantum.optimizer import QuantumOptimizer
+from project.engines import quantum_optimizer
 from project.modules.initial_odds import InitialOddsModule
 from project.modules.multi_bets import MultiBetsModule
 from project.modules.in_play import InPlayModule
 from project.config import BetPortfolio, BetType, QuantumBet
 from project.utils import safe_divide
+from session_budget import track_activity, debug_panel
+from rerun_tracing import rerun_span
 
 class BettingSystem:
     def __init__(self):
-        self.optimizer = QuantumOptimizer()
+        self.optimizer = quantum_optimizer()
         self.initial_odds = InitialOddsModule(self)
         self.multi_bets = MultiBetsModule(self)
         self.in_play = InPlayModule(self)
@@ -176,6 +178,10 @@ def main():
     </style>
     """, unsafe_allow_html=True)
     
+    # Memória da sessão: traz de volta o que foi despejado em disco e marca a atividade
+    track_activity()
+    debug_panel()
+
     # Inicializa estados antes de qualquer renderização
     initialize_session_state()
 
@@ -214,4 +220,5 @@ def main():
         st.info("Defina o Capital Total na barra lateral e clique em 'Iniciar Fluxo' para começar.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    with rerun_span("sports"):
+        main()
\ No newline at end of file
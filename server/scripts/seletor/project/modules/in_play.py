@@ -6,6 +6,7 @@ from project.config import BetType, MatchCondition, QuantumState, QuantumBet
 from project.utils import safe_divide
 from project.event_manager import EventManager
 from functools import lru_cache
+from session_budget import track_activity
 
 @lru_cache(maxsize=32)
 def calculate_probability(bet_type, score, minute, home_pressure, away_pressure):
@@ -26,6 +27,55 @@ STATE_KEYS = {
     }
 }
 
+@st.cache_data(max_entries=64, show_spinner=False)
+def probability_figure(_optimizer, score, minute, home_pressure, away_pressure):
+    """Gráfico de probabilidades por condição da partida (cache_data: cada sessão recebe a própria cópia)"""
+    condition = MatchCondition(
+        score=score,
+        minute=minute,
+        home_pressure=home_pressure,
+        away_pressure=away_pressure
+    )
+
+    # Dados para o gráfico
+    minutes = range(condition.minute, 91, 5)
+    bet_types = [BetType.UNDER_25, BetType.BOTH_TO_SCORE]
+    
+    # Criar DataFrame com os dados
+    data = []
+    for m in minutes:
+        for bt in bet_types:
+            prob = _optimizer.estimate_contextual_probability(bt, condition)
+            data.append({
+                "Minuto": m,
+                "Probabilidade": prob,
+                "Tipo": bt.value
+            })
+    
+    df = pd.DataFrame(data)
+    
+    # Criar gráfico interativo
+    fig = px.line(
+        df, 
+        x="Minuto", 
+        y="Probabilidade", 
+        color="Tipo",
+        title="Evolução das Probabilidades",
+        labels={"Probabilidade": "Probabilidade (%)"},
+        template="plotly_dark",
+        line_shape="spline"  # Linhas suaves
+    )
+    
+    # Personalizar layout
+    fig.update_layout(
+        hovermode="x unified",
+        legend_title_text="Tipo de Aposta",
+        xaxis_title="Minuto da Partida",
+        yaxis_title="Probabilidade (%)",
+        transition={'duration': 500}
+    )
+    return fig
+
 def init_state(module_name):
     if f'{module_name}_state' not in st.session_state:
         st.session_state[f'{module_name}_state'] = STATE_KEYS[module_name].copy()
@@ -98,9 +148,7 @@ class InPlayModule:
                     Utilize os controles abaixo para simular o estado atual da partida.
                 """)
                 
-                self._render_control_panel()
-                self._render_probability_chart()
-                self._render_bet_recommendations()
+                self._render_live_panels()
                 
                 # Botão de finalização com verificação adicional
                 if st.button("Finalizar Ciclo", type="primary", key="finish_cycle"):
@@ -167,6 +215,15 @@ class InPlayModule:
             
         return True
 
+    @st.fragment
+    def _render_live_panels(self):
+        """Controles, gráfico e recomendações em um só fragmento: mexer em um controle ao vivo
+        reexecuta só estes painéis (na ordem, já com o valor novo no estado), e não o app inteiro"""
+        track_activity()  # o rerun do fragmento não passa pelo main(): a sessão continua ativa
+        self._render_control_panel()
+        self._render_probability_chart()
+        self._render_bet_recommendations()
+
     def _render_control_panel(self):
         """Painel de controle com seleção de placar inteligente"""
         st.subheader("📊 Painel de Controle Ao Vivo")
@@ -209,7 +266,8 @@ class InPlayModule:
                 "Minuto do Jogo", 
                 0, 120, 
                 value=self.state["minute"],
-                help="Minuto atual da partida"
+                help="Minuto atual da partida",
+                key="live_minute"
             )
         
         with cols[1]:
@@ -217,7 +275,8 @@ class InPlayModule:
                 "Volatilidade do Mercado",
                 options=["Estável", "Transição", "Caótico"],
                 value=self.state["volatility"],
-                help="Nível de variação das odds ao vivo"
+                help="Nível de variação das odds ao vivo",
+                key="live_volatility"
             )
         
         # Configuração automática de pressão baseada no placar
@@ -700,12 +759,9 @@ class InPlayModule:
             })
             
         if not st.session_state.get('red_card_event', False) and minute > 30:
-            if st.button("Simular Cartão Vermelho (Demo)"):
-                st.session_state.red_card_event = {
-                    'minute': minute,
-                    'team': 'HOME' if home_pressure > away_pressure else 'AWAY'
-                }
-                st.rerun()
+            # o callback roda antes do rerun do fragmento, que já sai com o evento aplicado
+            st.button("Simular Cartão Vermelho (Demo)", on_click=self._simulate_red_card,
+                      args=(minute, 'HOME' if home_pressure > away_pressure else 'AWAY'))
 
         # Distribuição do capital
         if recommendations:
@@ -780,6 +836,9 @@ class InPlayModule:
         
         return recommendations
     
+    def _simulate_red_card(self, minute, team):
+        st.session_state.red_card_event = {'minute': minute, 'team': team}
+
     def _get_fallback_odd(self, bet_type: BetType) -> float:
         """Obtém odd de fallback quando não disponível"""
         return {
@@ -1136,49 +1195,13 @@ class InPlayModule:
  
     def _render_probability_chart(self):
         """Renderiza o gráfico de probabilidades com Plotly"""
-        condition = MatchCondition(
-            score=self.state["score"],
-            minute=self.state["minute"],
-            home_pressure=self.state["home_pressure"],
-            away_pressure=self.state["away_pressure"]
-        )
-        
-        # Dados para o gráfico
-        minutes = range(condition.minute, 91, 5)
-        bet_types = [BetType.UNDER_25, BetType.BOTH_TO_SCORE]
-        
-        # Criar DataFrame com os dados
-        data = []
-        for m in minutes:
-            for bt in bet_types:
-                prob = self.system.optimizer.estimate_contextual_probability(bt, condition)
-                data.append({
-                    "Minuto": m,
-                    "Probabilidade": prob,
-                    "Tipo": bt.value
-                })
-        
-        df = pd.DataFrame(data)
-        
-        # Criar gráfico interativo
-        fig = px.line(
-            df, 
-            x="Minuto", 
-            y="Probabilidade", 
-            color="Tipo",
-            title="Evolução das Probabilidades",
-            labels={"Probabilidade": "Probabilidade (%)"},
-            template="plotly_dark",
-            line_shape="spline"  # Linhas suaves
-        )
-        
-        # Personalizar layout
-        fig.update_layout(
-            hovermode="x unified",
-            legend_title_text="Tipo de Aposta",
-            xaxis_title="Minuto da Partida",
-            yaxis_title="Probabilidade (%)",
-            transition={'duration': 500}
+        # Depende só do placar, minuto e pressões: mudar a volatilidade reaproveita a figura do cache
+        fig = probability_figure(
+            self.system.optimizer,
+            self.state["score"],
+            self.state["minute"],
+            self.state["home_pressure"],
+            self.state["away_pressure"]
         )
         
         # Exibir o gráfico
@@ -6,6 +6,7 @@ from typing import Dict, List
 from scipy.optimize import minimize
 from collections import defaultdict
 from project.config import BetType, QuantumState, MatchCondition, HumanBiasProfile
+from result_cache import get_cache
 
 class QuantumOptimizer:
     """
@@ -176,6 +177,20 @@ class QuantumOptimizer:
                         quantum_state: QuantumState,
                         bias_profile: HumanBiasProfile = None) -> Dict[BetType, float]:
         """
+        Mesmas odds, condição da partida, estado e perfil: alocação do cache de resultados,
+        compartilhado entre as sessões do processo.
+        """
+        cache = get_cache("sports.portfolio", source=__file__)
+        return cache.get_or_compute(
+            cache.key(available_bets, condition, quantum_state, bias_profile),
+            lambda: self._optimize_portfolio(available_bets, condition, quantum_state, bias_profile),
+        )
+
+    def _optimize_portfolio(self, available_bets: Dict[BetType, float],
+                            condition: MatchCondition,
+                            quantum_state: QuantumState,
+                            bias_profile: HumanBiasProfile = None) -> Dict[BetType, float]:
+        """
         Versão aprimorada com:
         - Manutenção de todas as regras originais
         - Integração do HumanBiasProfile
@@ -0,0 +1,32 @@
+# rerun_tracing.py
+"""
+Span por execução de script dos apps Streamlit (hub, day trade, esportes, ApostaPro)
+Carrega server/services/tracing.py uma vez por processo (reruns reaproveitam o módulo) e liga
+todas as execuções de uma sessão ao X-Request-ID do handshake. Sem o módulo, roda sem rastreio.
+"""
+
+import importlib.util
+import sys
+from contextlib import nullcontext
+from pathlib import Path
+
+TRACING_PATH = Path(__file__).resolve().parents[2] / "services" / "tracing.py"
+
+
+def load_tracing():
+    """server/services/tracing.py como 'alma_tracing', ou None quando indisponível"""
+    if "alma_tracing" not in sys.modules:
+        try:
+            spec = importlib.util.spec_from_file_location("alma_tracing", TRACING_PATH)
+            module = importlib.util.module_from_spec(spec)
+            spec.loader.exec_module(module)
+        except (OSError, ImportError):
+            return None
+        sys.modules["alma_tracing"] = module
+    return sys.modules["alma_tracing"]
+
+
+def rerun_span(hop: str):
+    """with rerun_span("sports"): main()"""
+    tracing = load_tracing()
+    return tracing.streamlit_rerun_span(hop) if tracing else nullcontext()
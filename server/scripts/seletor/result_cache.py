@@ -0,0 +1,215 @@
+# result_cache.py
+"""
+Cache de resultados dos otimizadores, endereçado pelo conteúdo das entradas
+Muitos usuários digitam as mesmas odds e cada widget alterado refaz a mesma otimização.
+A chave é um SHA-256 das entradas normalizadas (odds, capital, perfil de risco, tolerâncias),
+então o mesmo cenário é servido do cache em qualquer sessão do processo.
+
+- memória limitada por número de entradas e por bytes (LRU)
+- valores guardados serializados: cada leitura devolve uma cópia, sem estado compartilhado
+  entre sessões
+- persistência opcional em disco (ALMA_RESULT_CACHE_DIR), também limitada em bytes; a versão
+  do código (data de modificação do módulo que calcula) faz parte da chave
+- métricas de acerto por cache: stats() e cache_stats() (painel de session_budget.debug_panel)
+
+ALMA_RESULT_CACHE=0 desliga o cache (sempre recalcula).
+"""
+
+import dataclasses
+import hashlib
+import json
+import logging
+import os
+import pickle
+import threading
+from collections import OrderedDict
+from enum import Enum
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger("ResultCache")
+
+CACHE_ENABLED = os.getenv("ALMA_RESULT_CACHE", "1") == "1"
+CACHE_DIR = os.getenv("ALMA_RESULT_CACHE_DIR")
+MAX_ENTRIES = 2048
+MAX_BYTES = 32 * 1024 * 1024
+MAX_DISK_BYTES = 256 * 1024 * 1024
+FLOAT_DIGITS = 10  # 1.85 e 1.8500000000000001 são a mesma odd
+
+
+def normalize(value: Any) -> Any:
+    """Converte as entradas em uma estrutura JSON canônica (ordem de dicionários não importa)"""
+    if hasattr(value, "tolist") and hasattr(value, "ndim"):  # escalares e arrays numpy
+        value = value.tolist()
+    if isinstance(value, Enum):
+        return f"{type(value).__name__}.{value.name}"
+    if isinstance(value, bool) or value is None or isinstance(value, str):
+        return value
+    if isinstance(value, (int, float)):
+        return repr(round(float(value), FLOAT_DIGITS))
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return {"__tipo__": type(value).__name__,
+                **{f.name: normalize(getattr(value, f.name)) for f in dataclasses.fields(value)}}
+    if isinstance(value, dict):
+        return sorted(([normalize(k), normalize(v)] for k, v in value.items()), key=json.dumps)
+    if isinstance(value, (list, tuple)):
+        return [normalize(v) for v in value]
+    if isinstance(value, (set, frozenset)):
+        return sorted((normalize(v) for v in value), key=json.dumps)
+    raise TypeError(f"Entrada sem forma canônica para o cache: {type(value).__name__}")
+
+
+class ResultCache:
+    """Um cache nomeado (um por tipo de cálculo)"""
+
+    def __init__(self, name: str, version: str = "", max_entries: int = MAX_ENTRIES,
+                 max_bytes: int = MAX_BYTES, directory: Optional[str] = CACHE_DIR,
+                 max_disk_bytes: int = MAX_DISK_BYTES, enabled: bool = CACHE_ENABLED):
+        self.name = name
+        self.version = version
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.enabled = enabled
+        self.directory = Path(directory) / name if directory else None
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self._disk_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+        self.hits = self.disk_hits = self.misses = self.evictions = 0
+
+    def key(self, *inputs: Any) -> str:
+        canonical = json.dumps([self.name, self.version, normalize(list(inputs))], separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get_or_compute(self, key: str, compute: Callable[[], Any],
+                       cacheable: Callable[[Any], bool] = lambda value: True) -> Any:
+        """Devolve uma cópia do resultado guardado ou calcula, guarda e devolve"""
+        if not self.enabled:
+            return compute()
+
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if data is None:
+            data = self._read_disk(key)
+            if data is not None:
+                with self._lock:
+                    self.disk_hits += 1
+                    self._store(key, data)
+        if data is not None:
+            try:
+                return pickle.loads(data)
+            except Exception as e:  # arquivo truncado ou de uma versão incompatível
+                logger.warning(f"⚠️ Cache {self.name}: entrada ilegível descartada: {e}")
+
+        value = compute()
+        with self._lock:
+            self.misses += 1
+        if cacheable(value):
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock:
+                self._store(key, data)
+            self._write_disk(key, data)
+        return value
+
+    def _store(self, key: str, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._bytes -= len(previous)
+        self._entries[key] = data
+        self._bytes += len(data)
+        while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+
+    # ------------------------------------------------------------------ disco
+    # Os arquivos são pickles gerados por este próprio processo: o diretório deve ser
+    # exclusivo do servidor.
+
+    def _read_disk(self, key: str) -> Optional[bytes]:
+        if self.directory is None:
+            return None
+        try:
+            return (self.directory / f"{key}.pkl").read_bytes()
+        except OSError:
+            return None
+
+    def _write_disk(self, key: str, data: bytes):
+        if self.directory is None:
+            return
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            tmp = self.directory / f"{key}.{threading.get_ident()}.tmp"
+            tmp.write_bytes(data)
+            os.replace(tmp, self.directory / f"{key}.pkl")
+            with self._lock:
+                if self._disk_bytes is None:
+                    self._disk_bytes = sum(p.stat().st_size for p in self.directory.glob("*.pkl"))
+                else:
+                    self._disk_bytes += len(data)
+                over = self._disk_bytes > self.max_disk_bytes
+            if over:
+                self._prune_disk()
+        except OSError as e:
+            logger.warning(f"⚠️ Cache {self.name}: falha ao gravar em disco: {e}")
+
+    def _prune_disk(self):
+        """Remove os arquivos mais antigos até ocupar 80% do limite"""
+        files = sorted(self.directory.glob("*.pkl"), key=lambda p: p.stat().st_mtime)
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            if total <= self.max_disk_bytes * 0.8:
+                break
+            total -= path.stat().st_size
+            path.unlink(missing_ok=True)
+        with self._lock:
+            self._disk_bytes = total
+
+    # --------------------------------------------------------------- métricas
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+
+_caches: Dict[str, ResultCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, source: Optional[str] = None, **options) -> ResultCache:
+    """
+    Cache compartilhado pelo processo. 'source' é o arquivo do cálculo: a data de modificação
+    entra na chave, então resultados de uma versão anterior do código não são reaproveitados.
+    """
+    version = str(os.path.getmtime(source)) if source else ""
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None or cache.version != version:
+            cache = _caches[name] = ResultCache(name, version=version, **options)
+        return cache
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    with _caches_lock:
+        caches = dict(_caches)
+    return {name: cache.stats() for name, cache in caches.items()}
@@ -2,6 +2,9 @@
 import streamlit as st
 import time
 
+# ==================== RASTREAMENTO (X-Request-ID) ====================
+from rerun_tracing import rerun_span
+
 # ==================== CONFIGURAÇÃO DE ESTILOS (Mantida) ====================
 def apply_custom_styles():
     st.markdown("""
@@ -233,4 +236,5 @@ def main():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
+    with rerun_span("hub"):
+        main()
@@ -0,0 +1,489 @@
+# session_budget.py
+"""
+Orçamento de memória do session_state
+Os apps guardam DataFrames, figuras, históricos e dicionários completos de combinações no
+st.session_state de cada visitante, então a memória do servidor cresce com o número de
+sessões e com o tempo. Este módulo:
+
+- mede o tamanho de cada sessão, chave a chave (estimativa profunda; arrays somente leitura
+  compartilhados entre sessões e blocos compactos compartilhados não contam para a sessão)
+- guarda resultados grandes em forma compacta e compartilhada: compact() serializa,
+  comprime e deduplica por conteúdo; sessões com o mesmo resultado apontam para o mesmo bloco
+- despeja em disco as chaves pesadas de sessões ociosas (ou acima do orçamento) e as devolve
+  ao session_state na próxima execução da sessão (track_activity()); só dados simples
+  (DataFrames, arrays, listas, dicionários) vão para o disco: objetos como os motores de
+  st.cache_resource perderiam a identidade (e o compartilhamento) na volta do pickle
+- mostra a memória por sessão e os acertos do cache de resultados (result_cache) num painel
+  de diagnóstico (debug_panel())
+
+Cada app chama track_activity() no início do script, e cada st.fragment no início do
+fragmento (os reruns de fragmento não passam pelo topo do script). ALMA_DEBUG_PANEL=1 (configuração do
+operador) mostra o painel na barra lateral.
+"""
+
+import datetime
+import enum
+import hashlib
+import logging
+import os
+import pickle
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import weakref
+import zlib
+from contextlib import nullcontext
+from pathlib import Path
+from types import FunctionType, MethodType, ModuleType
+from typing import Any, Dict, List, Optional
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from result_cache import cache_stats
+
+logger = logging.getLogger("SessionBudget")
+
+SESSION_BUDGET = int(os.getenv("ALMA_SESSION_BUDGET_MB", "50")) * 1024 * 1024
+IDLE_AFTER = float(os.getenv("ALMA_SESSION_IDLE_S", "900"))
+OVER_BUDGET_IDLE_AFTER = 60.0  # sessões acima do orçamento são despejadas mais cedo
+HEAVY_KEY = 256 * 1024  # só chaves a partir deste tamanho vão para o disco
+SWEEP_INTERVAL = 60.0
+# Sem ALMA_SESSION_SPILL_DIR, cada processo cria a sua pasta privada (tempfile.mkdtemp) no primeiro despejo
+SPILL_DIR: Optional[Path] = Path(os.environ["ALMA_SESSION_SPILL_DIR"]) if os.getenv("ALMA_SESSION_SPILL_DIR") else None
+DEBUG_PANEL = os.getenv("ALMA_DEBUG_PANEL") == "1"
+
+STATE_PREFIX = "_alma_"  # chaves internas (host, orçamento): nunca despejadas
+LAST_ACTIVITY = "_alma_budget_last_activity"
+SPILLED = "_alma_budget_spilled"
+
+
+# --------------------------------------------------------------- tamanho
+
+def _is_shared(obj) -> bool:
+    return isinstance(obj, _Blob) or (getattr(obj, "flags", None) is not None
+                                      and getattr(obj.flags, "writeable", True) is False)
+
+
+def estimate_size(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Bytes aproximados alcançáveis a partir de obj.
+    DataFrames/Series usam memory_usage(deep=True), arrays usam nbytes e figuras Plotly
+    contam só os dados e o layout (não os validadores, que são da classe).
+    """
+    seen = set() if seen is None else seen
+    pd = sys.modules.get("pandas")
+    np = sys.modules.get("numpy")
+    stack, total = [obj], 0
+    while stack:
+        current = stack.pop()
+        if id(current) in seen or isinstance(current, (type, ModuleType, FunctionType, MethodType)):
+            continue
+        seen.add(id(current))
+        if _is_shared(current):
+            continue
+        if np is not None and isinstance(current, np.ndarray):
+            total += current.nbytes + sys.getsizeof(current, 0) if current.base is None else current.nbytes
+            continue
+        if pd is not None and isinstance(current, (pd.DataFrame, pd.Series)):
+            total += int(current.memory_usage(deep=True).sum()) if isinstance(current, pd.DataFrame) \
+                else int(current.memory_usage(deep=True))
+            continue
+        if hasattr(current, "_data") and hasattr(current, "_layout") and hasattr(current, "to_plotly_json"):
+            stack.extend((current._data, current._layout))
+            continue
+        try:
+            total += sys.getsizeof(current)
+        except TypeError:
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            attributes = getattr(current, "__dict__", None)
+            if isinstance(attributes, dict):
+                stack.append(attributes)
+            for slot in getattr(type(current), "__slots__", ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+_PLAIN_SCALARS = (str, bytes, int, float, complex, bool, type(None), enum.Enum,
+                  datetime.date, datetime.time, datetime.timedelta)
+
+
+def is_plain(obj: Any) -> bool:
+    """
+    Dado simples, que volta do pickle equivalente ao original: escalares, DataFrames/Series,
+    arrays graváveis, formas compactas e contêineres só com isso.
+    Instâncias de classes (motores, otimizadores) e arrays somente leitura podem ser
+    compartilhados entre sessões (st.cache_resource) e não são despejados.
+    """
+    pd = sys.modules.get("pandas")
+    np = sys.modules.get("numpy")
+    stack, seen = [obj], set()
+    while stack:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        if isinstance(current, _PLAIN_SCALARS) or isinstance(current, Compact):
+            continue
+        if np is not None and isinstance(current, np.ndarray):
+            if _is_shared(current) or current.dtype == object:
+                return False
+            continue
+        if pd is not None and isinstance(current, (pd.DataFrame, pd.Series)):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            return False
+    return True
+
+
+# ----------------------------------------------------- forma compacta
+
+class _Blob:
+    __slots__ = ("data", "__weakref__")
+
+    def __init__(self, data: bytes):
+        self.data = data
+
+
+_blobs: "weakref.WeakValueDictionary[str, _Blob]" = weakref.WeakValueDictionary()
+_blobs_lock = threading.Lock()
+
+
+class Compact:
+    """Resultado guardado serializado e comprimido; value() devolve uma cópia nova"""
+
+    __slots__ = ("_blob", "size")
+
+    def __init__(self, blob: _Blob, size: int):
+        self._blob = blob
+        self.size = size
+
+    def value(self) -> Any:
+        return pickle.loads(zlib.decompress(self._blob.data))
+
+    def __getstate__(self):  # despejo em disco: leva os bytes junto
+        return {"data": self._blob.data, "size": self.size}
+
+    def __setstate__(self, state):
+        self._blob = _intern(state["data"])
+        self.size = state["size"]
+
+
+def _intern(data: bytes) -> _Blob:
+    digest = hashlib.sha256(data).hexdigest()
+    with _blobs_lock:
+        blob = _blobs.get(digest)
+        if blob is None:
+            blob = _blobs[digest] = _Blob(data)
+        return blob
+
+
+def compact(value: Any) -> Compact:
+    """Forma compacta e compartilhada (mesmo conteúdo em várias sessões = um só bloco)"""
+    raw = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+    return Compact(_intern(zlib.compress(raw, 6)), len(raw))
+
+
+def expand(value: Any) -> Any:
+    """Aceita tanto o valor original quanto a forma compacta"""
+    return value.value() if isinstance(value, Compact) else value
+
+
+def shared_bytes() -> int:
+    with _blobs_lock:
+        return sum(len(blob.data) for blob in _blobs.values())
+
+
+# ------------------------------------------------------------ sessões
+
+def _sessions() -> Optional[List[Any]]:
+    """SessionInfo de todas as sessões do servidor (None fora do `streamlit run`)"""
+    try:
+        from streamlit.runtime import Runtime
+        if not Runtime.exists():
+            return None
+        return list(Runtime.instance()._session_mgr.list_sessions())
+    except Exception as e:  # API interna do Streamlit
+        logger.debug(f"Sessões indisponíveis: {e}")
+        return None
+
+
+# O varredor mexe no session_state de outra sessão: ele e o início do script da própria sessão
+# (track_activity) se excluem por este lock, então um rerun nunca vê chaves pela metade
+_session_locks: Dict[str, threading.Lock] = {}
+_session_locks_guard = threading.Lock()
+
+
+def _session_lock(session_id: str) -> threading.Lock:
+    with _session_locks_guard:
+        return _session_locks.setdefault(session_id, threading.Lock())
+
+
+def _keys(state) -> List[str]:
+    """Chaves de um SessionState (de qualquer sessão) ou do st.session_state atual"""
+    return list(state.filtered_state if hasattr(state, "filtered_state") else state.to_dict())
+
+
+def _user_keys(state) -> List[str]:
+    """Chaves que podem ir para o disco: nem internas nem de widgets"""
+    try:
+        widgets = set(state._key_id_mapper.key_id_mapping)
+    except AttributeError:
+        widgets = set()
+    return [key for key in _keys(state) if not str(key).startswith(STATE_PREFIX) and key not in widgets]
+
+
+def footprint(state, seen: Optional[set] = None) -> Dict[str, int]:
+    """Tamanho estimado de cada chave do session_state, da maior para a menor"""
+    seen = set() if seen is None else seen
+    sizes = {}
+    for key in _keys(state):
+        try:
+            sizes[key] = estimate_size(state[key], seen)
+        except Exception:
+            continue
+    return dict(sorted(sizes.items(), key=lambda item: item[1], reverse=True))
+
+
+def session_footprints() -> List[Dict[str, Any]]:
+    now = time.time()
+    seen: set = set()  # objetos compartilhados entre sessões contam uma vez só
+    report = []
+    for info in _sessions() or []:
+        state = info.session.session_state
+        sizes = footprint(state, seen)
+        last = state[LAST_ACTIVITY] if LAST_ACTIVITY in state else None
+        spilled = state[SPILLED] if SPILLED in state else {}
+        report.append({
+            "session": info.session.id,
+            "script": Path(info.session._script_data.main_script_path).parent.name,
+            "active": info.is_active(),
+            "idle_s": round(now - last, 1) if last else None,
+            "bytes": sum(sizes.values()),
+            "over_budget": sum(sizes.values()) > SESSION_BUDGET,
+            "spilled": sorted(spilled),
+            "top_keys": list(sizes.items())[:5],
+        })
+    return sorted(report, key=lambda item: item["bytes"], reverse=True)
+
+
+# ------------------------------------------------ despejo e retorno
+
+_stats = {"spilled_keys": 0, "spilled_bytes": 0, "restored_keys": 0, "sweeps": 0}
+_stats_lock = threading.Lock()
+
+
+_spill_dir_lock = threading.Lock()
+
+
+def spill_dir() -> Optional[Path]:
+    """Pasta dos despejos, só do usuário do processo (0700); None quando ela não é segura"""
+    global SPILL_DIR
+    with _spill_dir_lock:
+        if SPILL_DIR is None:
+            SPILL_DIR = Path(tempfile.mkdtemp(prefix="alma_sessions_"))
+            return SPILL_DIR
+        try:
+            SPILL_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+            info = SPILL_DIR.stat()
+        except OSError as e:
+            logger.warning(f"⚠️ Pasta de despejo {SPILL_DIR} indisponível: {e}")
+            return None
+        # os arquivos voltam com pickle.loads: quem pudesse escrever aqui rodaria código no app
+        if hasattr(os, "getuid") and (info.st_uid != os.getuid() or info.st_mode & 0o077):
+            logger.warning(f"⚠️ Pasta de despejo {SPILL_DIR} não é privada (dono/permissões); despejo desligado")
+            return None
+        return SPILL_DIR
+
+
+def spill_session(info, now: Optional[float] = None) -> int:
+    """Move para o disco as chaves pesadas de uma sessão parada; devolve os bytes liberados"""
+    with _session_lock(info.session.id):
+        return _spill_locked(info, now or time.time())
+
+
+def _spill_locked(info, now: float) -> int:
+    from streamlit.runtime.app_session import AppSessionState
+
+    if info.session._state != AppSessionState.APP_NOT_RUNNING:
+        return 0
+    state = info.session.session_state
+    # o _state é atualizado de forma assíncrona: um script que acabou de passar por
+    # track_activity ainda pode aparecer como parado, mas já marcou atividade recente
+    if LAST_ACTIVITY in state and now - state[LAST_ACTIVITY] < OVER_BUDGET_IDLE_AFTER:
+        return 0
+    root = spill_dir()
+    if root is None:
+        return 0
+    spilled = dict(state[SPILLED]) if SPILLED in state else {}
+    directory = root / info.session.id
+    freed = count = 0
+    for key in _user_keys(state):
+        try:
+            value = state[key]
+            size = estimate_size(value)
+            if size < HEAVY_KEY or not is_plain(value):
+                continue
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            continue  # objetos não serializáveis ficam na memória
+        directory.mkdir(mode=0o700, exist_ok=True)
+        path = directory / f"{hashlib.sha256(str(key).encode()).hexdigest()[:16]}.pkl"
+        path.write_bytes(data)
+        spilled[key] = str(path)
+        del state[key]
+        freed += size
+        count += 1
+    if freed:
+        state[SPILLED] = spilled
+        with _stats_lock:
+            _stats["spilled_keys"] += count
+            _stats["spilled_bytes"] += freed
+        logger.info(f"💾 Sessão {info.session.id[:8]}: {freed / 1024 / 1024:.1f} MB despejados em disco")
+    return freed
+
+
+def restore_spilled(state=None):
+    """Devolve ao session_state as chaves despejadas desta sessão"""
+    state = state if state is not None else st.session_state
+    spilled = state[SPILLED] if SPILLED in state else None
+    if not spilled:
+        return
+    for key, path in spilled.items():
+        try:
+            state[key] = pickle.loads(Path(path).read_bytes())
+            Path(path).unlink(missing_ok=True)
+        except Exception as e:
+            logger.warning(f"⚠️ Chave '{key}' despejada não pôde ser restaurada: {e}")
+    del state[SPILLED]
+    with _stats_lock:
+        _stats["restored_keys"] += len(spilled)
+
+
+def sweep(now: Optional[float] = None) -> int:
+    """Despeja as sessões ociosas (ou acima do orçamento e paradas há 1 minuto)"""
+    now = now or time.time()
+    sessions = _sessions()
+    if sessions is None:
+        return 0
+    freed = 0
+    for info in sessions:
+        state = info.session.session_state
+        if LAST_ACTIVITY not in state:
+            continue
+        idle = now - state[LAST_ACTIVITY]
+        if idle < OVER_BUDGET_IDLE_AFTER:
+            continue
+        if idle >= IDLE_AFTER or sum(footprint(state).values()) > SESSION_BUDGET:
+            freed += spill_session(info, now)
+    forget_ended({info.session.id for info in sessions})
+    with _stats_lock:
+        _stats["sweeps"] += 1
+    return freed
+
+
+def forget_ended(live_ids: set):
+    """Apaga as pastas de despejo e os locks de sessões que já não existem no servidor"""
+    with _session_locks_guard:
+        for session_id in set(_session_locks) - live_ids:
+            del _session_locks[session_id]
+    if SPILL_DIR is None or not SPILL_DIR.is_dir():
+        return
+    for directory in SPILL_DIR.iterdir():
+        if directory.is_dir() and directory.name not in live_ids:
+            shutil.rmtree(directory, ignore_errors=True)
+            logger.info(f"🧹 Despejo da sessão encerrada {directory.name[:8]} apagado")
+
+
+_sweeper: Optional[threading.Thread] = None
+_sweeper_lock = threading.Lock()
+
+
+def _sweep_forever():
+    while True:
+        time.sleep(SWEEP_INTERVAL)
+        try:
+            sweep()
+        except Exception as e:
+            logger.warning(f"⚠️ Varredura de sessões falhou: {e}")
+
+
+def track_activity():
+    """
+    Chamar no início do script e de cada st.fragment: restaura o que foi despejado e marca a
+    sessão como ativa
+    """
+    global _sweeper
+    ctx = get_script_run_ctx()
+    with _session_lock(ctx.session_id) if ctx is not None else nullcontext():
+        restore_spilled()
+        st.session_state[LAST_ACTIVITY] = time.time()
+    if _sweeper is None and ctx is not None:
+        with _sweeper_lock:
+            if _sweeper is None:
+                _sweeper = threading.Thread(target=_sweep_forever, name="session-budget", daemon=True)
+                _sweeper.start()
+
+
+def stats() -> Dict[str, Any]:
+    with _stats_lock:
+        return dict(_stats, shared_bytes=shared_bytes(), shared_blobs=len(_blobs))
+
+
+# ------------------------------------------------------------- painel
+
+def _mb(value: int) -> str:
+    return f"{value / 1024 / 1024:.2f} MB"
+
+
+def debug_panel(force: bool = False):
+    """Memória por sessão na barra lateral (só com ALMA_DEBUG_PANEL=1: mostra dados de todas as sessões)"""
+    if not (force or DEBUG_PANEL):
+        return
+    with st.sidebar.expander("🧠 Memória das sessões", expanded=False):
+        current = footprint(st.session_state)
+        st.metric("Esta sessão", _mb(sum(current.values())), help=f"Orçamento: {_mb(SESSION_BUDGET)}")
+        st.dataframe([{"chave": key, "tamanho": _mb(size)} for key, size in list(current.items())[:10]],
+                     hide_index=True)
+
+        sessions = session_footprints()
+        if sessions:
+            st.caption(f"{len(sessions)} sessões · {_mb(sum(s['bytes'] for s in sessions))} no total")
+            st.dataframe([{
+                "sessão": s["session"][:8],
+                "app": s["script"],
+                "ociosa (s)": s["idle_s"],
+                "tamanho": _mb(s["bytes"]),
+                "acima do orçamento": "⚠️" if s["over_budget"] else "",
+                "em disco": ", ".join(map(str, s["spilled"])),
+            } for s in sessions], hide_index=True)
+        summary = stats()
+        st.caption(f"Compartilhado: {summary['shared_blobs']} blocos · {_mb(summary['shared_bytes'])} · "
+                   f"despejos: {summary['spilled_keys']} chaves ({_mb(summary['spilled_bytes'])})")
+
+        results = cache_stats()
+        if results:
+            st.caption("Cache de resultados dos otimizadores (processo)")
+            st.dataframe([{
+                "cálculo": name,
+                "acertos": s["hits"] + s["disk_hits"],
+                "em disco": s["disk_hits"],
+                "faltas": s["misses"],
+                "taxa": f"{s['hit_rate']:.0%}",
+                "entradas": s["entries"],
+                "tamanho": _mb(s["bytes"]),
+            } for name, s in results.items()], hide_index=True)
@@ -0,0 +1,69 @@
+# test_app_host.py
+import importlib
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app_host import HostedApp, _ModuleNamespaces
+
+
+def _app(tmp_path, name):
+    pacote = tmp_path / name / "project"
+    pacote.mkdir(parents=True)
+    (pacote / "__init__.py").write_text(f"APP = {name!r}\n", encoding="utf-8")
+    script = tmp_path / name / "main.py"
+    return HostedApp(name, name, "", script, root=tmp_path / name, paths=(tmp_path / name,), isolated=True)
+
+
+def test_apps_com_pacote_de_mesmo_nome_nao_colidem(tmp_path):
+    daytrade, sports = _app(tmp_path, "daytrade"), _app(tmp_path, "sports")
+    namespaces = _ModuleNamespaces({"daytrade": daytrade, "sports": sports})
+    original_path = list(sys.path)
+    try:
+        with namespaces.enter(daytrade):
+            primeiro = importlib.import_module("project")
+            assert primeiro.APP == "daytrade"
+
+        with namespaces.enter(sports):
+            assert importlib.import_module("project").APP == "sports"
+
+        with namespaces.enter(daytrade):
+            assert importlib.import_module("project") is primeiro  # módulo preservado, sem reimportar
+        assert namespaces.switches == 3
+    finally:
+        sys.modules.pop("project", None)
+        sys.path[:] = original_path
+
+
+def test_apps_com_pacote_modules_solto_nao_colidem(tmp_path):
+    # day trade tem modules.initial_trades; ApostaPro tem modules.analytics em frontend/
+    daytrade = tmp_path / "day_trade"
+    (daytrade / "modules").mkdir(parents=True)
+    (daytrade / "modules" / "__init__.py").write_text("", encoding="utf-8")
+    (daytrade / "modules" / "initial_trades.py").write_text("APP = 'daytrade'\n", encoding="utf-8")
+    quantum = tmp_path / "ApostaPro"
+    (quantum / "frontend" / "modules").mkdir(parents=True)
+    (quantum / "frontend" / "modules" / "__init__.py").write_text("", encoding="utf-8")
+    (quantum / "frontend" / "modules" / "analytics.py").write_text("APP = 'quantum'\n", encoding="utf-8")
+
+    apps = {
+        "daytrade": HostedApp("daytrade", "", "", daytrade / "main.py", paths=(daytrade,), isolated=True),
+        "quantum": HostedApp("quantum", "", "", quantum / "main.py", root=quantum,
+                             paths=(quantum, quantum / "frontend"), isolated=True),
+    }
+    namespaces = _ModuleNamespaces(apps)
+    original_path = list(sys.path)
+    # um 'modules' já importado por outro teste não pertence a nenhum dos dois apps
+    anteriores = {nome: sys.modules.pop(nome) for nome in list(sys.modules)
+                  if nome == "modules" or nome.startswith("modules.")}
+    try:
+        for nome, submodulo in (("daytrade", "modules.initial_trades"), ("quantum", "modules.analytics"),
+                                ("daytrade", "modules.initial_trades")):
+            with namespaces.enter(apps[nome]):
+                assert importlib.import_module(submodulo).APP == nome
+    finally:
+        for nome in ("modules", "modules.initial_trades", "modules.analytics"):
+            sys.modules.pop(nome, None)
+        sys.modules.update(anteriores)
+        sys.path[:] = original_path
@@ -0,0 +1,42 @@
+# test_result_cache.py
+import os
+import sys
+from enum import Enum
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from result_cache import ResultCache
+
+
+class Mercado(Enum):
+    CASA = "casa"
+    FORA = "fora"
+
+
+def test_chave_canonica_e_copia_por_leitura():
+    cache = ResultCache("teste", directory=None, enabled=True)
+    chave = cache.key({Mercado.CASA: 1.85, Mercado.FORA: 4}, 100, "Moderado")
+    assert chave == cache.key({Mercado.FORA: 4.0, Mercado.CASA: 1.8500000000000001}, 100.0, "Moderado")
+    assert chave != cache.key({Mercado.CASA: 1.86, Mercado.FORA: 4}, 100, "Moderado")
+
+    calculos = []
+    calcular = lambda: calculos.append(1) or {"pesos": [0.6, 0.4]}
+    primeiro = cache.get_or_compute(chave, calcular)
+    primeiro["pesos"].append(0.0)  # alterar o resultado de uma sessão não afeta as outras
+    assert cache.get_or_compute(chave, calcular) == {"pesos": [0.6, 0.4]}
+    assert len(calculos) == 1
+    assert cache.stats()["hit_rate"] == 0.5
+
+
+def test_limites_de_memoria_e_persistencia_em_disco(tmp_path):
+    cache = ResultCache("teste", max_entries=2, directory=str(tmp_path), enabled=True)
+    for i in range(3):
+        cache.get_or_compute(cache.key(i), lambda i=i: i * 10)
+    assert cache.stats()["entries"] == 2 and cache.stats()["evictions"] == 1
+
+    novo_processo = ResultCache("teste", directory=str(tmp_path), enabled=True)
+    assert novo_processo.get_or_compute(cache.key(0), lambda: None) == 0
+    assert novo_processo.stats()["disk_hits"] == 1
+
+    nao_guardado = cache.get_or_compute(cache.key("erro"), lambda: {"erro": True}, cacheable=lambda v: False)
+    assert nao_guardado == {"erro": True} and not (tmp_path / "teste" / f"{cache.key('erro')}.pkl").exists()
@@ -0,0 +1,93 @@
+# test_session_budget.py
+import os
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+from streamlit.runtime.app_session import AppSessionState
+from streamlit.runtime.state.session_state import SessionState
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import session_budget
+from session_budget import (LAST_ACTIVITY, SPILLED, compact, estimate_size, expand, forget_ended,
+                            restore_spilled, spill_dir, spill_session)
+
+
+def test_tamanho_ignora_compartilhado_e_forma_compacta_deduplica():
+    df = pd.DataFrame({"odd": np.linspace(1.1, 9.9, 50_000)})
+    assert estimate_size({"dataframe": df}) >= df["odd"].nbytes
+
+    campo = np.zeros(100_000)
+    campo.setflags(write=False)  # campo quântico compartilhado entre sessões
+    assert estimate_size({"campo": campo}) < 1024
+
+    resultado = {"distribuicao": {("casa", "under_25"): 12.5}, "dataframe": df}
+    a, b = compact(resultado), compact(resultado)
+    assert a._blob is b._blob  # duas sessões, um só bloco
+    assert expand(a)["distribuicao"] == resultado["distribuicao"]
+    assert expand(a) is not expand(a)
+    assert estimate_size(a) < 1024
+
+
+def test_sessao_ociosa_vai_para_o_disco_e_volta(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_budget, "SPILL_DIR", tmp_path)
+    state = SessionState()
+    state["historico"] = pd.DataFrame({"odd": np.arange(100_000, dtype=float)})
+    state["fase"] = "initial_odds"
+    info = SimpleNamespace(session=SimpleNamespace(id="sessao-1", session_state=state,
+                                                   _state=AppSessionState.APP_NOT_RUNNING))
+
+    state[LAST_ACTIVITY] = 1000.0  # o script acabou de rodar: o varredor não mexe na sessão
+    assert spill_session(info, now=1010.0) == 0 and "historico" in state
+
+    assert spill_session(info, now=2000.0) > session_budget.HEAVY_KEY
+    assert "historico" not in state and state["fase"] == "initial_odds"
+    assert list(state[SPILLED]) == ["historico"]
+
+    restore_spilled(state)
+    assert len(state["historico"]) == 100_000 and SPILLED not in state
+    assert not any(tmp_path.rglob("*.pkl"))
+
+
+class _Motor:
+    """Como os motores de st.cache_resource: um só objeto para todas as sessões"""
+
+    def __init__(self):
+        self.campo = np.zeros(100_000)
+        self.tabela = list(range(100_000))
+
+
+def test_so_dados_simples_vao_para_o_disco(tmp_path, monkeypatch):
+    monkeypatch.setattr(session_budget, "SPILL_DIR", tmp_path)
+    motor = _Motor()
+    campo = np.zeros(100_000)
+    campo.setflags(write=False)
+    state = SessionState()
+    state["optimizer"] = motor
+    state["com_motor"] = {"motor": motor, "odds": list(range(100_000))}
+    state["campo"] = campo
+    state["combinacoes"] = {("casa", i): float(i) for i in range(20_000)}
+    info = SimpleNamespace(session=SimpleNamespace(id="sessao-2", session_state=state,
+                                                   _state=AppSessionState.APP_NOT_RUNNING))
+
+    assert spill_session(info, now=5000.0) > 0
+    assert list(state[SPILLED]) == ["combinacoes"]
+    assert state["optimizer"] is motor and state["com_motor"]["motor"] is motor
+    assert state["campo"] is campo and not state["campo"].flags.writeable
+
+
+def test_pasta_de_despejo_privada_e_limpa_quando_a_sessao_acaba(tmp_path, monkeypatch):
+    pasta = tmp_path / "despejo"
+    monkeypatch.setattr(session_budget, "SPILL_DIR", pasta)
+    assert spill_dir() == pasta and pasta.stat().st_mode & 0o777 == 0o700
+
+    (pasta / "sessao-viva").mkdir()
+    (pasta / "sessao-encerrada").mkdir()
+    forget_ended({"sessao-viva"})
+    assert sorted(p.name for p in pasta.iterdir()) == ["sessao-viva"]
+
+    if hasattr(os, "getuid"):
+        pasta.chmod(0o777)  # gravável por outros usuários: nada é despejado ali
+        assert spill_dir() is None
@@ -0,0 +1,218 @@
+# admission.py
+"""
+Controle de admissão por upstream
+Limite de requisições simultâneas, fila limitada com timeout e classes de prioridade
+"""
+
+import asyncio
+import heapq
+import itertools
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Dict, Optional
+
+try:
+    from stats import percentile
+except ImportError:  # importado como pacote (server.services.admission)
+    from .stats import percentile
+
+# Classes de prioridade (menor valor = atendido primeiro)
+PRIORITY_AUTH = 0    # /api, login, validação de token
+PRIORITY_PAGE = 1    # páginas e chamadas dos apps
+PRIORITY_ASSET = 2   # /static e /_stcore (bundles, health, host-config)
+
+PRIORITY_NAMES = {PRIORITY_AUTH: "auth", PRIORITY_PAGE: "page", PRIORITY_ASSET: "asset"}
+
+
+def classify(path: str) -> int:
+    """Classe de prioridade a partir do caminho da requisição"""
+    path = path.strip("/")
+    first_segment = path.split("/")[0]
+    if first_segment in ("api", "login", "validate_token", "redirect-confirmation"):
+        return PRIORITY_AUTH
+    if first_segment in ("static", "_stcore") or "/static/" in f"/{path}" or "/_stcore/" in f"/{path}":
+        return PRIORITY_ASSET
+    return PRIORITY_PAGE
+
+
+class AdmissionRejected(Exception):
+    """Requisição recusada por sobrecarga (fila cheia ou tempo de espera esgotado)"""
+
+    def __init__(self, status: int, retry_after: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.retry_after = retry_after
+        self.reason = reason
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(self.retry_after)}
+
+    def to_dict(self) -> dict:
+        return {"error": "Serviço sobrecarregado", "reason": self.reason, "retry_after": self.retry_after}
+
+
+class AdmissionController:
+    """
+    Semáforo com fila de prioridade para um upstream.
+    'reserved' vagas ficam disponíveis apenas para PRIORITY_AUTH, de modo que
+    carregamentos de assets nunca ocupem todas as vagas do upstream.
+    Projetado para uso dentro de um único event loop.
+    """
+
+    def __init__(self, name: str, limit: int = 32, queue_size: int = 128,
+                 queue_timeout: float = 10.0, reserved: int = 2, retry_after: int = 2):
+        self.name = name
+        self.limit = max(1, limit)
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.reserved = min(reserved, self.limit - 1)
+        self.retry_after = retry_after
+        self.active = 0
+        self._waiters = []
+        self._seq = itertools.count()
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        self._wait_samples = deque(maxlen=1024)
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._queued = 0
+
+    def _capacity_for(self, priority: int) -> int:
+        return self.limit if priority == PRIORITY_AUTH else self.limit - self.reserved
+
+    def _can_enter(self, priority: int) -> bool:
+        return self.active < self._capacity_for(priority)
+
+    def _purge(self):
+        """Remove do topo da fila quem já desistiu (timeout ou cancelamento)"""
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+
+    def _wake_next(self):
+        """Entrega vagas livres aos próximos da fila, por prioridade e ordem de chegada"""
+        self._purge()
+        while self._waiters and self._can_enter(self._waiters[0][0]):
+            _, _, future = heapq.heappop(self._waiters)
+            self.active += 1
+            future.set_result(True)
+            self._purge()
+
+    def _record_wait(self, waited: float):
+        self._queued += 1
+        self._wait_total += waited
+        self._wait_max = max(self._wait_max, waited)
+        self._wait_samples.append(waited)
+
+    async def acquire(self, priority: int = PRIORITY_PAGE) -> float:
+        """Aguarda uma vaga; retorna o tempo de fila em segundos"""
+        self._purge()
+        ahead = self._waiters and self._waiters[0][0] <= priority
+        if not ahead and self._can_enter(priority):
+            self.active += 1
+            self.admitted += 1
+            return 0.0
+
+        pending = sum(1 for _, _, f in self._waiters if not f.done())
+        if pending >= self.queue_size:
+            self.rejected_full += 1
+            raise AdmissionRejected(429, self.retry_after, f"fila de {self.name} cheia")
+
+        future = asyncio.get_running_loop().create_future()
+        entry = (priority, next(self._seq), future)
+        heapq.heappush(self._waiters, entry)
+        started = time.monotonic()
+        try:
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            if future.done() and not future.cancelled():
+                # A vaga chegou junto com o timeout: devolve para o próximo
+                self.release()
+            future.cancel()
+            self.rejected_timeout += 1
+            raise AdmissionRejected(503, self.retry_after, f"tempo de fila esgotado em {self.name}")
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                self.release()
+            future.cancel()
+            raise
+
+        waited = time.monotonic() - started
+        self._record_wait(waited)
+        self.admitted += 1
+        return waited
+
+    def release(self):
+        self.active = max(0, self.active - 1)
+        self._wake_next()
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_PAGE):
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+    def stats(self) -> dict:
+        p95 = percentile(list(self._wait_samples), 95)
+        return {
+            "route": self.name,
+            "limit": self.limit,
+            "reserved_auth": self.reserved,
+            "active": self.active,
+            "queued": sum(1 for _, _, f in self._waiters if not f.done()),
+            "admitted": self.admitted,
+            "rejected_full": self.rejected_full,
+            "rejected_timeout": self.rejected_timeout,
+            "queue_wait_ms": {
+                "count": self._queued,
+                "avg": round(self._wait_total / self._queued * 1000, 3) if self._queued else 0.0,
+                "p95": round(p95 * 1000, 3),
+                "max": round(self._wait_max * 1000, 3),
+            },
+        }
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except ValueError:
+        return default
+
+
+def build_controllers(pools: Dict[str, object], limits: Optional[Dict[str, dict]] = None) -> Dict[str, AdmissionController]:
+    """
+    Um controlador por upstream (rotas que compartilham o mesmo pool de réplicas
+    compartilham o limite). O limite padrão escala com o número de réplicas.
+    """
+    limits = limits or {}
+    per_replica = _env_int("ALMA_MAX_INFLIGHT", 32)
+    queue_size = _env_int("ALMA_ADMISSION_QUEUE", 128)
+    queue_timeout = float(os.getenv("ALMA_ADMISSION_TIMEOUT", "10"))
+
+    controllers: Dict[str, AdmissionController] = {}
+    by_pool: Dict[int, AdmissionController] = {}
+    for name, pool in pools.items():
+        if id(pool) not in by_pool:
+            options = {
+                "limit": per_replica * max(1, len(pool)),
+                "queue_size": queue_size,
+                "queue_timeout": queue_timeout,
+                **limits.get(name, {}),
+            }
+            by_pool[id(pool)] = AdmissionController(name, **options)
+        controllers[name] = by_pool[id(pool)]
+    return controllers
+
+
+def controllers_stats(controllers: Dict[str, AdmissionController]) -> list:
+    seen, stats = set(), []
+    for controller in controllers.values():
+        if id(controller) not in seen:
+            seen.add(id(controller))
+            stats.append(controller.stats())
+    return stats
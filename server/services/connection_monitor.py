@@ -1,19 +1,28 @@
 """
 Monitor de conexão em tempo real para o sistema ALMA
+Assinante do supervisor: reage às mudanças de túnel e de saúde em vez de sondar a cada 10s
 """
 
-import threading
+import os
+import sys
 import time
+
+# O supervisor é um singleton: importado sempre como services.supervisor (como em
+# system_monitor, bridge_config e ngrok_manager), senão o Python carregaria uma segunda cópia
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
 from connection_manager import connection_manager
+from services.supervisor import FLASK_HEALTH_URL, STREAMLIT_HEALTH_URL, supervisor
 
 class ConnectionMonitor:
     """Monitora as conexões do sistema em tempo real"""
     
     def __init__(self, update_interval=10):
-        self.update_interval = update_interval
+        self.update_interval = update_interval  # intervalo das sondas de saúde locais
         self.monitoring = False
-        self.thread = None
         self.status_handlers = []
+        self._unsubscribe = None
+        self._last_status = None
         
     def start_monitoring(self):
         """Inicia o monitoramento de conexões"""
@@ -21,43 +30,50 @@ class ConnectionMonitor:
             return
             
         self.monitoring = True
-        self.thread = threading.Thread(target=self._monitor_loop, daemon=True)
-        self.thread.start()
+        supervisor.watch_ngrok()
+        supervisor.watch_http("flask", FLASK_HEALTH_URL, interval=self.update_interval)
+        supervisor.watch_http("streamlit", STREAMLIT_HEALTH_URL, interval=self.update_interval)
+        self._unsubscribe = supervisor.subscribe(
+            self._on_event, topics=["ngrok.tunnels", "health.flask", "health.streamlit"]
+        )
         print("🔍 Monitor de conexão iniciado")
     
     def stop_monitoring(self):
         """Para o monitoramento de conexões"""
         self.monitoring = False
-        if self.thread:
-            self.thread.join(timeout=1.0)
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
         print("🔍 Monitor de conexão parado")
     
     def add_status_handler(self, handler):
         """Adiciona um handler para receber atualizações de status"""
         self.status_handlers.append(handler)
     
-    def _monitor_loop(self):
-        """Loop principal de monitoramento"""
-        last_status = None
-        
-        while self.monitoring:
-            try:
-                current_status = connection_manager.get_connection_status()
-                
-                # Notifica apenas se houve mudança significativa
-                if last_status is None or self._status_changed(last_status, current_status):
-                    for handler in self.status_handlers:
-                        try:
-                            handler(current_status)
-                        except Exception as e:
-                            print(f"Erro no handler de status: {e}")
-                    
-                    last_status = current_status
+    def _on_event(self, event):
+        """Monta o status a partir do estado do supervisor e notifica se mudou"""
+        if not self.monitoring:
+            return
+        try:
+            current_status = {
+                # Túnel trocado: ignora o cache de URL do ConnectionManager
+                'ngrok_url': connection_manager.get_current_ngrok_url(force_refresh=event.topic == "ngrok.tunnels"),
+                'local_available': bool(supervisor.get("health.flask")),
+                'streamlit_available': bool(supervisor.get("health.streamlit")),
+                'timestamp': time.time(),
+            }
+            
+            # Notifica apenas se houve mudança significativa
+            if self._last_status is None or self._status_changed(self._last_status, current_status):
+                for handler in self.status_handlers:
+                    try:
+                        handler(current_status)
+                    except Exception as e:
+                        print(f"Erro no handler de status: {e}")
                 
-                time.sleep(self.update_interval)
-            except Exception as e:
-                print(f"Erro no monitor de conexão: {e}")
-                time.sleep(5)
+                self._last_status = current_status
+        except Exception as e:
+            print(f"Erro no monitor de conexão: {e}")
     
     def _status_changed(self, old_status, new_status):
         """Verifica se o status mudou significativamente"""
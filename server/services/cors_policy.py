@@ -0,0 +1,171 @@
+# cors_policy.py
+"""
+Política CORS compartilhada entre a API Flask e a borda
+Todas as origens permitidas compiladas em um único matcher, com decisão memorizada por origem
+e resposta de preflight pronta para ser servida direto no gateway.
+Em produção o túnel aceito é só o publicado agora no registro de túneis (tunnel_registry);
+os padrões curinga de ngrok/Cloudflare valem apenas em desenvolvimento.
+"""
+
+import os
+import re
+from typing import Dict, FrozenSet, Iterable, Optional
+from urllib.parse import urlsplit
+
+try:
+    from tunnel_registry import tunnel_registry
+except ImportError:  # importado como pacote (server.services.cors_policy)
+    from .tunnel_registry import tunnel_registry
+
+# Lista explícita (produção)
+ALLOWED_ORIGINS = (
+    "https://almafluxo.uk",
+    "https://fluxon.almafluxo.uk",
+    "http://almafluxo.uk",
+    "http://fluxon.almafluxo.uk",
+    "http://localhost:5001",
+    "http://localhost:5000",
+    "http://127.0.0.1:5001",
+    "http://127.0.0.1:5000",
+)
+
+# Domínios dinâmicos dos túneis (ngrok e Cloudflare) - só em desenvolvimento
+TUNNEL_ORIGIN_PATTERNS = (
+    r"https://[a-z0-9-]+\.ngrok-free\.(app|dev)",
+    r"https://[a-z0-9-]+\.ngrok\.(io|app|dev)",
+    r"https://[a-z0-9-]+(\.[a-z]{2})?\.ngrok\.io",
+    r"https://[a-z0-9-]+\.trycloudflare\.com",
+)
+
+# Padrões de desenvolvimento (rede local)
+DEV_ORIGIN_PATTERNS = (
+    r"https?://([a-z0-9-]+\.)?almafluxo\.uk",
+    r"https?://localhost(:[0-9]+)?",
+    r"https?://127\.0\.0\.1(:[0-9]+)?",
+    r"https?://192\.168\.([0-9]{1,3})\.([0-9]{1,3})(:[0-9]+)?",
+    r"https?://10\.([0-9]{1,3})\.([0-9]{1,3})\.([0-9]{1,3})(:[0-9]+)?",
+)
+
+ALLOWED_METHODS = ("GET", "POST", "PUT", "DELETE", "OPTIONS", "PATCH", "HEAD")
+
+ALLOWED_HEADERS = (
+    "Content-Type",
+    "Authorization",
+    "X-Requested-With",
+    "X-Forwarded-For",
+    "X-Client-Timestamp",
+    "X-System-Fingerprint",
+    "Origin",
+    "Accept",
+    "Access-Control-Request-Headers",
+    "Access-Control-Request-Method",
+)
+
+EXPOSED_HEADERS = ("Authorization", "X-Token-Expiry", "Content-Type", "X-Request-ID")
+
+
+def max_age(development: bool = False) -> int:
+    """Tempo (s) que o navegador pode reutilizar um preflight; ALMA_CORS_MAX_AGE sobrescreve"""
+    try:
+        return int(os.getenv("ALMA_CORS_MAX_AGE", 3600 if development else 600))
+    except ValueError:
+        return 3600 if development else 600
+
+
+def _origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+class OriginMatcher:
+    """
+    Origens exatas em um set e todos os padrões em uma única regex ancorada.
+    Com 'registry', as URLs publicadas no registro de túneis também são origens exatas; a memória
+    de decisões é descartada quando a versão do registro muda (túnel antigo deixa de valer).
+    Cada decisão fica memorizada por origem (limite de 'memo_size' entradas).
+    """
+
+    def __init__(self, origins: Iterable[str] = (), patterns: Iterable[str] = (), memo_size: int = 4096,
+                 registry=None):
+        self.origins = frozenset(o.rstrip("/").lower() for o in origins)
+        patterns = list(patterns)
+        self.regex = re.compile("|".join(f"(?:{p})" for p in patterns), re.IGNORECASE) if patterns else None
+        self.registry = registry
+        self.registry_version = None
+        self.tunnel_origins: FrozenSet[str] = frozenset()
+        self.memo_size = memo_size
+        self._memo: Dict[str, bool] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _sync_registry(self):
+        # version é O(1): no máximo um stat() do arquivo a cada intervalo do registro
+        version = self.registry.version
+        if version == self.registry_version:
+            return
+        snapshot = self.registry.snapshot()
+        urls = list(snapshot["urls"].values()) + [snapshot["url"]]
+        self.tunnel_origins = frozenset(_origin(url) for url in urls if url)
+        self.registry_version = snapshot["version"]
+        self._memo = {}
+
+    def allows(self, origin: Optional[str]) -> bool:
+        if not origin:
+            return False
+        if self.registry is not None:
+            self._sync_registry()
+        decision = self._memo.get(origin)
+        if decision is not None:
+            self.hits += 1
+            return decision
+
+        self.misses += 1
+        normalized = origin.rstrip("/").lower()
+        decision = normalized in self.origins or normalized in self.tunnel_origins \
+            or bool(self.regex and self.regex.fullmatch(normalized))
+        if len(self._memo) >= self.memo_size:
+            self._memo.clear()  # origens arbitrárias não crescem a memória sem limite
+        self._memo[origin] = decision
+        return decision
+
+    def stats(self) -> dict:
+        stats = {"memoized": len(self._memo), "hits": self.hits, "misses": self.misses}
+        if self.registry is not None:
+            stats.update(registry_version=self.registry_version, tunnel_origins=sorted(self.tunnel_origins))
+        return stats
+
+
+def build_matcher(development: bool = False, registry=None) -> OriginMatcher:
+    """
+    Produção: lista explícita + túnel publicado em 'registry' (padrão: tunnel_registry).
+    Desenvolvimento: lista explícita + curingas de túnel e de rede local.
+    """
+    if development:
+        return OriginMatcher(ALLOWED_ORIGINS, TUNNEL_ORIGIN_PATTERNS + DEV_ORIGIN_PATTERNS)
+    return OriginMatcher(ALLOWED_ORIGINS, registry=tunnel_registry if registry is None else registry)
+
+
+def is_preflight(method: str, headers) -> bool:
+    return method == "OPTIONS" and bool(headers.get("Origin")) and bool(headers.get("Access-Control-Request-Method"))
+
+
+def cors_headers(origin: str) -> Dict[str, str]:
+    """Headers para respostas normais de uma origem permitida"""
+    return {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Expose-Headers": ", ".join(EXPOSED_HEADERS),
+        "Vary": "Origin",
+    }
+
+
+def preflight_headers(origin: str, development: bool = False) -> Dict[str, str]:
+    """Headers da resposta a um preflight de uma origem permitida"""
+    return {
+        "Access-Control-Allow-Origin": origin,
+        "Access-Control-Allow-Credentials": "true",
+        "Access-Control-Allow-Methods": ", ".join(ALLOWED_METHODS),
+        "Access-Control-Allow-Headers": ", ".join(ALLOWED_HEADERS),
+        "Access-Control-Max-Age": str(max_age(development)),
+        "Vary": "Origin",
+    }
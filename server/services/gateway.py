@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+🚀 GATEWAY DE BORDA CONSOLIDADO (asyncio, processo único)
+Substitui a cadeia proxy_server/fastapi_proxy -> tunnel_server -> redirect_server/server:
+roteamento, autenticação, páginas estáticas, redirecionamentos e WebSockets
+dos apps Streamlit em um só processo, a partir de routes.py
+"""
+
+import asyncio
+import logging
+import os
+from typing import Optional
+
+import aiohttp
+from aiohttp import web, WSMsgType
+
+from admission import AdmissionRejected, build_controllers, classify, controllers_stats
+from cors_policy import build_matcher, cors_headers, is_preflight, preflight_headers
+from ip_blocklist import BlocklistWatcher, is_local_client
+from replica_pool import ReplicaPool, build_pools, streamlit_session_id
+from response_cache import CachedResponse, ResponseCache
+from runtime_config import RUNTIME_CONFIG_JS, RUNTIME_CONFIG_JSON, STATIC_CACHE_CONTROL, RuntimeConfig
+from tracing import aiohttp_middleware, propagate, upstream_wait
+from routes import (
+    API_URL, CLIENT_DIR, CONTENT_TYPES, DEFAULT_ROUTE, PAGE_ROUTES, REDIRECTS, SERVICE_ROUTES
+)
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
+logger = logging.getLogger("EdgeGateway")
+
+GATEWAY_HOST = os.getenv("ALMA_GATEWAY_HOST", "127.0.0.1")  # público só pelos túneis
+GATEWAY_PORT = int(os.getenv("ALMA_GATEWAY_PORT", "5001"))
+CORS_DEVELOPMENT = os.getenv("ALMA_CORS_DEV", "0") == "1"
+
+# Headers que não atravessam o proxy (hop-by-hop ou recalculados)
+HOP_HEADERS = {
+    "connection", "keep-alive", "proxy-authenticate", "proxy-authorization", "te",
+    "trailers", "transfer-encoding", "upgrade", "host", "content-length",
+}
+
+
+def _forward_headers(headers) -> dict:
+    return {k: v for k, v in headers.items() if k.lower() not in HOP_HEADERS}
+
+
+class EdgeGateway:
+    def __init__(self):
+        self.pools = build_pools(SERVICE_ROUTES)
+        self.cache = ResponseCache.from_env()
+        self.admission = build_controllers(self.pools)
+        self.blocklist = BlocklistWatcher()
+        self.cors = build_matcher(development=CORS_DEVELOPMENT)
+        self.runtime_config = RuntimeConfig(services=SERVICE_ROUTES)
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.app = web.Application(middlewares=self.middlewares())
+        self.app.on_startup.append(self.startup)
+        self.app.on_cleanup.append(self.cleanup)
+        self.setup_routes()
+
+    def middlewares(self) -> list:
+        """Middlewares aplicados antes de qualquer trabalho upstream"""
+        return [aiohttp_middleware("gateway"), self.blocklist_middleware, self.edge_stats_middleware,
+                self.cors_middleware]
+
+    @web.middleware
+    async def blocklist_middleware(self, request, handler):
+        # 🛡️ IPs bloqueados são recusados antes de cache, upstream ou banco
+        if self.blocklist.is_blocked(request.remote, request.headers):
+            logger.warning(f"🛡️ Requisição bloqueada de {request.remote} para /{request.match_info.get('path', '')}")
+            return web.json_response({"error": "Acesso bloqueado"}, status=403)
+        return await handler(request)
+
+    @web.middleware
+    async def edge_stats_middleware(self, request, handler):
+        # 📊 /_edge/* expõe estado interno (réplicas, bloqueios, túnel): só para quem está no servidor
+        if request.path.startswith("/_edge/") and not is_local_client(request.remote, request.headers):
+            return web.json_response({"error": "Disponível apenas no servidor local"}, status=403)
+        return await handler(request)
+
+    @web.middleware
+    async def cors_middleware(self, request, handler):
+        # ✈️ Preflights respondidos na borda; o navegador guarda por Access-Control-Max-Age
+        origin = request.headers.get("Origin")
+        if is_preflight(request.method, request.headers):
+            headers = preflight_headers(origin, CORS_DEVELOPMENT) if self.cors.allows(origin) else {}
+            return web.Response(status=200, headers=headers)
+
+        response = await handler(request)
+        if origin and not response.prepared and "Access-Control-Allow-Origin" not in response.headers \
+                and self.cors.allows(origin):
+            response.headers.update(cors_headers(origin))
+        return response
+
+    async def startup(self, app):
+        # Uma única sessão com pool de conexões para todos os upstreams
+        self.session = aiohttp.ClientSession(
+            timeout=aiohttp.ClientTimeout(total=30),
+            connector=aiohttp.TCPConnector(limit=0, limit_per_host=64),
+            auto_decompress=False,
+        )
+
+    async def cleanup(self, app):
+        if self.session:
+            await self.session.close()
+
+    def setup_routes(self):
+        router = self.app.router
+        router.add_get('/health', self.health)
+        router.add_get('/_edge/cache', self.cache_stats)
+        router.add_get('/_edge/replicas', self.replica_stats)
+        router.add_get('/_edge/admission', self.admission_stats)
+        router.add_get('/_edge/blocklist', self.blocklist_stats)
+        router.add_get('/_edge/cors', self.cors_stats)
+        router.add_get(RUNTIME_CONFIG_JSON, self.serve_runtime_config)
+        router.add_get(RUNTIME_CONFIG_JS, self.serve_runtime_config)
+        router.add_post('/login', self.login)
+        router.add_get('/redirect-confirmation', self.redirect_confirmation)
+        router.add_route('*', '/{path:.*}', self.dispatch)
+
+    # ==================== ENDPOINTS LOCAIS ====================
+
+    async def health(self, request):
+        return web.json_response({"status": "healthy", "service": "alma_gateway"})
+
+    async def cache_stats(self, request):
+        return web.json_response(self.cache.stats())
+
+    async def replica_stats(self, request):
+        seen, status = set(), []
+        for pool in self.pools.values():
+            if id(pool) not in seen:
+                seen.add(id(pool))
+                status.append(pool.status())
+        return web.json_response(status)
+
+    async def admission_stats(self, request):
+        return web.json_response(controllers_stats(self.admission))
+
+    async def blocklist_stats(self, request):
+        return web.json_response(self.blocklist.stats())
+
+    async def cors_stats(self, request):
+        return web.json_response(self.cors.stats())
+
+    async def serve_runtime_config(self, request):
+        """URL do túnel, base da API e rotas para as páginas estáticas (ETag pela versão do registro)"""
+        fmt = "js" if request.path.endswith(".js") else "json"
+        status, headers, body = self.runtime_config.respond(fmt, request.headers.get("If-None-Match"))
+        return web.Response(status=status, body=body or None, headers=headers)
+
+    async def login(self, request):
+        """Proxy de login para a API Flask"""
+        try:
+            data = await request.json()
+            with upstream_wait():
+                async with self.session.post(f"{API_URL}/api/login", json=data, headers=propagate({}),
+                                             timeout=aiohttp.ClientTimeout(total=10)) as resp:
+                    return web.json_response(await resp.json(content_type=None), status=resp.status)
+        except aiohttp.ClientError as e:
+            logger.error(f"Erro de conexão com API: {e}")
+            return web.json_response({
+                "success": False,
+                "error": "Não foi possível conectar ao servidor"
+            }, status=503)
+        except Exception as e:
+            logger.error(f"Erro inesperado no login: {e}")
+            return web.json_response({"success": False, "error": "Erro interno do servidor"}, status=500)
+
+    async def redirect_confirmation(self, request):
+        """Valida o token na API e serve a página de redirecionamento"""
+        token = request.query.get("token")
+        if not token or not await self.validate_token(token):
+            raise web.HTTPFound("/login")
+        return self.serve_page("redirect_confirmation.html", cache_control="no-store")
+
+    async def validate_token(self, token: str) -> bool:
+        try:
+            with upstream_wait():
+                async with self.session.post(f"{API_URL}/api/validate_token", json={"token": token},
+                                             headers=propagate({}), timeout=aiohttp.ClientTimeout(total=5)) as resp:
+                    if resp.status != 200:
+                        return False
+                    data = await resp.json(content_type=None)
+            return bool(data.get("success") and data.get("data", {}).get("valid"))
+        except Exception as e:
+            logger.error(f"Erro na validação do token: {e}")
+            return False
+
+    def serve_page(self, filename: str, cache_control: str = STATIC_CACHE_CONTROL) -> web.StreamResponse:
+        file_path = CLIENT_DIR / filename
+        if not file_path.is_file():
+            raise web.HTTPNotFound(text=f"Arquivo {filename} não encontrado")
+        # Páginas imutáveis: os valores dinâmicos vêm de /runtime-config.js
+        return web.FileResponse(file_path, headers={
+            "Content-Type": CONTENT_TYPES.get(file_path.suffix, "application/octet-stream"),
+            "Cache-Control": cache_control,
+        })
+
+    # ==================== ROTEAMENTO ====================
+
+    async def dispatch(self, request):
+        path = request.match_info.get('path', '')
+        first_segment = path.split('/')[0]
+
+        if request.method == "GET":
+            if path in PAGE_ROUTES:
+                return self.serve_page(PAGE_ROUTES[path])
+            if first_segment in REDIRECTS:
+                raise web.HTTPFound(REDIRECTS[first_segment])
+            if first_segment not in self.pools and "/" not in path and (CLIENT_DIR / path).is_file():
+                return self.serve_page(path)
+            # Token na raiz vai para o hub (antigo tunnel_server)
+            if not path and "token" in request.query:
+                raise web.HTTPFound(f"/hub/?token={request.query['token']}")
+
+        route = first_segment if first_segment in self.pools else DEFAULT_ROUTE
+        pool = self.pools[route]
+
+        if path.endswith("_stcore/stream") and request.headers.get("Upgrade", "").lower() == "websocket":
+            return await self.websocket_relay(request, path, pool)
+        return await self.http_proxy(request, path, route, pool)
+
+    async def http_proxy(self, request, path: str, route: str, pool: ReplicaPool):
+        cache_key = self.cache.request_key(request.method, path, request.query_string, request.headers)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return web.Response(status=cached.status, headers=cached.headers, body=cached.body)
+
+        # 🚦 Limite de requisições simultâneas por upstream (WebSockets não entram)
+        controller = self.admission[route]
+        try:
+            await controller.acquire(classify(path))
+        except AdmissionRejected as e:
+            return web.json_response(e.to_dict(), status=e.status, headers=e.headers)
+        try:
+            return await self.forward(request, path, pool, cache_key)
+        finally:
+            controller.release()
+
+    async def forward(self, request, path: str, pool: ReplicaPool, cache_key):
+        replica = pool.choose(
+            cookie=request.cookies.get(pool.cookie_name),
+            session_id=streamlit_session_id(path)
+        )
+        target_url = f"{replica.url}/{path}"
+        if request.query_string:
+            target_url += f"?{request.query_string}"
+
+        pool.acquire(replica)
+        try:
+            if cache_key:
+                upstream = await self.cache.fetch(cache_key, path, lambda: self.fetch_upstream(request, target_url),
+                                                  request.headers)
+            else:
+                upstream = await self.fetch_upstream(request, target_url)
+        except aiohttp.ClientConnectorError as e:
+            logger.error(f"Réplica indisponível em {target_url}: {e}")
+            pool.mark_failed(replica)
+            return web.json_response({"error": "Serviço indisponível"}, status=503)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"Erro no roteamento para {target_url}: {e}")
+            return web.json_response({"error": "Serviço indisponível"}, status=503)
+        finally:
+            pool.release(replica)
+
+        response = web.Response(status=upstream.status, headers=upstream.headers, body=upstream.body)
+        if len(pool) > 1:
+            response.set_cookie(pool.cookie_name, str(replica.index), httponly=True, samesite='Lax')
+        return response
+
+    async def fetch_upstream(self, request, target_url: str) -> CachedResponse:
+        body = await request.read() if request.can_read_body else None
+        with upstream_wait():
+            async with self.session.request(
+                method=request.method,
+                url=target_url,
+                headers=propagate(_forward_headers(request.headers)),
+                data=body,
+                allow_redirects=False
+            ) as response:
+                # auto_decompress=False: o corpo segue comprimido, junto com Content-Encoding
+                return CachedResponse(
+                    status=response.status,
+                    headers=_forward_headers(response.headers),
+                    body=await response.read()
+                )
+
+    async def websocket_relay(self, request, path: str, pool: ReplicaPool):
+        """Relay direto navegador <-> Streamlit, sem passar pelo tunnel"""
+        protocols = [p.strip() for p in request.headers.get('Sec-WebSocket-Protocol', '').split(',') if p.strip()]
+        replica = pool.choose(
+            cookie=request.cookies.get(pool.cookie_name),
+            session_id=streamlit_session_id(ws_protocol=request.headers.get('Sec-WebSocket-Protocol', ''))
+        )
+        target_ws_url = f"{replica.url.replace('http', 'ws', 1)}/{path}"
+
+        ws = web.WebSocketResponse(protocols=protocols[:1], max_msg_size=0)
+        await ws.prepare(request)
+
+        pool.acquire(replica)
+        try:
+            async with self.session.ws_connect(
+                target_ws_url,
+                protocols=protocols,
+                headers=propagate({k: v for k, v in request.headers.items() if k.lower() in ('cookie', 'origin')}),
+                max_msg_size=0,
+            ) as upstream:
+
+                async def pipe(source, target):
+                    async for msg in source:
+                        if msg.type == WSMsgType.TEXT:
+                            await target.send_str(msg.data)
+                        elif msg.type == WSMsgType.BINARY:
+                            await target.send_bytes(msg.data)
+                        elif msg.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
+                            break
+                    await target.close()
+
+                await asyncio.gather(pipe(ws, upstream), pipe(upstream, ws))
+
+        except aiohttp.ClientConnectorError as e:
+            logger.error(f"❌ Réplica {replica.url} indisponível para WebSocket: {e}")
+            pool.mark_failed(replica)
+        except Exception as e:
+            logger.error(f"❌ Erro no relay WebSocket {path}: {e}")
+        finally:
+            pool.release(replica)
+            await ws.close()
+
+        return ws
+
+
+def create_app() -> web.Application:
+    return EdgeGateway().app
+
+
+def main():
+    print("=" * 60)
+    print("🚀 ALMA EDGE GATEWAY - PROCESSO ÚNICO")
+    print("=" * 60)
+    print(f"📡 Endereço: {GATEWAY_HOST}:{GATEWAY_PORT}")
+    for name, route in SERVICE_ROUTES.items():
+        print(f"   • /{name} -> {route}")
+    print("=" * 60)
+    web.run_app(create_app(), host=GATEWAY_HOST, port=GATEWAY_PORT)
+
+
+if __name__ == "__main__":
+    main()
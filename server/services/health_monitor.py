@@ -0,0 +1,240 @@
+# health_monitor.py
+"""
+Monitor de saúde concorrente com orçamento de reinícios
+Substitui o laço sequencial do SystemManager.monitor_services (uma verificação travada
+atrasava todas as outras e os reinícios não tinham espera):
+
+- todos os serviços são sondados ao mesmo tempo, cada sonda com prazo próprio
+- reinício só após falhas seguidas, com backoff exponencial entre tentativas
+- orçamento de reinícios por janela; estourou = crash loop, o serviço fica parado até a janela passar
+- estado, reinícios e latência das sondas em JSON: GET http://127.0.0.1:5599/status
+"""
+
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Iterable, Optional
+
+import aiohttp
+from aiohttp import web
+
+logger = logging.getLogger("HealthMonitor")
+
+STATUS_HOST = "127.0.0.1"
+STATUS_PORT = int(os.getenv("ALMA_HEALTH_PORT", "5599"))
+
+CHECK_INTERVAL = 10.0
+PROBE_TIMEOUT = 3.0
+FAILURE_THRESHOLD = 2       # falhas seguidas antes de reiniciar
+STARTUP_GRACE = 30.0        # após reiniciar, falhas não contam enquanto o serviço sobe
+BACKOFF_INITIAL = 5.0
+BACKOFF_MAX = 300.0
+RESTART_BUDGET = 3          # reinícios permitidos por janela
+RESTART_WINDOW = 600.0
+STABLE_AFTER = 120.0        # saudável por este tempo zera o backoff
+
+
+class HealthTarget:
+    """Um serviço monitorado; restart() deve apenas disparar o processo (sem esperar)"""
+
+    def __init__(self, name: str, port: int, path: str = "", restart: Optional[Callable[[], object]] = None,
+                 host: str = "127.0.0.1"):
+        self.name = name
+        self.url = f"http://{host}:{port}{path}"
+        self.restart = restart
+
+        self.state = "unknown"
+        self.failures = 0
+        self.restarts = 0
+        self.restart_times = deque()
+        self.backoff = BACKOFF_INITIAL
+        self.next_restart_at = 0.0
+        self.grace_until = 0.0
+        self.healthy_since: Optional[float] = None
+        self.latency_ms: Optional[float] = None
+        self.last_error: Optional[str] = None
+        self.last_check: Optional[float] = None
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "url": self.url,
+            "failures": self.failures,
+            "restarts": self.restarts,
+            "restarts_in_window": len(self.restart_times),
+            "backoff_s": self.backoff,
+            "latency_ms": self.latency_ms,
+            "last_error": self.last_error,
+            "last_check": self.last_check,
+        }
+
+
+class HealthMonitor:
+    def __init__(self, targets: Iterable[HealthTarget], interval: float = CHECK_INTERVAL,
+                 probe_timeout: float = PROBE_TIMEOUT, threshold: int = FAILURE_THRESHOLD,
+                 budget: int = RESTART_BUDGET, window: float = RESTART_WINDOW, grace: float = STARTUP_GRACE,
+                 backoff: float = BACKOFF_INITIAL, max_backoff: float = BACKOFF_MAX,
+                 on_change: Optional[Callable[[str, str], None]] = None):
+        self.targets: Dict[str, HealthTarget] = {target.name: target for target in targets}
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        for target in self.targets.values():
+            target.backoff = backoff
+        self.interval = interval
+        self.probe_timeout = probe_timeout
+        self.threshold = threshold
+        self.budget = budget
+        self.window = window
+        self.grace = grace
+        self.on_change = on_change
+        self.cycles = 0
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop: Optional[asyncio.Event] = None
+        self._runner: Optional[web.AppRunner] = None
+        self.status_port: Optional[int] = None
+
+    # ==================== CICLO ====================
+
+    async def check_all(self, session: aiohttp.ClientSession):
+        """Uma rodada: todas as sondas em paralelo, depois as decisões de reinício"""
+        await asyncio.gather(*(self._check(session, target) for target in self.targets.values()))
+        self.cycles += 1
+
+    async def _check(self, session: aiohttp.ClientSession, target: HealthTarget):
+        started = time.perf_counter()
+        try:
+            async with session.get(target.url, allow_redirects=False,
+                                   timeout=aiohttp.ClientTimeout(total=self.probe_timeout)) as response:
+                ok = 200 <= response.status < 400
+                error = None if ok else f"HTTP {response.status}"
+        except asyncio.TimeoutError:
+            ok, error = False, f"sem resposta em {self.probe_timeout:.0f}s"
+        except aiohttp.ClientError as e:
+            ok, error = False, str(e) or type(e).__name__
+        now = time.monotonic()
+        target.latency_ms = round((time.perf_counter() - started) * 1000, 1)
+        target.last_check = time.time()
+        target.last_error = error
+
+        if ok:
+            self._healthy(target, now)
+        else:
+            await self._unhealthy(target, now)
+
+    def _set_state(self, target: HealthTarget, state: str):
+        if state == target.state:
+            return
+        previous, target.state = target.state, state
+        logger.info(f"🩺 {target.name}: {previous} -> {state}")
+        if self.on_change:
+            try:
+                self.on_change(target.name, state)
+            except Exception as e:
+                logger.error(f"❌ Erro no on_change do monitor: {e}")
+
+    def _healthy(self, target: HealthTarget, now: float):
+        target.failures = 0
+        if target.healthy_since is None:
+            target.healthy_since = now
+        elif now - target.healthy_since >= STABLE_AFTER:
+            target.backoff = self.backoff
+        self._set_state(target, "healthy")
+
+    async def _unhealthy(self, target: HealthTarget, now: float):
+        target.healthy_since = None
+        if now < target.grace_until:
+            self._set_state(target, "starting")
+            return
+        target.failures += 1
+        if target.failures < self.threshold or target.restart is None:
+            self._set_state(target, "unhealthy")
+            return
+
+        while target.restart_times and now - target.restart_times[0] > self.window:
+            target.restart_times.popleft()
+        if len(target.restart_times) >= self.budget:
+            if target.state != "crash_loop":
+                logger.error(f"🔁 {target.name} em crash loop: {len(target.restart_times)} reinícios "
+                             f"em {self.window:.0f}s; reinício suspenso")
+            self._set_state(target, "crash_loop")
+            return
+        if now < target.next_restart_at:
+            self._set_state(target, "backoff")
+            return
+
+        target.restarts += 1
+        target.restart_times.append(now)
+        target.failures = 0
+        target.grace_until = now + self.grace
+        target.next_restart_at = now + target.backoff
+        logger.warning(f"🔄 Reiniciando {target.name} (reinício {target.restarts}, "
+                       f"próximo no mínimo em {target.backoff:.0f}s)")
+        target.backoff = min(target.backoff * 2, self.max_backoff)
+        self._set_state(target, "restarting")
+        try:
+            await asyncio.get_running_loop().run_in_executor(None, target.restart)
+        except Exception as e:
+            target.last_error = f"falha ao reiniciar: {e}"
+            logger.error(f"❌ Erro ao reiniciar {target.name}: {e}")
+
+    def status(self) -> dict:
+        return {
+            "cycles": self.cycles,
+            "interval_s": self.interval,
+            "services": {name: target.as_dict() for name, target in self.targets.items()},
+        }
+
+    # ==================== EXECUÇÃO ====================
+
+    async def run(self, status_port: Optional[int] = STATUS_PORT):
+        self._stop = self._stop or asyncio.Event()
+        if status_port is not None:
+            await self._start_status_server(status_port)
+        try:
+            async with aiohttp.ClientSession() as session:
+                while not self._stop.is_set():
+                    await self.check_all(session)
+                    try:
+                        await asyncio.wait_for(self._stop.wait(), self.interval)
+                    except asyncio.TimeoutError:
+                        pass
+        finally:
+            if self._runner:
+                await self._runner.cleanup()
+
+    async def _start_status_server(self, port: int):
+        async def handle_status(request):
+            return web.json_response(self.status())
+
+        app = web.Application()
+        app.router.add_get("/status", handle_status)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, STATUS_HOST, port)
+        try:
+            await site.start()
+        except OSError as e:
+            logger.warning(f"⚠️ Endpoint de status indisponível na porta {port}: {e}")
+            return
+        self.status_port = site._server.sockets[0].getsockname()[1]
+        logger.info(f"🩺 Status dos serviços em http://{STATUS_HOST}:{self.status_port}/status")
+
+    def start(self, status_port: Optional[int] = STATUS_PORT) -> "HealthMonitor":
+        """Roda o monitor em uma thread própria (para uso a partir de código síncrono)"""
+        self._loop = asyncio.new_event_loop()
+        self._stop = asyncio.Event()
+        self._thread = threading.Thread(
+            target=self._loop.run_until_complete, args=(self.run(status_port),), name="health-monitor", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout: float = 5.0):
+        if self._loop and self._stop:
+            self._loop.call_soon_threadsafe(self._stop.set)
+        if self._thread:
+            self._thread.join(timeout)
@@ -0,0 +1,200 @@
+# ip_blocklist.py
+"""
+Lista de IPs bloqueados compilada para a borda
+IPs exatos e faixas CIDR em uma árvore de prefixos binária (consulta em O(tamanho do prefixo)),
+recarregada automaticamente quando o blocked_ips do banco JSON muda
+"""
+
+import ipaddress
+import json
+import logging
+import os
+import time
+from pathlib import Path
+from typing import Iterable, Optional, Union
+
+logger = logging.getLogger("IPBlocklist")
+
+DEFAULT_DB_FILE = Path(__file__).parent.parent / "fluxon.json"
+
+# Clientes reais chegam pelos túneis (ngrok/cloudflared) a partir do localhost
+TRUSTED_PROXIES = ("127.0.0.1", "::1")
+
+IPAddress = Union[ipaddress.IPv4Address, ipaddress.IPv6Address]
+
+
+class PrefixTrie:
+    """Árvore binária de prefixos: cada nó é [filho_0, filho_1, terminal]"""
+
+    def __init__(self, bits: int):
+        self.bits = bits
+        self.root = [None, None, False]
+        self.size = 0
+
+    def insert(self, value: int, prefixlen: int):
+        node = self.root
+        for i in range(prefixlen):
+            if node[2]:
+                return  # já coberto por um prefixo mais curto
+            bit = (value >> (self.bits - 1 - i)) & 1
+            if node[bit] is None:
+                node[bit] = [None, None, False]
+            node = node[bit]
+        if not node[2]:
+            # Prefixos mais longos abaixo deste ficam redundantes
+            self.size += 1 - self._count(node[0]) - self._count(node[1])
+            node[:] = [None, None, True]
+
+    def _count(self, node) -> int:
+        if node is None:
+            return 0
+        return 1 if node[2] else self._count(node[0]) + self._count(node[1])
+
+    def contains(self, value: int) -> bool:
+        node = self.root
+        shift = self.bits - 1
+        while node is not None:
+            if node[2]:
+                return True
+            node = node[(value >> shift) & 1]
+            shift -= 1
+        return False
+
+
+class IPBlocklist:
+    """Conjunto compilado de IPs/CIDRs bloqueados (IPv4 e IPv6)"""
+
+    def __init__(self, entries: Iterable[str] = ()):
+        self._tries = {4: PrefixTrie(32), 6: PrefixTrie(128)}
+        self.invalid = []
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry: str) -> bool:
+        try:
+            network = ipaddress.ip_network(str(entry).strip(), strict=False)
+        except ValueError:
+            self.invalid.append(entry)
+            logger.warning(f"Entrada inválida em blocked_ips ignorada: {entry!r}")
+            return False
+        self._tries[network.version].insert(int(network.network_address), network.prefixlen)
+        return True
+
+    @staticmethod
+    def parse(ip: str) -> Optional[IPAddress]:
+        try:
+            address = ipaddress.ip_address(ip.strip().split("%")[0])
+        except (ValueError, AttributeError):
+            return None
+        if address.version == 6 and address.ipv4_mapped:
+            return address.ipv4_mapped
+        return address
+
+    def is_blocked(self, ip: str) -> bool:
+        address = self.parse(ip)
+        if address is None:
+            return False
+        return self._tries[address.version].contains(int(address))
+
+    def __contains__(self, ip: str) -> bool:
+        return self.is_blocked(ip)
+
+    def __len__(self) -> int:
+        return self._tries[4].size + self._tries[6].size
+
+
+def client_ips(remote: Optional[str], headers) -> list:
+    """
+    Endereços a verificar para uma requisição: o peer TCP e, quando ele é um
+    túnel local confiável, o cliente original informado pelo túnel.
+    Do X-Forwarded-For vale só a entrada mais à direita que não é um salto local: é a que o
+    túnel acrescenta. As da esquerda vêm do próprio cliente e podem ser forjadas.
+    """
+    ips = [remote] if remote else []
+    if remote in TRUSTED_PROXIES:
+        for header in ("CF-Connecting-IP", "X-Real-IP"):
+            if headers.get(header):
+                ips.append(headers[header])
+        forwarded = headers.get("X-Forwarded-For")
+        if forwarded:
+            hops = [hop.strip() for hop in forwarded.split(",") if hop.strip()]
+            client = next((hop for hop in reversed(hops) if hop not in TRUSTED_PROXIES), None)
+            if client:
+                ips.append(client)
+    return ips
+
+
+def is_local_client(remote: Optional[str], headers) -> bool:
+    """
+    Requisição feita no próprio servidor (ex.: curl localhost:5001/_edge/cache).
+    O que chega pelos túneis também vem do localhost, mas com o cliente real nos headers do túnel.
+    """
+    ips = client_ips(remote, headers)
+    if len(ips) != 1:
+        return False
+    address = IPBlocklist.parse(ips[0])
+    return address is not None and address.is_loopback
+
+
+class BlocklistWatcher:
+    """
+    Mantém o IPBlocklist sincronizado com o arquivo do JSONDatabase.
+    A verificação de mudança é um stat() no máximo a cada 'interval' segundos;
+    o JSON só é relido quando mtime/tamanho mudam.
+    """
+
+    def __init__(self, db_file: Union[str, Path, None] = None, interval: float = 2.0):
+        self.db_file = Path(db_file or os.getenv("ALMA_DB_FILE", DEFAULT_DB_FILE))
+        self.interval = interval
+        self.blocklist = IPBlocklist()
+        self.reloads = 0
+        self.rejected = 0
+        self._signature = None
+        self._next_check = 0.0
+        self.refresh(force=True)
+
+    def refresh(self, force: bool = False) -> IPBlocklist:
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return self.blocklist
+        self._next_check = now + self.interval
+
+        try:
+            stat = self.db_file.stat()
+        except OSError:
+            return self.blocklist
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if signature == self._signature:
+            return self.blocklist
+
+        try:
+            with open(self.db_file, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("blocked_ips", [])
+        except (OSError, ValueError) as e:
+            # Arquivo em escrita ou corrompido: mantém a lista anterior e tenta de novo
+            logger.warning(f"Não foi possível recarregar blocked_ips de {self.db_file}: {e}")
+            return self.blocklist
+
+        self.blocklist = IPBlocklist(entries)
+        self._signature = signature
+        self.reloads += 1
+        logger.info(f"🛡️ Lista de bloqueio carregada: {len(self.blocklist)} entradas")
+        return self.blocklist
+
+    def is_blocked(self, remote: Optional[str], headers=None) -> bool:
+        blocklist = self.refresh()
+        if not len(blocklist):
+            return False
+        blocked = any(blocklist.is_blocked(ip) for ip in client_ips(remote, headers or {}))
+        if blocked:
+            self.rejected += 1
+        return blocked
+
+    def stats(self) -> dict:
+        return {
+            "db_file": str(self.db_file),
+            "entries": len(self.blocklist),
+            "invalid": len(self.blocklist.invalid),
+            "reloads": self.reloads,
+            "rejected": self.rejected,
+        }
@@ -0,0 +1,183 @@
+# log_multiplexer.py
+"""
+Captura não bloqueante da saída dos processos filhos
+Cada stdout/stderr é drenado continuamente por uma thread leitora, então o filho nunca trava
+com o buffer do pipe cheio. As linhas ganham horário e a etiqueta do serviço e vão para:
+- um arquivo rotativo por serviço (logs/<serviço>.log)
+- um buffer em memória com as últimas linhas (tail), para diagnóstico sem abrir arquivos
+Rajadas de log são limitadas por token bucket: o excesso é descartado (mas sempre lido do pipe)
+e o total descartado é anotado no arquivo quando a rajada passa.
+"""
+
+import logging
+import os
+import sys
+import threading
+import time
+from collections import deque
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+logger = logging.getLogger("LogMultiplexer")
+
+DEFAULT_LOG_DIR = Path(__file__).parent.parent / "logs"
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 3
+TAIL_LINES = 500
+RATE_LIMIT = 200.0   # linhas/s sustentadas por serviço
+BURST = 1000         # linhas aceitas de uma vez antes de limitar
+MAX_LINE = 4096      # linhas maiores são truncadas
+
+
+class _ServiceLog:
+    """Destino das linhas de um serviço: arquivo rotativo, tail e token bucket"""
+
+    def __init__(self, name: str, log_dir: Path, tail_lines: int, rate: float, burst: int, echo: bool):
+        self.name = name
+        self.echo = echo
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last_refill = time.monotonic()
+        self.lines = 0
+        self.dropped = 0
+        self.pending_dropped = 0
+        self.tail = deque(maxlen=tail_lines)
+        self.lock = threading.Lock()
+
+        log_dir.mkdir(parents=True, exist_ok=True)
+        self.handler = RotatingFileHandler(
+            log_dir / f"{name}.log", maxBytes=MAX_BYTES, backupCount=BACKUP_COUNT, encoding="utf-8"
+        )
+
+    def _allow(self) -> bool:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def write(self, stream: str, text: str):
+        with self.lock:
+            self.lines += 1
+            if not self._allow():
+                self.dropped += 1
+                self.pending_dropped += 1
+                return
+            if self.pending_dropped:
+                self._emit("mux", f"⚠️ {self.pending_dropped} linhas descartadas (rajada de logs)")
+                self.pending_dropped = 0
+            self._emit(stream, text)
+
+    def _emit(self, stream: str, text: str):
+        stamp = time.strftime("%Y-%m-%d %H:%M:%S")
+        line = f"{stamp} [{self.name}:{stream}] {text}"
+        self.tail.append(line)
+        record = logging.LogRecord(self.name, logging.INFO, "", 0, line, None, None)
+        try:
+            self.handler.emit(record)
+        except Exception:
+            pass
+        if self.echo:
+            print(line, file=sys.stdout, flush=True)
+
+    def close(self):
+        with self.lock:
+            if self.pending_dropped:
+                self._emit("mux", f"⚠️ {self.pending_dropped} linhas descartadas (rajada de logs)")
+                self.pending_dropped = 0
+            self.handler.close()
+
+
+class LogMultiplexer:
+    """Uma instância por processo gerenciador (log_multiplexer); attach() para cada filho"""
+
+    def __init__(self, log_dir: Union[str, Path, None] = None, tail_lines: int = TAIL_LINES,
+                 rate: float = RATE_LIMIT, burst: int = BURST):
+        self.log_dir = Path(log_dir or os.getenv("ALMA_LOG_DIR", DEFAULT_LOG_DIR))
+        self.tail_lines = tail_lines
+        self.rate = rate
+        self.burst = burst
+        self._services: Dict[str, _ServiceLog] = {}
+        self._readers: Dict[str, List[threading.Thread]] = {}
+        self._lock = threading.Lock()
+
+    def _service(self, name: str, echo: bool) -> _ServiceLog:
+        with self._lock:
+            service = self._services.get(name)
+            if service is None:
+                service = _ServiceLog(name, self.log_dir, self.tail_lines, self.rate, self.burst, echo)
+                self._services[name] = service
+            service.echo = echo
+            return service
+
+    def attach(self, name: str, process, echo: bool = False):
+        """Começa a drenar stdout/stderr do processo (abertos com PIPE) e devolve o próprio processo"""
+        service = self._service(name, echo)
+        readers = []
+        for stream_name, stream in (("stdout", process.stdout), ("stderr", process.stderr)):
+            if stream is None:
+                continue
+            reader = threading.Thread(
+                target=self._drain, args=(service, stream_name, stream),
+                name=f"log-{name}-{stream_name}", daemon=True,
+            )
+            reader.start()
+            readers.append(reader)
+        with self._lock:
+            self._readers[name] = readers
+        return process
+
+    @staticmethod
+    def _drain(service: _ServiceLog, stream_name: str, stream):
+        try:
+            for raw in iter(stream.readline, ""):
+                if isinstance(raw, bytes):
+                    raw = raw.decode("utf-8", errors="replace")
+                text = raw.rstrip("\r\n")
+                if len(text) > MAX_LINE:
+                    text = text[:MAX_LINE] + " …[truncado]"
+                service.write(stream_name, text)
+        except (OSError, ValueError):
+            pass  # pipe fechado pelo término do processo
+        finally:
+            try:
+                stream.close()
+            except OSError:
+                pass
+
+    def wait(self, name: str, timeout: Optional[float] = None):
+        """Espera as leitoras do serviço terminarem (processo encerrado e pipes esvaziados)"""
+        for reader in self._readers.get(name, []):
+            reader.join(timeout)
+
+    def tail(self, name: str, lines: int = 50) -> List[str]:
+        service = self._services.get(name)
+        if service is None:
+            return []
+        with service.lock:
+            return list(service.tail)[-lines:]
+
+    def stats(self) -> Dict[str, dict]:
+        return {
+            name: {
+                "lines": service.lines,
+                "dropped": service.dropped,
+                "file": service.handler.baseFilename,
+                "readers": sum(reader.is_alive() for reader in self._readers.get(name, [])),
+            }
+            for name, service in list(self._services.items())
+        }
+
+    def close(self):
+        with self._lock:
+            services = list(self._services.values())
+        for service in services:
+            service.close()
+
+
+# Instância compartilhada do processo
+log_multiplexer = LogMultiplexer()
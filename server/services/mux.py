@@ -0,0 +1,320 @@
+# mux.py
+"""
+Transporte multiplexado entre o proxy de borda e o tunnel_server
+Poucas conexões WebSocket persistentes carregam muitos streams lógicos,
+cada um com seu enquadramento, janela de controle de fluxo e fechamento próprios.
+
+Quadro (mensagem binária): !IB = id do stream (u32), tipo (u8), seguido do payload
+"""
+
+import asyncio
+import itertools
+import json
+import logging
+import struct
+from typing import Awaitable, Callable, Dict, List, Optional, Union
+
+import aiohttp
+from aiohttp import WSMsgType
+
+logger = logging.getLogger("Mux")
+
+HEADER = struct.Struct("!IB")
+WINDOW_UPDATE = struct.Struct("!I")
+
+# Tipos de quadro
+OPEN = 1        # payload: JSON com service, path, protocols, headers
+OPEN_OK = 2
+OPEN_FAIL = 3   # payload: motivo (utf-8)
+TEXT = 4
+BINARY = 5
+WINDOW = 6      # payload: bytes consumidos pelo receptor (u32)
+CLOSE = 7
+
+# Bytes que um lado pode enviar em um stream antes de receber WINDOW
+INITIAL_WINDOW = 256 * 1024
+
+MUX_PATH = "/_mux"
+
+
+class MuxError(Exception):
+    """Falha ao abrir ou usar um stream multiplexado"""
+
+
+class MuxStream:
+    """Stream lógico dentro de uma conexão multiplexada"""
+
+    def __init__(self, connection: "MuxConnection", stream_id: int, window: int = INITIAL_WINDOW):
+        self.connection = connection
+        self.id = stream_id
+        self.send_window = window
+        self.window = window
+        self.closed = False
+        self._window_open = asyncio.Event()
+        self._window_open.set()
+        self._inbox: asyncio.Queue = asyncio.Queue()
+        self._consumed = 0
+        self.opened: asyncio.Future = asyncio.get_running_loop().create_future()
+
+    async def send(self, data: Union[str, bytes]):
+        """Envia uma mensagem respeitando a janela do receptor"""
+        if isinstance(data, str):
+            frame_type, payload = TEXT, data.encode("utf-8")
+        else:
+            frame_type, payload = BINARY, bytes(data)
+
+        # Uma mensagem maior que a janela passa quando a janela está cheia (saldo negativo)
+        while self.send_window <= 0 and not self.closed:
+            self._window_open.clear()
+            await self._window_open.wait()
+        if self.closed:
+            raise MuxError(f"stream {self.id} fechado")
+
+        self.send_window -= len(payload)
+        await self.connection.send_frame(self.id, frame_type, payload)
+
+    async def receive(self) -> Optional[Union[str, bytes]]:
+        """Próxima mensagem do outro lado, ou None quando o stream fecha"""
+        item = await self._inbox.get()
+        if item is None:
+            self._inbox.put_nowait(None)  # leituras seguintes também terminam
+            return None
+        frame_type, payload = item
+        self._consumed += len(payload)
+        if self._consumed >= self.window // 2 and not self.closed:
+            consumed, self._consumed = self._consumed, 0
+            await self.connection.send_frame(self.id, WINDOW, WINDOW_UPDATE.pack(consumed))
+        return payload.decode("utf-8") if frame_type == TEXT else payload
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        message = await self.receive()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+
+    async def accept(self):
+        await self.connection.send_frame(self.id, OPEN_OK)
+
+    async def reject(self, reason: str):
+        await self.connection.send_frame(self.id, OPEN_FAIL, reason.encode("utf-8"))
+        self._terminate()
+
+    async def close(self):
+        if self.closed:
+            return
+        self._terminate()
+        try:
+            await self.connection.send_frame(self.id, CLOSE)
+        except Exception:
+            pass
+
+    # ----- chamados pela conexão -----
+
+    def _feed(self, frame_type: int, payload: bytes):
+        if not self.closed:
+            self._inbox.put_nowait((frame_type, payload))
+
+    def _grant(self, credit: int):
+        self.send_window += credit
+        self._window_open.set()
+
+    def _terminate(self, error: Optional[str] = None):
+        if self.closed:
+            return
+        self.closed = True
+        self._window_open.set()
+        self._inbox.put_nowait(None)
+        if not self.opened.done():
+            self.opened.set_exception(MuxError(error or "stream fechado antes de abrir"))
+            self.opened.exception()
+        self.connection.streams.pop(self.id, None)
+
+
+class MuxConnection:
+    """
+    Uma conexão WebSocket física carregando vários streams.
+    Do lado do tunnel, on_open recebe (stream, metadados) para cada OPEN.
+    """
+
+    def __init__(self, ws, on_open: Optional[Callable[[MuxStream, dict], Awaitable[None]]] = None,
+                 first_id: int = 1):
+        self.ws = ws
+        self.on_open = on_open
+        self.streams: Dict[int, MuxStream] = {}
+        self._ids = itertools.count(first_id, 2)
+        self._send_lock = asyncio.Lock()
+        self._tasks = set()
+        self.closed = False
+
+    async def send_frame(self, stream_id: int, frame_type: int, payload: bytes = b""):
+        if self.closed:
+            raise MuxError("conexão multiplexada encerrada")
+        async with self._send_lock:
+            await self.ws.send_bytes(HEADER.pack(stream_id, frame_type) + payload)
+
+    async def open_stream(self, meta: dict, timeout: float = 10.0) -> MuxStream:
+        stream = MuxStream(self, next(self._ids))
+        self.streams[stream.id] = stream
+        await self.send_frame(stream.id, OPEN, json.dumps(meta).encode("utf-8"))
+        try:
+            await asyncio.wait_for(asyncio.shield(stream.opened), timeout)
+        except asyncio.TimeoutError:
+            await stream.close()
+            raise MuxError(f"timeout abrindo stream para {meta.get('service')}")
+        return stream
+
+    async def run(self):
+        """Lê quadros até a conexão cair; fecha todos os streams no final"""
+        try:
+            async for msg in self.ws:
+                if msg.type == WSMsgType.BINARY:
+                    await self._dispatch(msg.data)
+                elif msg.type in (WSMsgType.CLOSE, WSMsgType.CLOSING, WSMsgType.ERROR):
+                    break
+        finally:
+            self.closed = True
+            for stream in list(self.streams.values()):
+                stream._terminate("conexão multiplexada encerrada")
+            for task in list(self._tasks):
+                task.cancel()
+
+    async def _dispatch(self, data: bytes):
+        if len(data) < HEADER.size:
+            return
+        stream_id, frame_type = HEADER.unpack_from(data)
+        payload = data[HEADER.size:]
+        stream = self.streams.get(stream_id)
+
+        if frame_type == OPEN:
+            if self.on_open is None or stream is not None:
+                await self.send_frame(stream_id, OPEN_FAIL, b"open nao suportado")
+                return
+            try:
+                meta = json.loads(payload or b"{}")
+            except ValueError:
+                meta = None
+            if not isinstance(meta, dict):
+                # Pedido malformado derruba só este stream, não o link com os outros
+                logger.warning(f"OPEN inválido no stream {stream_id}: {payload[:80]!r}")
+                await self.send_frame(stream_id, OPEN_FAIL, b"open invalido")
+                return
+            stream = MuxStream(self, stream_id)
+            stream.opened.set_result(True)
+            self.streams[stream_id] = stream
+            task = asyncio.create_task(self._serve(stream, meta))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        elif stream is None:
+            return
+        elif frame_type == OPEN_OK:
+            if not stream.opened.done():
+                stream.opened.set_result(True)
+        elif frame_type == OPEN_FAIL:
+            stream._terminate(payload.decode("utf-8", "replace"))
+        elif frame_type in (TEXT, BINARY):
+            stream._feed(frame_type, payload)
+        elif frame_type == WINDOW and len(payload) == WINDOW_UPDATE.size:
+            stream._grant(WINDOW_UPDATE.unpack(payload)[0])
+        elif frame_type == CLOSE:
+            stream._terminate()
+
+    async def _serve(self, stream: MuxStream, meta: dict):
+        try:
+            await self.on_open(stream, meta)
+        except Exception as e:
+            logger.error(f"Erro no stream {stream.id} ({meta.get('service')}): {e}")
+        finally:
+            await stream.close()
+
+    async def close(self):
+        self.closed = True
+        await self.ws.close()
+
+
+class MuxClient:
+    """
+    Lado do proxy de borda: mantém até 'connections' conexões persistentes com o
+    tunnel_server e distribui os streams pela menos ocupada.
+    """
+
+    def __init__(self, url: str, connections: int = 2, heartbeat: float = 20.0):
+        self.url = url
+        self.max_connections = max(1, connections)
+        self.heartbeat = heartbeat
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.connections: List[MuxConnection] = []
+        self._connect_lock = asyncio.Lock()
+
+    async def _connect(self) -> MuxConnection:
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession()
+        ws = await self.session.ws_connect(self.url, heartbeat=self.heartbeat, max_msg_size=0)
+        connection = MuxConnection(ws)
+        task = asyncio.create_task(connection.run())
+        task.add_done_callback(lambda _: self._drop(connection))
+        self.connections.append(connection)
+        logger.info(f"🔗 Conexão multiplexada aberta com {self.url} ({len(self.connections)} ativas)")
+        return connection
+
+    def _drop(self, connection: MuxConnection):
+        if connection in self.connections:
+            self.connections.remove(connection)
+            logger.warning(f"Conexão multiplexada com {self.url} encerrada")
+
+    async def _pick(self) -> MuxConnection:
+        async with self._connect_lock:
+            alive = [c for c in self.connections if not c.closed]
+            if len(alive) < self.max_connections and (not alive or min(len(c.streams) for c in alive) > 0):
+                return await self._connect()
+            return min(alive, key=lambda c: len(c.streams))
+
+    async def open(self, meta: dict, timeout: float = 10.0) -> MuxStream:
+        try:
+            connection = await self._pick()
+        except (aiohttp.ClientError, OSError) as e:
+            raise MuxError(f"tunnel indisponível: {e}")
+        return await connection.open_stream(meta, timeout)
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "connections": len(self.connections),
+            "streams": sum(len(c.streams) for c in self.connections),
+        }
+
+    async def close(self):
+        for connection in list(self.connections):
+            await connection.close()
+        if self.session:
+            await self.session.close()
+
+
+async def relay(stream: MuxStream, ws) -> None:
+    """Liga um stream a um WebSocket aiohttp (cliente ou servidor) nos dois sentidos"""
+
+    async def from_stream():
+        async for message in stream:
+            if isinstance(message, str):
+                await ws.send_str(message)
+            else:
+                await ws.send_bytes(message)
+
+    async def to_stream():
+        async for msg in ws:
+            if msg.type == WSMsgType.TEXT:
+                await stream.send(msg.data)
+            elif msg.type == WSMsgType.BINARY:
+                await stream.send(msg.data)
+            elif msg.type in (WSMsgType.CLOSE, WSMsgType.ERROR):
+                break
+
+    tasks = [asyncio.create_task(from_stream()), asyncio.create_task(to_stream())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await stream.close()
@@ -10,11 +10,13 @@ import httpx
 import logging
 import urllib.parse
 import os
-from pathlib import Path
-
-# 🔥 CORREÇÃO: Caminho correto para client/static
-BASE_DIR = Path(__file__).parent.parent.parent
-CLIENT_DIR = BASE_DIR / "client" / "static"  # ✅ CORRIGIDO: removida a vírgula
+from admission import AdmissionRejected, build_controllers, classify, controllers_stats
+from ip_blocklist import BlocklistWatcher, is_local_client
+from replica_pool import build_pools, streamlit_session_id
+from response_cache import CachedResponse, ResponseCache
+from routes import CLIENT_DIR, DEFAULT_ROUTE, SERVICE_ROUTES
+from runtime_config import RUNTIME_CONFIG_JS, RUNTIME_CONFIG_JSON, RuntimeConfig
+from tracing import fastapi_middleware, propagate, upstream_wait
 
 # Configurar logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s [%(levelname)s] %(message)s')
@@ -22,6 +24,33 @@ logger = logging.getLogger(__name__)
 
 app = FastAPI(title="ALMA Proxy")
 
+# 🛡️ Mesma lista de bloqueio do gateway (blocked_ips do banco JSON)
+BLOCKLIST = BlocklistWatcher()
+
+
+@app.middleware("http")
+async def blocklist_middleware(request: Request, call_next):
+    # IPs bloqueados são recusados antes de cache, admissão ou upstream
+    remote = request.client.host if request.client else None
+    if BLOCKLIST.is_blocked(remote, request.headers):
+        logger.warning(f"🛡️ Requisição bloqueada de {remote} para {request.url.path}")
+        return JSONResponse({"error": "Acesso bloqueado"}, status_code=403)
+    return await call_next(request)
+
+
+@app.middleware("http")
+async def edge_stats_middleware(request: Request, call_next):
+    # 📊 /_edge/* expõe estado interno: só para quem está no servidor, não para quem vem pelo túnel
+    remote = request.client.host if request.client else None
+    if request.url.path.startswith("/_edge/") and not is_local_client(remote, request.headers):
+        return JSONResponse({"error": "Disponível apenas no servidor local"}, status_code=403)
+    return await call_next(request)
+
+
+# 🧭 Span por requisição com X-Request-ID propagado para os upstreams
+# (registrado depois, fica por fora: requisições bloqueadas também geram span)
+app.middleware("http")(fastapi_middleware("proxy"))
+
 # Configurar CORS
 app.add_middleware(
     CORSMiddleware,
@@ -37,45 +66,119 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-SERVICE_ROUTES = {
-    "api": "http://localhost:5000",
-    "hub": "http://localhost:8501",
-    "daytrade": "http://localhost:8502",
-    "sports": "http://localhost:8503",
-    "quantum": "http://localhost:8504",
-    "_stcore": "http://localhost:8501",  # Streamlit internals
-    "static": "http://localhost:8501",   # Streamlit static files
-}
+# Rotas definidas em routes.py (compartilhadas com o gateway)
+SERVICE_POOLS = build_pools(SERVICE_ROUTES)
+
+# ⚡ Cache de borda para GETs idempotentes (/static, /_stcore/health, host-config...)
+EDGE_CACHE = ResponseCache.from_env()
+
+# 🚦 Limite de requisições simultâneas por upstream, com fila e prioridades
+ADMISSION = build_controllers(SERVICE_POOLS)
+
+# 🌐 URL do túnel e rotas para as páginas estáticas (window.ALMA_CONFIG)
+RUNTIME_CONFIG = RuntimeConfig(services=SERVICE_ROUTES)
+
+async def fetch_upstream(target_url: str, request: Request) -> CachedResponse:
+    """Executa a requisição no upstream e devolve uma resposta armazenável"""
+    body = await request.body()
+    with upstream_wait():
+        async with httpx.AsyncClient(timeout=30.0) as client:
+            response = await client.request(
+                method=request.method,
+                url=target_url,
+                headers=propagate({k: v for k, v in request.headers.items() 
+                                   if k.lower() not in ['host', 'content-length']}),
+                content=body,
+                params=request.query_params
+            )
+    
+    return CachedResponse(
+        status=response.status_code,
+        headers={k: v for k, v in response.headers.items() 
+                if k.lower() not in ['content-encoding', 'transfer-encoding']},
+        body=response.content
+    )
 
 async def route_request(path: str, request: Request):
     """Roteia requisições para o serviço apropriado"""
     # Determinar o serviço de destino baseado no caminho
     first_segment = path.split('/')[0] if path else ""
-    target_base = SERVICE_ROUTES.get(first_segment, "http://localhost:5000")
+    route = first_segment if first_segment in SERVICE_POOLS else DEFAULT_ROUTE
+    pool = SERVICE_POOLS[route]
     
-    target_url = f"{target_base}/{path}"
+    cache_key = EDGE_CACHE.request_key(request.method, path, request.url.query, request.headers)
+    cached = EDGE_CACHE.get(cache_key)
+    if cached is not None:
+        return Response(content=cached.body, status_code=cached.status, headers=cached.headers)
     
+    controller = ADMISSION[route]
     try:
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.request(
-                method=request.method,
-                url=target_url,
-                headers={k: v for k, v in request.headers.items() 
-                        if k.lower() not in ['host', 'content-length']},
-                content=await request.body(),
-                params=request.query_params
-            )
+        await controller.acquire(classify(path))
+    except AdmissionRejected as e:
+        return JSONResponse(e.to_dict(), status_code=e.status, headers=e.headers)
+    try:
+        return await forward_request(path, request, pool, cache_key)
+    finally:
+        controller.release()
+
+async def forward_request(path: str, request: Request, pool, cache_key):
+    """Encaminha para a réplica escolhida (com cache de borda quando permitido)"""
+    # 🔁 Menor número de conexões, com afinidade por cookie/sessão do Streamlit
+    replica = pool.choose(
+        cookie=request.cookies.get(pool.cookie_name),
+        session_id=streamlit_session_id(path)
+    )
+    target_url = f"{replica.url}/{path}"
+    
+    pool.acquire(replica)
+    try:
+        if cache_key:
+            upstream = await EDGE_CACHE.fetch(cache_key, path, lambda: fetch_upstream(target_url, request),
+                                              request.headers)
+        else:
+            upstream = await fetch_upstream(target_url, request)
         
-        return Response(
-            content=response.content,
-            status_code=response.status_code,
-            headers={k: v for k, v in response.headers.items() 
-                    if k.lower() not in ['content-encoding', 'transfer-encoding']}
+        proxied = Response(
+            content=upstream.body,
+            status_code=upstream.status,
+            headers=upstream.headers
         )
+        if len(pool) > 1:
+            proxied.set_cookie(pool.cookie_name, str(replica.index), httponly=True, samesite="lax")
+        return proxied
         
+    except httpx.ConnectError as e:
+        logger.error(f"Réplica indisponível em {target_url}: {e}")
+        pool.mark_failed(replica)
+        return JSONResponse({"error": "Serviço indisponível"}, status_code=503)
     except Exception as e:
         logger.error(f"Erro no roteamento para {target_url}: {e}")
         return JSONResponse({"error": "Serviço indisponível"}, status_code=503)
+    finally:
+        pool.release(replica)
+
+@app.get("/_edge/cache")
+async def edge_cache_stats():
+    """Métricas do cache de borda (hits, misses, bytes...)"""
+    return EDGE_CACHE.stats()
+
+@app.get("/_edge/blocklist")
+async def edge_blocklist_stats():
+    """Entradas carregadas, recargas e requisições recusadas"""
+    return BLOCKLIST.stats()
+
+@app.get("/_edge/admission")
+async def edge_admission_stats():
+    """Ocupação, fila e tempo de espera por upstream"""
+    return controllers_stats(ADMISSION)
+
+@app.get(RUNTIME_CONFIG_JSON)
+@app.get(RUNTIME_CONFIG_JS)
+async def serve_runtime_config(request: Request):
+    """Configuração de execução (ETag pela versão do registro); antes do catch-all do frontend"""
+    fmt = "js" if request.url.path.endswith(".js") else "json"
+    status, headers, body = RUNTIME_CONFIG.respond(fmt, request.headers.get("if-none-match"))
+    return Response(content=body, status_code=status, headers=headers)
 
 @app.get("/")
 async def home():
@@ -93,6 +196,10 @@ async def serve_frontend(path: str, request: Request):
         if path == "login" or path == "":
             return await serve_index()
         
+        # Caminhos de serviços (Streamlit/API) seguem para as réplicas
+        if path.split('/')[0] in SERVICE_ROUTES:
+            return await route_request(path, request)
+        
         # 🔥 CORREÇÃO: Verificar se o caminho é um arquivo estático
         file_path = CLIENT_DIR / path
         
@@ -159,12 +266,14 @@ async def login(request: Request):
         data = await request.json()
         logger.info(f"Login attempt for email: {data.get('email')}")
         
-        async with httpx.AsyncClient() as client:
-            resp = await client.post(
-                "http://localhost:5000/api/login",
-                json=data, 
-                timeout=10.0
-            )
+        with upstream_wait():
+            async with httpx.AsyncClient() as client:
+                resp = await client.post(
+                    "http://localhost:5000/api/login",
+                    json=data, 
+                    headers=propagate({}),
+                    timeout=10.0
+                )
             
             logger.info(f"API response status: {resp.status_code}")
             
@@ -204,11 +313,13 @@ async def redirect_confirmation(request: Request):
     try:
         # Validar token com a API Flask primeiro
         async with httpx.AsyncClient() as client:
-            validation_response = await client.post(
-                "http://localhost:5000/api/validate_token",
-                json={"token": token},
-                timeout=5.0
-            )
+            with upstream_wait():
+                validation_response = await client.post(
+                    "http://localhost:5000/api/validate_token",
+                    json={"token": token},
+                    headers=propagate({}),
+                    timeout=5.0
+                )
             
             logger.info(f"Token validation response: {validation_response.status_code}")
             
@@ -2,7 +2,7 @@ import httpx
 import uvicorn
 import asyncio
 from fastapi import FastAPI, Request, WebSocket, HTTPException
-from fastapi.responses import StreamingResponse, HTMLResponse, FileResponse, RedirectResponse
+from fastapi.responses import StreamingResponse, HTMLResponse, FileResponse, RedirectResponse, Response
 from fastapi.websockets import WebSocketDisconnect
 from starlette.middleware.cors import CORSMiddleware
 from pathlib import Path
@@ -10,6 +10,10 @@ import logging
 import websockets
 from urllib.parse import urlencode, urlparse
 from contextlib import asynccontextmanager
+import os
+from mux import MUX_PATH, MuxClient, MuxError
+from runtime_config import RUNTIME_CONFIG_JS, RUNTIME_CONFIG_JSON, STATIC_CACHE_CONTROL, RuntimeConfig
+from tracing import fastapi_middleware, propagate, request_id_from, upstream_wait
 
 # Configuração do Logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -17,17 +21,26 @@ logger = logging.getLogger(__name__)
 
 # Configurações
 TUNNEL_URL = "http://localhost:5501"
+# 🔗 WebSockets dos navegadores viajam como streams em poucas conexões persistentes com o tunnel
+MUX_ENABLED = os.getenv("ALMA_TUNNEL_MUX", "1") == "1"
+MUX_CONNECTIONS = int(os.getenv("ALMA_TUNNEL_MUX_CONNECTIONS", "2"))
 CLIENT_DIR = Path(__file__).parent
 
 # Lifespan manager
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     app.state.client = httpx.AsyncClient(timeout=30.0, follow_redirects=False)  # 🔥 NÃO seguir redirects automaticamente
+    app.state.mux = MuxClient(TUNNEL_URL.replace("http", "ws", 1) + MUX_PATH, MUX_CONNECTIONS) if MUX_ENABLED else None
     yield
     await app.state.client.aclose()
+    if app.state.mux:
+        await app.state.mux.close()
 
 app = FastAPI(title="Fluxon Quantum Proxy - Porta de Entrada", lifespan=lifespan)
 
+# 🧭 Span por requisição com X-Request-ID propagado para o tunnel
+app.middleware("http")(fastapi_middleware("edge"))
+
 # CORS
 app.add_middleware(
     CORSMiddleware,
@@ -42,6 +55,20 @@ app.add_middleware(
 async def websocket_proxy(websocket: WebSocket, service: str):
     await websocket.accept()
     
+    if websocket.app.state.mux:
+        try:
+            stream = await websocket.app.state.mux.open({
+                "service": service,
+                "protocol": websocket.headers.get("sec-websocket-protocol", ""),
+                "cookie": websocket.cookies.get(f"alma_replica_{service}"),
+                "request_id": request_id_from(websocket.headers),
+            })
+        except MuxError as e:
+            logger.warning(f"⚠️ Link multiplexado indisponível para {service}, usando conexão dedicada: {e}")
+        else:
+            await mux_relay(websocket, stream, service)
+            return
+    
     target_ws_url = f"ws://localhost:5501/{service}/_stcore/stream"
     
     logger.info(f"🔌 Encaminhando WebSocket para tunnel: {service} -> {target_ws_url}")
@@ -87,18 +114,62 @@ async def websocket_proxy(websocket: WebSocket, service: str):
         except:
             pass
 
+async def mux_relay(websocket: WebSocket, stream, service: str):
+    """Relay navegador <-> stream lógico do link multiplexado"""
+    async def forward_to_tunnel():
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            if message.get("text") is not None:
+                await stream.send(message["text"])
+            elif message.get("bytes") is not None:
+                await stream.send(message["bytes"])
+
+    async def forward_from_tunnel():
+        async for message in stream:
+            if isinstance(message, str):
+                await websocket.send_text(message)
+            else:
+                await websocket.send_bytes(message)
+
+    tasks = [asyncio.create_task(forward_to_tunnel()), asyncio.create_task(forward_from_tunnel())]
+    try:
+        done, _ = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            if not task.cancelled() and task.exception() and not isinstance(task.exception(), (WebSocketDisconnect, MuxError)):
+                logger.error(f"Erro no stream multiplexado ({service}): {task.exception()}")
+    finally:
+        for task in tasks:
+            task.cancel()
+        await stream.close()
+        try:
+            await websocket.close()
+        except:
+            pass
+
 # 🔥 CORREÇÃO CRÍTICA: Evitar loop de redirecionamento
 def should_handle_locally(path: str) -> bool:
     """Determina se a requisição deve ser tratada localmente"""
     local_paths = ['', 'health', 'index_external.html', 'favicon.ico']
     return path in local_paths or path.endswith(('.js', '.css', '.png', '.jpg', '.ico'))
 
+# Configuração dinâmica das páginas (URL do túnel, rotas) - o HTML não é mais reescrito
+runtime_config = RuntimeConfig()
+
+@app.get(RUNTIME_CONFIG_JSON)
+@app.get(RUNTIME_CONFIG_JS)
+async def serve_runtime_config(request: Request):
+    fmt = "js" if request.url.path.endswith(".js") else "json"
+    status, headers, body = runtime_config.respond(fmt, request.headers.get("if-none-match"))
+    return Response(content=body, status_code=status, headers=headers)
+
 # 🔥 NOVO: Servir arquivos estáticos localmente
 @app.get("/{filename:path}")
 async def serve_static(filename: str):
     static_file = CLIENT_DIR / filename
     if static_file.exists() and static_file.is_file():
-        return FileResponse(static_file)
+        return FileResponse(static_file, headers={"Cache-Control": STATIC_CACHE_CONTROL})
     raise HTTPException(status_code=404)
 
 # Health check simples
@@ -119,7 +190,7 @@ async def reverse_proxy(request: Request, path: str):
         if path == "" or path == "index_external.html":
             index_file = CLIENT_DIR / "index_external.html"
             if index_file.exists():
-                return FileResponse(index_file)
+                return FileResponse(index_file, headers={"Cache-Control": STATIC_CACHE_CONTROL})
         elif path == "health":
             return await health_check()
         return await serve_static(path)
@@ -134,7 +205,7 @@ async def reverse_proxy(request: Request, path: str):
     logger.info(f"🔁 Encaminhando para tunnel: {request.method} {path} -> {target_url}")
     
     try:
-        headers = {k: v for k, v in request.headers.items() if k.lower() != 'host'}
+        headers = propagate({k: v for k, v in request.headers.items() if k.lower() != 'host'})
         
         req = app.state.client.build_request(
             method=request.method,
@@ -143,7 +214,8 @@ async def reverse_proxy(request: Request, path: str):
             content=await request.body(),
         )
         
-        response = await app.state.client.send(req, stream=True)
+        with upstream_wait():
+            response = await app.state.client.send(req, stream=True)
         
         # 🔥 TRATAMENTO ESPECIAL PARA REDIRECIONAMENTOS DO STREAMLIT
         if response.status_code in [301, 302, 307, 308]:
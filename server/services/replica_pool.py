@@ -0,0 +1,177 @@
+# replica_pool.py
+"""
+Pool de réplicas locais para os serviços Streamlit
+Roteamento por menor número de conexões com afinidade de sessão
+"""
+
+import os
+import re
+import time
+import threading
+import logging
+from typing import Dict, List, Optional, Union
+from urllib.parse import urlsplit
+
+logger = logging.getLogger("ReplicaPool")
+
+# Prefixo do cookie que mantém o navegador na mesma réplica (um por serviço)
+AFFINITY_COOKIE = "alma_replica"
+
+# Cada réplica extra usa base + N * REPLICA_PORT_STEP (8501 -> 8511, 8521...)
+REPLICA_PORT_STEP = 10
+
+# Tempo que uma réplica com falha fica fora do rodízio
+FAILURE_COOLDOWN = 15.0
+
+# Ex.: /_stcore/upload_file/<session_id>/<file_id>
+_UPLOAD_SESSION_RE = re.compile(r"_stcore/upload_file/([0-9a-fA-F-]{8,})")
+
+
+def replica_count(service: str, default: int = 1) -> int:
+    """Quantidade de réplicas de um serviço (ALMA_REPLICAS_<SERVICO> ou ALMA_REPLICAS)"""
+    raw = os.getenv(f"ALMA_REPLICAS_{service.upper()}") or os.getenv("ALMA_REPLICAS")
+    try:
+        return max(1, int(raw)) if raw else default
+    except ValueError:
+        logger.warning(f"Valor inválido de réplicas para {service}: {raw}")
+        return default
+
+
+def replica_ports(base_port: int, count: int) -> List[int]:
+    """Portas das réplicas a partir da porta base do serviço"""
+    return [base_port + i * REPLICA_PORT_STEP for i in range(count)]
+
+
+def replica_urls(base_url: str, count: int) -> List[str]:
+    """URLs das réplicas a partir da URL base (http://localhost:8501)"""
+    parts = urlsplit(base_url)
+    host = parts.hostname or "localhost"
+    return [f"{parts.scheme}://{host}:{port}" for port in replica_ports(parts.port or 80, count)]
+
+
+def streamlit_session_id(path: str = "", ws_protocol: str = "") -> Optional[str]:
+    """
+    Extrai o id de sessão do Streamlit da requisição.
+    O cliente envia 'streamlit, <xsrf>, <session_id>' no Sec-WebSocket-Protocol
+    ao reconectar; uploads levam o id no caminho.
+    """
+    if ws_protocol:
+        parts = [p.strip() for p in ws_protocol.split(",")]
+        if len(parts) >= 3 and parts[2]:
+            return parts[2]
+    match = _UPLOAD_SESSION_RE.search(path or "")
+    return match.group(1) if match else None
+
+
+class Replica:
+    """Uma instância local de um serviço"""
+
+    def __init__(self, url: str, index: int):
+        self.url = url.rstrip("/")
+        self.index = index
+        self.active = 0
+        self.down_until = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self.down_until
+
+    def to_dict(self) -> dict:
+        return {"url": self.url, "active": self.active, "available": self.available}
+
+
+class ReplicaPool:
+    """
+    Conjunto de réplicas de um serviço.
+    Escolhe a réplica com menos conexões ativas e mantém a afinidade
+    por cookie ou por id de sessão do Streamlit.
+    """
+
+    def __init__(self, name: str, urls: List[str], max_sessions: int = 10000):
+        if not urls:
+            raise ValueError(f"Serviço {name} sem réplicas configuradas")
+        self.name = name
+        self.replicas = [Replica(url, i) for i, url in enumerate(urls)]
+        self.max_sessions = max_sessions
+        self._sessions: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_route(cls, name: str, route: Union[str, List[str]]) -> "ReplicaPool":
+        """Aceita tanto uma URL única quanto uma lista de URLs em SERVICE_ROUTES"""
+        urls = [route] if isinstance(route, str) else list(route)
+        return cls(name, urls)
+
+    def __len__(self) -> int:
+        return len(self.replicas)
+
+    @property
+    def cookie_name(self) -> str:
+        return f"{AFFINITY_COOKIE}_{self.name}"
+
+    def _from_cookie(self, cookie: Optional[str]) -> Optional[Replica]:
+        if not cookie or not cookie.isdigit():
+            return None
+        index = int(cookie)
+        return self.replicas[index] if index < len(self.replicas) else None
+
+    def choose(self, cookie: Optional[str] = None, session_id: Optional[str] = None) -> Replica:
+        """Seleciona a réplica para a requisição"""
+        if len(self.replicas) == 1:
+            return self.replicas[0]
+
+        with self._lock:
+            pinned = None
+            if session_id and session_id in self._sessions:
+                pinned = self.replicas[self._sessions[session_id]]
+            if pinned is None:
+                pinned = self._from_cookie(cookie)
+
+            if pinned is not None and pinned.available:
+                replica = pinned
+            else:
+                candidates = [r for r in self.replicas if r.available] or self.replicas
+                replica = min(candidates, key=lambda r: (r.active, r.index))
+
+            if session_id:
+                if len(self._sessions) >= self.max_sessions:
+                    self._sessions.pop(next(iter(self._sessions)))
+                self._sessions[session_id] = replica.index
+            return replica
+
+    def acquire(self, replica: Replica):
+        with self._lock:
+            replica.active += 1
+
+    def release(self, replica: Replica):
+        with self._lock:
+            replica.active = max(0, replica.active - 1)
+
+    def mark_failed(self, replica: Replica, cooldown: float = FAILURE_COOLDOWN):
+        """Retira temporariamente a réplica do rodízio após erro de conexão"""
+        if len(self.replicas) > 1:
+            replica.down_until = time.monotonic() + cooldown
+            logger.warning(f"Réplica {replica.url} de {self.name} fora do rodízio por {cooldown:.0f}s")
+
+    def forget_session(self, session_id: str):
+        with self._lock:
+            self._sessions.pop(session_id, None)
+
+    def status(self) -> dict:
+        return {
+            "service": self.name,
+            "replicas": [r.to_dict() for r in self.replicas],
+            "sessions": len(self._sessions),
+        }
+
+
+def build_pools(routes: Dict[str, Union[str, List[str]]]) -> Dict[str, ReplicaPool]:
+    """Cria um pool por rota, reaproveitando o mesmo pool para URLs idênticas"""
+    pools: Dict[str, ReplicaPool] = {}
+    by_urls: Dict[tuple, ReplicaPool] = {}
+    for name, route in routes.items():
+        urls = tuple([route] if isinstance(route, str) else route)
+        if urls not in by_urls:
+            by_urls[urls] = ReplicaPool(name, list(urls))
+        pools[name] = by_urls[urls]
+    return pools
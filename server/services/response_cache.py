@@ -0,0 +1,235 @@
+# response_cache.py
+"""
+Cache de respostas na borda para GETs idempotentes
+LRU limitado por memória, respeita Cache-Control e agrupa misses concorrentes
+"""
+
+import asyncio
+import os
+import time
+import logging
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Mapping, Optional
+
+logger = logging.getLogger("ResponseCache")
+
+# Headers da requisição que fazem parte da chave
+KEY_HEADERS = ("accept-encoding",)
+
+# Requisições com credenciais não entram na busca compartilhada de misses concorrentes:
+# a resposta pode ser da sessão de quem pediu (ex.: Set-Cookie _streamlit_xsrf)
+CREDENTIAL_HEADERS = ("cookie", "authorization")
+
+# Métodos que podem ser servidos do cache
+CACHEABLE_METHODS = ("GET", "HEAD")
+
+CACHEABLE_STATUS = (200, 203, 301, 404)
+
+# Endpoints do Streamlit que respondem "no-cache" mas suportam micro-cache:
+# o proxy revalida a cada N segundos em vez de a cada requisição
+# (casados pelo final do caminho, com ou sem prefixo do serviço)
+REVALIDATE_TTLS = {
+    "_stcore/health": 1.0,
+    "_stcore/host-config": 5.0,
+}
+
+
+def _parse_cache_control(value: str) -> Dict[str, Optional[str]]:
+    directives = {}
+    for part in (value or "").split(","):
+        name, _, arg = part.strip().partition("=")
+        if name:
+            directives[name.lower()] = arg.strip('"') or None
+    return directives
+
+
+class CachedResponse:
+    """Resposta armazenada (independente de framework)"""
+
+    __slots__ = ("status", "headers", "body", "expires", "size")
+
+    def __init__(self, status: int, headers: Mapping[str, str], body: bytes):
+        self.status = status
+        self.headers = dict(headers)
+        self.body = body
+        self.expires = 0.0
+        self.size = len(body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    @property
+    def fresh(self) -> bool:
+        return time.monotonic() < self.expires
+
+
+class ResponseCache:
+    """
+    Cache LRU de respostas upstream.
+    Projetado para uso dentro de um único event loop (proxies asyncio).
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, max_entry_bytes: int = 2 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.collapsed = 0
+        self.stores = 0
+        self.evictions = 0
+
+    @classmethod
+    def from_env(cls) -> "ResponseCache":
+        """Tamanho configurável por ALMA_EDGE_CACHE_MB (0 desativa)"""
+        megabytes = float(os.getenv("ALMA_EDGE_CACHE_MB", "32"))
+        return cls(max_bytes=int(megabytes * 1024 * 1024))
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    # ==================== CHAVE ====================
+
+    def request_key(self, method: str, path: str, query: str,
+                    headers: Mapping[str, str]) -> Optional[str]:
+        """Chave do cache ou None se a requisição não pode usar o cache"""
+        if not self.enabled or method.upper() not in CACHEABLE_METHODS:
+            return None
+        if headers.get("authorization") or "no-store" in (headers.get("cache-control") or ""):
+            return None
+        query = "&".join(sorted(query.split("&"))) if query else ""
+        varying = "|".join(headers.get(name, "") for name in KEY_HEADERS)
+        return f"{method.upper()} /{path.lstrip('/')}?{query}|{varying}"
+
+    # ==================== POLÍTICA ====================
+
+    def ttl_for(self, path: str, response: CachedResponse) -> float:
+        """Tempo de vida permitido pelo upstream (0 = não armazenar)"""
+        if response.status not in CACHEABLE_STATUS or len(response.body) > self.max_entry_bytes:
+            return 0.0
+
+        headers = {k.lower(): v for k, v in response.headers.items()}
+        if "set-cookie" in headers:
+            return 0.0
+        vary = {v.strip().lower() for v in headers.get("vary", "").split(",") if v.strip()}
+        if "*" in vary or not vary.issubset(KEY_HEADERS):
+            return 0.0
+
+        directives = _parse_cache_control(headers.get("cache-control", ""))
+        if "no-store" in directives or "private" in directives:
+            return 0.0
+
+        for name in ("s-maxage", "max-age"):
+            if directives.get(name):
+                try:
+                    ttl = float(directives[name])
+                except ValueError:
+                    continue
+                if ttl > 0 or "no-cache" not in directives:
+                    return max(ttl, 0.0)
+
+        # no-cache ou ausência de validade explícita: só micro-cache configurado
+        path = path.strip("/")
+        for suffix, ttl in REVALIDATE_TTLS.items():
+            if path == suffix or path.endswith("/" + suffix):
+                return ttl
+        return 0.0
+
+    # ==================== ARMAZENAMENTO ====================
+
+    def get(self, key: Optional[str]) -> Optional[CachedResponse]:
+        if not key:
+            return None
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if not entry.fresh:
+            self._remove(key)
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry
+
+    def store(self, key: str, path: str, response: CachedResponse) -> bool:
+        ttl = self.ttl_for(path, response)
+        if ttl <= 0 or response.size > self.max_bytes:
+            return False
+        if key in self._entries:
+            self._remove(key)
+        response.expires = time.monotonic() + ttl
+        self._entries[key] = response
+        self._bytes += response.size
+        self.stores += 1
+        while self._bytes > self.max_bytes and self._entries:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+        return True
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def clear(self):
+        self._entries.clear()
+        self._bytes = 0
+
+    async def fetch(self, key: str, path: str, loader: Callable[[], Awaitable[CachedResponse]],
+                    headers: Optional[Mapping[str, str]] = None) -> CachedResponse:
+        """
+        Retorna a resposta do cache ou busca no upstream.
+        Misses concorrentes para a mesma chave aguardam uma única busca, mas só recebem a
+        resposta dela se ela foi armazenada (pública); senão cada um busca a sua.
+        Requisições com Cookie/Authorization ('headers') nunca entram nesse agrupamento.
+        """
+        entry = self.get(key)
+        if entry is not None:
+            return entry
+
+        if headers is not None and any(name.lower() in CREDENTIAL_HEADERS for name in headers):
+            self.misses += 1
+            response = await loader()
+            self.store(key, path, response)
+            return response
+
+        pending = self._inflight.get(key)
+        if pending is not None:
+            shared = await asyncio.shield(pending)
+            if shared is not None:
+                self.collapsed += 1
+                return shared
+            self.misses += 1  # resposta não armazenável (Set-Cookie, private...): busca própria
+            return await loader()
+
+        self.misses += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            response = await loader()
+            future.set_result(response if self.store(key, path, response) else None)
+            return response
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # evita aviso de exceção não recuperada sem espera
+            raise
+        finally:
+            self._inflight.pop(key, None)
+
+    # ==================== MÉTRICAS ====================
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses + self.collapsed
+        return {
+            "entries": len(self._entries),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "collapsed": self.collapsed,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "hit_rate": round((self.hits + self.collapsed) / lookups, 4) if lookups else 0.0,
+        }
@@ -0,0 +1,58 @@
+# routes.py
+"""
+Tabela única de rotas da borda
+Usada pelo gateway consolidado e pelo proxy FastAPI
+"""
+
+import os
+from pathlib import Path
+from replica_pool import replica_count, replica_urls
+
+BASE_DIR = Path(__file__).parent.parent.parent
+CLIENT_DIR = BASE_DIR / "client" / "static"
+
+API_URL = "http://localhost:5000"
+
+# Cada rota aceita uma URL ou uma lista de réplicas (ALMA_REPLICAS_<SERVICO>=N)
+HUB_REPLICAS = replica_urls("http://localhost:8501", replica_count("hub"))
+
+# ALMA_STREAMLIT_HOST=1: os quatro apps são páginas de um único Streamlit (scripts/seletor/host.py)
+STREAMLIT_HOST = os.getenv("ALMA_STREAMLIT_HOST") == "1"
+
+SERVICE_ROUTES = {
+    "api": API_URL,
+    "hub": HUB_REPLICAS,
+    "daytrade": HUB_REPLICAS if STREAMLIT_HOST else replica_urls("http://localhost:8502", replica_count("daytrade")),
+    "sports": HUB_REPLICAS if STREAMLIT_HOST else replica_urls("http://localhost:8503", replica_count("sports")),
+    "quantum": HUB_REPLICAS if STREAMLIT_HOST else replica_urls("http://localhost:8504", replica_count("quantum")),
+    "_stcore": HUB_REPLICAS,  # Streamlit internals
+    "static": HUB_REPLICAS,   # Streamlit static files
+}
+
+# Rota usada quando o primeiro segmento não corresponde a nenhum serviço
+DEFAULT_ROUTE = "api"
+
+# Páginas servidas diretamente de client/static
+PAGE_ROUTES = {
+    "": "index_external.html",
+    "login": "index_external.html",
+    "link": "link_alma.html",
+}
+
+# Redirecionamentos fixos (antigo redirect_server.py)
+REDIRECTS = {
+    "app": "/hub/",
+    "streamlit": "/hub/",
+}
+
+CONTENT_TYPES = {
+    ".html": "text/html",
+    ".css": "text/css",
+    ".js": "application/javascript",
+    ".json": "application/json",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".ico": "image/x-icon",
+    ".svg": "image/svg+xml",
+}
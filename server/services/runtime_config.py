@@ -0,0 +1,98 @@
+# runtime_config.py
+"""
+Configuração de execução para as páginas de client/static
+Valores dinâmicos (URL do túnel, base da API, rotas dos serviços) saem de um endpoint
+pequeno e versionado em vez de serem reescritos dentro do HTML a cada troca de túnel:
+
+    <script src="/runtime-config.js"></script>   -> window.ALMA_CONFIG
+    GET /runtime-config.json                      -> mesmo conteúdo em JSON
+
+O HTML fica imutável e pode ser cacheado por muito tempo; a troca de URL custa uma
+resposta de poucos bytes, revalidada por ETag (304 enquanto a versão do registro não muda).
+"""
+
+import hashlib
+import json
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+try:
+    from tunnel_registry import tunnel_registry
+except ImportError:  # importado como pacote (server.services.runtime_config)
+    from .tunnel_registry import tunnel_registry
+
+RUNTIME_CONFIG_JSON = "/runtime-config.json"
+RUNTIME_CONFIG_JS = "/runtime-config.js"
+
+# Config: sempre revalidada (barato, 304); páginas: cache longo
+CONFIG_CACHE_CONTROL = "no-cache"
+STATIC_CACHE_CONTROL = "public, max-age=86400, stale-while-revalidate=604800"
+
+STREAMLIT_SERVICES = ("hub", "daytrade", "sports", "quantum")
+
+# Endereços locais usados pela página interna (index_internal.html)
+LOCAL_SERVICES = {
+    "proxy": "http://localhost:5500",
+    "flask": "http://localhost:5000",
+    "streamlit": "http://localhost:8501",
+}
+
+
+class RuntimeConfig:
+    """Renderiza a configuração uma vez por versão do registro de túneis"""
+
+    def __init__(self, registry=tunnel_registry, services: Iterable[str] = STREAMLIT_SERVICES):
+        self.registry = registry
+        self.services = tuple(s for s in services if not s.startswith("_") and s not in ("api", "static"))
+        self._lock = threading.Lock()
+        self._rendered: Dict[str, Tuple[int, bytes, str]] = {}
+
+    def build(self) -> dict:
+        data = self.registry.refresh()
+        return {
+            "version": data["version"],
+            "updated": data["updated"],
+            "tunnel_url": data["url"],
+            "tunnels": data["urls"],
+            # Vazio = mesma origem da página (gateway/proxy); a URL do túnel fica disponível à parte
+            "api_base": "",
+            "routes": {
+                **{name: f"/{name}/" for name in self.services},
+                "login": "/login",
+                "health": "/health",
+                "validate_token": "/validate_token",
+            },
+            "local": LOCAL_SERVICES,
+        }
+
+    def render(self, fmt: str = "json") -> Tuple[bytes, str]:
+        """(corpo, etag) da versão atual; recalculado apenas quando a versão muda"""
+        version = self.registry.version
+        with self._lock:
+            cached = self._rendered.get(fmt)
+            if cached and cached[0] == version:
+                return cached[1], cached[2]
+
+        payload = json.dumps(self.build(), separators=(",", ":"), sort_keys=True)
+        if fmt == "js":
+            body = f"window.ALMA_CONFIG = Object.freeze({payload});\n".encode("utf-8")
+        else:
+            body = payload.encode("utf-8")
+        etag = f'"rc-{version}-{hashlib.sha1(body).hexdigest()[:12]}"'
+        with self._lock:
+            self._rendered[fmt] = (version, body, etag)
+        return body, etag
+
+    def respond(self, fmt: str, if_none_match: Optional[str]) -> Tuple[int, dict, bytes]:
+        """(status, headers, corpo) independente de framework; 304 quando o ETag confere"""
+        body, etag = self.render(fmt)
+        headers = {
+            "ETag": etag,
+            "Cache-Control": CONFIG_CACHE_CONTROL,
+            "Content-Type": "application/javascript; charset=utf-8" if fmt == "js"
+            else "application/json; charset=utf-8",
+        }
+        if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            return 304, headers, b""
+        return 200, headers, body
+
@@ -13,7 +13,6 @@ from connection_manager import connection_manager
 
 # Configurações
 PORT = 8000
-NGROK_CONFIG_PATH = Path(__file__).parent.parent / "server" / ".ngrok_coordinator.json"
 
 def get_ngrok_url():
     """Obtém a URL atual do Ngrok usando o ConnectionManager"""
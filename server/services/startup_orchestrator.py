@@ -0,0 +1,185 @@
+# startup_orchestrator.py
+"""
+Inicialização paralela com dependências e sondas de prontidão
+Cada serviço declara de quem depende; serviços independentes sobem ao mesmo tempo e os
+dependentes esperam a prontidão real (porta aceitando conexão + endpoint HTTP) em vez de sleeps.
+O tempo total tende ao do serviço mais lento da cadeia, e cada um informa seu tempo até ficar pronto.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+
+logger = logging.getLogger("StartupOrchestrator")
+
+PROBE_INTERVAL = 0.1       # primeira nova tentativa; cresce até PROBE_MAX_INTERVAL
+PROBE_MAX_INTERVAL = 0.5
+PROBE_TIMEOUT = 2.0
+READY_TIMEOUT = 60.0
+
+
+async def tcp_accepts(port: int, host: str = "127.0.0.1", timeout: float = PROBE_TIMEOUT) -> bool:
+    """A porta aceita conexões"""
+    try:
+        _, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+    except (OSError, asyncio.TimeoutError):
+        return False
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except OSError:
+        pass
+    return True
+
+
+async def http_ok(session: aiohttp.ClientSession, port: int, path: str,
+                  host: str = "127.0.0.1", timeout: float = PROBE_TIMEOUT) -> bool:
+    """O endpoint responde 2xx/3xx (mesmo critério de check_service_health)"""
+    try:
+        async with session.get(f"http://{host}:{port}{path}", allow_redirects=False,
+                               timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+            return 200 <= response.status < 400
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False
+
+
+class ServiceSpec:
+    """
+    Um serviço da inicialização.
+    launch() inicia o processo e devolve o Popen (ou None se já estiver rodando / falhar);
+    a prontidão é a porta aceitando conexões e, se houver, 'health_path' respondendo.
+    prime(), se houver, roda depois da prontidão e antes de liberar os dependentes (aquecimento).
+    """
+
+    def __init__(self, name: str, port: int, launch: Callable[[], object], health_path: Optional[str] = None,
+                 depends_on: Iterable[str] = (), timeout: float = READY_TIMEOUT,
+                 prime: Optional[Callable[[], Awaitable[object]]] = None):
+        self.name = name
+        self.port = port
+        self.launch = launch
+        self.health_path = health_path
+        self.depends_on = tuple(depends_on)
+        self.timeout = timeout
+        self.prime = prime
+
+
+class StartupResult:
+    __slots__ = ("name", "ready", "process", "waited_s", "ready_s", "error", "primed")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ready = False
+        self.process = None
+        self.waited_s = 0.0   # tempo esperando dependências
+        self.ready_s = None   # do início da orquestração até pronto
+        self.error = None
+        self.primed = None    # retorno de prime()
+
+    def as_dict(self) -> dict:
+        return {
+            "name": self.name,
+            "ready": self.ready,
+            "pid": getattr(self.process, "pid", None),
+            "waited_s": round(self.waited_s, 3),
+            "ready_s": round(self.ready_s, 3) if self.ready_s is not None else None,
+            "error": self.error,
+            "primed": self.primed,
+        }
+
+
+class StartupOrchestrator:
+    def __init__(self, specs: Iterable[ServiceSpec]):
+        self.specs: Dict[str, ServiceSpec] = {spec.name: spec for spec in specs}
+        for spec in self.specs.values():
+            missing = [dep for dep in spec.depends_on if dep not in self.specs]
+            if missing:
+                raise ValueError(f"{spec.name} depende de serviços não declarados: {missing}")
+        self._check_cycles()
+
+    def _check_cycles(self):
+        state: Dict[str, int] = {}
+
+        def visit(name: str, path: List[str]):
+            if state.get(name) == 1:
+                raise ValueError(f"Dependência circular: {' -> '.join(path + [name])}")
+            if state.get(name) == 2:
+                return
+            state[name] = 1
+            for dep in self.specs[name].depends_on:
+                visit(dep, path + [name])
+            state[name] = 2
+
+        for name in self.specs:
+            visit(name, [])
+
+    async def run(self) -> Dict[str, StartupResult]:
+        started = time.perf_counter()
+        results = {name: StartupResult(name) for name in self.specs}
+        done = {name: asyncio.Event() for name in self.specs}
+
+        async with aiohttp.ClientSession() as session:
+            async def bring_up(spec: ServiceSpec):
+                result = results[spec.name]
+                try:
+                    for dep in spec.depends_on:
+                        await done[dep].wait()
+                    result.waited_s = time.perf_counter() - started
+                    failed = [dep for dep in spec.depends_on if not results[dep].ready]
+                    if failed:
+                        result.error = f"dependência indisponível: {', '.join(failed)}"
+                        logger.error(f"❌ {spec.name} não iniciado ({result.error})")
+                        return
+
+                    loop = asyncio.get_running_loop()
+                    result.process = await loop.run_in_executor(None, spec.launch)
+                    result.ready = await self._wait_ready(session, spec, result)
+                    if result.ready:
+                        result.ready_s = time.perf_counter() - started
+                        logger.info(f"✅ {spec.name} pronto em {result.ready_s:.2f}s "
+                                    f"(após dependências: {result.ready_s - result.waited_s:.2f}s)")
+                        if spec.prime:
+                            result.primed = await spec.prime()
+                except Exception as e:
+                    result.error = str(e)
+                    logger.error(f"❌ Erro ao iniciar {spec.name}: {e}")
+                finally:
+                    done[spec.name].set()
+
+            await asyncio.gather(*(bring_up(spec) for spec in self.specs.values()))
+        return results
+
+    async def _wait_ready(self, session: aiohttp.ClientSession, spec: ServiceSpec, result: StartupResult) -> bool:
+        deadline = time.monotonic() + spec.timeout
+        interval = PROBE_INTERVAL
+        while time.monotonic() < deadline:
+            process = result.process
+            if process is not None and process.poll() is not None:
+                result.error = f"processo terminou com código {process.returncode}"
+                logger.error(f"❌ {spec.name}: {result.error}")
+                return False
+            if await tcp_accepts(spec.port) and (
+                    spec.health_path is None or await http_ok(session, spec.port, spec.health_path)):
+                return True
+            await asyncio.sleep(interval)
+            interval = min(interval * 1.5, PROBE_MAX_INTERVAL)
+        result.error = f"não ficou pronto em {spec.timeout:.0f}s"
+        logger.error(f"❌ {spec.name}: {result.error}")
+        return False
+
+    def run_sync(self) -> Dict[str, StartupResult]:
+        return asyncio.run(self.run())
+
+
+def format_report(results: Dict[str, StartupResult]) -> str:
+    """Tabela de tempo até pronto por serviço, na ordem em que ficaram prontos"""
+    rows = sorted(results.values(), key=lambda r: (r.ready_s is None, r.ready_s or 0))
+    lines = [f"{'serviço':<26}{'pronto':>8}{'espera deps':>13}{'até pronto':>12}  erro"]
+    for r in rows:
+        ready_s = f"{r.ready_s:.2f}s" if r.ready_s is not None else "-"
+        lines.append(f"{r.name:<26}{'✅' if r.ready else '❌':>7}{r.waited_s:>12.2f}s{ready_s:>12}  {r.error or ''}")
+    total = max((r.ready_s for r in rows if r.ready_s is not None), default=0.0)
+    lines.append(f"Total até o último serviço pronto: {total:.2f}s")
+    return "\n".join(lines)
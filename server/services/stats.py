@@ -0,0 +1,23 @@
+# stats.py
+"""Estatísticas comuns às métricas da borda (admission) e aos benchmarks"""
+
+import statistics
+from typing import List
+
+
+def percentile(values: List[float], pct: int) -> float:
+    """
+    Percentil 'pct' interpolado entre as amostras (statistics.quantiles).
+    Com menos de 100 / (100 - pct) amostras (20 para o p95) ele não se distingue do máximo,
+    então o máximo é devolvido.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    if len(ordered) < 100 / (100 - pct):
+        return ordered[-1]
+    return statistics.quantiles(ordered, n=100)[pct - 1]
+
+
+def p95(values: List[float]) -> float:
+    return percentile(values, 95)
@@ -0,0 +1,136 @@
+# streamlit_warmup.py
+"""
+Aquecimento dos apps Streamlit antes de receber tráfego
+Cada app paga na primeira visita os imports pesados (pandas, numpy, scipy, plotly), a construção
+dos motores e o preenchimento dos caches. Aqui uma sessão headless abre o WebSocket do app
+(/_stcore/stream), pede uma execução do script principal e espera o script_finished; a visita
+real seguinte já encontra tudo carregado.
+
+A latência de primeira visita é medida duas vezes: a sessão de aquecimento (fria) e uma
+segunda sessão logo depois (o que o primeiro visitante passa a ver).
+
+    python streamlit_warmup.py 8501 8502 8503 8504
+"""
+
+import asyncio
+import logging
+import os
+import sys
+import time
+from typing import Dict, Iterable, Optional
+
+import aiohttp
+
+try:
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+except ImportError:  # streamlit ausente: o aquecimento é desativado
+    BackMsg = ForwardMsg = None
+
+logger = logging.getLogger("StreamlitWarmup")
+
+WARMUP_ENABLED = os.getenv("ALMA_WARMUP", "1") == "1"
+HEALTH_TIMEOUT = 60.0
+RUN_TIMEOUT = 180.0
+
+# ForwardMsg.script_finished
+FINISHED_SUCCESSFULLY = 0
+FINISHED_WITH_COMPILE_ERROR = 1
+
+
+async def wait_healthy(session: aiohttp.ClientSession, port: int, host: str = "127.0.0.1",
+                       timeout: float = HEALTH_TIMEOUT) -> float:
+    """Segundos até /_stcore/health responder 200"""
+    started = time.perf_counter()
+    while time.perf_counter() - started < timeout:
+        try:
+            async with session.get(f"http://{host}:{port}/_stcore/health",
+                                   timeout=aiohttp.ClientTimeout(total=2)) as response:
+                if response.status == 200:
+                    return time.perf_counter() - started
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            pass
+        await asyncio.sleep(0.25)
+    raise TimeoutError(f"Streamlit na porta {port} não respondeu em {timeout:.0f}s")
+
+
+async def run_session(session: aiohttp.ClientSession, port: int, host: str = "127.0.0.1",
+                      query_string: str = "", page_name: str = "", timeout: float = RUN_TIMEOUT) -> float:
+    """Abre uma sessão, executa o script (ou a página 'page_name') uma vez e devolve os segundos até o fim"""
+    if BackMsg is None:
+        raise RuntimeError("streamlit não instalado")
+
+    rerun = BackMsg()
+    rerun.rerun_script.query_string = query_string
+    rerun.rerun_script.page_script_hash = ""
+    rerun.rerun_script.page_name = page_name
+
+    started = time.perf_counter()
+    async with session.ws_connect(f"ws://{host}:{port}/_stcore/stream", protocols=["streamlit"],
+                                  max_msg_size=0) as ws:
+        await ws.send_bytes(rerun.SerializeToString())
+
+        async def until_finished():
+            async for message in ws:
+                if message.type != aiohttp.WSMsgType.BINARY:
+                    continue
+                forward = ForwardMsg()
+                forward.ParseFromString(message.data)
+                if forward.WhichOneof("type") == "script_finished":
+                    if forward.script_finished == FINISHED_WITH_COMPILE_ERROR:
+                        raise RuntimeError("erro de compilação no script")
+                    return
+            raise ConnectionError("WebSocket fechado antes do fim do script")
+
+        await asyncio.wait_for(until_finished(), timeout)
+    return time.perf_counter() - started
+
+
+async def warm_up(port: int, host: str = "127.0.0.1", session: Optional[aiohttp.ClientSession] = None,
+                  pages: Iterable[str] = ("",)) -> dict:
+    """
+    Espera a saúde, roda a sessão fria e mede a visita seguinte.
+    Com várias páginas (servidor único, host.py) cada uma é aquecida e o pior caso vai para o resumo.
+    """
+    own_session = session is None
+    session = session or aiohttp.ClientSession()
+    result = {"port": port, "health_s": None, "cold_run_s": None, "warm_run_s": None, "error": None, "pages": {}}
+    try:
+        result["health_s"] = round(await wait_healthy(session, port, host), 3)
+        for page in pages:
+            cold = await run_session(session, port, host, page_name=page)
+            warm = await run_session(session, port, host, page_name=page)
+            result["pages"][page or "/"] = {"cold_run_s": round(cold, 3), "warm_run_s": round(warm, 3)}
+        result["cold_run_s"] = max(p["cold_run_s"] for p in result["pages"].values())
+        result["warm_run_s"] = max(p["warm_run_s"] for p in result["pages"].values())
+        logger.info(f"🔥 Streamlit {port} aquecido: primeira visita {result['cold_run_s']:.2f}s "
+                    f"-> {result['warm_run_s']:.2f}s")
+    except Exception as e:
+        result["error"] = str(e) or type(e).__name__
+        logger.warning(f"⚠️ Aquecimento do Streamlit {port} falhou: {result['error']}")
+    finally:
+        if own_session:
+            await session.close()
+    return result
+
+
+async def warm_up_all(ports: Dict[str, int], host: str = "127.0.0.1") -> Dict[str, dict]:
+    async with aiohttp.ClientSession() as session:
+        results = await asyncio.gather(*(warm_up(port, host, session) for port in ports.values()))
+    return dict(zip(ports, results))
+
+
+def format_report(results: Dict[str, dict]) -> str:
+    lines = [f"{'app':<24}{'saúde':>8}{'1ª visita fria':>16}{'1ª visita aquecida':>20}"]
+    for name, r in results.items():
+        if r["error"]:
+            lines.append(f"{name:<24}  falhou: {r['error']}")
+            continue
+        lines.append(f"{name:<24}{r['health_s']:>7.2f}s{r['cold_run_s']:>15.2f}s{r['warm_run_s']:>19.2f}s")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    ports = {f"porta_{port}": int(port) for port in (sys.argv[1:] or ["8501"])}
+    print(format_report(asyncio.run(warm_up_all(ports))))
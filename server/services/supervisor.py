@@ -0,0 +1,502 @@
+# supervisor.py
+"""
+Supervisor único de túneis e serviços, orientado a eventos
+Substitui os laços de sondagem independentes (SystemMonitor, NgrokManager, NgrokCoordinator,
+ConnectionMonitor e a thread de saída do cloudflared) por um único event loop asyncio:
+
+- API local do ngrok: consulta barata em localhost, publicada apenas quando os túneis mudam
+- saída do ngrok/cloudflared: lida linha a linha como fluxo de eventos (a URL aparece na hora)
+- saúde dos serviços locais e dos túneis públicos, com tolerância a falhas
+
+Quem precisa reagir assina os tópicos (supervisor.subscribe) em vez de manter o próprio laço.
+"""
+
+import asyncio
+import inspect
+import logging
+import re
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence
+
+import aiohttp
+
+logger = logging.getLogger("Supervisor")
+
+# Portas possíveis da API local do ngrok (mesmas do NgrokManager)
+NGROK_API_URLS = (
+    "http://localhost:4040/api/tunnels",
+    "http://localhost:4041/api/tunnels",
+    "http://localhost:4050/api/tunnels",
+)
+
+FLASK_HEALTH_URL = "http://localhost:5000/health"
+STREAMLIT_HEALTH_URL = "http://localhost:8501/_stcore/health"
+
+NGROK_POLL_INTERVAL = 2.0       # API local: troca de túnel percebida em ~2s
+HEALTH_INTERVAL = 5.0           # serviços locais
+TUNNEL_VERIFY_INTERVAL = 60.0   # reverificação dos túneis públicos sem mudança
+PROBE_TIMEOUT = 5.0
+FAILURE_THRESHOLD = 3           # falhas seguidas antes de declarar algo fora do ar
+
+# Endpoints testados por tipo de túnel (mesmos do NgrokCoordinator)
+TUNNEL_HEALTH_PATHS = {
+    'proxy': ('/health', '/api/status', '/'),
+    'streamlit': ('/_stcore/health', '/'),
+    'quantum_proxy': ('/health', '/'),
+    'redirect': ('/',),
+    'default': ('/health', '/', '/api/status'),
+}
+
+# URLs publicadas na saída dos processos de túnel
+CLOUDFLARE_URL_PATTERNS = (
+    re.compile(r'https://[a-zA-Z0-9-]+\.trycloudflare\.com'),
+    re.compile(r'https://[a-zA-Z0-9-]+\.try\.cloudflare\.com'),
+    re.compile(r'https://[a-zA-Z0-9-]+\.[a-zA-Z0-9-]+\.cloudflare\.com'),
+    re.compile(r'https://[a-zA-Z0-9-]+\.almafluxo\.uk'),
+)
+NGROK_URL_PATTERNS = (
+    re.compile(r'url=(https://[^\s"]+)'),
+)
+
+
+class Event:
+    """Mudança de estado publicada pelo supervisor"""
+
+    __slots__ = ("topic", "value", "previous", "ts")
+
+    def __init__(self, topic: str, value, previous=None):
+        self.topic = topic
+        self.value = value
+        self.previous = previous
+        self.ts = time.time()
+
+    def __repr__(self):
+        return f"Event({self.topic!r}, {self.value!r})"
+
+
+def classify_tunnel(tunnel: dict, taken: Sequence[str] = ()) -> str:
+    """Nome lógico de um túnel da API do ngrok (mesma regra do NgrokManager)"""
+    config_addr = tunnel.get('config', {}).get('addr', '')
+    tunnel_name = tunnel.get('name', '')
+
+    if ':5000' in config_addr or 'proxy' in tunnel_name.lower():
+        return 'proxy'
+    if ':8501' in config_addr or 'streamlit' in tunnel_name.lower():
+        return 'streamlit'
+    if ':5500' in config_addr or 'quantum' in tunnel_name.lower():
+        return 'quantum_proxy'
+    if ':5001' in config_addr or 'redirect' in tunnel_name.lower():
+        return 'redirect'
+    port_match = re.search(r':(\d+)', config_addr)
+    if port_match:
+        return f'port_{port_match.group(1)}'
+    return tunnel_name or f'tunnel_{len(taken)}'
+
+
+def tunnels_by_name(tunnels: List[dict]) -> Dict[str, str]:
+    """Túneis HTTPS da API do ngrok indexados pelo nome lógico"""
+    urls: Dict[str, str] = {}
+    for tunnel in tunnels:
+        if tunnel.get('proto') == 'https' and tunnel.get('public_url'):
+            urls.setdefault(classify_tunnel(tunnel, list(urls)), tunnel['public_url'])
+    return urls
+
+
+class _Subscription:
+    """Fila própria por assinante: um assinante lento não atrasa os outros nem o supervisor"""
+
+    def __init__(self, callback: Callable, topics: Optional[Sequence[str]]):
+        self.callback = callback
+        self.topics = tuple(topics) if topics else None
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.task: Optional[asyncio.Task] = None
+
+    def matches(self, topic: str) -> bool:
+        return self.topics is None or any(topic == t or topic.startswith(t + ".") for t in self.topics)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            event = await self.queue.get()
+            try:
+                if inspect.iscoroutinefunction(self.callback):
+                    await self.callback(event)
+                else:
+                    # Callbacks síncronos (requests, arquivos) rodam fora do event loop, em ordem
+                    await loop.run_in_executor(None, self.callback, event)
+            except Exception as e:
+                logger.error(f"❌ Erro no assinante de {event.topic}: {e}")
+
+
+class Supervisor:
+    """Event loop único que observa túneis, processos e serviços e publica mudanças"""
+
+    def __init__(self):
+        self._state: Dict[str, object] = {}
+        self._subscriptions: List[_Subscription] = []
+        self._watchers: Dict[str, asyncio.Task] = {}
+        self.processes: Dict[str, asyncio.subprocess.Process] = {}
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._lock = threading.Lock()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ==================== LOOP ====================
+
+    def start(self) -> "Supervisor":
+        """Garante o event loop em uma thread própria (idempotente)"""
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self.loop.run_forever, name="supervisor", daemon=True)
+                self._thread.start()
+                logger.info("🛰️ Supervisor iniciado")
+        return self
+
+    def _call(self, fn, *args):
+        """Executa fn no event loop do supervisor e devolve o resultado"""
+        self.start()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            return fn(*args)
+
+        async def invoke():
+            return fn(*args)
+
+        return asyncio.run_coroutine_threadsafe(invoke(), self.loop).result()
+
+    def _run(self, coro, timeout: float = 10.0):
+        """Executa a corotina no event loop do supervisor e espera o resultado"""
+        self.start()
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result(timeout)
+
+    def stop(self):
+        """Cancela observadores e assinantes, encerra processos filhos e para o loop"""
+        if self.loop is None:
+            return
+
+        async def shutdown():
+            for name in list(self.processes):
+                await self._terminate(name)
+            tasks = list(self._watchers.values()) + [s.task for s in self._subscriptions if s.task]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            self._watchers.clear()
+            self._subscriptions.clear()
+            if self._session is not None:
+                await self._session.close()
+                self._session = None
+
+        try:
+            asyncio.run_coroutine_threadsafe(shutdown(), self.loop).result(timeout=10)
+        except Exception as e:
+            logger.warning(f"⚠️ Encerramento incompleto do supervisor: {e}")
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.loop = None
+        self._thread = None
+        logger.info("🛑 Supervisor parado")
+
+    def _http(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(headers={
+                'User-Agent': 'AlmaSupervisor/1.0',
+                'X-Fluxon-Verification': 'true',
+                'ngrok-skip-browser-warning': 'true',
+            })
+        return self._session
+
+    # ==================== ESTADO E ASSINATURAS ====================
+
+    def subscribe(self, callback: Callable[[Event], object], topics: Optional[Iterable[str]] = None) -> Callable[[], None]:
+        """
+        Registra callback(event) para os tópicos (prefixos: "health" casa "health.flask").
+        Recebe logo o estado atual dos tópicos já conhecidos. Devolve a função que cancela a assinatura.
+        """
+        topics = list(topics) if topics else None
+
+        def register():
+            subscription = _Subscription(callback, topics)
+            subscription.task = asyncio.get_running_loop().create_task(subscription.run())
+            self._subscriptions.append(subscription)
+            for topic, value in self._state.items():
+                if subscription.matches(topic):
+                    subscription.queue.put_nowait(Event(topic, value))
+            return subscription
+
+        subscription = self._call(register)
+
+        def unsubscribe():
+            def remove():
+                if subscription in self._subscriptions:
+                    self._subscriptions.remove(subscription)
+                    subscription.task.cancel()
+            if self.loop is not None:
+                self._call(remove)
+
+        return unsubscribe
+
+    def publish(self, topic: str, value) -> bool:
+        """Atualiza o estado e notifica os assinantes; ignora valores repetidos"""
+        if self._state.get(topic, Event) == value:
+            return False
+        event = Event(topic, value, self._state.get(topic))
+        self._state[topic] = value
+        logger.debug(f"📣 {topic}: {value!r}")
+        for subscription in self._subscriptions:
+            if subscription.matches(topic):
+                subscription.queue.put_nowait(event)
+        return True
+
+    def get(self, topic: str, default=None):
+        return self._state.get(topic, default)
+
+    def snapshot(self) -> Dict[str, object]:
+        return dict(self._state)
+
+    # ==================== OBSERVADORES ====================
+
+    def watch(self, name: str, factory: Callable[[], "asyncio.Future"]) -> bool:
+        """Inicia o observador 'name' uma única vez; reinicia com espera crescente se ele falhar"""
+
+        def schedule():
+            task = self._watchers.get(name)
+            if task is not None and not task.done():
+                return False
+            self._watchers[name] = asyncio.get_running_loop().create_task(self._keep_alive(name, factory))
+            return True
+
+        return self._call(schedule)
+
+    async def _keep_alive(self, name: str, factory):
+        backoff = 1.0
+        while True:
+            try:
+                await factory()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"❌ Observador {name} falhou: {e} - reiniciando em {backoff:.0f}s")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60.0)
+
+    def watch_ngrok(self, api_urls: Iterable[str] = NGROK_API_URLS, interval: float = NGROK_POLL_INTERVAL,
+                    threshold: int = FAILURE_THRESHOLD) -> bool:
+        """
+        Publica "ngrok.api" (API local acessível) e "ngrok.tunnels" ({nome: url}).
+        A API local não tem push; a consulta em localhost é barata e só gera evento quando algo muda.
+        """
+        api_urls = tuple(api_urls)
+
+        async def run():
+            failures = 0
+            while True:
+                tunnels = None
+                for api_url in api_urls:
+                    tunnels = await self._fetch_tunnels(api_url, min(interval, PROBE_TIMEOUT))
+                    if tunnels is not None:
+                        break
+                if tunnels is None:
+                    failures += 1
+                    if failures >= threshold or self.get("ngrok.api") is None:
+                        self.publish("ngrok.api", False)
+                        self.publish("ngrok.tunnels", {})
+                else:
+                    failures = 0
+                    self.publish("ngrok.api", True)
+                    self.publish("ngrok.tunnels", tunnels)
+                await asyncio.sleep(interval)
+
+        return self.watch("ngrok", run)
+
+    async def _fetch_tunnels(self, api_url: str, timeout: float) -> Optional[Dict[str, str]]:
+        try:
+            async with self._http().get(api_url, timeout=aiohttp.ClientTimeout(total=timeout)) as response:
+                if response.status != 200:
+                    return None
+                data = await response.json(content_type=None)
+        except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+            return None
+        return tunnels_by_name(data.get('tunnels', []))
+
+    def watch_http(self, name: str, url: str, interval: float = HEALTH_INTERVAL,
+                   threshold: int = FAILURE_THRESHOLD) -> bool:
+        """Publica "health.<name>": True/False, com 'threshold' falhas seguidas antes de cair"""
+
+        async def run():
+            failures = 0
+            while True:
+                if await self._probe(url, PROBE_TIMEOUT, expect_ok=True):
+                    failures = 0
+                    self.publish(f"health.{name}", True)
+                else:
+                    failures += 1
+                    if failures >= threshold or self.get(f"health.{name}") is None:
+                        self.publish(f"health.{name}", False)
+                await asyncio.sleep(interval)
+
+        return self.watch(f"health.{name}", run)
+
+    async def _probe(self, url: str, timeout: float, expect_ok: bool = False) -> bool:
+        try:
+            async with self._http().get(url, timeout=aiohttp.ClientTimeout(total=timeout),
+                                        allow_redirects=True, ssl=False) as response:
+                if expect_ok:
+                    return response.status == 200
+                # Erros do próprio ngrok (túnel offline) vêm com este header
+                return response.status < 500 and 'ngrok-error-code' not in response.headers
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            return False
+
+    async def probe_tunnel(self, name: str, url: str, timeout: float = PROBE_TIMEOUT) -> bool:
+        """Todos os endpoints do tipo de túnel em paralelo; basta um responder"""
+        paths = TUNNEL_HEALTH_PATHS.get(name, TUNNEL_HEALTH_PATHS['default'])
+        results = [asyncio.ensure_future(self._probe(f"{url.rstrip('/')}{path}", timeout)) for path in paths]
+        try:
+            for result in asyncio.as_completed(results):
+                if await result:
+                    return True
+            return False
+        finally:
+            for task in results:
+                task.cancel()
+
+    def watch_tunnels(self, interval: float = TUNNEL_VERIFY_INTERVAL, threshold: int = FAILURE_THRESHOLD) -> bool:
+        """
+        Publica "tunnels.healthy" ({nome: url}) reagindo a "ngrok.tunnels": túneis novos são testados
+        na hora; os demais são reverificados a cada 'interval' e só saem após 'threshold' falhas.
+        """
+        self.watch_ngrok()
+
+        async def run():
+            changed = asyncio.Event()
+
+            async def on_change(event):
+                changed.set()
+
+            unsubscribe = self.subscribe(on_change, topics=["ngrok.tunnels"])
+            try:
+                await self._verify_tunnels(changed, interval, threshold)
+            finally:
+                unsubscribe()
+
+        return self.watch("tunnels", run)
+
+    async def _verify_tunnels(self, changed: asyncio.Event, interval: float, threshold: int):
+        failures: Dict[str, int] = {}
+        while True:
+            changed.clear()  # mudanças durante as sondas disparam nova rodada logo em seguida
+            tunnels = self.get("ngrok.tunnels") or {}
+            names = list(tunnels)
+            results = await asyncio.gather(*(self.probe_tunnel(n, tunnels[n]) for n in names))
+
+            healthy = {}
+            for tunnel_name, ok in zip(names, results):
+                failures[tunnel_name] = 0 if ok else failures.get(tunnel_name, 0) + 1
+                known = self.get("tunnels.healthy") or {}
+                if ok or (failures[tunnel_name] < threshold and known.get(tunnel_name) == tunnels[tunnel_name]):
+                    healthy[tunnel_name] = tunnels[tunnel_name]
+                else:
+                    logger.warning(f"⚠️ {tunnel_name} não saudável: {tunnels[tunnel_name]}")
+            self.publish("tunnels.healthy", healthy)
+
+            try:
+                await asyncio.wait_for(changed.wait(), interval)
+            except asyncio.TimeoutError:
+                pass
+
+    def watch_process(self, name: str, cmd: Sequence[str], url_patterns: Sequence[re.Pattern] = (),
+                      restart: bool = False) -> bool:
+        """
+        Inicia 'cmd' e lê stdout/stderr linha a linha como fluxo de eventos:
+        "<name>.url" quando uma URL casa com url_patterns, "process.<name>" com running/exited:<código>.
+        restart=True encerra uma instância anterior do mesmo nome antes de iniciar.
+        """
+
+        async def run():
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *cmd, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE
+                )
+            except OSError as e:
+                logger.error(f"❌ Não foi possível iniciar {name}: {e}")
+                self.publish(f"process.{name}", "failed")
+                return
+            self.processes[name] = process
+            self.publish(f"process.{name}", "running")
+
+            async def read(stream):
+                async for raw in stream:
+                    line = raw.decode("utf-8", "replace").rstrip()
+                    if not line:
+                        continue
+                    logger.info(f"{name}: {line}")
+                    for pattern in url_patterns:
+                        match = pattern.search(line)
+                        if match:
+                            self.publish(f"{name}.url", match.group(match.lastindex or 0))
+                            break
+
+            try:
+                # cloudflared escreve quase tudo em stderr; as duas saídas são lidas juntas
+                await asyncio.gather(read(process.stdout), read(process.stderr))
+                code = await process.wait()
+            finally:
+                if self.processes.get(name) is process:
+                    del self.processes[name]
+            self.publish(f"process.{name}", f"exited:{code}")
+            logger.warning(f"⚠️ Processo {name} terminou com código {code}")
+
+        if restart:
+            self._run(self._replace_process(name))
+        return self.watch(f"process.{name}", run)
+
+    async def _replace_process(self, name: str):
+        await self._terminate(name)
+        task = self._watchers.pop(f"process.{name}", None)
+        if task is not None:
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _terminate(self, name: str, timeout: float = 5.0):
+        process = self.processes.pop(name, None)
+        if process is None or process.returncode is not None:
+            return
+        process.terminate()
+        try:
+            await asyncio.wait_for(process.wait(), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+
+    def stop_process(self, name: str):
+        if self.loop is not None:
+            self._run(self._terminate(name))
+
+    def wait_for(self, topic: str, predicate: Callable[[object], bool] = bool, timeout: float = 30.0):
+        """Bloqueia até o tópico satisfazer 'predicate' (ou o prazo acabar); devolve o valor ou None"""
+        done = threading.Event()
+        found = {}
+
+        def check(event):
+            if predicate(event.value):
+                found['value'] = event.value
+                done.set()
+
+        unsubscribe = self.subscribe(check, topics=[topic])
+        try:
+            done.wait(timeout)
+        finally:
+            unsubscribe()
+        return found.get('value')
+
+
+# Instância única do processo
+supervisor = Supervisor()
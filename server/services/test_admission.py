@@ -0,0 +1,58 @@
+# test_admission.py
+import asyncio
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from admission import (
+    PRIORITY_ASSET, PRIORITY_AUTH, PRIORITY_PAGE, AdmissionController, AdmissionRejected, classify
+)
+
+
+def test_classificacao_por_caminho():
+    assert classify("api/login") == PRIORITY_AUTH
+    assert classify("/_stcore/health") == PRIORITY_ASSET
+    assert classify("sports/static/js/main.js") == PRIORITY_ASSET
+    assert classify("hub/") == PRIORITY_PAGE
+
+
+def test_auth_fura_fila_de_assets():
+    async def cenario():
+        controller = AdmissionController("hub", limit=2, queue_size=10, reserved=1)
+        ordem = []
+
+        async def requisicao(prioridade, nome):
+            async with controller.slot(prioridade):
+                ordem.append(nome)
+                await asyncio.sleep(0.02)
+
+        await asyncio.gather(*[requisicao(PRIORITY_ASSET, f"asset{i}") for i in range(4)],
+                             requisicao(PRIORITY_AUTH, "auth"))
+        return ordem, controller.stats()
+
+    ordem, stats = asyncio.run(cenario())
+    # A vaga reservada deixa o auth entrar antes dos assets enfileirados
+    assert ordem.index("auth") <= 1
+    assert stats["active"] == 0
+    assert stats["queue_wait_ms"]["count"] >= 3
+
+
+def test_fila_cheia_e_timeout():
+    async def cenario():
+        controller = AdmissionController("api", limit=1, queue_size=1, queue_timeout=0.05, reserved=0)
+        await controller.acquire(PRIORITY_PAGE)
+        espera = asyncio.ensure_future(controller.acquire(PRIORITY_PAGE))
+        await asyncio.sleep(0)
+        with pytest.raises(AdmissionRejected) as cheia:
+            await controller.acquire(PRIORITY_PAGE)
+        with pytest.raises(AdmissionRejected) as expirou:
+            await espera
+        return cheia.value, expirou.value, controller.stats()
+
+    cheia, expirou, stats = asyncio.run(cenario())
+    assert cheia.status == 429 and cheia.headers["Retry-After"]
+    assert expirou.status == 503
+    assert stats["rejected_full"] == 1 and stats["rejected_timeout"] == 1
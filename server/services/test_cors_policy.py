@@ -0,0 +1,112 @@
+# test_cors_policy.py
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from cors_policy import OriginMatcher, build_matcher, is_preflight, preflight_headers
+from tunnel_registry import TunnelRegistry
+
+TUNEL = "https://a1b2-189-6-10-2.ngrok-free.app"
+
+# (origem, permitida em produção, permitida em desenvolvimento)
+# Em produção só vale o túnel publicado no registro (TUNEL); os curingas são de desenvolvimento
+ORIGENS = [
+    # ngrok
+    (TUNEL, True, True),
+    (TUNEL + "/", True, True),
+    ("https://alma-fluxo.ngrok-free.dev", False, True),
+    ("https://abc123.ngrok.io", False, True),
+    ("https://abc123.sa.ngrok.io", False, True),
+    ("https://alma.ngrok.app", False, True),
+    ("http://abc123.ngrok-free.app", False, False),       # túnel sempre em https
+    ("https://ngrok-free.app", False, False),
+    ("https://abc.ngrok-free.app.evil.com", False, False),
+    # Cloudflare
+    ("https://quiet-river-1234.trycloudflare.com", False, True),
+    ("https://QUIET-RIVER.trycloudflare.com", False, True),
+    ("https://x.trycloudflare.com.evil.com", False, False),
+    ("https://evil.com/?.trycloudflare.com", False, False),
+    # Domínio próprio e locais
+    ("https://fluxon.almafluxo.uk", True, True),
+    ("https://fluxon.almafluxo.uk/", True, True),
+    ("https://painel.almafluxo.uk", False, True),
+    ("https://almafluxo.uk.evil.com", False, False),
+    ("http://localhost:5000", True, True),
+    ("http://localhost:8501", False, True),
+    ("http://192.168.0.15:5001", False, True),
+    ("null", False, False),
+]
+
+
+@pytest.fixture
+def registro(tmp_path):
+    registro = TunnelRegistry(tmp_path / "registro.json", interval=0)
+    registro.publish({"proxy": TUNEL}, source="teste")
+    return registro
+
+
+@pytest.mark.parametrize("origem,producao,desenvolvimento", ORIGENS)
+def test_matriz_de_origens(origem, producao, desenvolvimento, registro):
+    assert build_matcher(development=False, registry=registro).allows(origem) is producao
+    assert build_matcher(development=True).allows(origem) is desenvolvimento
+
+
+def test_troca_de_tunel_descarta_decisoes_memorizadas(registro):
+    matcher = build_matcher(registry=registro)
+    novo = "https://quiet-river-1234.trycloudflare.com"
+    assert matcher.allows(TUNEL) and not matcher.allows(novo)
+
+    registro.publish({"proxy": novo}, source="teste")
+
+    assert matcher.allows(novo)
+    assert not matcher.allows(TUNEL)  # túnel antigo deixa de valer mesmo já memorizado
+    assert matcher.stats()["registry_version"] == 2
+
+
+def test_decisao_memorizada_por_origem():
+    matcher = OriginMatcher(["https://almafluxo.uk"], [r"https://[a-z]+\.trycloudflare\.com"], memo_size=2)
+    for _ in range(3):
+        assert matcher.allows("https://abc.trycloudflare.com")
+    assert matcher.stats() == {"memoized": 1, "hits": 2, "misses": 1}
+
+    matcher.allows("https://a.com")
+    matcher.allows("https://b.com")  # memória cheia é descartada, não cresce
+    assert matcher.stats()["memoized"] == 1
+
+
+def test_preflight_com_max_age_configuravel(monkeypatch):
+    monkeypatch.setenv("ALMA_CORS_MAX_AGE", "86400")
+    headers = preflight_headers("https://abc.trycloudflare.com")
+    assert headers["Access-Control-Max-Age"] == "86400"
+    assert headers["Access-Control-Allow-Origin"] == "https://abc.trycloudflare.com"
+
+    assert is_preflight("OPTIONS", {"Origin": "x", "Access-Control-Request-Method": "POST"})
+    assert not is_preflight("OPTIONS", {"Origin": "x"})
+
+
+def test_flask_responde_preflight(monkeypatch, registro):
+    flask = pytest.importorskip("flask")
+    sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+    from server.cors_config import configure_cors
+    from server.services import cors_policy
+
+    monkeypatch.setattr(cors_policy, "tunnel_registry", registro)
+    monkeypatch.setenv("ALMA_CORS_MAX_AGE", "7200")
+    app = flask.Flask(__name__)
+    app.add_url_rule("/api/ping", "ping", lambda: "pong", methods=["GET", "POST"])
+    configure_cors(app)
+    client = app.test_client()
+
+    origem = TUNEL
+    resposta = client.options("/api/ping", headers={"Origin": origem, "Access-Control-Request-Method": "POST"})
+    assert resposta.headers["Access-Control-Allow-Origin"] == origem
+    assert resposta.headers["Access-Control-Max-Age"] == "7200"
+
+    for outra in ("https://evil.com", "https://outro.ngrok-free.app"):
+        resposta = client.get("/api/ping", headers={"Origin": outra})
+        assert "Access-Control-Allow-Origin" not in resposta.headers
+    resposta = client.get("/api/ping", headers={"Origin": origem})
+    assert resposta.headers["Access-Control-Allow-Origin"] == origem
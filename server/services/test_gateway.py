@@ -0,0 +1,138 @@
+# test_gateway.py
+import asyncio
+import json
+import os
+import sys
+
+from aiohttp import web, WSMsgType
+from aiohttp.test_utils import TestClient, TestServer
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tracing
+from cors_policy import ALLOWED_ORIGINS, OriginMatcher
+from gateway import EdgeGateway
+from replica_pool import ReplicaPool
+
+ORIGEM = "http://localhost:5001"
+
+
+def _upstream():
+    """Streamlit falso: devolve o que recebeu e ecoa o WebSocket"""
+
+    async def eco(request):
+        return web.json_response({
+            "path": request.path,
+            "query": request.query_string,
+            "request_id": request.headers.get("X-Request-ID"),
+            "body": (await request.read()).decode(),
+        })
+
+    async def stream(request):
+        ws = web.WebSocketResponse(protocols=("streamlit",))
+        await ws.prepare(request)
+        async for msg in ws:
+            if msg.type == WSMsgType.TEXT:
+                await ws.send_str(f"eco:{msg.data}")
+            elif msg.type == WSMsgType.BINARY:
+                await ws.send_bytes(msg.data[::-1])
+        return ws
+
+    app = web.Application()
+    app.router.add_get("/hub/_stcore/stream", stream)
+    app.router.add_route("*", "/{path:.*}", eco)
+    return app
+
+
+def _gateway(tmp_path, monkeypatch) -> EdgeGateway:
+    monkeypatch.setattr(tracing, "_writer", tracing.TraceWriter(tmp_path / "trace.jsonl"))
+    db = tmp_path / "fluxon.json"
+    db.write_text(json.dumps({"blocked_ips": ["203.0.113.0/24"]}), encoding="utf-8")
+    monkeypatch.setenv("ALMA_DB_FILE", str(db))
+    gateway = EdgeGateway()
+    gateway.cors = OriginMatcher(ALLOWED_ORIGINS)
+    return gateway
+
+
+def _cenario(tmp_path, monkeypatch, teste):
+    async def executar():
+        gateway = _gateway(tmp_path, monkeypatch)
+        async with TestServer(_upstream()) as upstream:
+            gateway.pools["hub"] = ReplicaPool("hub", [str(upstream.make_url("")).rstrip("/")])
+            async with TestClient(TestServer(gateway.app)) as client:
+                await teste(client, gateway)
+
+    asyncio.run(executar())
+
+
+def test_encaminha_http_para_o_servico(tmp_path, monkeypatch):
+    async def teste(client, gateway):
+        resposta = await client.post("/hub/x/y?a=1", data="corpo", headers={"X-Request-ID": "req-00000010"})
+        assert resposta.status == 200
+        assert await resposta.json() == {
+            "path": "/hub/x/y", "query": "a=1", "request_id": "req-00000010", "body": "corpo"
+        }
+        assert resposta.headers["X-Request-ID"] == "req-00000010"
+        assert gateway.pools["hub"].replicas[0].active == 0
+
+        # Serviço fora do ar: 503 sem derrubar o gateway
+        gateway.pools["sports"] = ReplicaPool("sports", ["http://127.0.0.1:1"])
+        assert (await client.get("/sports/")).status == 503
+
+    _cenario(tmp_path, monkeypatch, teste)
+
+
+def test_relay_websocket(tmp_path, monkeypatch):
+    async def teste(client, gateway):
+        async with client.ws_connect("/hub/_stcore/stream", protocols=("streamlit",)) as ws:
+            assert ws.protocol == "streamlit"
+            await ws.send_str("oi")
+            assert (await ws.receive(timeout=5)).data == "eco:oi"
+            await ws.send_bytes(b"\x01\x02\x03")
+            assert (await ws.receive(timeout=5)).data == b"\x03\x02\x01"
+            assert gateway.pools["hub"].replicas[0].active == 1
+        for _ in range(50):  # o relay libera a réplica depois de fechar os dois lados
+            if gateway.pools["hub"].replicas[0].active == 0:
+                break
+            await asyncio.sleep(0.02)
+        assert gateway.pools["hub"].replicas[0].active == 0
+
+    _cenario(tmp_path, monkeypatch, teste)
+
+
+def test_edge_somente_para_clientes_locais(tmp_path, monkeypatch):
+    async def teste(client, gateway):
+        assert (await client.get("/_edge/replicas")).status == 200
+        # Pelo túnel o peer é o localhost, mas o cliente real vem no X-Forwarded-For
+        remoto = await client.get("/_edge/replicas", headers={"X-Forwarded-For": "198.51.100.4"})
+        assert remoto.status == 403
+
+    _cenario(tmp_path, monkeypatch, teste)
+
+
+def test_preflight_respondido_na_borda(tmp_path, monkeypatch):
+    async def teste(client, gateway):
+        cabecalhos = {"Origin": ORIGEM, "Access-Control-Request-Method": "POST"}
+        resposta = await client.options("/hub/x", headers=cabecalhos)
+        assert resposta.status == 200
+        assert resposta.headers["Access-Control-Allow-Origin"] == ORIGEM
+        assert "Access-Control-Max-Age" in resposta.headers
+
+        negada = await client.options("/hub/x", headers={**cabecalhos, "Origin": "https://evil.example"})
+        assert negada.status == 200 and "Access-Control-Allow-Origin" not in negada.headers
+
+        normal = await client.get("/hub/x", headers={"Origin": ORIGEM})
+        assert normal.headers["Access-Control-Allow-Origin"] == ORIGEM
+
+    _cenario(tmp_path, monkeypatch, teste)
+
+
+def test_ip_bloqueado_recusado(tmp_path, monkeypatch):
+    async def teste(client, gateway):
+        resposta = await client.get("/hub/x", headers={"X-Forwarded-For": "203.0.113.50"})
+        assert resposta.status == 403
+        assert await resposta.json() == {"error": "Acesso bloqueado"}
+        assert gateway.blocklist.rejected == 1
+        assert (await client.get("/hub/x", headers={"X-Forwarded-For": "198.51.100.4"})).status == 200
+
+    _cenario(tmp_path, monkeypatch, teste)
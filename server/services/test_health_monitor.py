@@ -0,0 +1,95 @@
+# test_health_monitor.py
+import asyncio
+import json
+import os
+import socket
+import sys
+import time
+import urllib.request
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import aiohttp
+from aiohttp import web
+from health_monitor import HealthMonitor, HealthTarget
+
+
+async def _servico(atraso=0.0):
+    async def health(request):
+        await asyncio.sleep(atraso)
+        return web.json_response({"ok": True})
+
+    app = web.Application()
+    app.router.add_get("/health", health)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+
+def _porta_fechada():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_sondas_concorrentes_com_prazo():
+    async def cenario():
+        rapido, porta_rapida = await _servico()
+        travado1, porta_travada1 = await _servico(atraso=2)
+        travado2, porta_travada2 = await _servico(atraso=2)
+        monitor = HealthMonitor([
+            HealthTarget("api", porta_rapida, "/health"),
+            HealthTarget("hub", porta_travada1, "/health"),
+            HealthTarget("sports", porta_travada2, "/health"),
+        ], probe_timeout=0.3)
+        try:
+            async with aiohttp.ClientSession() as session:
+                inicio = time.perf_counter()
+                await monitor.check_all(session)
+                return time.perf_counter() - inicio, monitor.status()["services"]
+        finally:
+            for runner in (rapido, travado1, travado2):
+                await runner.cleanup()
+
+    duracao, services = asyncio.run(cenario())
+    assert duracao < 1.0  # sequencial levaria 0.3s por serviço travado + o restante
+    assert services["api"]["state"] == "healthy" and services["api"]["latency_ms"] < 300
+    assert services["hub"]["state"] == "unhealthy" and "sem resposta" in services["hub"]["last_error"]
+
+
+def test_backoff_e_crash_loop():
+    reinicios = []
+    target = HealthTarget("quantum", _porta_fechada(), "/health", restart=lambda: reinicios.append(time.monotonic()))
+    monitor = HealthMonitor([target], threshold=1, grace=0, backoff=0.05, budget=3, window=60)
+
+    async def cenario():
+        async with aiohttp.ClientSession() as session:
+            for _ in range(40):
+                await monitor.check_all(session)
+                await asyncio.sleep(0.02)
+
+    asyncio.run(cenario())
+    assert len(reinicios) == 3 and target.restarts == 3
+    assert target.state == "crash_loop"
+    # Espera entre reinícios dobra: 0.05s, depois 0.1s
+    assert reinicios[1] - reinicios[0] >= 0.05 and reinicios[2] - reinicios[1] >= 0.1
+    assert target.backoff == 0.4
+
+
+def test_endpoint_de_status():
+    monitor = HealthMonitor([HealthTarget("api", _porta_fechada(), "/health")], interval=0.05).start(status_port=0)
+    try:
+        for _ in range(100):
+            if monitor.status_port and monitor.cycles:
+                break
+            time.sleep(0.02)
+        with urllib.request.urlopen(f"http://127.0.0.1:{monitor.status_port}/status", timeout=2) as response:
+            status = json.loads(response.read())
+    finally:
+        monitor.stop()
+
+    assert status["cycles"] >= 1
+    assert status["services"]["api"]["state"] == "unhealthy"
+    assert status["services"]["api"]["restarts"] == 0
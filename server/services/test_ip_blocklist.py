@@ -0,0 +1,69 @@
+# test_ip_blocklist.py
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from ip_blocklist import BlocklistWatcher, IPBlocklist, client_ips, is_local_client
+
+
+def test_ips_exatos_e_faixas_cidr():
+    blocklist = IPBlocklist(["203.0.113.7", "10.0.0.0/8", "2001:db8::/32", "nao-e-ip"])
+
+    assert blocklist.is_blocked("203.0.113.7")
+    assert not blocklist.is_blocked("203.0.113.8")
+    assert blocklist.is_blocked("10.255.1.2")
+    assert not blocklist.is_blocked("11.0.0.1")
+    assert blocklist.is_blocked("2001:db8:1::5")
+    assert blocklist.is_blocked("::ffff:10.1.2.3")  # IPv4 mapeado em IPv6
+    assert not blocklist.is_blocked("lixo")
+    assert len(blocklist) == 3
+    assert blocklist.invalid == ["nao-e-ip"]
+
+
+def test_prefixo_curto_absorve_os_longos():
+    blocklist = IPBlocklist(["192.168.1.0/24", "192.168.0.0/16", "192.168.1.10"])
+    assert len(blocklist) == 1
+    assert blocklist.is_blocked("192.168.200.1")
+
+
+def test_cliente_real_so_e_lido_de_tunel_local():
+    headers = {"X-Forwarded-For": "198.51.100.4, 127.0.0.1"}
+    assert client_ips("127.0.0.1", headers) == ["127.0.0.1", "198.51.100.4"]
+    assert client_ips("8.8.8.8", headers) == ["8.8.8.8"]
+
+
+def test_estatisticas_da_borda_so_para_o_proprio_servidor():
+    assert is_local_client("127.0.0.1", {})
+    assert is_local_client("::1", {"X-Forwarded-For": "127.0.0.1"})
+    assert not is_local_client("192.168.0.15", {})
+    assert not is_local_client(None, {})
+    # pelo túnel o peer também é o localhost, mas o túnel informa o cliente real
+    assert not is_local_client("127.0.0.1", {"X-Forwarded-For": "198.51.100.4"})
+    assert not is_local_client("127.0.0.1", {"X-Forwarded-For": "127.0.0.1, 198.51.100.4"})
+    assert not is_local_client("127.0.0.1", {"CF-Connecting-IP": "198.51.100.4"})
+
+
+def test_entrada_forjada_a_esquerda_nao_escapa_do_bloqueio(tmp_path):
+    db_file = tmp_path / "fluxon.json"
+    db_file.write_text(json.dumps({"blocked_ips": ["198.51.100.0/24"]}), encoding="utf-8")
+    watcher = BlocklistWatcher(db_file)
+
+    # o cliente bloqueado manda um X-Forwarded-For próprio; o túnel acrescenta o IP real
+    headers = {"X-Forwarded-For": "1.2.3.4, 198.51.100.4"}
+    assert client_ips("127.0.0.1", headers) == ["127.0.0.1", "198.51.100.4"]
+    assert watcher.is_blocked("127.0.0.1", headers)
+
+
+def test_recarrega_quando_o_banco_muda(tmp_path):
+    db_file = tmp_path / "fluxon.json"
+    db_file.write_text(json.dumps({"blocked_ips": []}), encoding="utf-8")
+    watcher = BlocklistWatcher(db_file, interval=0)
+    assert not watcher.is_blocked("198.51.100.4")
+
+    db_file.write_text(json.dumps({"blocked_ips": ["198.51.100.0/24"]}), encoding="utf-8")
+    os.utime(db_file, ns=(1, 10 ** 18))  # garante mtime diferente
+    assert watcher.is_blocked("127.0.0.1", {"X-Forwarded-For": "198.51.100.4"})
+    assert watcher.stats()["reloads"] == 2
+    assert watcher.stats()["rejected"] == 1
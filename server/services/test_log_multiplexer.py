@@ -0,0 +1,52 @@
+# test_log_multiplexer.py
+import os
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from log_multiplexer import LogMultiplexer
+
+# ~1 MB em cada pipe: bem acima do buffer do sistema (64 KB), travaria sem leitor
+CHATTY = (
+    "import sys\n"
+    "for i in range(10000):\n"
+    "    print(f'linha {i} ' + 'x' * 100)\n"
+    "    print(f'erro {i}', file=sys.stderr)\n"
+    "print('fim')\n"
+)
+
+
+def _popen(script):
+    return subprocess.Popen([sys.executable, "-c", script], stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                            text=True, encoding="utf-8", errors="replace")
+
+
+def test_filho_verborragico_nao_trava(tmp_path):
+    mux = LogMultiplexer(tmp_path, rate=1e9, burst=10 ** 9)
+    process = mux.attach("api", _popen(CHATTY))
+
+    assert process.wait(timeout=20) == 0
+    mux.wait("api", timeout=5)
+
+    assert mux.stats()["api"]["lines"] == 20001
+    assert mux.stats()["api"]["dropped"] == 0
+    assert len(mux.tail("api", 50)) == 50
+    mux.close()
+    conteudo = (tmp_path / "api.log").read_text(encoding="utf-8")
+    assert "[api:stdout] fim" in conteudo and "[api:stderr] erro 9999" in conteudo
+
+
+def test_rajada_limitada_e_anotada(tmp_path):
+    mux = LogMultiplexer(tmp_path, rate=1, burst=10)
+    script = "import time\nfor i in range(500): print(i)\ntime.sleep(1.2)\nprint('depois')\n"
+    process = mux.attach("sports", _popen(script))
+
+    assert process.wait(timeout=10) == 0
+    mux.wait("sports", timeout=5)
+
+    stats = mux.stats()["sports"]
+    assert stats["lines"] == 501 and stats["dropped"] == 490
+    tail = mux.tail("sports", 2)
+    assert "490 linhas descartadas" in tail[0]
+    assert tail[1].endswith("depois")
@@ -0,0 +1,130 @@
+# test_mux.py
+import asyncio
+import os
+import sys
+
+import pytest
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mux import INITIAL_WINDOW, MUX_PATH, OPEN, MuxClient, MuxConnection, MuxError, MuxStream
+
+
+async def _servidor_eco(lento=None):
+    """Tunnel falso: ecoa cada mensagem do stream; 'lento' segura a leitura"""
+
+    async def ao_abrir(stream, meta):
+        if meta.get("service") != "hub":
+            await stream.reject("Service not found")
+            return
+        await stream.accept()
+        if lento is not None:
+            await lento.wait()
+        async for mensagem in stream:
+            await stream.send(mensagem)
+
+    async def endpoint(request):
+        ws = web.WebSocketResponse(max_msg_size=0)
+        await ws.prepare(request)
+        await MuxConnection(ws, on_open=ao_abrir, first_id=2).run()
+        return ws
+
+    app = web.Application()
+    app.router.add_get(MUX_PATH, endpoint)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    return runner, f"ws://127.0.0.1:{port}{MUX_PATH}"
+
+
+def test_streams_compartilham_conexao():
+    async def cenario():
+        runner, url = await _servidor_eco()
+        client = MuxClient(url, connections=1)
+        try:
+            streams = [await client.open({"service": "hub"}) for _ in range(5)]
+            for i, stream in enumerate(streams):
+                await stream.send(f"texto-{i}")
+                await stream.send(bytes([i]) * 10)
+            for i, stream in enumerate(streams):
+                assert await stream.receive() == f"texto-{i}"
+                assert await stream.receive() == bytes([i]) * 10
+            assert client.stats()["connections"] == 1
+
+            # Fechar um stream não derruba os outros
+            await streams[0].close()
+            await streams[1].send("ainda vivo")
+            assert await streams[1].receive() == "ainda vivo"
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(cenario())
+
+
+def test_open_recusado():
+    async def cenario():
+        runner, url = await _servidor_eco()
+        client = MuxClient(url)
+        try:
+            with pytest.raises(MuxError):
+                await client.open({"service": "inexistente"})
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(cenario())
+
+
+def test_open_malformado_nao_derruba_o_link():
+    async def cenario():
+        runner, url = await _servidor_eco()
+        client = MuxClient(url, connections=1)
+        try:
+            vivo = await client.open({"service": "hub"})
+            conexao = client.connections[0]
+            for payload in (b"{nao e json", b"\xff\xfe", b"[1, 2]"):
+                stream = conexao.streams[999] = MuxStream(conexao, 999)  # id livre, sem open_stream
+                await conexao.send_frame(999, OPEN, payload)
+                with pytest.raises(MuxError):
+                    await asyncio.wait_for(stream.opened, timeout=2)
+
+            await vivo.send("ainda vivo")
+            assert await vivo.receive() == "ainda vivo"
+            assert not conexao.closed
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(cenario())
+
+
+def test_janela_de_controle_de_fluxo():
+    async def cenario():
+        lento = asyncio.Event()
+        runner, url = await _servidor_eco(lento)
+        client = MuxClient(url)
+        try:
+            stream = await client.open({"service": "hub"})
+            bloco = b"x" * (INITIAL_WINDOW // 4)
+            for _ in range(4):
+                await stream.send(bloco)
+            assert stream.send_window == 0
+
+            # Sem crédito do receptor o próximo envio espera
+            pendente = asyncio.create_task(stream.send(bloco))
+            await asyncio.sleep(0.1)
+            assert not pendente.done()
+
+            lento.set()
+            await asyncio.wait_for(pendente, timeout=2)
+            for _ in range(5):
+                assert await asyncio.wait_for(stream.receive(), timeout=2) == bloco
+        finally:
+            await client.close()
+            await runner.cleanup()
+
+    asyncio.run(cenario())
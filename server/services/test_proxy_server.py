@@ -0,0 +1,29 @@
+# test_proxy_server.py
+import os
+import sys
+
+from fastapi.testclient import TestClient
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import proxy_server
+import tracing
+from runtime_config import RuntimeConfig
+from tunnel_registry import TunnelRegistry
+
+
+def test_runtime_config_antes_do_fallback_do_frontend(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_writer", tracing.TraceWriter(tmp_path / "trace.jsonl"))
+    registro = TunnelRegistry(tmp_path / "registro.json", interval=0)
+    registro.publish({"proxy": "https://a.ngrok-free.app"}, source="teste")
+    monkeypatch.setattr(proxy_server, "RUNTIME_CONFIG", RuntimeConfig(registro, services=proxy_server.SERVICE_ROUTES))
+    client = TestClient(proxy_server.app)
+
+    script = client.get("/runtime-config.js")
+    assert script.status_code == 200 and "javascript" in script.headers["content-type"]
+    assert script.text.startswith("window.ALMA_CONFIG = ")
+
+    resposta = client.get("/runtime-config.json")
+    dados = resposta.json()
+    assert dados["tunnel_url"] == "https://a.ngrok-free.app" and dados["routes"]["hub"] == "/hub/"
+    assert client.get("/runtime-config.json", headers={"If-None-Match": resposta.headers["etag"]}).status_code == 304
@@ -0,0 +1,82 @@
+# test_replica_pool.py
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from replica_pool import ReplicaPool, build_pools, replica_count, replica_urls, streamlit_session_id
+
+SESSAO = "5f0c2a9e-1b2c-4d3e-8f90-a1b2c3d4e5f6"  # id de sessão do Streamlit (uuid4)
+URLS = ["http://localhost:8501", "http://localhost:8511", "http://localhost:8521"]
+
+
+def test_menor_numero_de_conexoes_e_liberacao():
+    pool = ReplicaPool("hub", URLS)
+    primeira = pool.choose()
+    pool.acquire(primeira)
+    segunda = pool.choose()
+    pool.acquire(segunda)
+    assert (primeira.index, segunda.index) == (0, 1)
+    assert pool.choose().index == 2
+
+    pool.release(primeira)
+    assert primeira.active == 0 and pool.choose().index == 0
+    pool.release(primeira)  # liberação a mais não fica negativa
+    assert primeira.active == 0
+
+
+def test_afinidade_por_cookie():
+    pool = ReplicaPool("hub", URLS)
+    pool.acquire(pool.replicas[2])
+    assert pool.choose(cookie="2").index == 2  # mesmo ocupada, o navegador volta à sua réplica
+    assert pool.choose(cookie="abc").index == 0
+
+    pool.mark_failed(pool.replicas[2])
+    assert pool.choose(cookie="2").index == 0  # réplica fora do rodízio: escolhe outra
+
+
+def test_afinidade_pelo_id_de_sessao_do_websocket():
+    pool = ReplicaPool("hub", URLS)
+    sessao = streamlit_session_id(ws_protocol=f"streamlit, xsrf-token, {SESSAO}")
+    assert sessao == SESSAO
+    assert streamlit_session_id(ws_protocol="streamlit") is None
+    assert streamlit_session_id(f"_stcore/upload_file/{SESSAO}/arquivo") == sessao
+
+    escolhida = pool.choose(session_id=sessao)
+    pool.acquire(escolhida)
+    for replica in pool.replicas:
+        if replica is not escolhida:
+            pool.acquire(replica)
+    pool.acquire(escolhida)
+    # Reconexão com cookie de outra réplica: o id de sessão prevalece
+    outra = (escolhida.index + 1) % len(URLS)
+    assert pool.choose(cookie=str(outra), session_id=sessao) is escolhida
+
+    pool.forget_session(sessao)
+    assert pool.choose(session_id=sessao).index != escolhida.index
+
+
+def test_indice_fixado_fora_do_intervalo():
+    pool = ReplicaPool("hub", URLS)
+    pool.acquire(pool.replicas[0])
+    # Cookie de quando havia mais réplicas: volta ao menor número de conexões
+    assert pool.choose(cookie="7").index == 1
+
+
+def test_quantidade_e_urls_por_ambiente(monkeypatch):
+    monkeypatch.delenv("ALMA_REPLICAS", raising=False)
+    monkeypatch.delenv("ALMA_REPLICAS_HUB", raising=False)
+    assert replica_count("hub") == 1
+
+    monkeypatch.setenv("ALMA_REPLICAS", "2")
+    monkeypatch.setenv("ALMA_REPLICAS_HUB", "3")
+    assert replica_count("hub") == 3
+    assert replica_count("sports") == 2
+    monkeypatch.setenv("ALMA_REPLICAS_HUB", "nao-e-numero")
+    assert replica_count("hub") == 1
+    monkeypatch.setenv("ALMA_REPLICAS_HUB", "0")
+    assert replica_count("hub") == 1
+
+    assert replica_urls("http://localhost:8501", 3) == URLS
+    pools = build_pools({"hub": URLS, "_stcore": URLS, "api": "http://localhost:5000"})
+    assert pools["hub"] is pools["_stcore"] and len(pools["api"]) == 1
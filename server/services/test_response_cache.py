@@ -0,0 +1,118 @@
+# test_response_cache.py
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from response_cache import CachedResponse, ResponseCache
+
+
+def resposta(body=b"ok", cache_control="public, max-age=60", **headers):
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    return CachedResponse(200, headers, body)
+
+
+def test_chave_ignora_ordem_da_query_e_considera_encoding():
+    cache = ResponseCache()
+    a = cache.request_key("GET", "static/js/main.js", "b=2&a=1", {"accept-encoding": "gzip"})
+    b = cache.request_key("GET", "/static/js/main.js", "a=1&b=2", {"accept-encoding": "gzip"})
+    c = cache.request_key("GET", "static/js/main.js", "a=1&b=2", {"accept-encoding": "br"})
+    assert a == b
+    assert a != c
+
+
+def test_requisicoes_nao_cacheaveis():
+    cache = ResponseCache()
+    assert cache.request_key("POST", "api/login", "", {}) is None
+    assert cache.request_key("GET", "api/users", "", {"authorization": "Bearer x"}) is None
+    assert ResponseCache(max_bytes=0).request_key("GET", "static/a.js", "", {}) is None
+
+
+def test_respeita_cache_control():
+    cache = ResponseCache()
+    assert cache.ttl_for("static/a.js", resposta()) == 60
+    assert cache.ttl_for("static/a.js", resposta(cache_control="no-store")) == 0
+    assert cache.ttl_for("static/a.js", resposta(cache_control="private, max-age=60")) == 0
+    assert cache.ttl_for("static/a.js", resposta(cache_control="public, max-age=60", **{"Set-Cookie": "a=1"})) == 0
+    assert cache.ttl_for("static/a.js", resposta(cache_control="max-age=60", Vary="Cookie")) == 0
+    # no-cache só entra no micro-cache dos endpoints internos do Streamlit
+    assert cache.ttl_for("static/a.js", resposta(cache_control="no-cache")) == 0
+    assert cache.ttl_for("sports/_stcore/health", resposta(cache_control="no-cache")) > 0
+
+
+def test_lru_limitado_por_memoria():
+    cache = ResponseCache(max_bytes=450)
+    for nome in ("a", "b", "c"):
+        assert cache.store(nome, "static/x.js", resposta(body=b"x" * 100))
+    cache.get("a")  # "a" passa a ser o mais recente
+    cache.store("d", "static/x.js", resposta(body=b"x" * 100))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["bytes"] <= 450
+    assert cache.stats()["evictions"] >= 1
+
+
+def test_misses_concorrentes_fazem_uma_unica_busca():
+    cache = ResponseCache()
+    chamadas = []
+
+    async def loader():
+        chamadas.append(1)
+        await asyncio.sleep(0.01)
+        return resposta(body=b"bundle")
+
+    async def cenario():
+        return await asyncio.gather(*[
+            cache.fetch("GET /static/main.js?|", "static/main.js", loader) for _ in range(10)
+        ])
+
+    respostas = asyncio.run(cenario())
+
+    assert len(chamadas) == 1
+    assert all(r.body == b"bundle" for r in respostas)
+    stats = cache.stats()
+    assert stats["misses"] == 1
+    assert stats["collapsed"] == 9
+    assert cache.get("GET /static/main.js?|") is not None
+
+
+def test_resposta_com_set_cookie_nao_e_repassada_a_quem_esperava():
+    cache = ResponseCache()
+    cookies = iter(["_streamlit_xsrf=cliente-a", "_streamlit_xsrf=cliente-b"])
+
+    async def loader():
+        cookie = next(cookies)
+        await asyncio.sleep(0.01)
+        return resposta(body=cookie.encode(), **{"Set-Cookie": cookie})
+
+    async def cenario():
+        return await asyncio.gather(*[cache.fetch("GET /hub/?|", "hub/", loader) for _ in range(2)])
+
+    primeira, segunda = asyncio.run(cenario())
+
+    assert {primeira.headers["Set-Cookie"], segunda.headers["Set-Cookie"]} == {
+        "_streamlit_xsrf=cliente-a", "_streamlit_xsrf=cliente-b"
+    }
+    assert cache.stats()["collapsed"] == 0 and cache.get("GET /hub/?|") is None
+
+
+def test_requisicao_com_credenciais_nao_entra_no_agrupamento():
+    cache = ResponseCache()
+    chamadas = []
+
+    async def loader():
+        chamadas.append(1)
+        await asyncio.sleep(0.01)
+        return resposta(body=b"bundle")
+
+    async def cenario():
+        await asyncio.gather(
+            cache.fetch("GET /static/main.js?|", "static/main.js", loader),
+            cache.fetch("GET /static/main.js?|", "static/main.js", loader, {"Cookie": "sessao=1"}),
+        )
+
+    asyncio.run(cenario())
+    assert len(chamadas) == 2 and cache.stats()["collapsed"] == 0
@@ -0,0 +1,32 @@
+# test_runtime_config.py
+import json
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from runtime_config import RuntimeConfig
+from tunnel_registry import TunnelRegistry
+
+
+def test_config_versionada_com_etag(tmp_path):
+    registro = TunnelRegistry(tmp_path / "registro.json", interval=0)
+    config = RuntimeConfig(registro, services=["api", "hub", "daytrade", "_stcore", "static"])
+
+    status, headers, corpo = config.respond("json", None)
+    dados = json.loads(corpo)
+    assert status == 200 and headers["Cache-Control"] == "no-cache"
+    assert dados["version"] == 0 and dados["tunnel_url"] is None
+    assert dados["routes"]["hub"] == "/hub/" and "_stcore" not in dados["routes"]
+
+    # Mesma versão: 304 sem corpo
+    assert config.respond("json", headers["ETag"])[0] == 304
+
+    # Troca de túnel: nova versão, novo ETag, mesmo cliente recebe 200
+    registro.publish({"proxy": "https://b.ngrok-free.app"}, source="teste")
+    status, novos, corpo = config.respond("json", headers["ETag"])
+    assert status == 200 and novos["ETag"] != headers["ETag"]
+    assert json.loads(corpo)["tunnel_url"] == "https://b.ngrok-free.app"
+
+    status, headers, corpo = config.respond("js", None)
+    assert corpo.startswith(b"window.ALMA_CONFIG = ") and "javascript" in headers["Content-Type"]
@@ -0,0 +1,88 @@
+# test_startup_orchestrator.py
+import os
+import socket
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from startup_orchestrator import ServiceSpec, StartupOrchestrator, format_report
+
+SERVER = (
+    "import sys, time, http.server\n"
+    "time.sleep(float(sys.argv[2]))\n"
+    "class H(http.server.BaseHTTPRequestHandler):\n"
+    "    def do_GET(self):\n"
+    "        self.send_response(200); self.end_headers(); self.wfile.write(b'ok')\n"
+    "    def log_message(self, *a): pass\n"
+    "http.server.HTTPServer(('127.0.0.1', int(sys.argv[1])), H).serve_forever()\n"
+)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _servico(nome, atraso, processos, lancados, depends_on=()):
+    port = _free_port()
+
+    def launch():
+        lancados[nome] = time.perf_counter()
+        processo = subprocess.Popen([sys.executable, "-c", SERVER, str(port), str(atraso)])
+        processos.append(processo)
+        return processo
+
+    return ServiceSpec(nome, port, launch, health_path="/health", depends_on=depends_on, timeout=10)
+
+
+def test_independentes_em_paralelo_e_dependente_espera_prontidao():
+    processos, lancados = [], {}
+    specs = [
+        _servico("api", 1.0, processos, lancados),
+        _servico("app", 1.0, processos, lancados),
+        _servico("proxy", 0.0, processos, lancados, depends_on=["api"]),
+    ]
+    try:
+        inicio = time.perf_counter()
+        results = StartupOrchestrator(specs).run_sync()
+
+        assert all(r.ready for r in results.values()), format_report(results)
+        # api e app são lançados antes de qualquer um ficar pronto: sobem juntos. Em série, o
+        # segundo só seria lançado depois do primeiro pronto (ordem, não tempo de parede)
+        assert max(lancados["api"], lancados["app"]) - inicio < min(results["api"].ready_s, results["app"].ready_s)
+        assert lancados["proxy"] - inicio >= results["api"].ready_s  # só lançado após api pronta
+        assert results["proxy"].ready_s >= results["api"].ready_s
+    finally:
+        for processo in processos:
+            processo.kill()
+            processo.wait()
+
+
+def test_dependente_nao_sobe_quando_dependencia_morre():
+    lancados = {}
+    port = _free_port()
+    specs = [
+        ServiceSpec("api", port, lambda: subprocess.Popen([sys.executable, "-c", "raise SystemExit(3)"]),
+                    health_path="/health", timeout=10),
+        ServiceSpec("proxy", _free_port(), lambda: lancados.setdefault("proxy", True), depends_on=["api"]),
+    ]
+    results = StartupOrchestrator(specs).run_sync()
+
+    assert not results["api"].ready and "código 3" in results["api"].error
+    assert not results["proxy"].ready and "api" in results["proxy"].error
+    assert "proxy" not in lancados
+
+
+def test_dependencia_circular_rejeitada():
+    try:
+        StartupOrchestrator([
+            ServiceSpec("a", 1, lambda: None, depends_on=["b"]),
+            ServiceSpec("b", 2, lambda: None, depends_on=["a"]),
+        ])
+    except ValueError as e:
+        assert "circular" in str(e)
+    else:
+        raise AssertionError("ciclo não detectado")
@@ -0,0 +1,46 @@
+# test_streamlit_warmup.py
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from streamlit_warmup import warm_up
+
+APP = (
+    "import time\n"
+    "import streamlit as st\n"
+    "@st.cache_resource\n"
+    "def motor():\n"
+    "    time.sleep(1.0)  # import/construção pesados\n"
+    "    return 42\n"
+    "st.write(motor())\n"
+)
+
+
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_sessao_de_aquecimento_paga_o_custo_frio(tmp_path):
+    app = tmp_path / "app.py"
+    app.write_text(APP, encoding="utf-8")
+    port = _free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "streamlit", "run", str(app), "--server.port", str(port),
+         "--server.address", "127.0.0.1", "--server.headless", "true", "--browser.gatherUsageStats", "false"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        result = asyncio.run(warm_up(port))
+    finally:
+        process.terminate()
+        process.wait(timeout=10)
+
+    assert result["error"] is None, result
+    assert result["cold_run_s"] >= 1.0
+    assert result["warm_run_s"] < 0.5
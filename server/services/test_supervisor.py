@@ -0,0 +1,93 @@
+# test_supervisor.py
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from aiohttp import web
+from services.supervisor import CLOUDFLARE_URL_PATTERNS, Supervisor, tunnels_by_name
+
+
+def _ngrok_api(state):
+    """API local do ngrok falsa; state['tunnels'] pode mudar durante o teste"""
+
+    async def tunnels(request):
+        return web.json_response({"tunnels": state["tunnels"]})
+
+    app = web.Application()
+    app.router.add_get("/api/tunnels", tunnels)
+    return app
+
+
+async def _start(app):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+def _tunnel(url, addr):
+    return {"public_url": url, "proto": "https", "config": {"addr": addr}}
+
+
+def test_nomes_logicos_dos_tuneis():
+    assert tunnels_by_name([
+        _tunnel("https://a.ngrok-free.app", "http://localhost:5000"),
+        {"public_url": "http://a.ngrok-free.app", "proto": "http", "config": {"addr": "http://localhost:5000"}},
+        _tunnel("https://b.ngrok-free.app", "http://localhost:8501"),
+        _tunnel("https://c.ngrok-free.app", "http://localhost:9000"),
+    ]) == {
+        "proxy": "https://a.ngrok-free.app",
+        "streamlit": "https://b.ngrok-free.app",
+        "port_9000": "https://c.ngrok-free.app",
+    }
+
+
+def test_troca_de_tunel_vira_evento():
+    supervisor = Supervisor().start()
+    state = {"tunnels": [_tunnel("https://a.ngrok-free.app", "http://localhost:5000")]}
+    runner, base = supervisor._run(_start(_ngrok_api(state)))
+    recebidos = []
+    chegou = threading.Event()
+
+    def on_event(event):
+        recebidos.append(event)
+        chegou.set()
+
+    try:
+        supervisor.watch_ngrok(api_urls=["http://127.0.0.1:9/api/tunnels", base + "/api/tunnels"], interval=0.1)
+        assert supervisor.wait_for("ngrok.tunnels", timeout=3) == {"proxy": "https://a.ngrok-free.app"}
+
+        supervisor.subscribe(on_event, topics=["ngrok"])
+        assert chegou.wait(2)  # estado atual entregue na assinatura
+        time.sleep(0.4)
+        assert [e.topic for e in recebidos] == ["ngrok.api", "ngrok.tunnels"]  # sem repetições
+        chegou.clear()
+
+        inicio = time.perf_counter()
+        state["tunnels"] = [_tunnel("https://b.ngrok-free.app", "http://localhost:5000")]
+        assert chegou.wait(2)
+        assert time.perf_counter() - inicio < 1.0
+        assert recebidos[-1].value == {"proxy": "https://b.ngrok-free.app"}
+        assert recebidos[-1].previous == {"proxy": "https://a.ngrok-free.app"}
+    finally:
+        supervisor._run(runner.cleanup())
+        supervisor.stop()
+
+
+def test_saida_do_processo_publica_url():
+    supervisor = Supervisor().start()
+    script = ("import sys, time; print('INF starting', flush=True); "
+              "print('INF |  https://abc-def.trycloudflare.com  |', file=sys.stderr, flush=True); time.sleep(30)")
+    try:
+        supervisor.watch_process("cloudflared", [sys.executable, "-c", script], CLOUDFLARE_URL_PATTERNS)
+        assert supervisor.wait_for("cloudflared.url", timeout=5) == "https://abc-def.trycloudflare.com"
+        assert supervisor.get("process.cloudflared") == "running"
+
+        supervisor.stop_process("cloudflared")
+        assert supervisor.wait_for("process.cloudflared", lambda v: v.startswith("exited"), timeout=5)
+    finally:
+        supervisor.stop()
@@ -0,0 +1,68 @@
+# test_tracing.py
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import tracing
+from aiohttp import web
+from aiohttp.test_utils import TestClient, TestServer
+
+
+def test_id_recebido_e_reaproveitado_ou_gerado():
+    assert tracing.request_id_from({"X-Request-ID": "abc12345-edge"}) == "abc12345-edge"
+    gerado = tracing.request_id_from({"X-Request-ID": "curto\n"})
+    assert gerado != "curto\n" and len(gerado) == 32
+
+
+def test_span_registra_espera_upstream_e_propaga(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_writer", tracing.TraceWriter(tmp_path / "trace.jsonl"))
+
+    span = tracing.start_span("proxy", {"X-Request-ID": "req-00000001"}, "GET", "/hub/")
+    assert tracing.propagate({"x-request-id": "velho", "Accept": "*/*"}) == {
+        "Accept": "*/*", "X-Request-ID": "req-00000001"
+    }
+    with tracing.upstream_wait():
+        pass
+    registro = span.finish(200, 42)
+    assert tracing.current_span() is None
+
+    spans = list(tracing.read_spans(tmp_path / "trace.jsonl"))
+    assert spans == [registro]
+    assert registro["rid"] == "req-00000001" and registro["bytes_out"] == 42
+    assert 0 <= registro["upstream_ms"] <= registro["dur_ms"]
+
+
+def test_middleware_aiohttp_devolve_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(tracing, "_writer", tracing.TraceWriter(tmp_path / "trace.jsonl"))
+
+    async def handler(request):
+        return web.Response(text=tracing.current_span().request_id)
+
+    async def cenario():
+        app = web.Application(middlewares=[tracing.aiohttp_middleware("tunnel")])
+        app.router.add_get("/x", handler)
+        async with TestClient(TestServer(app)) as client:
+            resposta = await client.get("/x", headers={"X-Request-ID": "req-00000002"})
+            assert resposta.headers["X-Request-ID"] == "req-00000002"
+            assert await resposta.text() == "req-00000002"
+
+    asyncio.run(cenario())
+    (span,) = tracing.read_spans(tmp_path / "trace.jsonl")
+    assert span["hop"] == "tunnel" and span["status"] == 200 and span["bytes_out"] == 12
+
+
+def test_arquivo_girado_por_tamanho(tmp_path):
+    caminho = tmp_path / "trace.jsonl"
+    escritor = tracing.TraceWriter(caminho, max_bytes=200, backup_count=2)
+    outro = tracing.TraceWriter(caminho, max_bytes=200, backup_count=2)  # outro processo
+    for i in range(30):
+        (escritor if i % 2 else outro).write({"i": i, "pad": "x" * 40})
+    escritor.close()
+    outro.close()
+
+    assert caminho.stat().st_size < 400
+    assert {p.name for p in tmp_path.iterdir()} == {"trace.jsonl", "trace.jsonl.1", "trace.jsonl.2"}
+    lidos = [span["i"] for span in tracing.read_spans(caminho)]
+    assert lidos == sorted(lidos) and lidos[-1] == 29  # girados primeiro, do mais antigo
@@ -0,0 +1,80 @@
+# test_tunnel_registry.py
+import json
+import os
+import sys
+import threading
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tunnel_registry import TunnelRegistry
+
+
+def test_versao_avanca_somente_com_mudanca(tmp_path):
+    registro = TunnelRegistry(tmp_path / "registro.json", interval=0)
+    assert registro.current_url() is None and registro.version == 0
+
+    assert registro.publish({"streamlit": "https://b.ngrok-free.app", "proxy": "https://a.ngrok-free.app"},
+                            source="teste") == 1
+    assert registro.publish({"proxy": "https://a.ngrok-free.app", "streamlit": "https://b.ngrok-free.app"},
+                            source="teste") == 1
+    assert registro.current_url() == "https://a.ngrok-free.app"  # proxy tem prioridade
+    assert registro.current_url("streamlit") == "https://b.ngrok-free.app"
+
+    assert registro.publish({"port_9000": "https://c.ngrok-free.app"}, source="outro", merge=True) == 2
+    assert set(registro.urls()) == {"proxy", "streamlit", "port_9000"}
+
+    # Outro processo enxerga a mesma versão lendo o arquivo
+    conteudo = json.loads((tmp_path / "registro.json").read_text(encoding="utf-8"))
+    assert conteudo["version"] == 2 and conteudo["source"] == "outro"
+    assert not list(tmp_path.glob("*.tmp"))
+
+
+def test_campos_extras_sobrevivem_a_outras_publicacoes(tmp_path):
+    registro = TunnelRegistry(tmp_path / "registro.json", interval=0)
+    registro.publish({"proxy": "https://a.ngrok-free.app"}, source="ngrok_coordinator", pid=4321)
+
+    # o ngrok_manager e o token_manager publicam sem pid: ele continua no registro
+    assert registro.publish(url="https://b.ngrok-free.app", source="token_manager", merge=True) == 2
+    assert registro.snapshot()["pid"] == 4321
+
+    with pytest.raises(TypeError):
+        registro.publish({}, source="teste", version=99)
+
+
+def test_unpublish_remove_so_os_tuneis_informados(tmp_path):
+    registro = TunnelRegistry(tmp_path / "registro.json", interval=0)
+    registro.publish({"cloudflare": "https://c.trycloudflare.com"}, source="sync_ngrok")
+    registro.publish({"proxy": "https://a.ngrok-free.app", "streamlit": "https://b.ngrok-free.app"},
+                     source="ngrok_manager", merge=True)
+    assert registro.current_url() == "https://a.ngrok-free.app"
+
+    assert registro.unpublish({"proxy", "streamlit"}, source="ngrok_manager") == 3
+    assert registro.urls() == {"cloudflare": "https://c.trycloudflare.com"}
+    assert registro.current_url() == "https://c.trycloudflare.com"
+    assert registro.unpublish({"proxy"}, source="ngrok_manager") == 3  # nada a remover
+
+
+def test_idade_maxima(tmp_path):
+    registro = TunnelRegistry(tmp_path / "registro.json", interval=0)
+    registro.publish(url="https://a.ngrok-free.app", source="teste")
+    assert registro.current_url(max_age=60) == "https://a.ngrok-free.app"
+    assert registro.current_url(max_age=-1) is None
+
+
+def test_observador_recebe_nova_versao(tmp_path):
+    escritor = TunnelRegistry(tmp_path / "registro.json", interval=0)
+    leitor = TunnelRegistry(tmp_path / "registro.json", interval=0.05)
+    recebidos = []
+    chegou = threading.Event()
+
+    def on_change(estado):
+        recebidos.append(estado)
+        chegou.set()
+
+    parar = leitor.watch(on_change)
+    escritor.publish({"proxy": "https://a.ngrok-free.app"}, source="teste")
+    assert chegou.wait(2)
+    parar()
+    assert recebidos[-1]["version"] == 1 and recebidos[-1]["url"] == "https://a.ngrok-free.app"
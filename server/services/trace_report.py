@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+🧭 RESUMO DO RASTREAMENTO ENTRE SALTOS
+Lê o arquivo de spans (ALMA_TRACE_FILE, padrão server/logs/trace.jsonl) e mostra
+qual salto adiciona latência: tempo próprio = duração - espera pelo upstream.
+
+Uso (a partir de server/services):
+    python trace_report.py                      # resumo por salto
+    python trace_report.py --minutes 15         # apenas spans recentes
+    python trace_report.py --slowest 10         # requisições mais lentas, salto a salto
+    python trace_report.py --request <id>       # cascata de uma requisição
+"""
+
+import argparse
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from tracing import read_spans
+
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))]
+
+
+def self_time(span: dict) -> float:
+    return max(0.0, span.get("dur_ms", 0.0) - span.get("upstream_ms", 0.0))
+
+
+def hop_summary(spans: List[dict]) -> List[dict]:
+    by_hop: Dict[str, List[dict]] = defaultdict(list)
+    for span in spans:
+        by_hop[span.get("hop", "?")].append(span)
+
+    rows = []
+    for hop, items in by_hop.items():
+        durations = [s.get("dur_ms", 0.0) for s in items]
+        own = [self_time(s) for s in items]
+        rows.append({
+            "hop": hop,
+            "spans": len(items),
+            "p50_ms": percentile(durations, 50),
+            "p95_ms": percentile(durations, 95),
+            "self_p50_ms": percentile(own, 50),
+            "self_p95_ms": percentile(own, 95),
+            "self_total_s": sum(own) / 1000,
+            "errors": sum(1 for s in items if (s.get("status") or 0) >= 500),
+            "avg_bytes_out": sum(s.get("bytes_out", 0) for s in items) / len(items),
+        })
+    return sorted(rows, key=lambda r: r["self_total_s"], reverse=True)
+
+
+def group_requests(spans: List[dict]) -> Dict[str, List[dict]]:
+    requests: Dict[str, List[dict]] = defaultdict(list)
+    for span in spans:
+        requests[span.get("rid", "?")].append(span)
+    for items in requests.values():
+        items.sort(key=lambda s: s.get("ts", 0))
+    return requests
+
+
+def print_summary(spans: List[dict]):
+    print(f"{'salto':<12}{'spans':>8}{'p50':>10}{'p95':>10}{'próprio p50':>14}{'próprio p95':>14}"
+          f"{'próprio total':>16}{'5xx':>6}{'bytes médios':>14}")
+    for row in hop_summary(spans):
+        print(f"{row['hop']:<12}{row['spans']:>8}{row['p50_ms']:>9.1f}ms{row['p95_ms']:>8.1f}ms"
+              f"{row['self_p50_ms']:>12.1f}ms{row['self_p95_ms']:>12.1f}ms{row['self_total_s']:>15.2f}s"
+              f"{row['errors']:>6}{row['avg_bytes_out']:>14.0f}")
+
+
+def print_waterfall(request_id: str, items: List[dict]):
+    origin = items[0].get("ts", 0)
+    print(f"== {request_id}  {items[0].get('method', '')} {items[0].get('path', '')}")
+    for span in items:
+        offset = (span.get("ts", 0) - origin) * 1000
+        print(f"   +{offset:8.1f}ms  {span.get('hop', '?'):<10} {span.get('status')!s:>4}  "
+              f"total {span.get('dur_ms', 0):8.1f}ms  upstream {span.get('upstream_ms', 0):8.1f}ms  "
+              f"próprio {self_time(span):8.1f}ms  {span.get('bytes_out', 0)} B")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resumo dos spans X-Request-ID por salto")
+    parser.add_argument("--file", help="Arquivo de spans (padrão: ALMA_TRACE_FILE ou server/logs/trace.jsonl)")
+    parser.add_argument("--minutes", type=float, help="Considerar apenas os últimos N minutos")
+    parser.add_argument("--hop", help="Filtrar por salto (gateway, proxy, edge, tunnel, flask, hub...)")
+    parser.add_argument("--slowest", type=int, metavar="N", help="Mostrar as N requisições mais lentas")
+    parser.add_argument("--request", metavar="ID", help="Cascata de uma requisição")
+    args = parser.parse_args()
+
+    spans = list(read_spans(args.file))
+    if args.minutes:
+        since = time.time() - args.minutes * 60
+        spans = [s for s in spans if s.get("ts", 0) >= since]
+
+    if args.request:
+        items = group_requests(spans).get(args.request)
+        if not items:
+            print(f"Nenhum span para {args.request}")
+            return
+        print_waterfall(args.request, items)
+        return
+
+    if args.hop:
+        spans = [s for s in spans if s.get("hop") == args.hop]
+    if not spans:
+        print("Nenhum span encontrado")
+        return
+
+    requests = group_requests(spans)
+    print(f"📊 {len(spans)} spans, {len(requests)} requisições")
+    print_summary(spans)
+
+    if args.slowest:
+        print()
+        slowest = sorted(requests.items(), key=lambda item: max(s.get("dur_ms", 0) for s in item[1]), reverse=True)
+        for request_id, items in slowest[:args.slowest]:
+            print_waterfall(request_id, items)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+# tracing.py
+"""
+Rastreamento entre saltos com X-Request-ID
+Cada salto (proxy, tunnel, Flask, Streamlit) registra um span leve - início, duração,
+espera pelo upstream e bytes - em um arquivo JSONL apenas de anexação, girado por tamanho
+(trace.jsonl.1 ... .N, como os logs do log_multiplexer). ALMA_TRACE=0 desliga.
+Resumo: python trace_report.py (em server/services)
+"""
+
+import json
+import logging
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Iterator, Optional
+
+logger = logging.getLogger("Tracing")
+
+REQUEST_ID_HEADER = "X-Request-ID"
+TRACE_ENABLED = os.getenv("ALMA_TRACE", "1") == "1"
+DEFAULT_TRACE_FILE = Path(__file__).parent.parent / "logs" / "trace.jsonl"  # server/logs (no .gitignore)
+MAX_BYTES = int(os.getenv("ALMA_TRACE_MAX_BYTES", 10 * 1024 * 1024))
+BACKUP_COUNT = 3
+CHECK_EVERY = 64 * 1024  # bytes anexados por este processo entre duas verificações de tamanho
+
+# Ids recebidos de fora só são aceitos se forem curtos e sem caracteres de controle
+_VALID_ID = re.compile(r"^[A-Za-z0-9._:-]{8,128}$")
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("alma_span", default=None)
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex
+
+
+def request_id_from(headers) -> str:
+    """Reaproveita o X-Request-ID do salto anterior ou gera um novo"""
+    incoming = headers.get(REQUEST_ID_HEADER) if headers is not None else None
+    if incoming and _VALID_ID.match(incoming):
+        return incoming
+    return new_request_id()
+
+
+def backup_path(path: Path, index: int) -> Path:
+    return path.with_name(f"{path.name}.{index}")
+
+
+class TraceWriter:
+    """
+    Anexa uma linha JSON por span. Cada linha vai em um único os.write com O_APPEND,
+    então vários processos podem compartilhar o mesmo arquivo sem intercalar linhas.
+    A linha (~250 bytes) vai para o cache de páginas do SO; não há fsync no caminho da requisição.
+
+    O tamanho só é conferido a cada CHECK_EVERY bytes anexados (um stat + fstat): passando de
+    max_bytes o arquivo é girado, e um processo cujo arquivo foi girado por outro reabre o novo.
+    """
+
+    def __init__(self, path=None, max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT):
+        self.path = Path(path or os.getenv("ALMA_TRACE_FILE", DEFAULT_TRACE_FILE))
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self._fd = None
+        self._unchecked = 0
+        self._failed = False
+
+    def write(self, record: dict):
+        if self._failed:
+            return
+        line = (json.dumps(record, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            if self._fd is None:
+                self._open()
+                self._check_rollover()
+            elif self._unchecked >= min(CHECK_EVERY, self.max_bytes):
+                self._check_rollover()
+            os.write(self._fd, line)
+            self._unchecked += len(line)
+        except OSError as e:
+            self._failed = True
+            logger.warning(f"Rastreamento desativado, não foi possível escrever em {self.path}: {e}")
+
+    def _open(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        self._unchecked = 0
+
+    def _check_rollover(self):
+        self._unchecked = 0
+        try:
+            current = os.stat(self.path)
+        except FileNotFoundError:
+            current = None
+        if current is None or current.st_ino != os.fstat(self._fd).st_ino:
+            self.close()  # outro processo girou o arquivo
+            self._open()
+            return
+        if current.st_size < self.max_bytes:
+            return
+        try:
+            self._rotate()
+        except OSError as e:  # ex.: Windows não renomeia arquivo aberto por outro processo
+            logger.debug(f"Não foi possível girar {self.path}: {e}")
+            return
+        self.close()
+        self._open()
+
+    def _rotate(self):
+        if self.backup_count <= 0:
+            os.unlink(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = backup_path(self.path, index)
+            if source.exists():
+                os.replace(source, backup_path(self.path, index + 1))
+        os.replace(self.path, backup_path(self.path, 1))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+_writer = TraceWriter()
+
+
+class Span:
+    """Um salto de uma requisição"""
+
+    __slots__ = ("hop", "request_id", "method", "path", "start", "_t0",
+                 "upstream_wait", "bytes_in", "bytes_out", "_token")
+
+    def __init__(self, hop: str, request_id: str, method: str = "", path: str = ""):
+        self.hop = hop
+        self.request_id = request_id
+        self.method = method
+        self.path = path
+        self.start = time.time()
+        self._t0 = time.perf_counter()
+        self.upstream_wait = 0.0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._token = None
+
+    @contextmanager
+    def upstream(self):
+        """Cronometra o tempo gasto esperando o próximo salto"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.upstream_wait += time.perf_counter() - started
+
+    def finish(self, status: Optional[int] = None, bytes_out: Optional[int] = None) -> dict:
+        if bytes_out is not None:
+            self.bytes_out = bytes_out
+        record = {
+            "ts": round(self.start, 6),
+            "rid": self.request_id,
+            "hop": self.hop,
+            "method": self.method,
+            "path": self.path,
+            "status": status,
+            "dur_ms": round((time.perf_counter() - self._t0) * 1000, 3),
+            "upstream_ms": round(self.upstream_wait * 1000, 3),
+            "bytes_in": self.bytes_in,
+            "bytes_out": self.bytes_out,
+            "pid": os.getpid(),
+        }
+        if self._token is not None:
+            try:
+                _current_span.reset(self._token)
+            except ValueError:
+                pass  # finalizado em outro contexto (ex.: outra task)
+            self._token = None
+        if TRACE_ENABLED:
+            _writer.write(record)
+        return record
+
+
+def start_span(hop: str, headers=None, method: str = "", path: str = "") -> Span:
+    """Abre o span do salto atual e o torna visível para upstream_wait()/propagate()"""
+    span = Span(hop, request_id_from(headers), method, path)
+    span._token = _current_span.set(span)
+    return span
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+@contextmanager
+def upstream_wait():
+    span = _current_span.get()
+    if span is None:
+        yield
+        return
+    with span.upstream():
+        yield
+
+
+def propagate(headers: dict) -> dict:
+    """Acrescenta o X-Request-ID do span atual aos headers enviados ao próximo salto"""
+    span = _current_span.get()
+    if span is not None:
+        headers = {k: v for k, v in headers.items() if k.lower() != REQUEST_ID_HEADER.lower()}
+        headers[REQUEST_ID_HEADER] = span.request_id
+    return headers
+
+
+# ==================== INTEGRAÇÕES ====================
+
+def aiohttp_middleware(hop: str):
+    """Middleware aiohttp: span por requisição e X-Request-ID na resposta"""
+    from aiohttp import web
+
+    @web.middleware
+    async def trace_middleware(request, handler):
+        span = start_span(hop, request.headers, request.method, request.path)
+        span.bytes_in = request.content_length or 0
+        status, body = 500, None
+        try:
+            response = await handler(request)
+            status = response.status
+            body = getattr(response, "body", None)
+            if not response.prepared:
+                response.headers[REQUEST_ID_HEADER] = span.request_id
+            return response
+        except web.HTTPException as e:
+            status = e.status
+            e.headers[REQUEST_ID_HEADER] = span.request_id
+            raise
+        finally:
+            span.finish(status, len(body) if isinstance(body, (bytes, bytearray)) else None)
+
+    return trace_middleware
+
+
+def fastapi_middleware(hop: str):
+    """Middleware HTTP do FastAPI/Starlette: app.middleware("http")(fastapi_middleware("proxy"))"""
+
+    async def trace_middleware(request, call_next):
+        span = start_span(hop, request.headers, request.method, request.url.path)
+        span.bytes_in = int(request.headers.get("content-length") or 0)
+        status = 500
+        response = None
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            response.headers[REQUEST_ID_HEADER] = span.request_id
+            return response
+        finally:
+            length = response.headers.get("content-length") if response is not None else None
+            span.finish(status, int(length) if length else None)
+
+    return trace_middleware
+
+
+def init_flask(app, hop: str = "flask"):
+    """Registra o span por requisição na API Flask"""
+    from flask import g, request
+
+    @app.before_request
+    def _start_trace_span():
+        g.trace_span = start_span(hop, request.headers, request.method, request.path)
+        g.trace_span.bytes_in = request.content_length or 0
+        g.request_id = g.trace_span.request_id
+
+    @app.after_request
+    def _finish_trace_span(response):
+        span = g.pop("trace_span", None)
+        if span is not None:
+            response.headers[REQUEST_ID_HEADER] = span.request_id
+            span.finish(response.status_code, response.calculate_content_length())
+        return response
+
+
+@contextmanager
+def streamlit_rerun_span(hop: str) -> Iterator[Optional[Span]]:
+    """
+    Span de uma execução do script Streamlit. O id vem do handshake do WebSocket
+    (st.context.headers), então todas as execuções de uma sessão ficam ligadas ao mesmo id.
+    """
+    headers = None
+    try:
+        import streamlit as st
+        headers = st.context.headers
+    except Exception:
+        pass
+    span = start_span(hop, headers, "RERUN", hop)
+    try:
+        yield span
+    finally:
+        span.finish(200)
+
+
+def read_spans(path=None) -> Iterator[dict]:
+    """Lê o arquivo de rastreamento (girados primeiro, do mais antigo) ignorando linhas incompletas"""
+    path = Path(path or os.getenv("ALMA_TRACE_FILE", DEFAULT_TRACE_FILE))
+    files = [backup_path(path, index) for index in range(BACKUP_COUNT, 0, -1)] + [path]
+    for name in files:
+        if not name.exists():
+            continue
+        with open(name, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    continue
@@ -0,0 +1,248 @@
+# tunnel_registry.py
+"""
+Registro único das URLs públicas dos túneis
+Um arquivo JSON escrito de forma atômica (arquivo temporário + os.replace) com contador de versão.
+Substitui o cache de 30s do ConnectionManager, o .ngrok_cache.json do token_manager e os
+.ngrok_coordinator.json/.ngrok_redirects.json do NgrokCoordinator/NgrokManager.
+
+Leitura: O(1) em memória; no máximo um stat() a cada 'interval' segundos, relendo o JSON
+apenas quando o arquivo muda. Nenhuma chamada HTTP à API do ngrok no caminho da requisição.
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Optional, Union
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger("TunnelRegistry")
+
+DEFAULT_REGISTRY_FILE = Path(__file__).parent.parent / ".tunnel_registry.json"
+
+# Ordem de preferência da URL principal (mesma do NgrokManager.update_bridge_config)
+MAIN_URL_PRIORITY = ('proxy', 'streamlit')
+
+
+def _empty() -> dict:
+    return {"version": 0, "updated": None, "source": None, "url": None, "urls": {}}
+
+
+def main_url(urls: Dict[str, str]) -> Optional[str]:
+    for name in MAIN_URL_PRIORITY:
+        if urls.get(name):
+            return urls[name]
+    return next(iter(urls.values()), None)
+
+
+@contextmanager
+def _file_lock(path: Path):
+    """Lock entre processos para o ciclo ler-incrementar-gravar da versão"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a+b") as handle:
+        if fcntl is not None:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX)
+        else:
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+            else:
+                handle.seek(0)
+                msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class TunnelRegistry:
+    """Leitor/escritor do registro; uma instância por processo (tunnel_registry)"""
+
+    def __init__(self, path: Union[str, Path, None] = None, interval: float = 0.5):
+        self.path = Path(path or os.getenv("ALMA_TUNNEL_REGISTRY", DEFAULT_REGISTRY_FILE))
+        self.interval = interval
+        self.reloads = 0
+        self._data = _empty()
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._watchers = []
+        self._watch_thread: Optional[threading.Thread] = None
+
+    # ==================== LEITURA ====================
+
+    def refresh(self, force: bool = False) -> dict:
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return self._data
+        self._next_check = now + self.interval
+
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return self._data
+        signature = (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        if signature == self._signature:
+            return self._data
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Não foi possível ler o registro de túneis {self.path}: {e}")
+            return self._data
+
+        with self._lock:
+            self._data = {**_empty(), **data}
+            self._signature = signature
+            self.reloads += 1
+        return self._data
+
+    @property
+    def version(self) -> int:
+        return self.refresh()["version"]
+
+    def current_url(self, name: Optional[str] = None, max_age: Optional[float] = None) -> Optional[str]:
+        """URL principal (ou a do túnel 'name'); None se o registro for mais antigo que max_age"""
+        data = self.refresh()
+        if max_age is not None and (not data["updated"] or time.time() - data["updated"] > max_age):
+            return None
+        if name:
+            return data["urls"].get(name)
+        return data["url"]
+
+    def urls(self) -> Dict[str, str]:
+        return dict(self.refresh()["urls"])
+
+    def snapshot(self) -> dict:
+        return dict(self.refresh())
+
+    # ==================== ESCRITA ====================
+
+    def publish(self, urls: Optional[Dict[str, str]] = None, source: str = "", url: Optional[str] = None,
+                merge: bool = False, **extra) -> int:
+        """
+        Grava um novo estado e devolve a versão. Sem mudança nas URLs a versão não avança.
+        merge=True preserva os túneis já registrados e só acrescenta/atualiza os informados.
+        Campos extras (ex.: pid do ngrok) ficam no registro até alguém gravar outro valor:
+        uma publicação que não os informa não os apaga.
+        """
+        reserved = sorted(set(extra) & set(_empty()))
+        if reserved:
+            raise TypeError(f"Campos reservados do registro não podem ser publicados: {', '.join(reserved)}")
+        with _file_lock(self.path.with_name(self.path.name + ".lock")):
+            current = self.refresh(force=True)
+            new_urls = {**current["urls"], **(urls or {})} if merge else dict(urls or {})
+            return self._commit(current, new_urls, url or main_url(new_urls), source, extra)
+
+    def unpublish(self, names, source: str = "") -> int:
+        """
+        Remove só os túneis 'names' e devolve a versão; os publicados por outros processos
+        (ex.: cloudflare pelo sync_ngrok) continuam no registro.
+        A URL principal é recalculada apenas se apontava para um túnel removido.
+        """
+        with _file_lock(self.path.with_name(self.path.name + ".lock")):
+            current = self.refresh(force=True)
+            removed = {current["urls"][name] for name in names if name in current["urls"]}
+            new_urls = {name: u for name, u in current["urls"].items() if name not in names}
+            new_url = main_url(new_urls) if current["url"] in removed else current["url"]
+            return self._commit(current, new_urls, new_url, source, {})
+
+    def _commit(self, current: dict, new_urls: Dict[str, str], new_url: Optional[str], source: str,
+                extra: dict) -> int:
+        """Grava o novo estado (chamado com o lock do arquivo); sem mudança a versão não avança"""
+        if new_urls == current["urls"] and new_url == current["url"] and \
+                all(current.get(k) == v for k, v in extra.items()):
+            return current["version"]
+
+        data = {
+            **{k: v for k, v in current.items() if k not in _empty()},
+            **extra,
+            "version": current["version"] + 1,
+            "updated": time.time(),
+            "source": source,
+            "url": new_url,
+            "urls": new_urls,
+        }
+        self._write(data)
+        self.refresh(force=True)
+        logger.info(f"🌐 Registro de túneis v{data['version']} ({source}): {new_url}")
+        return data["version"]
+
+    def _write(self, data: dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix=self.path.name, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, self.path)  # leitores veem o arquivo antigo ou o novo, nunca metade
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    # ==================== OBSERVAÇÃO ====================
+
+    def watch(self, callback: Callable[[dict], None], interval: Optional[float] = None) -> Callable[[], None]:
+        """
+        Chama callback(estado) a cada nova versão (stat() periódico em uma thread compartilhada;
+        inotify não está na biblioteca padrão e o stat de um arquivo é barato).
+        Devolve a função que cancela a observação.
+        """
+        with self._lock:
+            self._watchers.append(callback)
+            if self._watch_thread is None:
+                self._watch_thread = threading.Thread(
+                    target=self._watch_loop, args=(interval or self.interval,), name="tunnel-registry", daemon=True
+                )
+                self._watch_thread.start()
+
+        def unwatch():
+            with self._lock:
+                if callback in self._watchers:
+                    self._watchers.remove(callback)
+
+        return unwatch
+
+    def _watch_loop(self, interval: float):
+        seen = self.refresh(force=True)["version"]
+        while True:
+            time.sleep(interval)
+            data = self.refresh(force=True)
+            if data["version"] == seen:
+                continue
+            seen = data["version"]
+            for callback in list(self._watchers):
+                try:
+                    callback(dict(data))
+                except Exception as e:
+                    logger.error(f"❌ Erro no observador do registro: {e}")
+
+    def stats(self) -> dict:
+        data = self.refresh()
+        return {
+            "path": str(self.path),
+            "version": data["version"],
+            "url": data["url"],
+            "source": data["source"],
+            "age_s": round(time.time() - data["updated"], 1) if data["updated"] else None,
+            "reloads": self.reloads,
+            "watchers": len(self._watchers),
+        }
+
+
+# Instância compartilhada do processo
+tunnel_registry = TunnelRegistry()
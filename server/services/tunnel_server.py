@@ -3,6 +3,12 @@ import aiohttp
 from aiohttp import web, WSMsgType
 import logging
 import httpx
+from admission import AdmissionRejected, build_controllers, classify, controllers_stats
+from ip_blocklist import is_local_client
+from mux import MUX_PATH, MuxConnection, MuxStream, relay
+from replica_pool import ReplicaPool, replica_count, replica_urls, streamlit_session_id
+from response_cache import CachedResponse, ResponseCache
+from tracing import REQUEST_ID_HEADER, aiohttp_middleware, propagate, start_span, upstream_wait
 
 # Configuração
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -14,30 +20,51 @@ SERVICES = {
     'seletor': {
         'url': 'http://localhost:8501', 
         'path': '/seletor',
-        'health_endpoint': '/seletor/_stcore/health'
+        'health_endpoint': '/seletor/_stcore/health',
+        'replicas': replica_count('hub')
     },
     'daytrade': {  # ✅ Nome único
         'url': 'http://localhost:8502',
         'path': '/daytrade',  # ✅ Path único
-        'health_endpoint': '/daytrade/_stcore/health'
+        'health_endpoint': '/daytrade/_stcore/health',
+        'replicas': replica_count('daytrade')
     },
     'sports': {  # ✅ Nome único  
         'url': 'http://localhost:8503',
         'path': '/sports',  # ✅ Path único
-        'health_endpoint': '/sports/_stcore/health'
+        'health_endpoint': '/sports/_stcore/health',
+        'replicas': replica_count('sports')
     },
     'quantum': {  # ✅ Nome único
         'url': 'http://localhost:8504', 
         'path': '/quantum',  # ✅ Path único
-        'health_endpoint': '/quantum/_stcore/health'
+        'health_endpoint': '/quantum/_stcore/health',
+        'replicas': replica_count('quantum')
     },
 }
 
+@web.middleware
+async def edge_stats_middleware(request, handler):
+    # 📊 /_edge/* expõe estado interno: só para quem está no servidor
+    if request.path.startswith('/_edge/') and not is_local_client(request.remote, request.headers):
+        return web.json_response({'error': 'Disponível apenas no servidor local'}, status=403)
+    return await handler(request)
+
 class TunnelServer:
     def __init__(self):
-        self.app = web.Application()
+        # 🧭 Span por requisição com X-Request-ID propagado para os apps
+        self.app = web.Application(middlewares=[aiohttp_middleware("tunnel"), edge_stats_middleware])
         self.setup_routes()
         self.session = None
+        # 🔁 Pool de réplicas por serviço (least-connections + afinidade)
+        self.pools = {
+            name: ReplicaPool(name, replica_urls(config['url'], config.get('replicas', 1)))
+            for name, config in SERVICES.items()
+        }
+        # ⚡ Cache de borda para GETs idempotentes dos apps Streamlit
+        self.cache = ResponseCache.from_env()
+        # 🚦 Limite de requisições simultâneas por serviço
+        self.admission = build_controllers(self.pools)
         
     async def startup(self, app):
         self.session = aiohttp.ClientSession()
@@ -47,6 +74,13 @@ class TunnelServer:
             await self.session.close()
             
     def setup_routes(self):
+        # Métricas do cache de borda
+        self.app.router.add_get('/_edge/cache', self.cache_stats)
+        self.app.router.add_get('/_edge/admission', self.admission_stats)
+        
+        # 🔗 Link multiplexado persistente com o proxy de borda
+        self.app.router.add_get(MUX_PATH, self.mux_endpoint)
+        
         # WebSocket tunnel para serviços Streamlit
         self.app.router.add_route('*', '/{service}/_stcore/stream', self.websocket_tunnel)
         
@@ -60,20 +94,26 @@ class TunnelServer:
             return web.Response(text='Service not found', status=404)
             
         service_config = SERVICES[service]
-        target_ws_url = f"{service_config['url'].replace('http', 'ws')}{service_config['path']}/_stcore/stream"
+        pool = self.pools[service]
+        replica = pool.choose(
+            cookie=request.cookies.get(pool.cookie_name),
+            session_id=streamlit_session_id(ws_protocol=request.headers.get('Sec-WebSocket-Protocol', ''))
+        )
+        target_ws_url = f"{replica.url.replace('http', 'ws')}{service_config['path']}/_stcore/stream"
         
         logger.info(f"🔌 Conectando WebSocket para serviço: {service} -> {target_ws_url}")
         
         ws = web.WebSocketResponse()
         await ws.prepare(request)
         
+        pool.acquire(replica)
         try:
             async with self.session.ws_connect(
                 target_ws_url,
-                headers={
+                headers=propagate({
                     'Origin': 'http://localhost:5500',
                     'Sec-WebSocket-Protocol': 'v4.streamlit.connection'
-                }
+                })
             ) as target_ws:
                 logger.info(f"✅ Conexão WebSocket estabelecida com {service}")
                 
@@ -93,13 +133,64 @@ class TunnelServer:
                 
                 await asyncio.gather(forward_to_service(), forward_from_service())
                 
+        except aiohttp.ClientConnectorError as e:
+            logger.error(f"❌ Réplica {replica.url} indisponível para {service}: {e}")
+            pool.mark_failed(replica)
         except Exception as e:
             logger.error(f"❌ Erro no tunnel para {service}: {e}")
         finally:
+            pool.release(replica)
             await ws.close()
             
         return ws
         
+    async def mux_endpoint(self, request):
+        """Conexão persistente do proxy de borda: cada stream lógico vira um WebSocket Streamlit"""
+        ws = web.WebSocketResponse(max_msg_size=0, heartbeat=30)
+        await ws.prepare(request)
+        logger.info(f"🔗 Link multiplexado aberto por {request.remote}")
+        connection = MuxConnection(ws, on_open=self.mux_stream, first_id=2)
+        await connection.run()
+        logger.info(f"🔗 Link multiplexado encerrado ({request.remote})")
+        return ws
+        
+    async def mux_stream(self, stream: MuxStream, meta: dict):
+        service = meta.get('service')
+        if service not in SERVICES:
+            await stream.reject('Service not found')
+            return
+            
+        pool = self.pools[service]
+        replica = pool.choose(
+            cookie=meta.get('cookie'),
+            session_id=streamlit_session_id(ws_protocol=meta.get('protocol', ''))
+        )
+        target_ws_url = f"{replica.url.replace('http', 'ws')}{SERVICES[service]['path']}/_stcore/stream"
+        
+        # Cada stream lógico é um salto próprio no rastreamento
+        span = start_span('tunnel', {REQUEST_ID_HEADER: meta.get('request_id')}, 'WS', f"/{service}/_stcore/stream")
+        status = 502
+        pool.acquire(replica)
+        try:
+            async with self.session.ws_connect(
+                target_ws_url,
+                headers=propagate({
+                    'Origin': 'http://localhost:5500',
+                    'Sec-WebSocket-Protocol': 'v4.streamlit.connection'
+                }),
+                max_msg_size=0
+            ) as target_ws:
+                await stream.accept()
+                status = 101
+                await relay(stream, target_ws)
+        except aiohttp.ClientConnectorError as e:
+            logger.error(f"❌ Réplica {replica.url} indisponível para {service}: {e}")
+            pool.mark_failed(replica)
+            await stream.reject(f'Replica indisponivel: {replica.url}')
+        finally:
+            pool.release(replica)
+            span.finish(status)
+        
     # No método http_proxy, substitua esta parte:
     async def http_proxy(self, request):
         service = request.match_info['service']
@@ -108,45 +199,56 @@ class TunnelServer:
         if service not in SERVICES:
             return web.Response(text='Service not found', status=404)
             
+        cache_key = self.cache.request_key(request.method, f"{service}/{path}", request.query_string, request.headers)
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return web.Response(status=cached.status, headers=cached.headers, body=cached.body)
+        
+        controller = self.admission[service]
+        try:
+            await controller.acquire(classify(path))
+        except AdmissionRejected as e:
+            return web.json_response(e.to_dict(), status=e.status, headers=e.headers)
+        try:
+            return await self.forward(request, service, path, cache_key)
+        finally:
+            controller.release()
+    
+    async def forward(self, request, service, path, cache_key):
         service_config = SERVICES[service]
-        target_url = f"{service_config['url']}{service_config['path']}/{path}"
+        pool = self.pools[service]
+        replica = pool.choose(
+            cookie=request.cookies.get(pool.cookie_name),
+            session_id=streamlit_session_id(path)
+        )
+        target_url = f"{replica.url}{service_config['path']}/{path}"
         
         if request.query_string:
             target_url += f"?{request.query_string}"
             
         logger.info(f"🔁 HTTP para serviço: {request.path} -> {target_url}")
         
-        headers = {k: v for k, v in request.headers.items() if k.lower() != 'host'}
+        headers = propagate({k: v for k, v in request.headers.items() if k.lower() != 'host'})
         
+        pool.acquire(replica)
         try:
-            async with self.session.request(
-                method=request.method,
-                url=target_url,
-                headers=headers,
-                data=await request.read() if request.can_read_body else None,
-                allow_redirects=False  # 🔥 IMPORTANTE: Não seguir redirecionamentos automaticamente
-            ) as response:
-                
-                # 🔥 TRATAR REDIRECIONAMENTOS MANUALMENTE
-                if response.status in [301, 302, 307, 308]:
-                    location = response.headers.get('location', '')
-                    if location and location.startswith('/'):
-                        # Redirecionamento relativo - ajustar para URL completa
-                        location = f"{service_config['url']}{service_config['path']}{location}"
-                    return web.Response(
-                        status=response.status,
-                        headers=dict(response.headers),
-                        body=await response.read()
-                    )
-                
-                return web.Response(
-                    status=response.status,
-                    headers=dict(response.headers),
-                    body=await response.read()
+            if cache_key:
+                upstream = await self.cache.fetch(
+                    cache_key, f"{service}/{path}",
+                    lambda: self.fetch_upstream(request, target_url, headers),
+                    request.headers
                 )
+            else:
+                upstream = await self.fetch_upstream(request, target_url, headers)
+            
+            proxied = web.Response(status=upstream.status, headers=upstream.headers, body=upstream.body)
+            if len(pool) > 1:
+                proxied.set_cookie(pool.cookie_name, str(replica.index), httponly=True, samesite='Lax')
+            return proxied
                 
         except aiohttp.ClientConnectorError:
-            logger.error(f"❌ Serviço {service} offline na porta {service_config['url'].split(':')[-1]}")
+            pool.mark_failed(replica)
+            logger.error(f"❌ Serviço {service} offline em {replica.url}")
             return web.Response(
                 text=f"Serviço {service} indisponível. Execute: streamlit run {service}.py --server.port={service_config['url'].split(':')[-1]} --server.baseUrlPath={service}",
                 status=503
@@ -154,6 +256,31 @@ class TunnelServer:
         except aiohttp.ClientError as e:
             logger.error(f"❌ Erro de conexão: {e}")
             return web.Response(text=f"Service {service} unavailable", status=503)
+        finally:
+            pool.release(replica)
+        
+    async def fetch_upstream(self, request, target_url, headers) -> CachedResponse:
+        body = await request.read() if request.can_read_body else None
+        with upstream_wait():
+            async with self.session.request(
+                method=request.method,
+                url=target_url,
+                headers=headers,
+                data=body,
+                allow_redirects=False  # 🔥 IMPORTANTE: Não seguir redirecionamentos automaticamente
+            ) as response:
+                # Redirecionamentos seguem para o navegador sem alteração
+                return CachedResponse(
+                    status=response.status,
+                    headers=dict(response.headers),
+                    body=await response.read()
+                )
+    
+    async def cache_stats(self, request):
+        return web.json_response(self.cache.stats())
+    
+    async def admission_stats(self, request):
+        return web.json_response(controllers_stats(self.admission))
         
     async def http_proxy_root(self, request):
         # Para requisições na raiz, redireciona para seletor
@@ -13,6 +13,11 @@ import threading
 import os
 from pathlib import Path
 import logging
+from services.replica_pool import replica_count, replica_ports
+from services.startup_orchestrator import ServiceSpec, StartupOrchestrator, format_report
+from services.log_multiplexer import log_multiplexer
+from services.health_monitor import HealthMonitor, HealthTarget
+from services import streamlit_warmup
 
 # ==============================
 # CONFIGURAÇÃO AVANÇADA
@@ -31,6 +36,10 @@ logger = logging.getLogger("SystemManager")
 
 BASE_DIR = Path(__file__).parent.parent
 
+# ALMA_STREAMLIT_HOST=1 sobe um só Streamlit com os quatro apps como páginas (mesma chave do routes.py)
+STREAMLIT_HOST = os.getenv("ALMA_STREAMLIT_HOST") == "1"
+HOST_PAGES = ("", "daytrade", "sports", "quantum")
+
 # ==============================
 # STREAMLIT MANAGER (SEU CÓDIGO)
 # ==============================
@@ -53,10 +62,23 @@ class StreamlitManager:
             "streamlit_quantum": BASE_DIR / "server" / "scripts" / "seletor" / "ApostaPro" / "main.py"
         }
 
+        # 🧩 Servidor único: o hub vira host.py e os outros apps são páginas dele
+        if STREAMLIT_HOST:
+            self.ports = {"streamlit_hub": 8501}
+            self.app_paths = {"streamlit_hub": BASE_DIR / "server" / "scripts" / "seletor" / "host.py"}
+
+        # 🔁 Réplicas extras (ALMA_REPLICAS_<SERVICO>=N) viram apps próprios
+        for app_name, port in list(self.ports.items()):
+            count = replica_count(app_name.replace("streamlit_", ""))
+            for i, replica_port in enumerate(replica_ports(port, count)[1:], start=1):
+                replica_name = f"{app_name}_r{i}"
+                self.ports[replica_name] = replica_port
+                self.app_paths[replica_name] = self.app_paths[app_name]
+
         self.processes = {}
 
-    def start_streamlit(self, app_name: str, port: int, headless: bool = True):
-        """Inicia um aplicativo Streamlit específico"""
+    def launch_streamlit(self, app_name: str, port: int, headless: bool = True):
+        """Dispara o processo do Streamlit sem esperar (a prontidão é verificada por quem chama)"""
         app_path = self.app_paths.get(app_name)
         
         # ✅ VERIFICAÇÃO ADICIONADA
@@ -90,24 +112,32 @@ class StreamlitManager:
             process = subprocess.Popen(
                 cmd,
                 cwd=app_path.parent,
-                stdout=subprocess.DEVNULL if headless else None,
-                stderr=subprocess.DEVNULL if headless else None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
                 text=True,
+                encoding="utf-8",
+                errors="replace",
                 env=env
             )
+            # 📜 Saída drenada para logs/<app>.log; o hub (não headless) também aparece no console
+            log_multiplexer.attach(app_name, process, echo=not headless)
         except Exception as e:
             logger.error(f"Erro ao iniciar {app_name}: {e}")
             return None
 
-        # Aguarda para checar se o processo iniciou
-        time.sleep(3)
-        if process.poll() is None:
-            self.processes[app_name] = process
-            logger.info(f"{app_name} iniciado na porta {port} (PID: {process.pid})")
-            return process
-        else:
-            logger.error(f"{app_name} falhou ao iniciar")
+        self.processes[app_name] = process
+        logger.info(f"{app_name} disparado na porta {port} (PID: {process.pid})")
+        return process
+
+    def start_streamlit(self, app_name: str, port: int, headless: bool = True):
+        """Inicia um aplicativo Streamlit específico e espera o /_stcore/health"""
+        process = self.launch_streamlit(app_name, port, headless)
+        if process is None:
             return None
+        if self.wait_for_streamlit(port) and process.poll() is None:
+            return process
+        logger.error(f"{app_name} falhou ao iniciar")
+        return None
 
     def wait_for_streamlit(self, port: int, timeout: int = 30) -> bool:
         """Aguarda até que o Streamlit esteja respondendo"""
@@ -122,7 +152,7 @@ class StreamlitManager:
                     return True
             except requests.RequestException:
                 pass
-            time.sleep(2)
+            time.sleep(0.25)
 
         logger.error(f"❌ Timeout aguardando Streamlit na porta {port}")
         return False
@@ -138,18 +168,26 @@ SERVICES = {
         "cwd": BASE_DIR,  # ✅ flux_on/
         "health_endpoint": "/api/health",
         "startup_time": 10,  # ✅ Aumentar tempo
-        "max_retries": 3
+        "max_retries": 3,
+        "depends_on": []
     },
     "fastapi_proxy": {
         "port": 5001, 
-        "command": ["python", "proxy_server.py"],
+        # ALMA_EDGE_GATEWAY=1 usa o gateway asyncio consolidado no lugar do proxy FastAPI
+        "command": ["python", "gateway.py" if os.getenv("ALMA_EDGE_GATEWAY") == "1" else "proxy_server.py"],
         "cwd": BASE_DIR / "server" / "services",  # ✅ Diretório correto
         "health_endpoint": "/health",
         "startup_time": 5,
-        "max_retries": 3
+        "max_retries": 3,
+        "depends_on": ["flask_api"]  # encaminha /api e /login para o Flask
     }
 }
 
+# Dependências dos apps Streamlit (réplicas herdam as do app base); o hub valida tokens no Flask
+STREAMLIT_DEPENDS_ON = {
+    "streamlit_hub": ["flask_api"],
+}
+
 # ==============================
 # FUNÇÕES AUXILIARES
 # ==============================
@@ -172,22 +210,32 @@ def check_service_health(port: int, endpoint: str = "") -> bool:
             time.sleep(0.5)
     return False
 
-def start_service(name: str, config: dict):
-    """Inicia um serviço"""
+def launch_service(name: str, config: dict):
+    """Dispara o processo do serviço sem esperar; None se a porta já estiver ocupada"""
     logger.info(f"Iniciando serviço {name}...")
     
     if is_port_in_use(config["port"]):
         logger.warning(f"Porta {config['port']} já está em uso para {name}")
         return None
     
+    process = subprocess.Popen(
+        config["command"],
+        cwd=config["cwd"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        encoding="utf-8",
+        errors="replace"
+    )
+    # 📜 Sem leitor o pipe enche e o filho trava; o multiplexador drena em segundo plano
+    return log_multiplexer.attach(name, process)
+
+def start_service(name: str, config: dict):
+    """Inicia um serviço"""
     try:
-        process = subprocess.Popen(
-            config["command"],
-            cwd=config["cwd"],
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True
-        )
+        process = launch_service(name, config)
+        if process is None:
+            return None
         
         startup_time = config.get("startup_time", 5)
         for i in range(startup_time * 2):
@@ -213,133 +261,107 @@ class SystemManager:
         self.processes = {}
         self.running = True
         self.service_status = {}
-        self.retry_count = {}
         self.streamlit_manager = StreamlitManager()
+        self.startup_report = {}
+        self.health_monitor = None
         
-        # Inicializar contadores
-        for name in list(SERVICES.keys()) + list(self.streamlit_manager.ports.keys()):
-            self.retry_count[name] = 0
-        
+    def startup_specs(self) -> list:
+        """Serviços da inicialização com suas dependências e sondas de prontidão"""
+        specs = [
+            ServiceSpec(
+                name,
+                config["port"],
+                launch=lambda name=name, config=config: launch_service(name, config),
+                health_path=config.get("health_endpoint") or None,
+                depends_on=config.get("depends_on", ()),
+                timeout=max(config.get("startup_time", 5) * 3, 30),
+            )
+            for name, config in SERVICES.items()
+        ]
+        streamlit = self.streamlit_manager
+        for app_name, port in streamlit.ports.items():
+            base_name = app_name.split("_r")[0]
+            specs.append(ServiceSpec(
+                app_name,
+                port,
+                launch=lambda app_name=app_name, port=port: streamlit.launch_streamlit(
+                    app_name, port, headless=(app_name != "streamlit_hub")
+                ),
+                health_path="/_stcore/health",
+                depends_on=STREAMLIT_DEPENDS_ON.get(base_name, ()),
+                # 🔥 Uma sessão headless carrega imports/motores/caches antes do primeiro visitante
+                prime=(lambda port=port: streamlit_warmup.warm_up(port, pages=HOST_PAGES if STREAMLIT_HOST else ("",)))
+                if streamlit_warmup.WARMUP_ENABLED else None,
+            ))
+        return specs
+
     def start_all_services(self):
-        """Inicia todos os serviços em ordem controlada"""
+        """Inicia todos os serviços em paralelo, respeitando as dependências declaradas"""
         logger.info("Iniciando sistema FLUXON...")
         
-        # 1. Iniciar serviços principais
-        service_order = ["flask_api", "fastapi_proxy"]
-        
-        for service_name in service_order:
-            if service_name in SERVICES:
-                config = SERVICES[service_name]
-                process = start_service(service_name, config)
-                self.processes[service_name] = process
-                
-                is_healthy = process is not None and check_service_health(
-                    config["port"], config.get("health_endpoint", "")
-                )
-                self.service_status[service_name] = is_healthy
-                
-                if not is_healthy and process:
-                    logger.warning(f"Serviço {service_name} iniciado mas não está saudável")
-        
-        # 2. Iniciar Streamlit apps
-        logger.info("Iniciando aplicações Streamlit...")
-        
-        # Primeiro o hub (mais importante)
-        hub_process = self.streamlit_manager.start_streamlit(
-            "streamlit_hub", 
-            self.streamlit_manager.ports["streamlit_hub"], 
-            headless=False
-        )
-        
-        if hub_process:
-            self.processes["streamlit_hub"] = hub_process
-            if self.streamlit_manager.wait_for_streamlit(self.streamlit_manager.ports["streamlit_hub"]):
-                self.service_status["streamlit_hub"] = True
-            else:
-                self.service_status["streamlit_hub"] = False
-        
-        # Depois os outros apps
-        for app_name, port in self.streamlit_manager.ports.items():
-            if app_name != "streamlit_hub":
-                process = self.streamlit_manager.start_streamlit(app_name, port, headless=True)
-                if process:
-                    self.processes[app_name] = process
-                    self.service_status[app_name] = True
-                    time.sleep(2)
+        results = StartupOrchestrator(self.startup_specs()).run_sync()
+        for name, result in results.items():
+            if result.process is not None:
+                self.processes[name] = result.process
+            self.service_status[name] = result.ready
+        self.startup_report = {name: result.as_dict() for name, result in results.items()}
         
+        logger.info("Tempo até pronto por serviço:\n" + format_report(results))
+        warmup = {name: result.primed for name, result in results.items() if result.primed}
+        if warmup:
+            logger.info("Latência da primeira visita (fria -> aquecida):\n" + streamlit_warmup.format_report(warmup))
         logger.info("Todos os serviços iniciados")
         self.print_status()
     
-    def monitor_services(self):
-        """Monitora e reinicia serviços se necessário"""
-        logger.info("Iniciando monitoramento de serviços...")
-        
-        while self.running:
+    def restart_service(self, service_name: str):
+        """Encerra o processo anterior e dispara outro (a prontidão fica a cargo do monitor)"""
+        process = self.processes.get(service_name)
+        if process:
             try:
-                all_healthy = True
-                
-                # Monitorar serviços principais
-                for service_name, config in SERVICES.items():
-                    is_healthy = check_service_health(config["port"], config.get("health_endpoint", ""))
-                    self.update_service_status(service_name, is_healthy, config)
-                    if not is_healthy:
-                        all_healthy = False
-                
-                # Monitorar Streamlit apps
-                for app_name, port in self.streamlit_manager.ports.items():
-                    is_healthy = check_service_health(port, "/_stcore/health")
-                    self.update_service_status(app_name, is_healthy, {"max_retries": 3})
-                    if not is_healthy:
-                        all_healthy = False
-                
-                if all_healthy:
-                    logger.info("Todos os serviços estão operacionais")
-                
-                time.sleep(10)
-                
-            except KeyboardInterrupt:
-                logger.info("Interrupção recebida, desligando sistema...")
-                self.shutdown()
-                break
-            except Exception as e:
-                logger.error(f"Erro no monitoramento: {e}")
-                time.sleep(10)
+                process.terminate()
+                process.wait(timeout=5)
+            except:
+                try:
+                    process.kill()
+                except:
+                    pass
+        
+        if service_name in SERVICES:
+            self.processes[service_name] = launch_service(service_name, SERVICES[service_name])
+        elif service_name in self.streamlit_manager.ports:
+            self.processes[service_name] = self.streamlit_manager.launch_streamlit(
+                service_name,
+                self.streamlit_manager.ports[service_name],
+                headless=(service_name != "streamlit_hub")
+            )
     
-    def update_service_status(self, service_name: str, is_healthy: bool, config: dict):
-        """Atualiza status do serviço e reinicia se necessário"""
-        previous_status = self.service_status.get(service_name, False)
-        self.service_status[service_name] = is_healthy
+    def health_targets(self) -> list:
+        targets = [
+            HealthTarget(name, config["port"], config.get("health_endpoint", ""),
+                         restart=lambda name=name: self.restart_service(name))
+            for name, config in SERVICES.items()
+        ]
+        targets += [
+            HealthTarget(app_name, port, "/_stcore/health",
+                         restart=lambda app_name=app_name: self.restart_service(app_name))
+            for app_name, port in self.streamlit_manager.ports.items()
+        ]
+        return targets
+    
+    def on_health_change(self, service_name: str, state: str):
+        self.service_status[service_name] = state == "healthy"
+    
+    def monitor_services(self):
+        """Monitora todos os serviços em paralelo e reinicia com backoff e orçamento"""
+        logger.info("Iniciando monitoramento de serviços...")
         
-        if not is_healthy:
-            logger.warning(f"Serviço {service_name} está offline")
-            
-            if self.retry_count[service_name] < config.get("max_retries", 3):
-                self.retry_count[service_name] += 1
-                logger.info(f"Tentativa {self.retry_count[service_name]} de reiniciar {service_name}")
-                
-                # Encerrar processo anterior
-                if service_name in self.processes and self.processes[service_name]:
-                    try:
-                        self.processes[service_name].terminate()
-                        self.processes[service_name].wait(timeout=5)
-                    except:
-                        pass
-                
-                # Reiniciar serviço
-                if service_name in SERVICES:
-                    self.processes[service_name] = start_service(service_name, SERVICES[service_name])
-                elif service_name in self.streamlit_manager.ports:
-                    self.processes[service_name] = self.streamlit_manager.start_streamlit(
-                        service_name, 
-                        self.streamlit_manager.ports[service_name],
-                        headless=(service_name != "streamlit_hub")
-                    )
-            else:
-                logger.error(f"Serviço {service_name} excedeu o número máximo de tentativas")
-        else:
-            if not previous_status and is_healthy:
-                logger.info(f"Serviço {service_name} recuperado")
-            self.retry_count[service_name] = 0
+        self.health_monitor = HealthMonitor(self.health_targets(), on_change=self.on_health_change).start()
+        try:
+            while self.running:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logger.info("Interrupção recebida, desligando sistema...")
+            self.shutdown()
     
     def print_status(self):
         """Exibe status atual dos serviços"""
@@ -363,6 +385,8 @@ class SystemManager:
         """Desliga todos os serviços de forma controlada"""
         self.running = False
         logger.info("Desligando todos os serviços...")
+        if self.health_monitor:
+            self.health_monitor.stop()
         
         for name, process in self.processes.items():
             if process:
@@ -376,6 +400,7 @@ class SystemManager:
                     except:
                         pass
         
+        log_multiplexer.close()
         logger.info("Sistema desligado com sucesso")
 
 def main():
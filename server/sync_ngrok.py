@@ -3,9 +3,10 @@ import requests
 import subprocess
 import os
 import json
-import re
 from pathlib import Path
 import logging
+from services.supervisor import supervisor
+from services.tunnel_registry import tunnel_registry
 
 # Configurar logging
 logging.basicConfig(
@@ -18,29 +19,17 @@ class NgrokCoordinator:
     def __init__(self):
         self.current_pid = None
         self.current_url = None
-        self.config_file = Path(__file__).parent / ".ngrok_coordinator.json"
-        self.redirect_config = Path(__file__).parent / ".ngrok_redirects.json"  # NOVO: Config de redirecionamento
-        self.client_dir = Path(__file__).parent.parent / "client"
+        self._published = set()  # túneis que este coordenador publicou no registro
         self.history_file = Path(__file__).parent / ".ngrok_history.json"  # NOVO: Histórico de URLs
         self.load_config()
     
     def load_config(self):
         """Carrega configuração persistente - MANTIDO ORIGINAL"""
         try:
-            if self.config_file.exists():
-                with open(self.config_file, 'r') as f:
-                    config = json.load(f)
-                    self.current_pid = config.get('pid')
-                    self.current_url = config.get('url')
-            
-            # NOVO: Carregar configuração de redirecionamento
-            if self.redirect_config.exists():
-                with open(self.redirect_config, 'r') as f:
-                    redirect_config = json.load(f)
-                    # Mantém compatibilidade com sistemas existentes
-            else:
-                # Cria arquivo de redirecionamento se não existir
-                self.save_redirect_config()
+            # ✅ ESTADO COMPARTILHADO: REGISTRO DE TÚNEIS
+            registry = tunnel_registry.snapshot()
+            self.current_pid = registry.get('pid')
+            self.current_url = registry.get('url')
                 
             # NOVO: Carregar histórico se existir
             if self.history_file.exists():
@@ -57,42 +46,30 @@ class NgrokCoordinator:
     
     # ✅ ADICIONE ESTA FUNÇÃO DENTRO DA CLASSE NgrokCoordinator:
     def save_config(self):
-        """Salva configuração atual - VERSÃO MELHORADA PARA MULTIPORTAS"""
+        """Publica a configuração atual no registro compartilhado de túneis"""
         try:
             # ✅ OBTÉM TODOS OS TÚNEIS ATIVOS
             all_tunnels = self.get_ngrok_tunnels() or {}
             
-            config = {
-                'pid': self.current_pid,
-                'url': self.current_url,  # ✅ MANTÉM COMPATIBILIDADE
-                'urls': all_tunnels,      # ✅ NOVO: TODOS OS TÚNEIS
-                'timestamp': time.time(),
-                'version': '2.0-multiport'
-            }
-            
-            # ✅ SALVA EM AMBOS OS DIRETÓRIOS
-            self.save_config_to_both_locations(config)
-                    
-            # ✅ ATUALIZA CONFIG DE REDIRECIONAMENTO
-            self.save_redirect_config()
+            # ✅ GRAVAÇÃO ATÔMICA COM VERSÃO (substitui .ngrok_coordinator.json/.ngrok_redirects.json)
+            # merge: túneis de outros publicadores (ex.: cloudflare) continuam no registro;
+            # só os que este coordenador publicou antes e sumiram são retirados
+            stale = self._published - set(all_tunnels)
+            if stale:
+                tunnel_registry.unpublish(stale, source='ngrok_coordinator')
+            version = tunnel_registry.publish(
+                all_tunnels, source='ngrok_coordinator', url=self.current_url, merge=True, pid=self.current_pid
+            )
+            self._published = set(all_tunnels)
             
             # ✅ SALVA NO HISTÓRICO
             self.save_to_history()
             
-            logger.info(f"✅ Config salva com {len(all_tunnels)} túneis")
+            logger.info(f"✅ Config v{version} salva com {len(all_tunnels)} túneis")
             
         except Exception as e:
             logger.error(f"❌ Erro ao salvar config: {e}")
     
-    def save_redirect_config(self):
-        """NOVO: Salva configuração para o servidor de redirecionamento"""
-        try:
-            config = {'current_ngrok': self.current_url}
-            with open(self.redirect_config, 'w') as f:
-                json.dump(config, f, indent=2)
-        except Exception as e:
-            logger.error(f"Erro ao salvar config de redirecionamento: {e}")
-    
     def save_to_history(self):
         """NOVO: Salva URL no histórico"""
         try:
@@ -106,23 +83,6 @@ class NgrokCoordinator:
         except Exception as e:
             logger.error(f"Erro ao salvar histórico: {e}")
             
-    def save_config_to_both_locations(self, config):
-        """Salva a configuração tanto no diretório server quanto no client"""
-        try:
-            # ✅ SALVA NO DIRETÓRIO SERVER (original)
-            with open(self.config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-            
-            # ✅ SALVA NO DIRETÓRIO CLIENT (para o servidor web)
-            client_config_file = self.client_dir / ".ngrok_coordinator.json"
-            with open(client_config_file, 'w') as f:
-                json.dump(config, f, indent=2)
-                
-            logger.info(f"✅ Configuração salva em ambos os diretórios")
-            
-        except Exception as e:
-            logger.error(f"❌ Erro ao salvar configuração em ambos os locais: {e}")
-    
     def is_ngrok_running(self):
         """Verifica se o Ngrok já está rodando - MANTIDO ORIGINAL"""
         try:
@@ -150,62 +110,6 @@ class NgrokCoordinator:
             pass
         return None
     
-    def update_html_files(self, new_ngrok_url):
-        """Atualiza automaticamente todos os arquivos HTML - MANTIDO ORIGINAL"""
-        try:
-            if not self.client_dir.exists():
-                logger.warning(f"Diretório client não encontrado: {self.client_dir}")
-                return False
-            
-            html_files = ['link_alma.html', 'index_external.html', 'index_internal.html']
-            updated_count = 0
-            
-            for file_name in html_files:
-                file_path = self.client_dir / file_name
-                
-                if file_path.exists():
-                    try:
-                        with open(file_path, 'r', encoding='utf-8') as file:
-                            content = file.read()
-                        
-                        # Substitui qualquer URL ngrok antiga pela nova
-                        old_pattern = r'https://[a-z0-9-]+\.ngrok-free\.app'
-                        new_content = re.sub(old_pattern, new_ngrok_url, content)
-                        
-                        # Atualiza específicamente o fallback no JavaScript
-                        js_patterns = [
-                            r"fallbackNgrok: 'https://[a-z0-9-]+\.ngrok-free\.app'",
-                            r'fallbackNgrok: "https://[a-z0-9-]+\.ngrok-free\.app"'
-                        ]
-                        
-                        for pattern in js_patterns:
-                            new_js = f"fallbackNgrok: '{new_ngrok_url}'"
-                            new_content = re.sub(pattern, new_js, new_content)
-                        
-                        # Atualiza data attributes
-                        data_pattern = r'data-ngrok-url="https://[a-z0-9-]+\.ngrok-free\.app'
-                        new_data = f'data-ngrok-url="{new_ngrok_url}'
-                        new_content = re.sub(data_pattern, new_data, new_content)
-                        
-                        if new_content != content:
-                            with open(file_path, 'w', encoding='utf-8') as file:
-                                file.write(new_content)
-                            logger.info(f"✅ {file_name} atualizado com: {new_ngrok_url}")
-                            updated_count += 1
-                        else:
-                            logger.debug(f"ℹ️  {file_name} já está atualizado")
-                            
-                    except Exception as e:
-                        logger.error(f"❌ Erro ao atualizar {file_name}: {e}")
-                else:
-                    logger.debug(f"ℹ️  Arquivo não encontrado: {file_name}")
-            
-            return updated_count > 0
-            
-        except Exception as e:
-            logger.error(f"❌ Erro geral na atualização HTML: {e}")
-            return False
-    
     def start_ngrok(self):
         """Inicia Ngrok apenas se não estiver rodando - MANTIDO ORIGINAL"""
         logger.info("🔧 Coordenador Ngrok iniciado")
@@ -219,9 +123,6 @@ class NgrokCoordinator:
                 self.save_config()
                 logger.info(f"🌐 URL existente: {existing_url}")
                 
-                # Atualiza HTMLs com URL existente
-                self.update_html_files(existing_url)
-                
                 return existing_url
         
         # Mata processos antigos para garantir limpeza
@@ -251,10 +152,6 @@ class NgrokCoordinator:
                     self.save_config()
                     logger.info(f"🌐 Nova URL: {url}")
                     
-                    # Atualiza HTMLs automaticamente
-                    if self.update_html_files(url):
-                        logger.info("🎯 Arquivos HTML atualizados automaticamente")
-                    
                     return url
                 time.sleep(1)
             
@@ -305,7 +202,7 @@ class NgrokCoordinator:
         return True  # ✅ SEMPRE RETORNA True PARA NÃO BLOQUEAR
 
     def monitor_ngrok_url(self):
-        """Monitora continuamente a URL do Ngrok"""
+        """Monitora a URL do Ngrok como assinante do supervisor (sem sondagem própria)"""
         print("📡 Iniciando monitoramento contínuo multiporta...")
         
         # ✅ VERIFICAÇÃO OPCIONAL - NÃO BLOQUEIA
@@ -315,74 +212,48 @@ class NgrokCoordinator:
         except:
             pass  # ✅ IGNORA QUALQUER ERRO
         
-        last_tunnels = {}
+        self._last_tunnels = {}
+        supervisor.watch_tunnels()
+        unsubscribe = supervisor.subscribe(self.on_tunnels_changed, topics=["tunnels.healthy"])
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            logger.info("⏹️ Monitoramento interrompido")
+        finally:
+            unsubscribe()
+
+    def on_tunnels_changed(self, event):
+        """Publica a configuração quando os túneis saudáveis mudam"""
+        healthy_tunnels = event.value or {}
+        last_tunnels = self._last_tunnels
         
-        while True:
-            try:
-                # ✅ OBTÉM TODOS OS TÚNEIS
-                current_tunnels = self.get_ngrok_tunnels() or {}
-                
-                if not current_tunnels:
-                    logger.warning("⚠️ Nenhum túnel Ngrok detectado")
-                    time.sleep(20)
-                    continue
-                
-                # ✅ VERIFICA SAÚDE DE CADA TÚNEL
-                healthy_tunnels = {}
-                for tunnel_name, tunnel_url in current_tunnels.items():
-                    if self.verify_tunnel_health(tunnel_url, tunnel_name):
-                        healthy_tunnels[tunnel_name] = tunnel_url
-                        logger.debug(f"✅ {tunnel_name}: {tunnel_url}")
-                    else:
-                        logger.warning(f"⚠️ {tunnel_name} não saudável: {tunnel_url}")
-                
-                # ✅ ATUALIZA SE HOUVER MUDANÇAS
-                if healthy_tunnels != last_tunnels:
-                    if healthy_tunnels:
-                        logger.info(f"🔄 Mudança detectada: {len(healthy_tunnels)} túneis saudáveis")
-                        
-                        # ✅ ATUALIZA URL PRINCIPAL (para compatibilidade)
-                        self.current_url = healthy_tunnels.get('proxy') or next(iter(healthy_tunnels.values()))
-                        
-                        # ✅ SALVA CONFIGURAÇÃO COMPLETA
-                        self.save_config()
-                        
-                        # ✅ ATUALIZA HTMLs APENAS SE URL PRINCIPAL MUDOU
-                        if self.current_url != (last_tunnels.get('proxy') if last_tunnels else None):
-                            if self.update_html_files(self.current_url):
-                                logger.info("🎯 Arquivos HTML atualizados")
-                        
-                        last_tunnels = healthy_tunnels
-                    else:
-                        logger.warning("💥 Todos os túneis insaudáveis")
-                
-                time.sleep(25)  # ✅ AUMENTADO PARA 25s
-                
-            except KeyboardInterrupt:
-                logger.info("⏹️ Monitoramento interrompido")
-                break
-            except Exception as e:
-                logger.error(f"❌ Erro no monitoramento: {e}")
-                time.sleep(30)
+        if not healthy_tunnels:
+            logger.warning("💥 Nenhum túnel Ngrok saudável")
+            return
+        if healthy_tunnels == last_tunnels:
+            return
+        
+        logger.info(f"🔄 Mudança detectada: {len(healthy_tunnels)} túneis saudáveis")
+        
+        # ✅ ATUALIZA URL PRINCIPAL (para compatibilidade)
+        self.current_url = healthy_tunnels.get('proxy') or next(iter(healthy_tunnels.values()))
+        
+        # ✅ SALVA CONFIGURAÇÃO COMPLETA (as páginas leem a URL de /runtime-config.js)
+        self.save_config()
+        
+        self._last_tunnels = healthy_tunnels
                 
     def sync_with_ngrok_manager(self):
-        """Sincroniza com o ngrok_manager.py para consistência"""
+        """Sincroniza com o ngrok_manager.py pelo registro de túneis"""
         try:
-            # ✅ VERIFICA SE O NGROK_MANAGER ESTÁ RODANDO
-            manager_config_path = Path(__file__).parent / ".ngrok_coordinator.json"
-            if manager_config_path.exists():
-                with open(manager_config_path, 'r') as f:
-                    manager_config = json.load(f)
-                
-                # ✅ COMPARA CONFIGURAÇÕES
-                current_tunnels = self.get_ngrok_tunnels() or {}
-                manager_tunnels = manager_config.get('urls', {})
-                
-                if current_tunnels != manager_tunnels:
-                    logger.info("🔄 Sincronizando com ngrok_manager...")
-                    # ✅ ATUALIZA MANAGER COM NOSSOS TÚNEIS
-                    self.save_config()
-                    return True
+            # ✅ COMPARA COM O QUE ESTE COORDENADOR PUBLICOU (URLs de outros processos não contam)
+            current_tunnels = self.get_ngrok_tunnels() or {}
+            published = {name: url for name, url in tunnel_registry.urls().items() if name in self._published}
+            if current_tunnels != published:
+                logger.info("🔄 Sincronizando com ngrok_manager...")
+                self.save_config()
+                return True
             
             return False
             
@@ -3,14 +3,19 @@ import time
 import requests
 import logging
 import subprocess
-from threading import Thread
+from services.supervisor import FLASK_HEALTH_URL, NGROK_URL_PATTERNS, supervisor
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger('SystemMonitor')
 
+# Intervalo mínimo entre reinícios do Ngrok (evita reinícios em cascata)
+RESTART_COOLDOWN = 60
+
 class SystemMonitor:
     def __init__(self):
-        self.running = True
+        self.running = False
+        self._unsubscribe = None
+        self._last_restart = 0
         
     def check_ngrok_health(self):
         """Verifica a saúde do Ngrok"""
@@ -59,49 +64,53 @@ class SystemMonitor:
             return False
             
     def restart_ngrok(self):
-        """Reinicia o Ngrok"""
+        """Reinicia o Ngrok; a saída do novo processo é acompanhada pelo supervisor"""
         try:
             logger.warning("Reiniciando Ngrok...")
             subprocess.run(["pkill", "-f", "ngrok"], capture_output=True)
             time.sleep(2)
-            subprocess.Popen(["ngrok", "http", "5000", "--log=stdout"], 
-                           stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+            supervisor.watch_process("ngrok", ["ngrok", "http", "5000", "--log=stdout"],
+                                     NGROK_URL_PATTERNS, restart=True)
+            self._last_restart = time.time()
             logger.info("Ngrok reiniciado")
             return True
         except Exception as e:
             logger.error(f"Erro ao reiniciar Ngrok: {e}")
             return False
             
-    def monitor_loop(self):
-        """Loop principal de monitoramento"""
-        while self.running:
-            try:
-                # Verifica saúde dos componentes
-                ngrok_healthy = self.check_ngrok_health()
-                flask_healthy = self.check_flask_health()
-                
-                if not ngrok_healthy and flask_healthy:
-                    logger.warning("Ngrok não está saudável, mas Flask está - reiniciando Ngrok")
-                    self.restart_ngrok()
-                    
-                elif not flask_healthy:
-                    logger.error("Flask não está respondendo - verifique o servidor")
-                    
-                time.sleep(30)  # Verifica a cada 30 segundos
-                
-            except Exception as e:
-                logger.error(f"Erro no monitor: {e}")
-                time.sleep(60)
+    def on_event(self, event):
+        """Reage às mudanças publicadas pelo supervisor (substitui o laço de 30s)"""
+        if not self.running:
+            return
+        ngrok_healthy = supervisor.get("ngrok.api")
+        flask_healthy = supervisor.get("health.flask")
+
+        if ngrok_healthy is False and flask_healthy:
+            if time.time() - self._last_restart < RESTART_COOLDOWN:
+                logger.warning("Ngrok ainda indisponível - aguardando o reinício anterior")
+                return
+            logger.warning("Ngrok não está saudável, mas Flask está - reiniciando Ngrok")
+            self.restart_ngrok()
+
+        elif event.topic == "health.flask" and flask_healthy is False:
+            logger.error("Flask não está respondendo - verifique o servidor")
                 
     def start(self):
-        """Inicia o monitoramento em thread separada"""
-        self.thread = Thread(target=self.monitor_loop, daemon=True)
-        self.thread.start()
+        """Inicia o monitoramento como assinante do supervisor"""
+        if self.running:
+            return
+        self.running = True
+        supervisor.watch_ngrok()
+        supervisor.watch_http("flask", FLASK_HEALTH_URL)
+        self._unsubscribe = supervisor.subscribe(self.on_event, topics=["ngrok.api", "health.flask"])
         logger.info("Monitor do sistema iniciado")
         
     def stop(self):
         """Para o monitoramento"""
         self.running = False
+        if self._unsubscribe:
+            self._unsubscribe()
+            self._unsubscribe = None
         logger.info("Monitor do sistema parado")
 
 # Uso:
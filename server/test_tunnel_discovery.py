@@ -0,0 +1,91 @@
+# test_tunnel_discovery.py
+import asyncio
+import os
+import sys
+import time
+
+from aiohttp import web
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from tunnel_discovery import DiscoveryCache, discover, discover_tunnel_url
+
+
+async def _start(app):
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    return runner, f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+
+
+def _tunnel(status=200, delay=0.0, paths=("/health",)):
+    """Túnel falso: responde 'status' nos 'paths' depois de 'delay' segundos"""
+
+    async def handler(request):
+        await asyncio.sleep(delay)
+        return web.Response(status=status if request.path in paths else 404)
+
+    app = web.Application()
+    app.router.add_get("/{path:.*}", handler)
+    return app
+
+
+def _ngrok_api(public_urls, delay=0.0):
+    """API local do ngrok falsa"""
+
+    async def tunnels(request):
+        await asyncio.sleep(delay)
+        return web.json_response({"tunnels": [{"public_url": url, "proto": url.split(":")[0]} for url in public_urls]})
+
+    app = web.Application()
+    app.router.add_get("/api/tunnels", tunnels)
+    return app
+
+
+async def _cenario(cache):
+    runners = []
+    try:
+        lento, lento_url = await _start(_tunnel(delay=1.0))
+        quebrado, quebrado_url = await _start(_tunnel(status=500))
+        saudavel, saudavel_url = await _start(_tunnel(paths=("/api/time",)))
+        api_a, api_a_url = await _start(_ngrok_api([lento_url, quebrado_url]))
+        api_b, api_b_url = await _start(_ngrok_api([saudavel_url], delay=0.1))
+        runners += [lento, quebrado, saudavel, api_a, api_b]
+
+        inicio = time.perf_counter()
+        url = await discover(
+            api_urls=[api_a_url + "/api/tunnels", "http://127.0.0.1:9/api/tunnels", api_b_url + "/api/tunnels"],
+            api_timeout=0.5, probe_timeout=2.0, overall_timeout=3.0, cache=cache,
+        )
+        decorrido = time.perf_counter() - inicio
+
+        assert url == saudavel_url
+        assert decorrido < 0.9  # não esperou o túnel lento nem tentativas sequenciais
+
+        # As sondas restantes continuam e aquecem o cache
+        await asyncio.sleep(1.3)
+        assert cache.health[lento_url][0] is True
+        assert cache.health[quebrado_url][0] is False
+    finally:
+        for runner in runners:
+            await runner.cleanup()
+
+
+def test_primeira_url_saudavel_e_cache_aquecido():
+    asyncio.run(_cenario(DiscoveryCache()))
+
+
+def test_sem_tuneis_devolve_none_no_prazo():
+    inicio = time.perf_counter()
+    url = discover_tunnel_url(cache=DiscoveryCache(), api_urls=["http://127.0.0.1:9/api/tunnels"],
+                              api_timeout=0.2, overall_timeout=0.5)
+    assert url is None
+    assert time.perf_counter() - inicio < 1.5
+
+
+def test_cache_responde_sem_sondar():
+    cache = DiscoveryCache()
+    cache.record("https://abc.ngrok-free.app", True)
+    cache.record("http://abc.ngrok-free.app", True)
+    assert discover_tunnel_url(cache=cache, api_urls=[]) == "https://abc.ngrok-free.app"
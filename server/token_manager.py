@@ -1,8 +1,6 @@
 # token_manager.py (versão completa de segurança)
 import jwt
-import json
 from datetime import datetime, timedelta
-import os
 from config import SECURITY_CONFIG
 import requests
 import logging
@@ -11,6 +9,11 @@ import uuid
 import psutil
 import platform
 from typing import Dict, Optional
+from tunnel_discovery import DISCOVERY_CACHE, discover_tunnel_url
+from services.tunnel_registry import tunnel_registry
+
+# Entradas do registro mais antigas que isso não são confiáveis: o coordenador pode ter morrido
+REGISTRY_MAX_AGE = 600
 
 logger = logging.getLogger(__name__)
 
@@ -149,92 +152,33 @@ class TokenManager:
             return None
 
     def get_dynamic_ngrok_url(self) -> str:
-        """Obtém URL do Ngrok com verificação de estabilidade e fallback inteligente"""
-        max_attempts = 5  # 🔧 Aumentado para 5 tentativas
-        healthy_urls = []  # 🔧 Lista para URLs que passaram no health check
+        """Obtém URL do Ngrok: registro compartilhado, sondas concorrentes com prazo e fallback inteligente"""
+        # 🔧 Registro de túneis mantido pelos coordenadores: leitura O(1), sem HTTP
+        registry = tunnel_registry.snapshot()
+        registry_url = tunnel_registry.current_url(max_age=REGISTRY_MAX_AGE)
+        if registry_url and registry["source"] != "token_manager":
+            return registry_url
+        if registry["url"] and not registry_url:
+            logger.debug(f"⌛ URL do registro expirada, descobrindo de novo: {registry['url']}")
         
-        for attempt in range(max_attempts):
-            try:
-                response = requests.get(
-                    "http://localhost:4040/api/tunnels", 
-                    timeout=5,  # 🔧 Timeout aumentado
-                    headers={
-                        'Cache-Control': 'no-cache',
-                        'User-Agent': 'Fluxon-Token-Manager/1.0'
-                    }
-                )
-                
-                if response.status_code == 200:
-                    tunnels = response.json().get('tunnels', [])
-                    if tunnels:
-                        # 🔧 Verifica TODOS os túneis e prioriza os saudáveis
-                        for tunnel in tunnels:
-                            tunnel_url = tunnel['public_url']
-                            
-                            # 🔧 VERIFICA SAÚDE da URL antes de retornar
-                            if self._is_ngrok_url_healthy(tunnel_url):
-                                healthy_urls.append(tunnel_url)
-                                logger.info(f"✅ URL Ngrok saudável encontrada: {tunnel_url}")
-                        
-                        # 🔧 Retorna a primeira URL saudável (prioriza HTTPS)
-                        if healthy_urls:
-                            https_urls = [url for url in healthy_urls if url.startswith('https://')]
-                            if https_urls:
-                                return https_urls[0]
-                            return healthy_urls[0]
-                        
-                        # 🔧 Se nenhuma URL está saudável, tenta mesmo assim
-                        https_tunnel = next((t for t in tunnels if t.get('proto') == 'https'), None)
-                        if https_tunnel:
-                            logger.warning(f"⚠️  URL HTTPS encontrada mas não verificada: {https_tunnel['public_url']}")
-                            return https_tunnel['public_url']
-                        
-                        logger.warning(f"⚠️  Túnel encontrado mas sem verificação de saúde: {tunnels[0]['public_url']}")
-                        return tunnels[0]['public_url']
-                
-                logger.debug(f"Tentativa {attempt + 1}: API retornou status {response.status_code}")
-                    
-            except requests.RequestException as e:
-                logger.debug(f"Tentativa {attempt + 1} falhou: {e}")
-            
-            # 🔧 Aguarda progressivamente mais entre tentativas
-            delay = min(2 * (attempt + 1), 10)  # 2, 4, 6, 8, 10 segundos
-            if attempt < max_attempts - 1:
-                time.sleep(delay)
+        # 🔧 Todas as APIs/túneis/endpoints testados em paralelo; a primeira URL saudável vence
+        url = discover_tunnel_url()
+        if url:
+            logger.info(f"✅ URL Ngrok saudável encontrada: {url}")
+            self._cache_ngrok_url(url)
+            return url
+        
+        # 🔧 Túnel listado pela API mas sem resposta no prazo: tenta mesmo assim
+        unverified = DISCOVERY_CACHE.unverified()
+        if unverified:
+            logger.warning(f"⚠️  Túnel encontrado mas sem verificação de saúde: {unverified}")
+            return unverified
         
         # 🔧 FALLBACK INTELIGENTE - Tenta múltiplas estratégias
         fallback_url = self._get_fallback_url()
         logger.warning(f"🔁 Usando fallback: {fallback_url}")
         return fallback_url
 
-    def _is_ngrok_url_healthy(self, url: str) -> bool:
-        """Verifica se a URL do Ngrok está respondendo corretamente"""
-        try:
-            # 🔧 Testa múltiplos endpoints para garantir que está funcional
-            test_endpoints = [
-                f"{url}/health",           # Endpoint principal
-                f"{url}/api/time",         # Endpoint alternativo
-                f"{url}/api/check_session" # Endpoint de sessão
-            ]
-            
-            for endpoint in test_endpoints:
-                try:
-                    response = requests.get(
-                        endpoint, 
-                        timeout=3,
-                        headers={'X-Fluxon-Verification': 'true'}
-                    )
-                    if response.status_code == 200:
-                        return True
-                except:
-                    continue
-            
-            return False
-            
-        except Exception as e:
-            logger.debug(f"Erro na verificação de saúde da URL {url}: {e}")
-            return False
-
     def _get_fallback_url(self) -> str:
         """Obtém URL de fallback com múltiplas estratégias"""
         fallback_strategies = [
@@ -269,16 +213,8 @@ class TokenManager:
     def _get_last_known_ngrok_url(self) -> str:
         """Tenta obter a última URL conhecida do Ngrok"""
         try:
-            # 🔧 Verifica se há um arquivo de cache com a última URL
-            cache_file = os.path.join(os.path.dirname(__file__), '.ngrok_cache.json')
-            if os.path.exists(cache_file):
-                with open(cache_file, 'r') as f:
-                    cache_data = json.load(f)
-                    if cache_data.get('url') and cache_data.get('timestamp'):
-                        # 🔧 Verifica se o cache é recente (menos de 10 minutos)
-                        cache_time = datetime.fromisoformat(cache_data['timestamp'])
-                        if (datetime.now() - cache_time).total_seconds() < 600:
-                            return cache_data['url']
+            # 🔧 Última URL do registro, se recente (menos de 10 minutos)
+            return tunnel_registry.current_url(max_age=REGISTRY_MAX_AGE)
         except:
             pass
         return None
@@ -288,17 +224,11 @@ class TokenManager:
         return "http://localhost:5000"
 
     def _cache_ngrok_url(self, url: str):
-        """Armazena a URL do Ngrok em cache para fallback futuro"""
+        """Publica a URL descoberta no registro compartilhado de túneis"""
         try:
-            cache_file = os.path.join(os.path.dirname(__file__), '.ngrok_cache.json')
-            cache_data = {
-                'url': url,
-                'timestamp': datetime.now().isoformat()
-            }
-            with open(cache_file, 'w') as f:
-                json.dump(cache_data, f)
-        except:
-            pass
+            tunnel_registry.publish(url=url, source="token_manager", merge=True)
+        except Exception as e:
+            logger.debug(f"Não foi possível atualizar o registro de túneis: {e}")
     
     def generate_quantum_url(self, user_id: int, email: str, is_admin: bool = False, 
                            license_data: Optional[Dict] = None) -> tuple:
@@ -0,0 +1,228 @@
+# tunnel_discovery.py
+"""
+Descoberta concorrente da URL pública do túnel (ngrok)
+Consulta todas as APIs locais do ngrok e testa todos os túneis/endpoints em paralelo,
+cada sonda com seu próprio prazo. A primeira URL saudável é devolvida; as sondas restantes
+continuam em segundo plano e mantêm o cache compartilhado aquecido.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Portas possíveis da API local do ngrok (mesmas do NgrokManager)
+NGROK_API_URLS = (
+    "http://localhost:4040/api/tunnels",
+    "http://localhost:4041/api/tunnels",
+    "http://localhost:4050/api/tunnels",
+)
+
+# Endpoints que comprovam que o túnel chega até a API
+HEALTH_PATHS = ("/health", "/api/time", "/api/check_session")
+
+API_TIMEOUT = 1.5      # prazo de cada consulta à API do ngrok
+PROBE_TIMEOUT = 2.0    # prazo de cada sonda de saúde
+OVERALL_TIMEOUT = 4.0  # prazo total para quem está esperando a URL
+CACHE_TTL = 30.0       # validade de uma sonda bem-sucedida
+
+
+class DiscoveryCache:
+    """Resultados das sondas compartilhados por todas as instâncias (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.health: Dict[str, Tuple[bool, float]] = {}
+        self.tunnels: Dict[str, float] = {}
+        self.refreshing = False
+
+    def record_tunnels(self, urls: Iterable[str]):
+        with self._lock:
+            for url in urls:
+                self.tunnels[url] = time.time()
+
+    def record(self, url: str, healthy: bool):
+        with self._lock:
+            previous = self.health.get(url)
+            # Um sucesso recente não é desfeito por uma sonda que falhou no mesmo ciclo
+            if healthy or previous is None or not previous[0] or time.time() - previous[1] > CACHE_TTL:
+                self.health[url] = (healthy, time.time())
+
+    def best(self, max_age: float = CACHE_TTL) -> Optional[str]:
+        """URL saudável mais recente dentro da validade (HTTPS primeiro)"""
+        now = time.time()
+        with self._lock:
+            healthy = [(url, checked) for url, (ok, checked) in self.health.items()
+                       if ok and now - checked <= max_age]
+        if not healthy:
+            return None
+        healthy.sort(key=lambda item: (item[0].startswith("https://"), item[1]), reverse=True)
+        return healthy[0][0]
+
+    def age(self, url: str) -> Optional[float]:
+        with self._lock:
+            entry = self.health.get(url)
+        return time.time() - entry[1] if entry else None
+
+    def unverified(self, max_age: float = CACHE_TTL) -> Optional[str]:
+        """Túnel listado recentemente pela API mas não confirmado (HTTPS primeiro)"""
+        now = time.time()
+        with self._lock:
+            tunnels = [url for url, seen in self.tunnels.items() if now - seen <= max_age]
+        https = [url for url in tunnels if url.startswith("https://")]
+        return (https or tunnels or [None])[0]
+
+    def clear(self):
+        with self._lock:
+            self.health.clear()
+            self.tunnels.clear()
+
+
+DISCOVERY_CACHE = DiscoveryCache()
+
+# Descobertas que ainda têm sondas em andamento depois de responder
+_BACKGROUND = set()
+
+
+def _dedupe_tunnels(tunnels: List[dict]) -> List[str]:
+    """Um URL por host, preferindo HTTPS (ngrok v2 lista http e https do mesmo túnel)"""
+    by_host: Dict[str, str] = {}
+    for tunnel in tunnels:
+        url = tunnel.get("public_url")
+        if not url:
+            continue
+        host = urlparse(url).netloc
+        if host not in by_host or url.startswith("https://"):
+            by_host[host] = url
+    return sorted(by_host.values(), key=lambda url: not url.startswith("https://"))
+
+
+async def _fetch_tunnels(session: aiohttp.ClientSession, api_url: str, timeout: float) -> List[str]:
+    try:
+        async with session.get(api_url, timeout=aiohttp.ClientTimeout(total=timeout),
+                               headers={"Cache-Control": "no-cache"}) as response:
+            if response.status != 200:
+                return []
+            data = await response.json(content_type=None)
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError) as e:
+        logger.debug(f"API do ngrok indisponível em {api_url}: {e}")
+        return []
+    return _dedupe_tunnels(data.get("tunnels", []))
+
+
+async def _probe(session: aiohttp.ClientSession, tunnel_url: str, path: str, timeout: float) -> bool:
+    try:
+        async with session.get(f"{tunnel_url.rstrip('/')}{path}", timeout=aiohttp.ClientTimeout(total=timeout),
+                               headers={"X-Fluxon-Verification": "true"}) as response:
+            return response.status == 200
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        return False
+
+
+async def discover(api_urls: Iterable[str] = NGROK_API_URLS, health_paths: Iterable[str] = HEALTH_PATHS,
+                   api_timeout: float = API_TIMEOUT, probe_timeout: float = PROBE_TIMEOUT,
+                   overall_timeout: float = OVERALL_TIMEOUT,
+                   cache: DiscoveryCache = DISCOVERY_CACHE) -> Optional[str]:
+    """
+    Devolve a primeira URL de túnel saudável ou None se nenhuma responder no prazo.
+    As sondas em andamento continuam até o próprio prazo e atualizam o cache.
+    """
+    health_paths = tuple(health_paths)
+    found: asyncio.Future = asyncio.get_running_loop().create_future()
+    session = aiohttp.ClientSession()
+    probes: List[asyncio.Task] = []
+    probed = set()
+
+    async def probe_tunnel(tunnel_url: str):
+        # Todos os endpoints do túnel em paralelo; basta um responder 200
+        results = [asyncio.create_task(_probe(session, tunnel_url, path, probe_timeout)) for path in health_paths]
+        healthy = False
+        for result in asyncio.as_completed(results):
+            if await result:
+                healthy = True
+                break
+        for task in results:
+            task.cancel()
+        cache.record(tunnel_url, healthy)
+        if healthy and not found.done():
+            found.set_result(tunnel_url)
+
+    async def query_api(api_url: str):
+        tunnels = await _fetch_tunnels(session, api_url, api_timeout)
+        cache.record_tunnels(tunnels)
+        for tunnel_url in tunnels:
+            if tunnel_url not in probed:
+                probed.add(tunnel_url)
+                probes.append(asyncio.create_task(probe_tunnel(tunnel_url)))
+
+    async def finish_in_background():
+        try:
+            await asyncio.gather(*queries, return_exceptions=True)
+            await asyncio.gather(*probes, return_exceptions=True)
+        finally:
+            await session.close()
+            if not found.done():
+                found.set_result(None)
+
+    queries = [asyncio.create_task(query_api(api_url)) for api_url in api_urls]
+    background = asyncio.create_task(finish_in_background())
+    _BACKGROUND.add(background)
+    background.add_done_callback(_BACKGROUND.discard)
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(found), overall_timeout)
+    except asyncio.TimeoutError:
+        return None
+
+
+class _DiscoveryLoop:
+    """Event loop dedicado em uma thread, para chamadas síncronas (Flask) e sondas em segundo plano"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def get(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self.loop is None:
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="tunnel-discovery", daemon=True).start()
+            return self.loop
+
+
+_LOOP = _DiscoveryLoop()
+
+
+def _refresh_in_background(cache: DiscoveryCache, **kwargs):
+    if cache.refreshing:
+        return
+    cache.refreshing = True
+    future = asyncio.run_coroutine_threadsafe(discover(cache=cache, **kwargs), _LOOP.get())
+    future.add_done_callback(lambda _: setattr(cache, "refreshing", False))
+
+
+def discover_tunnel_url(max_age: float = CACHE_TTL, cache: DiscoveryCache = DISCOVERY_CACHE,
+                        **kwargs) -> Optional[str]:
+    """
+    Versão síncrona: responde do cache quando há URL saudável recente
+    (renovando em segundo plano depois de metade da validade); senão espera a descoberta.
+    """
+    cached = cache.best(max_age)
+    if cached:
+        if cache.age(cached) > max_age / 2:
+            _refresh_in_background(cache, **kwargs)
+        return cached
+
+    overall = kwargs.get("overall_timeout", OVERALL_TIMEOUT)
+    future = asyncio.run_coroutine_threadsafe(discover(cache=cache, **kwargs), _LOOP.get())
+    try:
+        return future.result(timeout=overall + 1)
+    except Exception as e:
+        logger.debug(f"Descoberta do túnel falhou: {e}")
+        return None